@@ -0,0 +1,335 @@
+"""
+Enterprise Data Sanitization Platform
+Structured Audit Log
+"""
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+
+from core.log_archive import SegmentReader, resolve_segment, rotated_segments
+
+# Every log record is also written as one JSON line to the audit stream:
+#   {"seq", "ts", "level", "logger", "module", "function", "message",
+#    "exception", "job_id", "device_serial", "certificate_id", "prev", "hash"}
+# hash = sha256(prev + canonical JSON of the record without "hash"), so
+# editing, removing or reordering any line breaks every later hash.
+GENESIS_HASH = "0" * 64
+
+# Correlation fields stamped on records from the logging thread's context
+CORRELATION_FIELDS = ("job_id", "device_serial", "certificate_id")
+_context_vars: Dict[str, contextvars.ContextVar] = {
+    name: contextvars.ContextVar(f"audit_{name}", default=None) for name in CORRELATION_FIELDS
+}
+
+_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit_index (
+    field   TEXT NOT NULL,
+    value   TEXT NOT NULL,
+    segment TEXT NOT NULL,
+    offset  INTEGER NOT NULL,
+    seq     INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_audit_lookup ON audit_index (field, value, seq);
+CREATE INDEX IF NOT EXISTS idx_audit_segment ON audit_index (segment);
+"""
+
+@contextmanager
+def audit_context(**fields: Optional[str]):
+    """
+    Correlate every record logged inside the block (on this thread or task)
+    with the given job_id / device_serial / certificate_id.
+    """
+    unknown = set(fields) - set(CORRELATION_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown audit correlation field(s): {', '.join(sorted(unknown))}")
+    tokens = [(_context_vars[name], _context_vars[name].set(value)) for name, value in fields.items()]
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+class AuditContextFilter(logging.Filter):
+    """
+    Stamp the current correlation IDs on a record. Runs on the logging thread,
+    before the record is handed to the log writer thread; values passed via
+    `extra` take precedence.
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        for name, var in _context_vars.items():
+            if getattr(record, name, None) is None:
+                setattr(record, name, var.get())
+        return True
+
+def chain_hash(prev_hash: str, entry: Dict[str, Any]) -> str:
+    body = {k: v for k, v in entry.items() if k != "hash"}
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(prev_hash.encode("ascii") + canonical.encode("utf-8")).hexdigest()
+
+def build_audit_entry(record: logging.LogRecord, seq: int, prev_hash: str) -> Dict[str, Any]:
+    """Chained audit entry for a prepared record (message already merged with its args)."""
+    entry = {
+        "seq": seq,
+        "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+        "level": record.levelname,
+        "logger": record.name,
+        "module": getattr(record, "custom_module", record.module),
+        "function": getattr(record, "custom_funcName", record.funcName),
+        "message": record.getMessage(),
+        "exception": record.exc_text or None,
+    }
+    for name in CORRELATION_FIELDS:
+        value = getattr(record, name, None)
+        entry[name] = None if value is None else str(value)
+    entry["prev"] = prev_hash
+    entry["hash"] = chain_hash(prev_hash, entry)
+    return entry
+
+def audit_segments(log_path: str) -> List[str]:
+    """Rotated audit segments oldest first, then the live file (date suffixes sort chronologically)."""
+    live = [os.path.abspath(log_path)] if os.path.exists(log_path) else []
+    return rotated_segments(log_path) + live
+
+def _chain_link(line: bytes) -> Optional[Tuple[int, str]]:
+    """(seq, hash) of one audit line, or None if it is not a complete entry."""
+    try:
+        entry = json.loads(line)
+        return int(entry["seq"]), str(entry["hash"])
+    except (ValueError, TypeError, KeyError):
+        return None
+
+def last_chain_state(log_path: str) -> Tuple[int, str]:
+    """(seq, hash) of the newest intact audit entry, to continue the chain after a restart."""
+    for segment in reversed(audit_segments(log_path)):
+        with SegmentReader(segment) as reader:
+            line = reader.last_line()
+            link = _chain_link(line) if line else None
+            if line and link is None:
+                # Damaged tail (normally set aside by set_aside_torn_tail() first): take the last good line
+                for _, line in reader.iter_lines():
+                    link = _chain_link(line) or link
+        if link is not None:
+            return link
+    return 0, GENESIS_HASH
+
+def set_aside_torn_tail(log_path: str) -> Optional[str]:
+    """
+    Cut whatever follows the last intact entry of the live audit file (a line
+    torn by a crash mid-write, or garbage) so the chain can resume from that
+    entry. The removed bytes are kept in a side file next to the log, named so
+    it is never taken for a rotated segment. Returns a description of the
+    break, or None if the file was intact.
+    """
+    if not os.path.exists(log_path):
+        return None
+    with open(log_path, "r+b") as f:
+        end = f.seek(0, os.SEEK_END)
+        window = 65536
+        while True:
+            start = max(0, end - window)
+            f.seek(start)
+            data = f.read()
+            # Bytes after the final newline are always an unfinished write
+            cut = data.rfind(b"\n") + 1
+            link = None
+            while cut > 0:
+                line_start = data.rfind(b"\n", 0, cut - 1) + 1
+                if line_start == 0 and start > 0:
+                    break  # Line continues before the window
+                link = _chain_link(data[line_start:cut - 1])
+                if link is not None:
+                    break
+                cut = line_start
+            if link is not None or start == 0:
+                break
+            window *= 2
+        keep = start + cut
+        if keep == end:
+            return None
+        root, ext = os.path.splitext(log_path)
+        side_path = f"{root}.torn-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')}{ext}"
+        with open(side_path, "wb") as side:
+            side.write(data[cut:])
+        f.truncate(keep)
+    after = f"entry {link[0]}" if link is not None else "the start of the file"
+    return (f"Audit chain broken: {end - keep} byte(s) after {after} in {os.path.basename(log_path)} "
+            f"were incomplete or unreadable; set aside in {os.path.basename(side_path)}")
+
+def acquire_writer_lock(log_path: str) -> Optional[IO]:
+    """
+    Exclusive lock making this process the only writer of the audit chain
+    (several processes appending with their own chain state would fork it).
+    Returns the open lock file, or None if another process holds it.
+    """
+    lock_file = open(log_path + ".lock", "a+b")
+    try:
+        if os.name == "nt":
+            import msvcrt
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+def process_audit_paths(log_path: str, index_path: str, pid: int) -> Tuple[str, str]:
+    """
+    Log and index paths of the chain a process writes on its own when another
+    process holds the writer lock of the shared one (audit-p<pid>.jsonl).
+    """
+    log_root, log_ext = os.path.splitext(log_path)
+    index_root, index_ext = os.path.splitext(index_path)
+    return f"{log_root}-p{pid}{log_ext}", f"{index_root}-p{pid}{index_ext}"
+
+def process_audit_pids(log_path: str) -> List[int]:
+    """PIDs of every per-process audit chain found next to the shared one."""
+    directory, base = os.path.split(os.path.abspath(log_path))
+    root, ext = os.path.splitext(base)
+    pattern = re.compile(re.escape(root) + r"-p(\d+)" + re.escape(ext) + "$")
+    if not os.path.isdir(directory):
+        return []
+    return sorted(int(m.group(1)) for m in map(pattern.match, os.listdir(directory)) if m)
+
+class AuditIndex:
+    """
+    SQLite sidecar mapping correlation values to (segment, byte offset), so a
+    lookup is an index probe plus one seek per matching record. Rows are
+    committed only after the audit file itself is flushed, so the index never
+    points past the data on disk.
+    """
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        # Written by the log writer thread, read by tools; one connection per user
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_INDEX_SCHEMA)
+        self._pending: List[Tuple[str, str, str, int, int]] = []
+
+    def add(self, entry: Dict[str, Any], segment: str, offset: int) -> None:
+        for name in CORRELATION_FIELDS:
+            if entry.get(name):
+                self._pending.append((name, entry[name], segment, offset, entry["seq"]))
+
+    def commit(self) -> None:
+        if self._pending:
+            with self._conn:
+                self._conn.executemany("INSERT INTO audit_index VALUES (?, ?, ?, ?, ?)", self._pending)
+            self._pending = []
+
+    def rename_segment(self, old: str, new: str) -> None:
+        self.commit()
+        with self._conn:
+            self._conn.execute("UPDATE audit_index SET segment = ? WHERE segment = ?", (new, old))
+
+    def prune(self, existing_segments: List[str]) -> None:
+        """Drop rows for segments deleted by retention."""
+        self.commit()
+        names = [os.path.basename(s) for s in existing_segments]
+        with self._conn:
+            self._conn.execute(
+                f"DELETE FROM audit_index WHERE segment NOT IN ({','.join('?' * len(names))})", names
+            )
+
+    def lookup(self, field: str, value: str) -> List[Tuple[str, int]]:
+        """(segment name, offset) of every entry carrying field=value, oldest first."""
+        if field not in CORRELATION_FIELDS:
+            raise ValueError(f"Not an indexed audit field: {field}")
+        rows = self._conn.execute(
+            "SELECT segment, offset FROM audit_index WHERE field = ? AND value = ? ORDER BY seq", (field, value)
+        )
+        return list(rows)
+
+    def close(self) -> None:
+        self.commit()
+        self._conn.close()
+
+def find_entries(log_path: str, index_path: str, field: str, value: str) -> Iterator[Dict[str, Any]]:
+    """
+    Audit entries with field=value, read by seeking to their indexed offsets
+    (inflating only the archive blocks that hold them).
+    """
+    index = AuditIndex(index_path)
+    try:
+        locations = index.lookup(field, value)
+    finally:
+        index.close()
+    directory = os.path.dirname(os.path.abspath(log_path))
+    reader: Optional[SegmentReader] = None
+    try:
+        for segment, offset in locations:
+            path = os.path.join(directory, segment)
+            if reader is None or reader.path != resolve_segment(path):
+                if reader is not None:
+                    reader.close()
+                reader = None
+                if resolve_segment(path) is None:
+                    continue  # Expired by retention
+                reader = SegmentReader(path)
+            yield json.loads(reader.read_line_at(offset))
+    finally:
+        if reader is not None:
+            reader.close()
+
+def iter_entries(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """(offset, entry) for every line of one plain or archived segment."""
+    with SegmentReader(path) as reader:
+        for offset, line in reader.iter_lines():
+            if line.strip():
+                yield offset, json.loads(line)
+
+@dataclass
+class ChainVerification:
+    """Result of checking the audit hash chain."""
+    entries: int = 0
+    segments: int = 0
+    first_seq: Optional[int] = None
+    last_seq: Optional[int] = None
+    anchored: bool = True           # False when the oldest entries were removed by retention
+    error: Optional[str] = None     # Description of the first break, None if intact
+
+    @property
+    def valid(self) -> bool:
+        return self.error is None
+
+def verify_chain(log_path: str) -> ChainVerification:
+    """
+    Recompute the hash chain across all segments. The first surviving entry
+    is trusted as the anchor if earlier segments were deleted by retention.
+    """
+    result = ChainVerification()
+    prev_hash, prev_seq = None, None
+    for segment in audit_segments(log_path):
+        result.segments += 1
+        name = os.path.basename(segment)
+        try:
+            for offset, entry in iter_entries(segment):
+                if prev_hash is None:
+                    result.first_seq = entry.get("seq")
+                    result.anchored = entry.get("prev") == GENESIS_HASH
+                    prev_hash, prev_seq = entry.get("prev"), entry.get("seq", 1) - 1
+                if entry.get("seq") != prev_seq + 1:
+                    result.error = f"{name}@{offset}: sequence jumps from {prev_seq} to {entry.get('seq')}"
+                elif entry.get("prev") != prev_hash:
+                    result.error = f"{name}@{offset}: entry {entry.get('seq')} does not link to entry {prev_seq}"
+                elif chain_hash(prev_hash, entry) != entry.get("hash"):
+                    result.error = f"{name}@{offset}: entry {entry.get('seq')} was modified"
+                if result.error:
+                    return result
+                prev_hash, prev_seq = entry["hash"], entry["seq"]
+                result.entries += 1
+                result.last_seq = prev_seq
+        except (ValueError, TypeError, KeyError) as e:
+            result.error = f"{name}: unreadable entry ({e})"
+            return result
+    return result
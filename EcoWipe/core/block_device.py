@@ -0,0 +1,103 @@
+"""
+Enterprise Data Sanitization Platform
+Block Device Access
+"""
+from core.device_validator import ValidatedDevice
+from core.exception_types import DeviceIOError, DeviceRemovedError, WipeEngineError
+from utils.constants import WIPE_BLOCK_SIZE_BYTES, INVALID_HANDLE_VALUE
+
+# Win32 error codes that mean the device is gone rather than failing
+_REMOVAL_ERRORS = frozenset({
+    21,     # ERROR_NOT_READY
+    55,     # ERROR_DEV_NOT_EXIST
+    1167,   # ERROR_DEVICE_NOT_CONNECTED
+    483,    # ERROR_DEVICE_HARDWARE_ERROR
+})
+
+class BlockDevice:
+    """
+    Sequential raw access to a wipe target, as used by the WipeEngine.
+    read() and write() may transfer fewer bytes than asked (callers loop);
+    failures raise DeviceIOError, or DeviceRemovedError once the device is gone.
+    """
+    def lock(self) -> None:
+        """Take exclusive access (lock and dismount). Raises WipeEngineError."""
+        raise NotImplementedError
+
+    def seek(self, offset: int) -> None:
+        raise NotImplementedError
+
+    def read(self, size: int) -> bytes:
+        raise NotImplementedError
+
+    def write(self, data: bytes, size: int) -> int:
+        """Write the first `size` bytes of data; returns the number written."""
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release exclusive access and the handle. Safe to call more than once."""
+        raise NotImplementedError
+
+class Win32BlockDevice(BlockDevice):
+    """A \\\\.\\PhysicalDriveN handle opened for writing."""
+    def __init__(self, device_path: str):
+        # Imported here so the engine (and simulated devices) load on any platform
+        import ctypes
+        from ctypes import wintypes
+        from utils import win_api
+        self._ctypes = ctypes
+        self._win_api = win_api
+        self._kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        self.device_path = device_path
+        self.handle: int = win_api.get_device_handle(device_path, write_access=True)
+        self._buffer = ctypes.create_string_buffer(WIPE_BLOCK_SIZE_BYTES)
+        self._transferred = wintypes.DWORD(0)
+        self._locked = False
+
+    @classmethod
+    def open(cls, device: ValidatedDevice) -> "Win32BlockDevice":
+        return cls(device.device_id)
+
+    def _raise_io_error(self, action: str) -> None:
+        error_code = self._ctypes.get_last_error()
+        error_type = DeviceRemovedError if error_code in _REMOVAL_ERRORS else DeviceIOError
+        raise error_type(f"{action} failed on {self.device_path}. Error: {error_code}", error_code)
+
+    def lock(self) -> None:
+        if not self._win_api.lock_volume(self.handle):
+            raise WipeEngineError("Failed to lock volume for exclusive access.")
+        self._locked = True
+        if not self._win_api.dismount_volume(self.handle):
+            raise WipeEngineError("Failed to dismount volume.")
+
+    def seek(self, offset: int) -> None:
+        high = self._ctypes.c_long(offset >> 32)
+        self._kernel32.SetFilePointer(self.handle, offset & 0xFFFFFFFF, self._ctypes.byref(high), 0)  # FILE_BEGIN
+
+    def read(self, size: int) -> bytes:
+        if size > len(self._buffer):
+            self._buffer = self._ctypes.create_string_buffer(size)
+        success = self._kernel32.ReadFile(self.handle, self._buffer, size, self._ctypes.byref(self._transferred), None)
+        if not success:
+            self._raise_io_error("Read")
+        return self._buffer.raw[:self._transferred.value]
+
+    def write(self, data: bytes, size: int) -> int:
+        success = self._kernel32.WriteFile(self.handle, data, size, self._ctypes.byref(self._transferred), None)
+        if not success:
+            self._raise_io_error("Write")
+        return self._transferred.value
+
+    def flush(self) -> None:
+        self._kernel32.FlushFileBuffers(self.handle)
+
+    def close(self) -> None:
+        if self.handle != INVALID_HANDLE_VALUE:
+            if self._locked:
+                self._win_api.unlock_volume(self.handle)
+                self._locked = False
+            self._win_api.close_handle(self.handle)
+            self.handle = INVALID_HANDLE_VALUE
@@ -0,0 +1,297 @@
+"""
+Enterprise Data Sanitization Platform
+Counterfeit Capacity Probe
+"""
+import hashlib
+import os
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from core.block_device import BlockDevice
+from core.exception_types import DeviceIOError, DeviceRemovedError, WipeEngineError
+from core.logging_engine import log_error_event, log_security_event
+from utils.constants import CAPACITY_PROBE_SECTOR_BYTES, CAPACITY_PROBE_POINTS_PER_OCTAVE, CAPACITY_PROBE_IO_ATTEMPTS
+
+_TAG_MAGIC = b"EWPROBE1"
+_TAG_HEADER = struct.Struct(">8s16sQ")  # magic, run nonce, offset the tag was written to
+
+@dataclass
+class CapacityProbeResult:
+    """Outcome of a probe run; verified_bytes is the usable prefix of the address space."""
+    reported_bytes: int
+    verified_bytes: int
+    probes: int
+    seconds: float
+    # (offset, lower offset it wraps onto) for every alias observed
+    aliases: List[Tuple[int, int]] = field(default_factory=list)
+    io_errors: int = 0              # Failed transfer attempts, including ones that succeeded on retry
+
+    @property
+    def counterfeit(self) -> bool:
+        return self.verified_bytes < self.reported_bytes
+
+def probe_offsets(size_bytes: int, sector: int = CAPACITY_PROBE_SECTOR_BYTES,
+                  points_per_octave: int = CAPACITY_PROBE_POINTS_PER_OCTAVE) -> List[int]:
+    """
+    Sector-aligned offsets spaced logarithmically from the first to the last
+    sector. Fake drives wrap at (or drop writes past) a boundary that is
+    usually a power of two, so every power of two is always included.
+    """
+    last = (size_bytes // sector - 1) * sector
+    if last < 0:
+        return []
+    offsets = {0, last}
+    exponent = 0
+    while sector << exponent <= last:
+        for step in range(points_per_octave):
+            offset = int(sector * 2 ** (exponent + step / points_per_octave)) // sector * sector
+            if offset <= last:
+                offsets.add(offset)
+        exponent += 1
+    return sorted(offsets)
+
+class CapacityProbe:
+    """
+    Finds the real usable capacity of a device that may report more than it
+    stores. Unique tagged sectors are written at logarithmically spaced
+    offsets and read back: a tag that turns up at another offset reveals an
+    address space that wraps around, a tag that does not come back at all
+    reveals writes past the real storage being dropped. The boundary between
+    the highest good probe and the lowest bad one is then narrowed by binary
+    search. Failed transfers are retried; a sector the device keeps failing
+    to read or write only lowers the capacity when everything past it fails
+    too (fakes often error past their real storage). An isolated persistent
+    I/O error fails the probe instead: a damaged genuine drive is never
+    reported, and wiped, as a smaller one. Every overwritten sector is
+    restored, so a following pre-wipe hash (or forensic image) still sees
+    the original content.
+
+    Cost is a few hundred sector-sized transfers regardless of device size.
+    Wrap-around is detected when two probes collide. Fake controllers wrap
+    at a power-of-two module size, and every power of two is a probe offset,
+    so the collision always happens for them. A wrap at any other period
+    could go unnoticed.
+    """
+    def __init__(self, block_device: BlockDevice, size_bytes: int, sector: int = CAPACITY_PROBE_SECTOR_BYTES,
+                 cancelled: Optional[Callable[[], bool]] = None):
+        self.block_device = block_device
+        self.size_bytes = size_bytes
+        self.sector = sector
+        self.cancelled = cancelled or (lambda: False)
+        self._nonce = os.urandom(16)
+        # Undo log of (offset, original content); restored in reverse order so
+        # aliased sectors written more than once end up with their first content
+        self._undo: List[Tuple[int, bytes]] = []
+        self._anchors: List[int] = []
+        self._aliases: List[Tuple[int, int]] = []
+        self._period: Optional[int] = None
+        self.probes = 0
+        self.transfers = 0
+        self.io_errors = 0
+        # Offsets the device persistently failed (or ended before) despite retries
+        self._failed: Set[int] = set()
+
+    # --- Sector I/O ---
+
+    def _read(self, offset: int) -> Optional[bytes]:
+        """The sector at offset, or None if the device keeps failing to return it (removal raises)."""
+        if self.cancelled():
+            raise WipeEngineError("Operation cancelled by user.")
+        for _ in range(CAPACITY_PROBE_IO_ATTEMPTS):
+            self.transfers += 1
+            try:
+                self.block_device.seek(offset)
+                data = b""
+                while len(data) < self.sector:
+                    chunk = self.block_device.read(self.sector - len(data))
+                    if not chunk:
+                        self._failed.add(offset)
+                        return None     # Ends before its reported size
+                    data += chunk
+                return data
+            except DeviceRemovedError:
+                raise
+            except DeviceIOError:
+                self.io_errors += 1
+        self._failed.add(offset)
+        return None
+
+    def _write(self, offset: int, data: bytes) -> bool:
+        """Write one sector; False if the device keeps failing the write (removal raises)."""
+        for _ in range(CAPACITY_PROBE_IO_ATTEMPTS):
+            self.transfers += 1
+            try:
+                self.block_device.seek(offset)
+                done = 0
+                while done < self.sector:
+                    written = self.block_device.write(data[done:], self.sector - done)
+                    if written == 0:
+                        self._failed.add(offset)
+                        return False
+                    done += written
+                return True
+            except DeviceRemovedError:
+                raise
+            except DeviceIOError:
+                self.io_errors += 1
+        self._failed.add(offset)
+        return False
+
+    def _tag(self, offset: int) -> bytes:
+        header = _TAG_HEADER.pack(_TAG_MAGIC, self._nonce, offset)
+        return header + hashlib.shake_256(header).digest(self.sector - len(header))
+
+    def _owner_at(self, offset: int) -> Optional[int]:
+        """Offset the sector at offset was tagged for in this run; None if untagged or unreadable."""
+        data = self._read(offset)
+        if data is None:
+            return None
+        magic, nonce, owner = _TAG_HEADER.unpack_from(data)
+        if magic == _TAG_MAGIC and nonce == self._nonce and data == self._tag(owner):
+            return owner
+        return None
+
+    def _place(self, offset: int, original: bytes) -> bool:
+        """Tag one sector, remembering its content first; False if the write failed."""
+        # Logged before writing: a failed write may still have changed the sector
+        self._undo.append((offset, original))
+        self.probes += 1
+        return self._write(offset, self._tag(offset))
+
+    def _persistent_error(self, offset: int) -> WipeEngineError:
+        message = (f"Capacity probe: the device persistently fails I/O at offset {offset} while storage past it "
+                   f"works; it is damaged, not short, and its capacity cannot be verified")
+        log_error_event("capacity_probe", "_probe", message)
+        return WipeEngineError(message)
+
+    def _note_alias(self, offset: int, target: int) -> None:
+        self._aliases.append((offset, target))
+        # The wrap period divides every observed distance; the smallest is the best guess
+        distance = offset - target
+        if distance > 0 and (self._period is None or distance < self._period):
+            self._period = distance
+
+    # --- Probe ---
+
+    def _is_backed(self, offset: int) -> bool:
+        """Tag one more sector and check it is distinct storage (reads back, clobbers nothing)."""
+        original = self._read(offset)
+        if original is None or not self._place(offset, original):
+            return False
+        good = self._owner_at(offset) == offset
+        for anchor in self._anchors:
+            if anchor >= offset:
+                break
+            if self._owner_at(anchor) == offset:
+                self._note_alias(offset, anchor)
+                good = False
+        if good and self._period is not None and offset >= self._period:
+            if self._owner_at(offset - self._period) == offset:
+                self._note_alias(offset, offset - self._period)
+                good = False
+        return good
+
+    def run(self) -> CapacityProbeResult:
+        started = time.perf_counter()
+        offsets = probe_offsets(self.size_bytes, self.sector)
+        try:
+            verified = self._probe(offsets) if offsets else self.size_bytes
+        except BaseException:
+            # Restore what can be restored, but report the error that stopped the probe
+            self._restore()
+            raise
+        unrestored = self._restore()
+        if unrestored:
+            raise WipeEngineError(f"Capacity probe could not restore {unrestored} sector(s); "
+                                  f"the device no longer holds its original content")
+        return CapacityProbeResult(self.size_bytes, verified, self.probes, time.perf_counter() - started,
+                                   list(self._aliases), self.io_errors)
+
+    def _probe(self, offsets: List[int]) -> int:
+        # Save every original before the first write, so no saved copy is itself a tag
+        originals: Dict[int, Optional[bytes]] = {offset: self._read(offset) for offset in offsets}
+        bad = {offset for offset, original in originals.items() if original is None}
+        # Highest first: where offsets alias, the lowest one's tag survives, so
+        # the distance read back is the wrap period itself rather than a multiple
+        for offset in reversed(offsets):
+            if offset not in bad and not self._place(offset, originals[offset]):
+                bad.add(offset)
+        self.block_device.flush()
+
+        for offset in offsets:
+            if offset in bad:
+                continue
+            owner = self._owner_at(offset)
+            if owner == offset:
+                continue
+            if owner is None:
+                bad.add(offset)             # Write dropped, never stored, or unreadable
+            else:
+                # The higher of the two offsets wrapped onto the lower one
+                self._note_alias(max(owner, offset), min(owner, offset))
+                bad.add(max(owner, offset))
+        if self._period is not None:
+            for offset in offsets:
+                if offset >= self._period and offset not in bad:
+                    if self._owner_at(offset - self._period) == offset:
+                        self._note_alias(offset, offset - self._period)
+                        bad.add(offset)
+        if not bad:
+            return self.size_bytes
+
+        high = min(bad)
+        if high in self._failed:
+            # No alias proves the boundary: every offset from it on must fail,
+            # and more than one, or this is a bad sector on a genuine drive
+            past = [offset for offset in offsets if offset >= high]
+            working = [offset for offset in past if offset not in bad]
+            if working or len(past) < 2:
+                raise self._persistent_error(high)
+        low = max((offset for offset in offsets if offset < high), default=None)
+        if low is None:
+            return 0
+        self._anchors = [offset for offset in offsets if offset <= low]
+        while high - low > self.sector:
+            mid = (low + high) // 2 // self.sector * self.sector
+            if self._is_backed(mid):
+                low = mid
+                self._anchors.append(mid)
+            else:
+                if mid in self._failed and mid + self.sector < high and self._is_backed(mid + self.sector):
+                    raise self._persistent_error(mid)
+                high = mid
+        return high
+
+    def _restore(self) -> int:
+        """
+        Write back every saved sector, newest first, whatever fails along the
+        way. Never raises; sectors left holding probe tags are logged and
+        their count returned.
+        """
+        failed: Set[int] = set()
+        while self._undo:
+            offset, original = self._undo.pop()
+            try:
+                if not self._write(offset, original):
+                    failed.add(offset)
+            except Exception:
+                failed.add(offset)
+        try:
+            self.block_device.flush()
+        except Exception as e:
+            log_error_event("capacity_probe", "_restore", f"Flush after restoring probe sectors failed: {e}")
+        if failed:
+            # Overwritten sectors are user data that is now lost (and differs from any later pre-wipe hash)
+            shown = ", ".join(str(offset) for offset in sorted(failed)[:16])
+            more = f" and {len(failed) - 16} more" if len(failed) > 16 else ""
+            log_security_event("capacity_probe", "_restore",
+                               f"Capacity probe could not restore {len(failed)} overwritten sector(s) "
+                               f"of {self.sector} bytes at offset(s) {shown}{more}")
+        return len(failed)
+
+def probe_capacity(block_device: BlockDevice, size_bytes: int,
+                   cancelled: Optional[Callable[[], bool]] = None) -> CapacityProbeResult:
+    """Probe the real capacity of an opened, locked device (see CapacityProbe)."""
+    return CapacityProbe(block_device, size_bytes, cancelled=cancelled).run()
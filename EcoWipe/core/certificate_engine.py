@@ -3,31 +3,87 @@ Enterprise Data Sanitization Platform
 Forensic Certificate Engine
 """
 import json
+import time
 import uuid
-import hashlib
-import base64
 from datetime import datetime, timezone
-from typing import Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterable, Iterator, Optional
 import os
 
-import sys
-# Ensure core can be imported
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.security_engine import SecurityEngine
 from core.qr_engine import QREngine
+from core.qr_payload import encode_qr_payload
 from core.exception_types import CertificateError
+from core.certificate_schema import SCHEMA_VERSION, compute_payload_hash
+from core.certificate_store import CertificateStore
+from core.merkle_signer import MerkleBatchSigner
+from core.signing_agent import RemoteSigner
 from core.logging_engine import certificate_logger, log_error_event
+from core import metrics
+from utils.constants import CERT_DIR, MERKLE_BATCH_SIGNING, SIGNATURE_ALGORITHM, SIGNING_AGENT_ADDRESS
+from utils.parallel import bounded_as_completed
+
+# Per-process engine used by batch workers (each holds its own key and QR detector)
+_worker_engine: Optional["CertificateEngine"] = None
+
+def _init_batch_worker(key_dir: str, write_json: bool, algorithm: str, agent_address: Optional[str]) -> None:
+    global _worker_engine
+    # Workers never touch the store; the parent writes results in batched transactions.
+    # Each worker handles one certificate at a time, so Merkle batching would only add latency.
+    _worker_engine = CertificateEngine(key_dir=key_dir, write_json=write_json, batch_sign=False, algorithm=algorithm,
+                                       agent_address=agent_address)
+
+def _remove_artifacts(*paths: Optional[str]) -> None:
+    """Delete certificate files whose certificate could not be completed or indexed."""
+    for path in paths:
+        if path is None:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            log_error_event("certificate_engine", "_remove_artifacts", f"Could not remove orphaned certificate file {path}: {e}")
+
+def _generate_in_worker(wipe_result: Dict[str, Any], output_dir: str) -> Dict[str, str]:
+    return _worker_engine.generate_certificate(wipe_result, output_dir)
 
 class CertificateEngine:
     """
     Generates cryptographically signed, forensic-grade JSON certificates.
     """
-    def __init__(self):
-        self.security_engine = SecurityEngine()
+    def __init__(self, key_dir: str = "keys", store: Optional[CertificateStore] = None, write_json: bool = True,
+                 batch_sign: bool = MERKLE_BATCH_SIGNING, batch_signer: Optional[MerkleBatchSigner] = None,
+                 algorithm: str = SIGNATURE_ALGORITHM, agent_address: Optional[str] = SIGNING_AGENT_ADDRESS):
+        """
+        Args:
+            key_dir: Directory holding the signing keys.
+            algorithm: Signature suite used for new certificates (see core/signature_suites.py).
+            store: Optional indexed store every generated certificate is added to.
+            write_json: Whether to also write the loose cert_*.json file.
+            batch_sign: Sign Merkle roots over concurrent certificates instead of
+                each certificate (see MerkleBatchSigner).
+            batch_signer: Explicit batch signer (e.g. with a custom batch size or
+                latency); implies batch signing.
+            agent_address: Sign through the signing agent listening here instead
+                of loading the private key (see core/signing_agent.py); the
+                agent's algorithm then applies.
+        """
+        self.key_dir = key_dir
+        self.store = store
+        self.write_json = write_json
+        self.agent_address = agent_address
+        if agent_address:
+            self.security_engine = RemoteSigner(agent_address, key_dir)
+        else:
+            self.security_engine = SecurityEngine(key_dir, algorithm)
+        if batch_signer is None and batch_sign:
+            batch_signer = MerkleBatchSigner(self.security_engine)
+        self.batch_signer = batch_signer
         self.qr_engine = QREngine()
         self.app_version = "2.0.0-Enterprise"
 
-    def generate_certificate(self, wipe_result: Dict[str, Any], output_dir: str = "certificates") -> Dict[str, str]:
+    def generate_certificate(self, wipe_result: Dict[str, Any], output_dir: str = CERT_DIR) -> Dict[str, Any]:
         """
         Generate a signed JSON certificate and corresponding QR code.
         
@@ -36,27 +92,39 @@ class CertificateEngine:
             output_dir: Directory to save the certificate files.
             
         Returns:
-            Dict containing paths to the generated files.
+            Dict containing the certificate id, paths to the generated files
+            (json_path is None when JSON files are disabled) and the signed
+            certificate itself.
         """
         os.makedirs(output_dir, exist_ok=True)
+        started = time.perf_counter()
         
         try:
             # 1. Generate UUIDv4 and strict UTC timestamp
             cert_id = str(uuid.uuid4())
             timestamp_iso = datetime.now(timezone.utc).isoformat()
             
+            # The image's manifest pins every segment hash and the raw stream hash
+            # (= pre_hash_sha256); its local path stays out of the certificate
+            image = wipe_result.get("forensic_image")
+            image_entry = None
+            if image:
+                image_entry = {key: image[key] for key in ("manifest_sha256", "segments", "stored_bytes")}
+            
             # 2. Construct the strict JSON schema
             cert_data = {
-                "schema_version": "EcoWIPE-Enterprise-v2",
+                "schema_version": SCHEMA_VERSION,
                 "certificate_id": cert_id,
                 "timestamp_utc": timestamp_iso,
                 "app_version": self.app_version,
+                "signature_algorithm": self.security_engine.algorithm,
                 "operator": wipe_result["operator"],
                 "device": {
                     "id": wipe_result["device_id"],
                     "model": wipe_result["model"],
                     "serial_number": wipe_result["serial"],
-                    "size_bytes": wipe_result["size_bytes"]
+                    "size_bytes": wipe_result["size_bytes"],
+                    "verified_capacity_bytes": wipe_result.get("verified_capacity_bytes")
                 },
                 "wipe_details": {
                     "method": wipe_result["method"],
@@ -64,51 +132,126 @@ class CertificateEngine:
                     "nist_standard": wipe_result["nist_standard"],
                     "pre_hash_sha256": wipe_result["pre_hash"],
                     "post_hash_sha256": wipe_result["post_hash"],
+                    "forensic_image": image_entry,
                     "start_time_unix": wipe_result["start_time"],
                     "end_time_unix": wipe_result["end_time"],
                     "status": wipe_result["status"]
                 }
             }
             
-            # 3. Serialize deterministically for hashing
-            cert_json_str = json.dumps(cert_data, sort_keys=True, separators=(',', ':'))
-            cert_bytes = cert_json_str.encode('utf-8')
-            
-            # 4. Compute SHA-256 of the payload
-            payload_hash = hashlib.sha256(cert_bytes).hexdigest()
+            # 3-4. Serialize deterministically and compute SHA-256 of the payload
+            payload_hash = compute_payload_hash(cert_data)
             cert_data["payload_hash"] = payload_hash
             
-            # 5. Sign the hash using RSA-4096
-            signature = self.security_engine.sign_data(payload_hash.encode('utf-8'))
-            cert_data["rsa_signature"] = signature
+            # 5. Sign the hash with the station key (or the Merkle root of its batch)
+            sign_started = time.perf_counter()
+            if self.batch_signer is not None:
+                signature, merkle_proof = self.batch_signer.sign(payload_hash)
+                cert_data["merkle_proof"] = merkle_proof
+            else:
+                signature = self.security_engine.sign_data(payload_hash.encode('utf-8'))
+            cert_data["signature"] = signature
+            metrics.CERTIFICATE_SIGN_SECONDS.labels(self.security_engine.algorithm).observe(time.perf_counter() - sign_started)
             
             # 6. Save JSON to disk
             safe_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            json_filename = f"cert_{safe_timestamp}_{cert_id[:8]}.json"
-            json_path = os.path.join(output_dir, json_filename)
-            
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(cert_data, f, indent=4)
-                
-            # 7. Generate QR Code (using a compact base64 version of the signed data)
-            # We encode the JSON to base64 to make it URL safe if needed later
-            compact_json = json.dumps(cert_data, separators=(',', ':'))
-            b64_cert = base64.b64encode(compact_json.encode('utf-8')).decode('utf-8')
-            
+            json_path = None
             qr_filename = f"qr_{safe_timestamp}_{cert_id[:8]}.png"
             qr_path = os.path.join(output_dir, qr_filename)
+            try:
+                if self.write_json:
+                    json_filename = f"cert_{safe_timestamp}_{cert_id[:8]}.json"
+                    json_path = os.path.join(output_dir, json_filename)
+                    
+                    with open(json_path, "w", encoding="utf-8") as f:
+                        json.dump(cert_data, f, indent=4)
+                    
+                # 7. Generate QR Code (compact CBOR + zlib + base45 record of the signed data)
+                qr_payload = encode_qr_payload(cert_data)
+                
+                # This will raise CertificateError if verification fails
+                self.qr_engine.generate_and_verify(qr_payload, qr_path)
+                
+                # 8. Index the certificate (only once every artifact was produced)
+                if self.store is not None:
+                    self.store.add(cert_data, json_path, qr_path)
+            except Exception:
+                # Files and index entry are one unit: no files for an unindexed certificate
+                _remove_artifacts(json_path, qr_path)
+                raise
             
-            # This will raise CertificateError if verification fails
-            self.qr_engine.generate_and_verify(b64_cert, qr_path)
-            
-            certificate_logger.info(f"Successfully generated signed certificate {cert_id}")
+            metrics.CERTIFICATE_SECONDS.observe(time.perf_counter() - started)
+            metrics.CERTIFICATES.labels("success").inc()
+            certificate_logger.info(f"Successfully generated signed certificate {cert_id}",
+                                    extra={"certificate_id": cert_id, "device_serial": wipe_result["serial"]})
             
             return {
                 "certificate_id": cert_id,
                 "json_path": json_path,
-                "qr_path": qr_path
+                "qr_path": qr_path,
+                "certificate": cert_data
             }
             
         except Exception as e:
+            metrics.CERTIFICATES.labels("failure").inc()
             log_error_event("certificate_engine", "generate_certificate", f"Certificate generation failed: {e}", exc_info=True)
             raise CertificateError(f"Failed to generate secure certificate: {e}")
+
+    def close(self) -> None:
+        """Sign any certificates still waiting for a batch, stop the batch signer and disconnect from the agent."""
+        if self.batch_signer is not None:
+            self.batch_signer.close()
+        if isinstance(self.security_engine, RemoteSigner):
+            self.security_engine.close()
+
+    def generate_certificates(
+        self,
+        wipe_results: Iterable[Dict[str, Any]],
+        output_dir: str = CERT_DIR,
+        max_workers: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Generate certificates for many wipe results across a process pool.
+        
+        Signing and QR rendering/verification are CPU-bound, so each worker
+        process loads its own key and QR detector once and handles a stream of
+        results. Input is consumed lazily with a bounded number of tasks in
+        flight, and results are yielded as they complete (not in input order).
+        
+        Args:
+            wipe_results: Iterable of WipeEngine result dictionaries.
+            output_dir: Directory to save the certificate files.
+            max_workers: Worker process count (defaults to the CPU count).
+            
+        Yields:
+            The generate_certificate() result plus "index" (position in the
+            input), or {"index": ..., "error": ...} if that certificate failed.
+            If this engine has a store, results are added to it by this
+            (parent) process and flushed when the batch ends.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        workers = max_workers or os.cpu_count() or 1
+        
+        # Keys already exist (this engine created or loaded them), so workers only load
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker, initargs=(self.key_dir, self.write_json, self.security_engine.algorithm, self.agent_address)) as executor:
+            try:
+                for index, _, future in bounded_as_completed(executor, _generate_in_worker, wipe_results, workers * 2, output_dir):
+                    try:
+                        cert_info = future.result()
+                        if self.store is not None:
+                            try:
+                                self.store.add(cert_info["certificate"], cert_info["json_path"], cert_info["qr_path"])
+                            except Exception:
+                                _remove_artifacts(cert_info["json_path"], cert_info["qr_path"])
+                                raise
+                    except Exception as e:
+                        metrics.CERTIFICATES.labels("failure").inc()
+                        log_error_event("certificate_engine", "generate_certificates", f"Batch item {index} failed: {e}")
+                        yield {"index": index, "error": str(e)}
+                        continue
+                    # Workers count into their own process; the station totals are kept here
+                    metrics.CERTIFICATES.labels("success").inc()
+                    yield {"index": index, **cert_info}
+            finally:
+                if self.store is not None:
+                    self.store.flush()
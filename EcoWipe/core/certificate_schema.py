@@ -0,0 +1,36 @@
+"""
+Enterprise Data Sanitization Platform
+Certificate Schema and Canonical Encoding
+"""
+import hashlib
+import json
+from typing import Any, Dict, Optional, Tuple
+
+SCHEMA_VERSION = "EcoWIPE-Enterprise-v3"
+
+# v2 certificates carry no signature_algorithm and store their signature in
+# rsa_signature; v3 records the (hashed) algorithm and uses signature.
+LEGACY_SIGNATURE_ALGORITHM = "rsa-pss-sha256"
+
+# Fields added after the payload hash is computed; they are excluded when the
+# canonical payload is rebuilt for verification. In batch-signing mode the
+# signature covers a Merkle root and merkle_proof links the payload hash to it.
+UNSIGNED_FIELDS = ("payload_hash", "signature", "rsa_signature", "merkle_proof")
+
+def canonical_payload(certificate: Dict[str, Any]) -> bytes:
+    """
+    Deterministic serialization of the signed part of a certificate, exactly
+    as CertificateEngine hashes it (sorted keys, no whitespace, UTF-8).
+    """
+    payload = {k: v for k, v in certificate.items() if k not in UNSIGNED_FIELDS}
+    return json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+def compute_payload_hash(certificate: Dict[str, Any]) -> str:
+    """SHA-256 hex digest of the canonical payload."""
+    return hashlib.sha256(canonical_payload(certificate)).hexdigest()
+
+def certificate_signature(certificate: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+    """(signature algorithm, Base64 signature) of a v2 or v3 certificate."""
+    algorithm = certificate.get("signature_algorithm", LEGACY_SIGNATURE_ALGORITHM)
+    signature = certificate.get("signature", certificate.get("rsa_signature"))
+    return algorithm, signature
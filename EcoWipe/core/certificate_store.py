@@ -0,0 +1,257 @@
+"""
+Enterprise Data Sanitization Platform
+Indexed Certificate Store
+"""
+import csv
+import json
+import os
+import sqlite3
+import threading
+import urllib.parse
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+
+from core.exception_types import CertificateError
+from core.logging_engine import log_error_event
+from utils.constants import CERT_DB_PATH
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS certificates (
+    certificate_id TEXT PRIMARY KEY,
+    serial_number  TEXT NOT NULL,
+    operator       TEXT NOT NULL,
+    timestamp_utc  TEXT NOT NULL,
+    device_model   TEXT,
+    method         TEXT,
+    status         TEXT,
+    payload_hash   TEXT NOT NULL,
+    json_path      TEXT,
+    qr_path        TEXT,
+    document       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_certificates_serial ON certificates (serial_number, timestamp_utc);
+CREATE INDEX IF NOT EXISTS idx_certificates_operator ON certificates (operator, timestamp_utc);
+CREATE INDEX IF NOT EXISTS idx_certificates_time ON certificates (timestamp_utc);
+"""
+
+# Columns written by the CSV export (the full signed document is in the JSONL export)
+CSV_COLUMNS = (
+    "certificate_id", "timestamp_utc", "operator", "serial_number",
+    "device_model", "method", "status", "payload_hash", "json_path", "qr_path",
+)
+
+class CertificateStore:
+    """
+    SQLite archive of signed certificates, indexed by certificate_id, serial
+    number, operator and timestamp.
+
+    Inserts are grouped into transactions of `batch_size` certificates; with
+    the default of 1 every certificate is durable as soon as add() returns.
+    Bulk imports should use a larger batch and call flush()/close().
+    """
+    def __init__(self, db_path: str = CERT_DB_PATH, batch_size: int = 1, read_only: bool = False):
+        """read_only opens an existing store without creating, migrating or locking it for writing."""
+        self.db_path = db_path
+        self.batch_size = max(1, batch_size)
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        self._uncommitted = 0
+
+        try:
+            if read_only:
+                self._conn = self._connect_read_only()
+            else:
+                directory = os.path.dirname(db_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                # Shared by the certificate worker threads; access is serialized by _lock
+                self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=FULL")
+                self._conn.executescript(_SCHEMA)
+        except sqlite3.Error as e:
+            log_error_event("certificate_store", "__init__", f"Cannot open certificate store {db_path}: {e}", exc_info=True)
+            raise CertificateError(f"Cannot open certificate store: {e}")
+
+    def _connect_read_only(self) -> sqlite3.Connection:
+        uri = "file:" + urllib.parse.quote(os.path.abspath(self.db_path)) + "?mode=ro"
+        return sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None)
+
+    def __enter__(self) -> "CertificateStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    # --- Writing ---
+
+    @staticmethod
+    def _row(certificate: Dict[str, Any], json_path: Optional[str], qr_path: Optional[str]) -> Tuple:
+        device = certificate.get("device", {})
+        details = certificate.get("wipe_details", {})
+        return (
+            certificate["certificate_id"],
+            device.get("serial_number", ""),
+            certificate.get("operator", ""),
+            certificate.get("timestamp_utc", ""),
+            device.get("model"),
+            details.get("method"),
+            details.get("status"),
+            certificate["payload_hash"],
+            json_path,
+            qr_path,
+            json.dumps(certificate, separators=(",", ":")),
+        )
+
+    def add(self, certificate: Dict[str, Any], json_path: Optional[str] = None, qr_path: Optional[str] = None) -> None:
+        """
+        Store a signed certificate. Committed once `batch_size` certificates are pending.
+
+        Raises:
+            CertificateError: If the certificate cannot be stored (e.g. duplicate id).
+        """
+        if self.read_only:
+            raise CertificateError("Certificate store was opened read-only.")
+        row = self._row(certificate, json_path, qr_path)
+        with self._lock:
+            if self._uncommitted == 0 and not self._conn.in_transaction:
+                self._conn.execute("BEGIN")
+            # Each certificate is its own savepoint inside the batch transaction,
+            # so a rejected insert never discards the other pending certificates.
+            self._conn.execute("SAVEPOINT certificate")
+            try:
+                self._conn.execute("INSERT INTO certificates VALUES (?,?,?,?,?,?,?,?,?,?,?)", row)
+            except sqlite3.Error as e:
+                self._conn.execute("ROLLBACK TO certificate")
+                self._conn.execute("RELEASE certificate")
+                log_error_event("certificate_store", "add", f"Failed to store certificate {row[0]}: {e}")
+                raise CertificateError(f"Failed to store certificate {row[0]}: {e}")
+            self._conn.execute("RELEASE certificate")
+            self._uncommitted += 1
+            if self._uncommitted >= self.batch_size:
+                try:
+                    self._commit_locked()
+                except sqlite3.Error as e:
+                    log_error_event("certificate_store", "add", f"Failed to commit certificate {row[0]}: {e}")
+                    raise CertificateError(f"Failed to store certificate {row[0]}: {e}")
+
+    def flush(self) -> None:
+        """Commit any pending certificates."""
+        with self._lock:
+            self._commit_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            self._commit_locked()
+            self._conn.close()
+
+    def _commit_locked(self) -> None:
+        if self._conn.in_transaction:
+            self._conn.execute("COMMIT")
+        self._uncommitted = 0
+
+    def import_json_directory(self, directory: str) -> int:
+        """Import loose cert_*.json files (the legacy flat archive). Returns the number imported."""
+        imported = 0
+        for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+            if not (entry.is_file() and entry.name.startswith("cert_") and entry.name.endswith(".json")):
+                continue
+            with open(entry.path, "r", encoding="utf-8") as f:
+                certificate = json.load(f)
+            if self.get(certificate["certificate_id"]) is not None:
+                continue
+            qr_path = os.path.join(directory, "qr_" + entry.name[len("cert_"):-len(".json")] + ".png")
+            self.add(certificate, entry.path, qr_path if os.path.exists(qr_path) else None)
+            imported += 1
+        self.flush()
+        return imported
+
+    # --- Querying ---
+
+    def get(self, certificate_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a single certificate by id."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT document FROM certificates WHERE certificate_id = ?", (certificate_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _select(self, columns: str, serial: Optional[str], operator: Optional[str],
+                since: Optional[str], until: Optional[str], limit: Optional[int]) -> Iterator[Tuple]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if serial is not None:
+            clauses.append("serial_number = ?")
+            params.append(serial)
+        if operator is not None:
+            clauses.append("operator = ?")
+            params.append(operator)
+        if since is not None:
+            clauses.append("timestamp_utc >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp_utc < ?")
+            params.append(until)
+        sql = f"SELECT {columns} FROM certificates"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp_utc"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        # A dedicated read connection lets long exports stream without holding
+        # the writer lock (WAL readers see a consistent snapshot).
+        reader = self._connect_read_only()
+        try:
+            cursor = reader.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(500)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            reader.close()
+
+    def find(self, serial: Optional[str] = None, operator: Optional[str] = None,
+             since: Optional[str] = None, until: Optional[str] = None,
+             limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream certificates matching all given filters, oldest first.
+        `since`/`until` are ISO-8601 UTC timestamps (until is exclusive).
+        """
+        for (document,) in self._select("document", serial, operator, since, until, limit):
+            yield json.loads(document)
+
+    # --- Exporting ---
+
+    def export_jsonl(self, fh: IO[str], **filters: Any) -> int:
+        """Stream matching signed certificates as JSON lines. Returns the row count."""
+        count = 0
+        for (document,) in self._select("document", filters.get("serial"), filters.get("operator"),
+                                         filters.get("since"), filters.get("until"), filters.get("limit")):
+            fh.write(document)
+            fh.write("\n")
+            count += 1
+        return count
+
+    def export_csv(self, fh: IO[str], **filters: Any) -> int:
+        """Stream a CSV summary of matching certificates. Returns the row count."""
+        writer = csv.writer(fh)
+        writer.writerow(CSV_COLUMNS)
+        count = 0
+        for row in self._select(", ".join(CSV_COLUMNS), filters.get("serial"), filters.get("operator"),
+                                filters.get("since"), filters.get("until"), filters.get("limit")):
+            writer.writerow(row)
+            count += 1
+        return count
+
+    def export_json_files(self, output_dir: str, **filters: Any) -> int:
+        """Write matching certificates as individual JSON files. Returns the file count."""
+        os.makedirs(output_dir, exist_ok=True)
+        count = 0
+        for certificate in self.find(**filters):
+            path = os.path.join(output_dir, f"cert_{certificate['certificate_id']}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(certificate, f, indent=4)
+            count += 1
+        return count
@@ -0,0 +1,178 @@
+"""
+Enterprise Data Sanitization Platform
+Bulk Certificate Verification
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from core.certificate_schema import certificate_signature, compute_payload_hash
+from core.merkle_signer import merkle_root_from_proof
+from core.security_engine import load_public_keys, verify_with_public_key
+from core.signature_suites import suite_for_public_key
+from utils.parallel import bounded_as_completed, chunked
+
+# A work item is (source label, certificate dict or None to load from the label path)
+WorkItem = Tuple[str, Optional[Dict[str, Any]]]
+
+@dataclass
+class VerificationFailure:
+    """One certificate that did not verify."""
+    source: str
+    certificate_id: Optional[str]
+    reason: str
+
+@dataclass
+class VerificationReport:
+    """Aggregate result of a bulk verification run."""
+    total: int = 0
+    valid: int = 0
+    elapsed_seconds: float = 0.0
+    failures: List[VerificationFailure] = field(default_factory=list)
+
+    @property
+    def invalid(self) -> int:
+        return self.total - self.valid
+
+    @property
+    def throughput(self) -> float:
+        return self.total / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+def verify_certificate(certificate: Dict[str, Any], public_keys) -> Optional[str]:
+    """
+    Check a certificate's payload hash and signature. Batch-signed certificates
+    carry a merkle_proof; the proof must lead from the payload hash to the
+    signed root.
+
+    Args:
+        public_keys: Keyring of station public keys by signature algorithm
+            (see load_public_keys), or a single public key.
+
+    Returns:
+        None if the certificate is authentic, otherwise the failure reason.
+    """
+    try:
+        expected_hash = certificate["payload_hash"]
+        algorithm, signature = certificate_signature(certificate)
+    except (KeyError, TypeError, AttributeError):
+        return "missing payload_hash or signature"
+    if signature is None:
+        return "missing payload_hash or signature"
+
+    if not isinstance(public_keys, dict):
+        public_keys = {suite_for_public_key(public_keys).name: public_keys}
+    public_key = public_keys.get(algorithm)
+    if public_key is None:
+        return f"no public key for signature algorithm {algorithm!r}"
+
+    if compute_payload_hash(certificate) != expected_hash:
+        return "payload hash mismatch (certificate content altered)"
+
+    signed_value = expected_hash
+    proof = certificate.get("merkle_proof")
+    if proof is not None:
+        try:
+            root = merkle_root_from_proof(expected_hash, proof["path"])
+        except (KeyError, TypeError, ValueError) as e:
+            return f"malformed merkle proof ({e})"
+        if root != proof.get("root"):
+            return "merkle proof does not lead to the signed root"
+        signed_value = root
+
+    try:
+        verify_with_public_key(public_key, signed_value.encode('utf-8'), signature, algorithm)
+    except Exception as e:
+        return f"invalid signature ({type(e).__name__})"
+    return None
+
+# Per-process keyring, loaded once by the pool initializer
+_worker_public_keys: Dict[str, Any] = {}
+
+def _init_verify_worker(public_key_paths: Sequence[str]) -> None:
+    global _worker_public_keys
+    _worker_public_keys = load_public_keys(public_key_paths)
+
+def _verify_chunk(chunk: List[WorkItem]) -> Tuple[int, List[VerificationFailure]]:
+    """Verify a chunk of certificates inside a worker process."""
+    valid = 0
+    failures = []
+    for source, certificate in chunk:
+        cert_id = None
+        try:
+            if certificate is None:
+                with open(source, "r", encoding="utf-8") as f:
+                    certificate = json.load(f)
+            cert_id = certificate.get("certificate_id")
+            reason = verify_certificate(certificate, _worker_public_keys)
+        except Exception as e:
+            reason = f"unreadable certificate ({e})"
+        if reason is None:
+            valid += 1
+        else:
+            failures.append(VerificationFailure(source, cert_id, reason))
+    return valid, failures
+
+def iter_certificate_files(root: str) -> Iterator[WorkItem]:
+    """Lazily walk a certificate archive for cert_*.json files."""
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.startswith("cert_") and entry.name.endswith(".json"):
+                    yield entry.path, None
+
+def iter_store_certificates(store) -> Iterator[WorkItem]:
+    """Stream certificates out of a CertificateStore."""
+    for certificate in store.find():
+        yield f"db:{certificate.get('certificate_id')}", certificate
+
+def verify_archive(
+    items: Iterable[WorkItem],
+    public_key_paths: Union[str, Sequence[str]],
+    max_workers: Optional[int] = None,
+    chunk_size: int = 256,
+    on_failure=None,
+) -> VerificationReport:
+    """
+    Verify a stream of certificates in parallel worker processes.
+
+    Items are sent in chunks to amortize inter-process overhead, with a bounded
+    number of chunks in flight so memory does not grow with archive size. Each
+    worker loads the public key once.
+
+    Args:
+        items: (source, certificate-or-None) pairs, e.g. from iter_certificate_files().
+        public_key_paths: PEM public key(s) of the signing station, at most one per
+            signature algorithm.
+        max_workers: Worker process count (defaults to the CPU count).
+        chunk_size: Certificates per task.
+        on_failure: Optional callback invoked with each VerificationFailure as it
+            is found; when given, failures are not accumulated in the report.
+    """
+    if isinstance(public_key_paths, str):
+        public_key_paths = [public_key_paths]
+    public_key_paths = list(public_key_paths)
+    # Fail fast in the parent if a key is unusable
+    load_public_keys(public_key_paths)
+
+    workers = max_workers or os.cpu_count() or 1
+    report = VerificationReport()
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_verify_worker, initargs=(public_key_paths,)) as executor:
+        for _, chunk, future in bounded_as_completed(executor, _verify_chunk, chunked(items, chunk_size), workers * 2):
+            valid, failures = future.result()
+            report.total += len(chunk)
+            report.valid += valid
+            for failure in failures:
+                # Streamed failures are not also kept in memory
+                if on_failure is not None:
+                    on_failure(failure)
+                else:
+                    report.failures.append(failure)
+    report.elapsed_seconds = time.perf_counter() - started
+    return report
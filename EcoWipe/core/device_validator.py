@@ -2,18 +2,24 @@
 Enterprise Data Sanitization Platform
 Strict Device Validation and Detection
 """
-import wmi
-import ctypes
+import logging
+import threading
+import time
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
-import os
+from typing import List, Optional, Dict, Any, FrozenSet, Tuple
 
-import sys
-# Ensure core can be imported
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.exception_types import DeviceValidationError, SystemDriveError
 from core.logging_engine import device_logger, log_security_event, log_error_event
 from core.validation_engine import validate_device_path
+from core.discovery_backends import DiscoveryBackend, DiskInfo, get_default_backend
+from utils.constants import DEVICE_SCAN_INTERVAL_S, DEVICE_SCAN_MAX_DUTY_CYCLE, DEVICE_SECURITY_REPEAT_LOG_S
+
+def scan_interval_for(enumeration_seconds: float) -> float:
+    """
+    Polling interval that keeps enumeration below DEVICE_SCAN_MAX_DUTY_CYCLE.
+    Stations with many disks poll less often instead of saturating WMI.
+    """
+    return max(DEVICE_SCAN_INTERVAL_S, enumeration_seconds / DEVICE_SCAN_MAX_DUTY_CYCLE)
 
 @dataclass(frozen=True)
 class ValidatedDevice:
@@ -25,60 +31,257 @@ class ValidatedDevice:
     interface_type: str
     is_system_drive: bool
     is_boot_drive: bool
+    disk_index: int
+    # Set by the pre-wipe capacity probe; None until the device has been probed
+    verified_capacity_bytes: Optional[int] = None
     
     @property
     def size_gb(self) -> float:
         return round(self.size_bytes / (1024**3), 2)
 
+    @property
+    def usable_bytes(self) -> int:
+        """Bytes backed by real storage: the probed capacity if known, else the reported size."""
+        return self.size_bytes if self.verified_capacity_bytes is None else self.verified_capacity_bytes
+
+    @property
+    def is_counterfeit(self) -> bool:
+        return self.verified_capacity_bytes is not None and self.verified_capacity_bytes < self.size_bytes
+
+    @property
+    def fingerprint(self) -> Tuple[str, str, int, str]:
+        """Identity used to detect a device being swapped between selection and wipe."""
+        return (self.serial_number, self.model, self.size_bytes, self.interface_type.upper())
+
+@dataclass(frozen=True)
+class SystemDiskFingerprint:
+    """Identity of a physical disk that hosts the OS or boot partitions."""
+    disk_index: int
+    serial_number: str
+    model: str
+    size_bytes: int
+
+    @classmethod
+    def of(cls, disk: DiskInfo) -> "SystemDiskFingerprint":
+        return cls(disk.index, disk.serial_number, disk.model, disk.size_bytes)
+
+    def matches(self, disk: Optional[DiskInfo]) -> bool:
+        """
+        Whether disk is this system disk. A fingerprint without a serial never
+        matches: any other serial-less disk of the same model could stand at its index.
+        """
+        return (disk is not None and bool(self.serial_number) and SystemDiskFingerprint.of(disk) == self)
+
 class DeviceValidator:
     """
-    Handles strict device detection and validation using WMI.
+    Handles strict device detection and validation on top of a platform
+    discovery backend (WMI on Windows, sysfs on Linux).
     Guarantees system/boot drives are identified and blocked.
     """
-    def __init__(self):
-        try:
-            # Initialize WMI connection
-            self.wmi_conn = wmi.WMI()
-        except Exception as e:
-            log_error_event("device_validator", "__init__", f"Failed to initialize WMI: {e}", exc_info=True)
-            raise DeviceValidationError("Critical failure: Cannot initialize WMI for device detection.")
+    # The boot disk does not change while the application is running, so the
+    # expensive system disk query is cached per backend and shared between every
+    # validator instance (scanner thread and wipe engines alike). The cache is
+    # dropped on hotplug (disk population change), on an explicit
+    # invalidate_system_drive_cache() call, or when a fingerprint (serial,
+    # model and size) no longer matches the disk found at its index. A system
+    # disk without a serial cannot be told apart, so it is never taken from the cache.
+    _system_cache_lock = threading.Lock()
+    _system_cache: Dict[str, Tuple[FrozenSet[SystemDiskFingerprint], FrozenSet[SystemDiskFingerprint]]] = {}
+
+    def __init__(self, backend: Optional[DiscoveryBackend] = None):
+        # An injected backend belongs to the caller; a default one is closed by close()
+        self._owns_backend = backend is None
+        self.backend = backend if backend is not None else get_default_backend()
+        # Last verdict logged per disk index. The scanner re-validates every disk on
+        # every poll, so verdicts are only logged when they change for that disk.
+        self._logged_verdicts: Dict[int, Tuple[DiskInfo, str]] = {}
+        # Security verdicts are never silently dropped: repeats are counted per
+        # disk and reported periodically and when the verdict ends.
+        self._suppressed_security: Dict[int, Tuple[int, float]] = {}  # index -> (repeats, last logged)
+
+    def close(self) -> None:
+        """Release the discovery backend created by this validator (on its own thread)."""
+        if self._owns_backend:
+            self.backend.close()
 
     def _is_admin(self) -> bool:
         """Check if running with Administrator privileges."""
-        try:
-            return ctypes.windll.shell32.IsUserAnAdmin() == 1
-        except Exception:
-            return False
+        return self.backend.is_admin()
+
+    def invalidate_system_drive_cache(self) -> None:
+        """Drop the cached system disk fingerprints (call on device hotplug events)."""
+        with self._system_cache_lock:
+            self._system_cache.pop(self.backend.cache_key, None)
+        device_logger.debug("System drive cache invalidated.")
+
+    @classmethod
+    def invalidate_all_system_drive_caches(cls) -> None:
+        """Drop the cached system disk fingerprints of every backend."""
+        with cls._system_cache_lock:
+            cls._system_cache.clear()
 
-    def _get_system_drive_indices(self) -> set[int]:
+    def _query_system_drive_indices(self) -> set[int]:
         """
         Identify physical drive indices that contain the OS or Boot partitions.
-        Uses Win32_DiskPartition and Win32_LogicalDisk to trace back to the physical drive.
+        The backend traces partitions and mounted volumes back to the physical drive.
         """
-        system_indices = set()
         try:
-            # 1. Find partitions marked as BootPartition
-            for partition in self.wmi_conn.Win32_DiskPartition(BootPartition=True):
-                system_indices.add(partition.DiskIndex)
-                
-            # 2. Find the drive containing the Windows directory (usually C:)
-            win_dir = os.environ.get("windir", "C:\\Windows")
-            system_drive_letter = win_dir[:2] # e.g., "C:"
-            
-            # Trace Logical Disk -> Partition -> Physical Disk
-            for logical_disk in self.wmi_conn.Win32_LogicalDisk(DeviceID=system_drive_letter):
-                for partition in logical_disk.associators("Win32_LogicalDiskToPartition"):
-                    for physical_disk in partition.associators("Win32_DiskDriveToDiskPartition"):
-                        system_indices.add(physical_disk.Index)
-                        
+            return set(self.backend.query_system_disk_indices())
         except Exception as e:
-            log_error_event("device_validator", "_get_system_drive_indices", f"Error detecting system drives: {e}", exc_info=True)
+            log_error_event("device_validator", "_query_system_drive_indices", f"Error detecting system drives: {e}", exc_info=True)
             # FAIL SAFE: If we can't determine system drives, we must assume ALL drives are system drives
             # to prevent accidental wiping. This will effectively block the application until resolved.
             raise SystemDriveError("FAIL SAFE TRIGGERED: Cannot reliably determine system drive indices.")
+
+    def _get_system_drive_indices(self, disks: List[DiskInfo]) -> set[int]:
+        """
+        Return the system/boot disk indices, using the cached fingerprints when they
+        still match the disks currently attached.
+        
+        Args:
+            disks: The disks of the current enumeration.
             
+        Raises:
+            SystemDriveError: If the system disks cannot be determined (fail safe).
+        """
+        population = frozenset(SystemDiskFingerprint.of(disk) for disk in disks)
+        cache_key = self.backend.cache_key
+
+        with self._system_cache_lock:
+            cached = self._system_cache.get(cache_key)
+        if cached is not None and population == cached[1] and all(fp.serial_number for fp in cached[0]):
+            return {fp.disk_index for fp in cached[0]}
+
+        if cached is not None:
+            device_logger.info("Disk population changed. Recomputing system drive fingerprints.")
+
+        try:
+            system_indices = self._query_system_drive_indices()
+        except SystemDriveError:
+            self.invalidate_system_drive_cache()
+            raise
+
+        by_index = {fp.disk_index: fp for fp in population}
+        # A system disk missing from the enumeration gets an empty fingerprint, which never matches
+        fingerprints = frozenset(
+            by_index.get(index, SystemDiskFingerprint(index, "", "", 0)) for index in system_indices
+        )
+        with self._system_cache_lock:
+            self._system_cache[cache_key] = (fingerprints, population)
         return system_indices
 
+    def _verified_system_drive_indices(self) -> set[int]:
+        """
+        Return the system/boot disk indices without a full enumeration.
+        Each cached fingerprint is checked with a targeted query on its disk index;
+        any mismatch (or a cold cache) falls back to a full recomputation.
+        """
+        with self._system_cache_lock:
+            cached = self._system_cache.get(self.backend.cache_key)
+
+        if cached is not None:
+            fingerprints = cached[0]
+            try:
+                matches = True
+                for fp in fingerprints:
+                    if not fp.matches(self.backend.get_disk(fp.disk_index)):
+                        matches = False
+                        break
+            except Exception as e:
+                device_logger.warning(f"System drive fingerprint check failed: {e}")
+                matches = False
+            if matches:
+                return {fp.disk_index for fp in fingerprints}
+            device_logger.info("System drive fingerprint mismatch. Recomputing.")
+            self.invalidate_system_drive_cache()
+
+        return self._get_system_drive_indices(self.backend.list_disks())
+
+    def _log_verdict(self, disk: DiskInfo, level: int, message: str, security: bool = False) -> None:
+        """
+        Log a per-disk validation verdict once per (disk state, verdict).
+        Repeats of a security verdict are counted and re-logged with their count
+        every DEVICE_SECURITY_REPEAT_LOG_S.
+        """
+        now = time.monotonic()
+        if self._logged_verdicts.get(disk.index) == (disk, message):
+            if security:
+                repeats, logged_at = self._suppressed_security.get(disk.index, (0, now))
+                repeats += 1
+                if now - logged_at >= DEVICE_SECURITY_REPEAT_LOG_S:
+                    log_security_event("device_validator", "_build_validated_device",
+                                       f"{message} (seen {repeats} more time(s) since last report)")
+                    repeats, logged_at = 0, now
+                self._suppressed_security[disk.index] = (repeats, logged_at)
+            return
+        self._report_suppressed(disk.index)
+        self._logged_verdicts[disk.index] = (disk, message)
+        if security:
+            self._suppressed_security[disk.index] = (0, now)
+            log_security_event("device_validator", "_build_validated_device", message)
+        else:
+            device_logger.log(level, message, stacklevel=2)
+
+    def _report_suppressed(self, index: int) -> None:
+        """Log the unreported repeats of a disk's security verdict before it is replaced or forgotten."""
+        repeats, _ = self._suppressed_security.pop(index, (0, 0.0))
+        if repeats:
+            _, message = self._logged_verdicts[index]
+            log_security_event("device_validator", "_build_validated_device",
+                               f"{message} (seen {repeats} more time(s) since last report)")
+
+    def _build_validated_device(self, disk: DiskInfo, system_indices: set[int]) -> Optional[ValidatedDevice]:
+        """
+        Apply the strict validation rules to a single disk reported by the backend.
+        
+        Returns:
+            The validated device, or None if the disk must not be offered for wiping.
+        """
+        device_id = disk.device_id
+        interface_type = disk.interface_type
+        size_bytes = disk.size_bytes
+        disk_index = disk.index
+        
+        is_system = disk_index in system_indices
+        
+        # --- STRICT VALIDATION RULES ---
+        
+        # 1. Must be USB
+        if interface_type.upper() != "USB":
+            if device_logger.isEnabledFor(logging.DEBUG):
+                self._log_verdict(disk, logging.DEBUG, f"Skipping {device_id}: Interface is {interface_type}, not USB.")
+            return None
+            
+        # 2. Must not be a system/boot drive
+        if is_system:
+            self._log_verdict(disk, logging.WARNING, f"System drive detected as USB (Index {disk_index}). Blocking.", security=True)
+            return None
+            
+        # 3. Must have a valid size
+        if size_bytes <= 0:
+            self._log_verdict(disk, logging.WARNING, f"Skipping {device_id}: Invalid size ({size_bytes} bytes).")
+            return None
+            
+        # 4. Must have a serial number (required for forensic logging)
+        if not disk.serial_number:
+            self._log_verdict(disk, logging.WARNING, f"Skipping {device_id}: Missing serial number.")
+            return None
+            
+        # Validate path format
+        validate_device_path(device_id)
+        
+        # Create immutable device record
+        return ValidatedDevice(
+            device_id=device_id,
+            model=disk.model,
+            serial_number=disk.serial_number,
+            size_bytes=size_bytes,
+            interface_type=interface_type,
+            is_system_drive=False, # We already filtered out True
+            is_boot_drive=False,   # We already filtered out True
+            disk_index=disk_index
+        )
+
     def get_valid_usb_drives(self) -> List[ValidatedDevice]:
         """
         Enumerate and strictly validate all connected USB drives.
@@ -90,61 +293,27 @@ class DeviceValidator:
 
         valid_drives = []
         try:
-            system_indices = self._get_system_drive_indices()
+            disks = self.backend.list_disks()
+            system_indices = self._get_system_drive_indices(disks)
             
-            for disk in self.wmi_conn.Win32_DiskDrive():
+            for disk in disks:
                 try:
-                    device_id = disk.DeviceID
-                    model = disk.Model or "Unknown Model"
-                    interface_type = disk.InterfaceType or "UNKNOWN"
-                    size_bytes = int(disk.Size) if disk.Size else 0
-                    serial_number = disk.SerialNumber.strip() if disk.SerialNumber else ""
-                    disk_index = disk.Index
-                    
-                    is_system = disk_index in system_indices
-                    
-                    # --- STRICT VALIDATION RULES ---
-                    
-                    # 1. Must be USB
-                    if interface_type.upper() != "USB":
-                        device_logger.debug(f"Skipping {device_id}: Interface is {interface_type}, not USB.")
-                        continue
-                        
-                    # 2. Must not be a system/boot drive
-                    if is_system:
-                        log_security_event("device_validator", "get_valid_usb_drives", f"System drive detected as USB (Index {disk_index}). Blocking.")
-                        continue
-                        
-                    # 3. Must have a valid size
-                    if size_bytes <= 0:
-                        device_logger.warning(f"Skipping {device_id}: Invalid size ({size_bytes} bytes).")
-                        continue
-                        
-                    # 4. Must have a serial number (required for forensic logging)
-                    if not serial_number:
-                        device_logger.warning(f"Skipping {device_id}: Missing serial number.")
+                    validated_device = self._build_validated_device(disk, system_indices)
+                    if validated_device is None:
                         continue
-                        
-                    # Validate path format
-                    validate_device_path(device_id)
-                    
-                    # Create immutable device record
-                    validated_device = ValidatedDevice(
-                        device_id=device_id,
-                        model=model,
-                        serial_number=serial_number,
-                        size_bytes=size_bytes,
-                        interface_type=interface_type,
-                        is_system_drive=False, # We already filtered out True
-                        is_boot_drive=False    # We already filtered out True
-                    )
                     
                     valid_drives.append(validated_device)
-                    device_logger.info(f"Validated USB device: {device_id} ({model}, {validated_device.size_gb}GB)")
+                    self._log_verdict(disk, logging.INFO, f"Validated USB device: {validated_device.device_id} ({validated_device.model}, {validated_device.size_gb}GB)")
                     
                 except Exception as e:
-                    device_logger.error(f"Error validating individual disk {getattr(disk, 'DeviceID', 'Unknown')}: {e}")
+                    device_logger.error(f"Error validating individual disk {disk.device_id}: {e}")
                     continue # Skip this disk on error, fail safe
+            
+            # Forget verdicts for disks that have been unplugged
+            present = {disk.index for disk in disks}
+            for index in [i for i in self._logged_verdicts if i not in present]:
+                self._report_suppressed(index)
+                del self._logged_verdicts[index]
                     
         except SystemDriveError as sde:
             # Re-raise fail-safe errors
@@ -154,17 +323,50 @@ class DeviceValidator:
             
         return valid_drives
 
-    def validate_device_for_wipe(self, device_id: str) -> ValidatedDevice:
+    def validate_device_for_wipe(self, expected: ValidatedDevice) -> ValidatedDevice:
         """
         Perform a final, strict validation immediately before a wipe operation.
-        This ensures the device hasn't changed or been swapped since detection.
+        Only the selected disk is re-queried (by index), and its full fingerprint is
+        compared against the device the operator chose, so a device that was
+        removed, altered or swapped on the same port is rejected.
+        
+        Args:
+            expected: The device record the operator selected.
+            
+        Returns:
+            The freshly validated device record.
+            
+        Raises:
+            DeviceValidationError: If the device is missing, invalid, or not the same device.
+            SystemDriveError: If the system drives cannot be determined (fail safe).
         """
-        validate_device_path(device_id)
+        device_id = validate_device_path(expected.device_id)
+        
+        if not self._is_admin():
+            raise DeviceValidationError("Administrator privileges required for device validation.")
         
-        current_valid_drives = self.get_valid_usb_drives()
-        for drive in current_valid_drives:
-            if drive.device_id == device_id:
-                return drive
-                
-        log_security_event("device_validator", "validate_device_for_wipe", f"Device {device_id} failed pre-wipe validation. It may have been removed, altered, or is a system drive.")
-        raise DeviceValidationError(f"Device {device_id} is not valid for wiping or is no longer present.")
+        current: Optional[ValidatedDevice] = None
+        try:
+            disk = self.backend.get_disk(expected.disk_index)
+            if disk is not None:
+                system_indices = self._verified_system_drive_indices()
+                current = self._build_validated_device(disk, system_indices)
+        except SystemDriveError:
+            raise
+        except Exception as e:
+            log_error_event("device_validator", "validate_device_for_wipe", f"Targeted validation of {device_id} failed: {e}", exc_info=True)
+            current = None
+        
+        if current is None or current.device_id.upper() != device_id.upper():
+            log_security_event("device_validator", "validate_device_for_wipe", f"Device {device_id} failed pre-wipe validation. It may have been removed, altered, or is a system drive.")
+            raise DeviceValidationError(f"Device {device_id} is not valid for wiping or is no longer present.")
+            
+        if current.fingerprint != expected.fingerprint:
+            log_security_event(
+                "device_validator", "validate_device_for_wipe",
+                f"Device at {device_id} does not match the selected device. "
+                f"Expected {expected.fingerprint}, found {current.fingerprint}. Possible device swap."
+            )
+            raise DeviceValidationError(f"Device at {device_id} is not the device that was selected. Please re-select it.")
+            
+        return current
@@ -0,0 +1,298 @@
+"""
+Enterprise Data Sanitization Platform
+Device Discovery Backends
+"""
+import ctypes
+import os
+import re
+import sys
+from dataclasses import dataclass
+from typing import List, Optional, Set
+
+from core.exception_types import DeviceValidationError
+from core.logging_engine import device_logger, log_error_event
+
+@dataclass(frozen=True)
+class DiskInfo:
+    """Raw, unvalidated description of a physical disk as reported by a backend."""
+    index: int
+    device_id: str
+    model: str
+    serial_number: str
+    size_bytes: int
+    interface_type: str
+
+class DiscoveryBackend:
+    """
+    Base class for platform device discovery.
+    Backends only report what the platform sees; all validation rules
+    (USB-only, non-system, serial required) are enforced by DeviceValidator.
+    """
+    name: str = "abstract"
+
+    @property
+    def cache_key(self) -> str:
+        """Key under which the validator caches this backend's system disk fingerprints."""
+        return self.name
+
+    def is_admin(self) -> bool:
+        """Whether the process has the privileges required to open raw disks."""
+        raise NotImplementedError("Must be implemented by subclass")
+
+    def list_disks(self) -> List[DiskInfo]:
+        """Enumerate every physical disk currently attached."""
+        raise NotImplementedError("Must be implemented by subclass")
+
+    def get_disk(self, disk_index: int) -> Optional[DiskInfo]:
+        """Targeted lookup of a single disk by index. Returns None if it is not present."""
+        raise NotImplementedError("Must be implemented by subclass")
+
+    def query_system_disk_indices(self) -> Set[int]:
+        """
+        Return the indices of disks hosting the OS or boot partitions.
+        Implementations must raise on any doubt; the validator treats that as fail safe.
+        """
+        raise NotImplementedError("Must be implemented by subclass")
+
+    def close(self) -> None:
+        """Release platform resources. Call on the thread that created the backend."""
+
+class WmiDiscoveryBackend(DiscoveryBackend):
+    """
+    Windows discovery through WMI (Win32_DiskDrive and partition associators).
+    A WMI connection is bound to the COM apartment of the thread that created
+    it, so construct the backend on the thread that will query it, and close
+    it on that thread too (COM initialization is per thread and reference counted).
+    """
+    name = "wmi"
+
+    def __init__(self):
+        try:
+            import pythoncom
+            import wmi
+            # COM must be initialized on every thread that uses WMI, not just the GUI thread
+            pythoncom.CoInitialize()
+            try:
+                # Initialize WMI connection
+                self.wmi_conn = wmi.WMI()
+            except Exception:
+                pythoncom.CoUninitialize()
+                raise
+            self._pythoncom = pythoncom
+        except Exception as e:
+            log_error_event("discovery_backends", "WmiDiscoveryBackend.__init__", f"Failed to initialize WMI: {e}", exc_info=True)
+            raise DeviceValidationError("Critical failure: Cannot initialize WMI for device detection.")
+
+    def close(self) -> None:
+        """Drop the WMI connection and balance the CoInitialize() of __init__."""
+        if self._pythoncom is None:
+            return
+        try:
+            # The connection must be released before COM is torn down on this thread
+            self.wmi_conn = None
+        finally:
+            self._pythoncom.CoUninitialize()
+            self._pythoncom = None
+
+    def is_admin(self) -> bool:
+        """Check if running with Administrator privileges."""
+        try:
+            return ctypes.windll.shell32.IsUserAnAdmin() == 1
+        except Exception:
+            return False
+
+    @staticmethod
+    def _to_disk_info(disk) -> DiskInfo:
+        return DiskInfo(
+            index=int(disk.Index),
+            device_id=disk.DeviceID,
+            model=disk.Model or "Unknown Model",
+            serial_number=disk.SerialNumber.strip() if disk.SerialNumber else "",
+            size_bytes=int(disk.Size) if disk.Size else 0,
+            interface_type=disk.InterfaceType or "UNKNOWN",
+        )
+
+    def list_disks(self) -> List[DiskInfo]:
+        disks = []
+        for disk in self.wmi_conn.Win32_DiskDrive():
+            try:
+                disks.append(self._to_disk_info(disk))
+            except Exception as e:
+                device_logger.error(f"Error reading disk {getattr(disk, 'DeviceID', 'Unknown')}: {e}")
+        return disks
+
+    def get_disk(self, disk_index: int) -> Optional[DiskInfo]:
+        for disk in self.wmi_conn.Win32_DiskDrive(Index=disk_index):
+            return self._to_disk_info(disk)
+        return None
+
+    def query_system_disk_indices(self) -> Set[int]:
+        system_indices = set()
+        # 1. Find partitions marked as BootPartition
+        for partition in self.wmi_conn.Win32_DiskPartition(BootPartition=True):
+            system_indices.add(partition.DiskIndex)
+
+        # 2. Find the drive containing the Windows directory (usually C:)
+        win_dir = os.environ.get("windir", "C:\\Windows")
+        system_drive_letter = win_dir[:2] # e.g., "C:"
+
+        # Trace Logical Disk -> Partition -> Physical Disk
+        for logical_disk in self.wmi_conn.Win32_LogicalDisk(DeviceID=system_drive_letter):
+            for partition in logical_disk.associators("Win32_LogicalDiskToPartition"):
+                for physical_disk in partition.associators("Win32_DiskDriveToDiskPartition"):
+                    system_indices.add(physical_disk.Index)
+        return system_indices
+
+# Block devices that are never physical disks
+_VIRTUAL_BLOCK_PREFIXES = ("loop", "ram", "zram", "dm-", "md", "sr", "fd", "nbd")
+
+# Mount points whose backing disks are treated as system disks
+_SYSTEM_MOUNT_POINTS = ("/", "/boot", "/boot/efi", "/usr")
+
+_USB_BUS_COMPONENT = re.compile(r"^usb\d+$")
+
+class SysfsDiscoveryBackend(DiscoveryBackend):
+    """
+    Linux discovery from /sys/block and the mount table.
+    All paths are configurable so enumeration can run against a synthetic tree.
+    """
+    name = "sysfs"
+
+    def __init__(self, sysfs_root: str = "/sys", mounts_path: str = "/proc/self/mounts", require_root: bool = True):
+        self.sysfs_root = os.path.abspath(sysfs_root)
+        self.mounts_path = mounts_path
+        self.require_root = require_root
+        self._block_dir = os.path.join(self.sysfs_root, "block")
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.name}:{self.sysfs_root}"
+
+    def is_admin(self) -> bool:
+        if not self.require_root:
+            return True
+        try:
+            return os.geteuid() == 0
+        except AttributeError:
+            return False
+
+    @staticmethod
+    def _read(path: str, default: str = "") -> str:
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                return f.read().strip()
+        except OSError:
+            return default
+
+    def _disk_index(self, name: str) -> int:
+        """Index a disk by its device number, which /sys/dev/block resolves in O(1)."""
+        major, minor = self._read(os.path.join(self._block_dir, name, "dev")).split(":")
+        return (int(major) << 20) | int(minor)
+
+    def _interface_type(self, name: str, real_path: str) -> str:
+        if any(_USB_BUS_COMPONENT.match(part) for part in real_path.split(os.sep)):
+            return "USB"
+        if name.startswith("nvme"):
+            return "NVME"
+        if name.startswith("mmcblk"):
+            return "SD"
+        return "SCSI"
+
+    def _serial(self, block_path: str, real_path: str) -> str:
+        """The USB device node (or NVMe controller) above the block device carries the serial."""
+        serial = self._read(os.path.join(block_path, "device", "serial"))
+        if serial:
+            return serial
+        current = real_path
+        while current.startswith(self.sysfs_root) and current != self.sysfs_root:
+            serial = self._read(os.path.join(current, "serial"))
+            if serial:
+                return serial
+            current = os.path.dirname(current)
+        return ""
+
+    def _describe(self, name: str) -> DiskInfo:
+        block_path = os.path.join(self._block_dir, name)
+        real_path = os.path.realpath(block_path)
+        vendor = self._read(os.path.join(block_path, "device", "vendor"))
+        model = self._read(os.path.join(block_path, "device", "model"))
+        sectors = self._read(os.path.join(block_path, "size"), "0")
+        return DiskInfo(
+            index=self._disk_index(name),
+            device_id=f"/dev/{name}",
+            model=f"{vendor} {model}".strip() or "Unknown Model",
+            serial_number=self._serial(block_path, real_path),
+            # sysfs always reports the size in 512-byte units
+            size_bytes=int(sectors) * 512,
+            interface_type=self._interface_type(name, real_path),
+        )
+
+    def list_disks(self) -> List[DiskInfo]:
+        disks = []
+        for name in sorted(os.listdir(self._block_dir)):
+            if name.startswith(_VIRTUAL_BLOCK_PREFIXES):
+                continue
+            try:
+                disks.append(self._describe(name))
+            except Exception as e:
+                device_logger.error(f"Error reading disk /dev/{name}: {e}")
+        return disks
+
+    def get_disk(self, disk_index: int) -> Optional[DiskInfo]:
+        dev_link = os.path.join(self.sysfs_root, "dev", "block", f"{disk_index >> 20}:{disk_index & 0xFFFFF}")
+        if not os.path.exists(dev_link):
+            return None
+        name = os.path.basename(os.path.realpath(dev_link))
+        if not os.path.isdir(os.path.join(self._block_dir, name)):
+            return None # A partition, not a whole disk
+        return self._describe(name)
+
+    def _whole_disks(self, name: str, depth: int = 0) -> Set[str]:
+        """Resolve a partition, device-mapper or md device down to its physical disks."""
+        if depth > 8:
+            raise DeviceValidationError(f"Block device stacking too deep at {name}.")
+        class_path = os.path.join(self.sysfs_root, "class", "block", name)
+        if not os.path.exists(class_path):
+            raise DeviceValidationError(f"Unknown block device {name}.")
+        real_path = os.path.realpath(class_path)
+        if os.path.exists(os.path.join(real_path, "partition")):
+            real_path = os.path.dirname(real_path)
+        disk = os.path.basename(real_path)
+        slaves_dir = os.path.join(real_path, "slaves")
+        slaves = os.listdir(slaves_dir) if os.path.isdir(slaves_dir) else []
+        if not slaves:
+            return {disk}
+        disks = set()
+        for slave in slaves:
+            disks |= self._whole_disks(slave, depth + 1)
+        return disks
+
+    def query_system_disk_indices(self) -> Set[int]:
+        system_disks = set()
+        root_resolved = False
+        with open(self.mounts_path, "r", encoding="utf-8") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 2:
+                    continue
+                source = fields[0]
+                mount_point = fields[1].replace("\\040", " ")
+                if mount_point not in _SYSTEM_MOUNT_POINTS or not source.startswith("/dev/"):
+                    continue
+                name = os.path.basename(os.path.realpath(source)) if os.path.exists(source) else os.path.basename(source)
+                system_disks |= self._whole_disks(name)
+                if mount_point == "/":
+                    root_resolved = True
+
+        # FAIL SAFE: a root filesystem we cannot trace to a disk means any disk could be the system disk
+        if not root_resolved:
+            raise DeviceValidationError("Root filesystem is not backed by a resolvable block device.")
+        return {self._disk_index(disk) for disk in system_disks}
+
+def get_default_backend() -> DiscoveryBackend:
+    """Select the discovery backend for the running platform."""
+    if sys.platform == "win32":
+        return WmiDiscoveryBackend()
+    if sys.platform.startswith("linux"):
+        return SysfsDiscoveryBackend()
+    raise DeviceValidationError(f"Device discovery is not supported on {sys.platform}.")
@@ -27,6 +27,20 @@ class WipeEngineError(EcoWipeError):
     """Raised when the wipe engine encounters a critical failure."""
     pass
 
+class DeviceIOError(WipeEngineError):
+    """Raised when a read or write on the wipe target fails."""
+    def __init__(self, message: str, error_code: int = 0):
+        super().__init__(message)
+        self.error_code = error_code
+
+class DeviceRemovedError(DeviceIOError):
+    """Raised when the wipe target disappears mid-operation."""
+    pass
+
+class ForensicImageError(WipeEngineError):
+    """Raised when a forensic image cannot be written or does not verify."""
+    pass
+
 class StateMachineError(EcoWipeError):
     """Raised when an invalid state transition is attempted."""
     pass
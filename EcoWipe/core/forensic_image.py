@@ -0,0 +1,360 @@
+"""
+Enterprise Data Sanitization Platform
+Forensic Image Capture
+"""
+import hashlib
+import json
+import os
+import queue
+import shutil
+import struct
+import threading
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from core.device_validator import ValidatedDevice
+from core.exception_types import ForensicImageError
+from core.logging_engine import wipe_logger, log_error_event
+from core import metrics
+from utils.constants import (
+    FORENSIC_IMAGE_BLOCK_BYTES, FORENSIC_IMAGE_SEGMENT_BYTES, FORENSIC_IMAGE_COMPRESSION_LEVEL,
+    FORENSIC_IMAGE_WORKERS, FORENSIC_IMAGE_QUEUE_CHUNKS,
+)
+
+IMAGE_FORMAT = "ecowipe-image/1"
+MANIFEST_NAME = "manifest.json"
+SEGMENT_SUFFIX = ".ewseg"
+
+# Segment file: header, then records covering consecutive device ranges
+_SEGMENT_MAGIC = b"EWIMGSEG"
+_SEGMENT_HEADER = struct.Struct(">8sHI16s")     # magic, format version, segment index, job uuid
+_RECORD_HEADER = struct.Struct(">QQBI")         # device offset, raw length, kind, stored length
+KIND_ZLIB = 0
+KIND_ZERO = 1                                   # Elided: nothing stored, the range reads as zeros
+KIND_RAW = 2                                    # Incompressible block stored as is
+_KIND_NAMES = {KIND_ZLIB: "zlib", KIND_ZERO: "zero", KIND_RAW: "raw"}
+
+Record = Tuple[int, int, int, bytes]
+
+def encode_chunk(offset: int, data: bytes, block_bytes: int = FORENSIC_IMAGE_BLOCK_BYTES,
+                 level: int = FORENSIC_IMAGE_COMPRESSION_LEVEL) -> List[Record]:
+    """Split one read chunk into (offset, raw length, kind, payload) records; runs on a worker thread."""
+    records: List[Record] = []
+    zeros = bytes(block_bytes)
+    view = memoryview(data)
+    for start in range(0, len(data), block_bytes):
+        block = view[start:start + block_bytes]
+        length = len(block)
+        if block == zeros[:length]:
+            if records and records[-1][2] == KIND_ZERO:
+                records[-1] = (records[-1][0], records[-1][1] + length, KIND_ZERO, b"")
+            else:
+                records.append((offset + start, length, KIND_ZERO, b""))
+            continue
+        compressed = zlib.compress(block, level)
+        if len(compressed) < length:
+            records.append((offset + start, length, KIND_ZLIB, compressed))
+        else:
+            records.append((offset + start, length, KIND_RAW, bytes(block)))
+    return records
+
+class _SegmentFile:
+    """One open segment: hashes its bytes as they are written."""
+    def __init__(self, path: str, index: int, job_uuid: bytes, first_offset: int):
+        self.path = path
+        self.index = index
+        self.first_offset = first_offset
+        self.end_offset = first_offset
+        self.hasher = hashlib.sha256()
+        self.size = 0
+        self._file = open(path, "wb")
+        self._write(_SEGMENT_HEADER.pack(_SEGMENT_MAGIC, 1, index, job_uuid))
+
+    def _write(self, data: bytes) -> None:
+        self._file.write(data)
+        self.hasher.update(data)
+        self.size += len(data)
+
+    def add(self, record: Record) -> None:
+        offset, length, kind, payload = record
+        self._write(_RECORD_HEADER.pack(offset, length, kind, len(payload)))
+        if payload:
+            self._write(payload)
+        self.end_offset = offset + length
+
+    def close(self) -> Dict[str, Any]:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        return {"file": os.path.basename(self.path), "sha256": self.hasher.hexdigest(), "bytes": self.size,
+                "first_offset": self.first_offset, "end_offset": self.end_offset}
+
+class ForensicImageWriter:
+    """
+    Streams the device content read by the pre-wipe hash into a compressed,
+    segmented image: <image_dir>/<job_id>/image.NNN.ewseg plus manifest.json.
+
+    submit() hands each read chunk to a pool of compression threads (zlib
+    releases the GIL) and returns at once; a writer thread stores the results
+    in device order, eliding all-zero blocks and rolling to a new segment at
+    segment_bytes. At most queue_chunks chunks are in flight, so a slow image
+    disk slows the read instead of buffering the device in memory.
+
+    The manifest records each segment's SHA-256 and the SHA-256 of the raw
+    device stream, which is the pre-wipe hash itself; the certificate carries
+    the manifest's SHA-256. Any failure raises ForensicImageError, and an
+    incomplete image is removed by abort().
+    """
+    def __init__(self, image_dir: str, job_id: str, device: ValidatedDevice, image_bytes: int,
+                 segment_bytes: int = FORENSIC_IMAGE_SEGMENT_BYTES, block_bytes: int = FORENSIC_IMAGE_BLOCK_BYTES,
+                 workers: int = FORENSIC_IMAGE_WORKERS, queue_chunks: int = FORENSIC_IMAGE_QUEUE_CHUNKS):
+        self.directory = os.path.join(image_dir, job_id)
+        self.job_id = job_id
+        self.device = device
+        self.image_bytes = image_bytes
+        self.segment_bytes = segment_bytes
+        self.block_bytes = block_bytes
+        self.segments: List[Dict[str, Any]] = []
+        self.stored_bytes = 0
+        self.elided_bytes = 0
+        self._job_uuid = hashlib.sha256(job_id.encode("utf-8")).digest()[:16]
+        self._segment: Optional[_SegmentFile] = None
+        self._pending_zero: Optional[Record] = None
+        self._next_offset = 0
+        self._error: Optional[BaseException] = None
+        try:
+            os.makedirs(self.directory, exist_ok=False)
+        except OSError as e:
+            raise ForensicImageError(f"Cannot create image directory {self.directory}: {e}") from e
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ImageCompress")
+        self._queue: "queue.Queue[Optional[Future]]" = queue.Queue(maxsize=queue_chunks)
+        self._writer = threading.Thread(target=self._write_loop, name=f"ImageWriter-{job_id[:8]}", daemon=True)
+        self._writer.start()
+
+    # --- Producer side (wipe thread) ---
+
+    def submit(self, offset: int, data: bytes) -> None:
+        """Queue the next chunk of the device (chunks must arrive in order, without gaps)."""
+        if self._error is not None:
+            raise ForensicImageError(f"Forensic image capture failed: {self._error}")
+        if offset != self._next_offset:
+            raise ForensicImageError(f"Forensic image chunk at offset {offset}, expected {self._next_offset}")
+        self._next_offset = offset + len(data)
+        self._queue.put(self._pool.submit(encode_chunk, offset, data, self.block_bytes))
+
+    def finish(self, raw_sha256: str) -> Dict[str, Any]:
+        """Drain the queue, close the last segment and write the manifest; returns the wipe result entry."""
+        self._stop()
+        if self._error is not None:
+            raise ForensicImageError(f"Forensic image capture failed: {self._error}")
+        if self._next_offset != self.image_bytes:
+            raise ForensicImageError(f"Forensic image covers {self._next_offset} of {self.image_bytes} bytes")
+        manifest = {
+            "format": IMAGE_FORMAT,
+            "job_id": self.job_id,
+            "created_utc": datetime.now(timezone.utc).isoformat(),
+            "device": {
+                "id": self.device.device_id,
+                "model": self.device.model,
+                "serial_number": self.device.serial_number,
+                "size_bytes": self.device.size_bytes,
+                "verified_capacity_bytes": self.device.verified_capacity_bytes,
+            },
+            "image_bytes": self.image_bytes,
+            "block_bytes": self.block_bytes,
+            "compression": "zlib",
+            "raw_sha256": raw_sha256,
+            "stored_bytes": self.stored_bytes,
+            "elided_zero_bytes": self.elided_bytes,
+            "segments": self.segments,
+        }
+        body = json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8")
+        path = os.path.join(self.directory, MANIFEST_NAME)
+        try:
+            with open(path, "wb") as f:
+                f.write(body)
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            raise ForensicImageError(f"Cannot write image manifest {path}: {e}") from e
+        wipe_logger.info(f"Forensic image written to {self.directory}: {len(self.segments)} segment(s), "
+                         f"{self.stored_bytes} bytes stored, {self.elided_bytes} zero bytes elided")
+        return {
+            "manifest": path,
+            "manifest_sha256": hashlib.sha256(body).hexdigest(),
+            "segments": len(self.segments),
+            "stored_bytes": self.stored_bytes,
+        }
+
+    def abort(self) -> None:
+        """Stop capturing and delete the incomplete image."""
+        self._stop()
+        shutil.rmtree(self.directory, ignore_errors=True)
+        wipe_logger.warning(f"Incomplete forensic image {self.directory} removed")
+
+    def _stop(self) -> None:
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._pool.shutdown(wait=True)
+
+    # --- Writer thread ---
+
+    def _write_loop(self) -> None:
+        while True:
+            future = self._queue.get()
+            if future is None:
+                break
+            if self._error is not None:
+                continue                    # Keep draining so submit() never blocks forever
+            try:
+                for record in future.result():
+                    self._add(record)
+            except Exception as e:
+                self._error = e
+                log_error_event("forensic_image", "_write_loop", f"Forensic image capture failed: {e}", exc_info=True)
+        try:
+            if self._error is None:
+                self._flush_zero()
+            if self._segment is not None:
+                self.segments.append(self._segment.close())
+                self._segment = None
+        except Exception as e:
+            self._error = self._error or e
+            log_error_event("forensic_image", "_write_loop", f"Forensic image capture failed: {e}", exc_info=True)
+
+    def _add(self, record: Record) -> None:
+        # Zero runs are merged across chunk boundaries before they are written
+        if record[2] == KIND_ZERO:
+            pending = self._pending_zero
+            self._pending_zero = (pending[0], pending[1] + record[1], KIND_ZERO, b"") if pending else record
+            return
+        self._flush_zero()
+        self._store(record)
+
+    def _flush_zero(self) -> None:
+        if self._pending_zero is not None:
+            record, self._pending_zero = self._pending_zero, None
+            self._store(record)
+
+    def _store(self, record: Record) -> None:
+        offset, length, kind, payload = record
+        needed = _RECORD_HEADER.size + len(payload)
+        if self._segment is None or (self._segment.size + needed > self.segment_bytes
+                                     and self._segment.end_offset > self._segment.first_offset):
+            if self._segment is not None:
+                self.segments.append(self._segment.close())
+            index = len(self.segments)
+            path = os.path.join(self.directory, f"image.{index:03d}{SEGMENT_SUFFIX}")
+            self._segment = _SegmentFile(path, index, self._job_uuid, offset)
+        self._segment.add(record)
+        if kind == KIND_ZERO:
+            self.elided_bytes += length
+        else:
+            self.stored_bytes += len(payload)
+        metrics.FORENSIC_IMAGE_BYTES.labels(_KIND_NAMES[kind]).inc(length)
+
+class ForensicImageReader:
+    """Reads back and verifies an image written by ForensicImageWriter."""
+    def __init__(self, manifest_path: str):
+        self.manifest_path = manifest_path
+        self.directory = os.path.dirname(os.path.abspath(manifest_path))
+        with open(manifest_path, "rb") as f:
+            self.manifest_bytes = f.read()
+        self.manifest: Dict[str, Any] = json.loads(self.manifest_bytes)
+        if self.manifest.get("format") != IMAGE_FORMAT:
+            raise ForensicImageError(f"Unsupported image format {self.manifest.get('format')!r}")
+
+    @property
+    def manifest_sha256(self) -> str:
+        return hashlib.sha256(self.manifest_bytes).hexdigest()
+
+    def iter_records(self) -> Iterator[Tuple[int, int, int, bytes]]:
+        """(offset, raw length, kind, payload) in device order, checking every segment's hash and coverage."""
+        expected_offset = 0
+        for index, segment in enumerate(self.manifest["segments"]):
+            path = os.path.join(self.directory, segment["file"])
+            hasher = hashlib.sha256()
+            with open(path, "rb") as f:
+                header = f.read(_SEGMENT_HEADER.size)
+                if len(header) != _SEGMENT_HEADER.size:
+                    raise ForensicImageError(f"{segment['file']} is truncated (incomplete segment header)")
+                hasher.update(header)
+                magic, _version, segment_index, _job = _SEGMENT_HEADER.unpack(header)
+                if magic != _SEGMENT_MAGIC or segment_index != index:
+                    raise ForensicImageError(f"{segment['file']} is not segment {index} of this image")
+                while True:
+                    head = f.read(_RECORD_HEADER.size)
+                    if not head:
+                        break
+                    if len(head) != _RECORD_HEADER.size:
+                        raise ForensicImageError(f"{segment['file']} is truncated (incomplete record header "
+                                                 f"after offset {expected_offset})")
+                    hasher.update(head)
+                    offset, length, kind, stored = _RECORD_HEADER.unpack(head)
+                    payload = f.read(stored)
+                    hasher.update(payload)
+                    if offset != expected_offset or len(payload) != stored:
+                        raise ForensicImageError(f"{segment['file']}: record at offset {offset} breaks the image "
+                                                 f"(expected offset {expected_offset})")
+                    expected_offset = offset + length
+                    yield offset, length, kind, payload
+            if hasher.hexdigest() != segment["sha256"]:
+                raise ForensicImageError(f"{segment['file']}: segment hash mismatch")
+        if expected_offset != self.manifest["image_bytes"]:
+            raise ForensicImageError(f"Image covers {expected_offset} of {self.manifest['image_bytes']} bytes")
+
+    @staticmethod
+    def _decode(offset: int, kind: int, payload: bytes) -> bytes:
+        if kind == KIND_RAW:
+            return payload
+        try:
+            return zlib.decompress(payload)
+        except zlib.error as e:
+            raise ForensicImageError(f"Record at offset {offset} is corrupt: {e}") from e
+
+    def iter_blocks(self) -> Iterator[Tuple[int, bytes]]:
+        """Decoded device content as (offset, data); zero runs come back in block-sized pieces."""
+        block_bytes = self.manifest["block_bytes"]
+        for offset, length, kind, payload in self.iter_records():
+            if kind == KIND_ZERO:
+                for start in range(0, length, block_bytes):
+                    yield offset + start, bytes(min(block_bytes, length - start))
+                continue
+            data = self._decode(offset, kind, payload)
+            if len(data) != length:
+                raise ForensicImageError(f"Record at offset {offset} decodes to {len(data)} of {length} bytes")
+            yield offset, data
+
+    def verify(self) -> str:
+        """Check every segment and the raw stream hash; returns the raw SHA-256 (the pre-wipe hash)."""
+        hasher = hashlib.sha256()
+        for _, data in self.iter_blocks():
+            hasher.update(data)
+        digest = hasher.hexdigest()
+        if digest != self.manifest["raw_sha256"]:
+            raise ForensicImageError("Image content does not match the recorded pre-wipe hash")
+        return digest
+
+    def extract(self, out_path: str) -> str:
+        """Restore the raw device image (sparse where zero runs were elided); returns its SHA-256."""
+        hasher = hashlib.sha256()
+        zeros = bytes(self.manifest["block_bytes"])
+        with open(out_path, "wb") as out:
+            for offset, length, kind, payload in self.iter_records():
+                if kind == KIND_ZERO:
+                    out.seek(offset + length)
+                    for start in range(0, length, len(zeros)):
+                        hasher.update(zeros[:min(len(zeros), length - start)])
+                    continue
+                data = self._decode(offset, kind, payload)
+                out.seek(offset)
+                out.write(data)
+                hasher.update(data)
+            out.truncate(self.manifest["image_bytes"])
+        digest = hasher.hexdigest()
+        if digest != self.manifest["raw_sha256"]:
+            raise ForensicImageError("Extracted image does not match the recorded pre-wipe hash")
+        return digest
@@ -0,0 +1,379 @@
+"""
+Enterprise Data Sanitization Platform
+Compressed Log Archive
+"""
+import json
+import os
+import re
+import struct
+import threading
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from utils.constants import DATE_FORMAT, LOG_ARCHIVE_BLOCK_BYTES, LOG_ARCHIVE_LEVEL
+
+# Rotated log segments are stored as gzip files made of independent members
+# ("blocks") of roughly LOG_ARCHIVE_BLOCK_BYTES of whole log records, like
+# BGZF. Every member header carries an "EW" extra subfield:
+#   member length, uncompressed length, first and last record timestamp
+# so a reader finds any block by walking headers only, and a time-range
+# search skips blocks without inflating them. Standard tools (zcat, gzip -d)
+# still read the files as ordinary gzip.
+ARCHIVE_SUFFIX = ".gz"
+
+_GZIP_MAGIC = b"\x1f\x8b\x08"
+_FLAG_FEXTRA = 0x04
+_OS_UNKNOWN = 255
+_SUBFIELD_ID = b"EW"
+_SUBFIELD = struct.Struct("<IIdd")                  # member_len, raw_len, first_ts, last_ts
+_HEADER = struct.Struct("<3sBIBBH2sH")              # magic+method, flags, mtime, xfl, os, xlen, si, sublen
+_HEADER_SIZE = _HEADER.size + _SUBFIELD.size
+_NO_TIMESTAMP = float("nan")
+
+_TEXT_RECORD = re.compile(rb"^\[([^\]]+)\] \[([^\]]+)\] \[([^\]]*)\] \[([^\]]*)\] ")
+_JSON_TS = re.compile(rb'"ts":"([^"]+)"')
+
+class ArchiveBlock(NamedTuple):
+    offset: int                 # Member offset in the compressed file
+    length: int                 # Member length in the compressed file
+    raw_offset: int             # Offset of the block's first byte in the uncompressed segment
+    raw_length: int
+    first_ts: Optional[float]   # Unix time of the first/last record, None if unknown
+    last_ts: Optional[float]
+
+def archive_name(name: str) -> str:
+    """Rotation namer: rotated segments are compressed."""
+    return name + ARCHIVE_SUFFIX
+
+@lru_cache(maxsize=4096)
+def _parse_timestamp(text: bytes, iso: bool) -> Optional[float]:
+    try:
+        if iso:
+            return datetime.fromisoformat(text.decode("ascii")).timestamp()
+        return datetime.strptime(text.decode("ascii"), DATE_FORMAT).replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return None
+
+def record_timestamp(record: bytes) -> Optional[float]:
+    """Unix time of a text (LOG_FORMAT) or audit JSON record, None if it has none."""
+    match = _TEXT_RECORD.match(record)
+    if match:
+        return _parse_timestamp(match.group(1), False)
+    if record.startswith(b"{"):
+        match = _JSON_TS.search(record)
+        if match:
+            return _parse_timestamp(match.group(1), True)
+    return None
+
+def _starts_record(line: bytes) -> bool:
+    return line[:1] == b"{" or (line[:1] == b"[" and line[1:2].isdigit())
+
+def _records(lines) -> Iterator[bytes]:
+    """Group lines into records: a record line plus its continuation lines (tracebacks)."""
+    record = b""
+    for line in lines:
+        if record and _starts_record(line):
+            yield record
+            record = b""
+        record += line
+    if record:
+        yield record
+
+def _blocks(lines, block_size: int) -> Iterator[List[bytes]]:
+    """Records grouped into blocks of about block_size bytes."""
+    block: List[bytes] = []
+    size = 0
+    for record in _records(lines):
+        if block and size + len(record) > block_size:
+            yield block
+            block, size = [], 0
+        block.append(record)
+        size += len(record)
+    if block:
+        yield block
+
+def _block_time_range(block: List[bytes]) -> Tuple[Optional[float], Optional[float]]:
+    first = next((t for t in map(record_timestamp, block) if t is not None), None)
+    last = next((t for t in map(record_timestamp, reversed(block)) if t is not None), None)
+    return first, last
+
+def _write_member(out, raw: bytes, first_ts: Optional[float], last_ts: Optional[float]) -> None:
+    compressor = zlib.compressobj(LOG_ARCHIVE_LEVEL, zlib.DEFLATED, -15)
+    body = compressor.compress(raw) + compressor.flush()
+    trailer = struct.pack("<II", zlib.crc32(raw), len(raw) & 0xFFFFFFFF)
+    member_len = _HEADER_SIZE + len(body) + len(trailer)
+    subfield = _SUBFIELD.pack(
+        member_len, len(raw),
+        _NO_TIMESTAMP if first_ts is None else first_ts,
+        _NO_TIMESTAMP if last_ts is None else last_ts,
+    )
+    header = _HEADER.pack(_GZIP_MAGIC, _FLAG_FEXTRA, 0, 0, _OS_UNKNOWN, 4 + len(subfield), _SUBFIELD_ID, len(subfield))
+    out.write(header + subfield + body + trailer)
+
+def write_archive(source: str, dest: str, block_size: int = LOG_ARCHIVE_BLOCK_BYTES) -> None:
+    """Compress a log segment into block-framed gzip; blocks end on record boundaries."""
+    tmp = os.path.join(os.path.dirname(dest), f".{os.path.basename(dest)}.{os.getpid()}.tmp")
+    with open(source, "rb") as src, open(tmp, "wb") as out:
+        for block in _blocks(src, block_size):
+            _write_member(out, b"".join(block), *_block_time_range(block))
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(tmp, dest)
+
+def read_blocks(path: str) -> List[ArchiveBlock]:
+    """Block table of an archive, from the member headers alone."""
+    blocks = []
+    raw_offset = 0
+    with open(path, "rb") as f:
+        offset = 0
+        while True:
+            f.seek(offset)
+            header = f.read(_HEADER_SIZE)
+            if not header:
+                return blocks
+            if len(header) < _HEADER_SIZE:
+                raise ValueError(f"{path}: truncated block header at {offset}")
+            magic, flags, _, _, _, _, subfield_id, sublen = _HEADER.unpack_from(header)
+            if magic != _GZIP_MAGIC or not flags & _FLAG_FEXTRA or subfield_id != _SUBFIELD_ID or sublen != _SUBFIELD.size:
+                raise ValueError(f"{path}: not a block-framed log archive (offset {offset})")
+            length, raw_length, first_ts, last_ts = _SUBFIELD.unpack_from(header, _HEADER.size)
+            blocks.append(ArchiveBlock(
+                offset, length, raw_offset, raw_length,
+                None if first_ts != first_ts else first_ts,    # NaN: no timestamp in the block
+                None if last_ts != last_ts else last_ts,
+            ))
+            offset += length
+            raw_offset += raw_length
+
+def read_block(f, block: ArchiveBlock) -> bytes:
+    f.seek(block.offset + _HEADER_SIZE)
+    member = f.read(block.length - _HEADER_SIZE)
+    raw = zlib.decompressobj(-15).decompress(member[:-8])
+    crc, size = struct.unpack("<II", member[-8:])
+    if zlib.crc32(raw) != crc or len(raw) & 0xFFFFFFFF != size:
+        raise ValueError(f"Corrupt log archive block at offset {block.offset}")
+    return raw
+
+def resolve_segment(path: str) -> Optional[str]:
+    """The file holding a segment, which may still be uncompressed while rotation compresses it."""
+    if os.path.exists(path):
+        return path
+    if path.endswith(ARCHIVE_SUFFIX) and os.path.exists(path[:-len(ARCHIVE_SUFFIX)]):
+        return path[:-len(ARCHIVE_SUFFIX)]
+    return None
+
+class SegmentReader:
+    """Random and sequential access to a plain or archived log segment by uncompressed offset."""
+    def __init__(self, path: str):
+        resolved = resolve_segment(path)
+        if resolved is None:
+            raise FileNotFoundError(path)
+        self.path = resolved
+        self.compressed = resolved.endswith(ARCHIVE_SUFFIX)
+        self._file = open(resolved, "rb")
+        self.blocks = read_blocks(resolved) if self.compressed else []
+        self._cached: Optional[Tuple[ArchiveBlock, bytes]] = None
+
+    def _block_data(self, block: ArchiveBlock) -> bytes:
+        if self._cached is None or self._cached[0] != block:
+            self._cached = (block, read_block(self._file, block))
+        return self._cached[1]
+
+    def read_line_at(self, offset: int) -> bytes:
+        if not self.compressed:
+            self._file.seek(offset)
+            return self._file.readline()
+        for block in self.blocks:
+            if block.raw_offset <= offset < block.raw_offset + block.raw_length:
+                data = self._block_data(block)
+                start = offset - block.raw_offset
+                end = data.find(b"\n", start)
+                return data[start:] if end < 0 else data[start:end + 1]
+        raise ValueError(f"{self.path}: offset {offset} is past the end of the segment")
+
+    def iter_lines(self, start: int = 0) -> Iterator[Tuple[int, bytes]]:
+        """(uncompressed offset, line) for every line from `start` (a line boundary) on."""
+        if not self.compressed:
+            self._file.seek(start)
+            offset = start
+            for line in self._file:
+                yield offset, line
+                offset += len(line)
+            return
+        for block in self.blocks:
+            if block.raw_offset + block.raw_length <= start:
+                continue
+            offset = block.raw_offset
+            for line in self._block_data(block).splitlines(keepends=True):
+                if offset >= start:
+                    yield offset, line
+                offset += len(line)
+
+    def last_line(self) -> Optional[bytes]:
+        if self.compressed:
+            data = self._block_data(self.blocks[-1]) if self.blocks else b""
+        else:
+            self._file.seek(0, os.SEEK_END)
+            end = self._file.tell()
+            self._file.seek(max(0, end - 65536))
+            data = self._file.read()
+        lines = data.rstrip(b"\n").split(b"\n")
+        return lines[-1] or None
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def compress_segment(plain: str, dest: str) -> None:
+    """Compress a rotated segment and remove the uncompressed copy."""
+    write_archive(plain, dest)
+    try:
+        os.remove(plain)
+    except FileNotFoundError:
+        pass  # Another process finished the same segment first
+
+def compressing_rotator(source: str, dest: str) -> None:
+    """
+    Rotation hook: rename the live file to its plain rotated name, then
+    compress it on a background thread so rollover never stalls the log
+    writer thread. `dest` is the archive name produced by archive_name().
+    """
+    if not os.path.exists(source):
+        return  # Delayed handler that never wrote
+    plain = dest[:-len(ARCHIVE_SUFFIX)] if dest.endswith(ARCHIVE_SUFFIX) else dest
+    os.rename(source, plain)
+    if plain != dest:
+        threading.Thread(target=_compress_quietly, args=(plain, dest), name="log-archiver", daemon=True).start()
+
+def _compress_quietly(plain: str, dest: str) -> None:
+    try:
+        compress_segment(plain, dest)
+    except OSError:
+        pass  # Left uncompressed; retried by compress_leftovers() on the next start
+
+def rotated_segments(log_path: str) -> List[str]:
+    """
+    Rotated segments of one log, oldest first, as their archive names
+    (segments still being compressed resolve through resolve_segment()).
+    """
+    directory, base = os.path.split(os.path.abspath(log_path))
+    if not os.path.isdir(directory):
+        return []
+    names = set()
+    for name in os.listdir(directory):
+        if not name.startswith(base + ".") or name.endswith((".lock", ".tmp")):
+            continue
+        names.add(name if name.endswith(ARCHIVE_SUFFIX) else archive_name(name))
+    return [os.path.join(directory, name) for name in sorted(names)]
+
+def compress_leftovers(log_path: str) -> None:
+    """Compress rotated segments left uncompressed (older releases, or a crash mid-compression)."""
+    for segment in rotated_segments(log_path):
+        plain = segment[:-len(ARCHIVE_SUFFIX)]
+        if os.path.exists(plain):
+            _compress_quietly(plain, segment)
+
+# --- Search ---
+
+@dataclass
+class SearchCriteria:
+    """Filters applied to each log record; all given criteria must match."""
+    pattern: Optional[str] = None           # Regular expression over the record text
+    since: Optional[float] = None           # Unix time bounds (inclusive)
+    until: Optional[float] = None
+    fields: Dict[str, str] = field(default_factory=dict)
+    ignore_case: bool = False
+
+    def block_overlaps(self, block: ArchiveBlock) -> bool:
+        if self.since is not None and block.last_ts is not None and block.last_ts < self.since:
+            return False
+        if self.until is not None and block.first_ts is not None and block.first_ts > self.until:
+            return False
+        return True
+
+def _record_fields(record: bytes, logger: str) -> Dict[str, str]:
+    if record.startswith(b"{"):
+        entry = json.loads(record.split(b"\n", 1)[0])
+        return {k: "" if v is None else str(v) for k, v in entry.items()}
+    match = _TEXT_RECORD.match(record)
+    if not match:
+        return {"logger": logger}
+    level, module, function = (g.decode("utf-8", "replace") for g in match.groups()[1:])
+    return {"logger": logger, "level": level, "module": module, "function": function}
+
+def _segment_logger(path: str) -> str:
+    return os.path.basename(path).split(".", 1)[0]
+
+def search_segment(path: str, block_indexes: Optional[List[int]], criteria: SearchCriteria) -> List[Tuple[int, str]]:
+    """
+    Records of one segment (or the given blocks of an archive) matching the
+    criteria, as (uncompressed offset, text). Runs in a worker process;
+    decompression happens in memory, one block at a time.
+    """
+    regex = re.compile(criteria.pattern.encode("utf-8"), re.IGNORECASE if criteria.ignore_case else 0) if criteria.pattern else None
+    needles = [value.encode("utf-8") for value in criteria.fields.values()]
+    logger = _segment_logger(path)
+    timed = criteria.since is not None or criteria.until is not None
+    matches = []
+    with SegmentReader(path) as reader:
+        if reader.compressed:
+            chunks = ((b.raw_offset, reader._block_data(b)) for i, b in enumerate(reader.blocks)
+                      if block_indexes is None or i in block_indexes)
+        else:
+            chunks = _plain_chunks(reader)
+        for offset, data in chunks:
+            # Whole-block prefilters: most blocks of a large archive hold no match at all
+            if regex is not None and not regex.search(data):
+                continue
+            if not all(needle in data for needle in needles):
+                continue
+            for record in _records(data.splitlines(keepends=True)):
+                record_offset = offset
+                offset += len(record)
+                if timed:
+                    stamp = record_timestamp(record)
+                    if (stamp is None or (criteria.since is not None and stamp < criteria.since)
+                            or (criteria.until is not None and stamp > criteria.until)):
+                        continue
+                if regex is not None and not regex.search(record):
+                    continue
+                if criteria.fields:
+                    try:
+                        values = _record_fields(record, logger)
+                    except ValueError:
+                        continue
+                    if any(values.get(k) != v for k, v in criteria.fields.items()):
+                        continue
+                matches.append((record_offset, record.decode("utf-8", "replace")))
+    return matches
+
+def _plain_chunks(reader: SegmentReader) -> Iterator[Tuple[int, bytes]]:
+    offset = 0
+    for block in _blocks((line for _, line in reader.iter_lines()), LOG_ARCHIVE_BLOCK_BYTES):
+        data = b"".join(block)
+        yield offset, data
+        offset += len(data)
+
+def plan_search(paths: List[str], criteria: SearchCriteria, blocks_per_task: int = 8) -> Iterator[Tuple[str, Optional[List[int]]]]:
+    """
+    Split segments into (path, block indexes) tasks, dropping archive blocks
+    outside the time range by their headers alone.
+    """
+    for path in paths:
+        resolved = resolve_segment(path)
+        if resolved is None:
+            continue
+        if not resolved.endswith(ARCHIVE_SUFFIX):
+            yield resolved, None
+            continue
+        selected = [i for i, block in enumerate(read_blocks(resolved)) if criteria.block_overlaps(block)]
+        for start in range(0, len(selected), blocks_per_task):
+            yield resolved, selected[start:start + blocks_per_task]
@@ -0,0 +1,416 @@
+"""
+Enterprise Data Sanitization Platform
+Central Log Shipping
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from core.log_archive import SegmentReader, rotated_segments
+from core.logging_engine import shipper_logger
+from core import metrics
+from utils.constants import (
+    LOG_DIR, LOG_SHIP_URL, LOG_SHIP_STREAMS, LOG_SHIP_SPOOL_DIR, LOG_SHIP_SPOOL_MAX_BYTES,
+    LOG_SHIP_BATCH_RECORDS, LOG_SHIP_BATCH_BYTES, LOG_SHIP_INTERVAL_S, LOG_SHIP_TIMEOUT_S,
+    LOG_SHIP_BACKOFF_INITIAL_S, LOG_SHIP_BACKOFF_MAX_S, LOG_SHIP_STATION_ID,
+)
+
+# The shipper only reads the log files the logging pipeline already wrote,
+# so nothing on the logging (or wipe) path ever waits for the network. When
+# the collector is unreachable, batches accumulate in the on-disk spool; once
+# the spool is full the tailer stops reading and the backlog stays in the
+# logs themselves (kept LOG_BACKUP_DAYS), to be picked up where it left off.
+#
+# Spooled batch: gzip of JSON lines, one per log line:
+#   {"station", "stream", "segment", "offset", "line"}
+# "segment" identifies the log file (hash of its first line, which survives
+# rotation and compression) and "offset" is the uncompressed byte offset, so
+# the batch id derived from them is stable and the collector can discard
+# batches resent after a crash or a lost response.
+
+CURSOR_FILE = "cursors.json"
+REJECTED_DIR = "rejected"
+_SPOOL_SUFFIX = ".ndjson.gz"
+_LINE_PATTERN = re.compile(rb"^\[([^\]]*)\] \[([A-Z]+)\]")
+_SYSLOG_SEVERITY = {"CRITICAL": 2, "ERROR": 3, "WARNING": 4, "INFO": 6, "DEBUG": 7}
+_SYSLOG_FACILITY_AUDIT = 13
+
+SPOOL_BYTES = metrics.REGISTRY.gauge("ecowipe_log_ship_spool_bytes", "Compressed log batches waiting to be shipped")
+SHIPPED_RECORDS = metrics.REGISTRY.counter("ecowipe_log_ship_records_total", "Log lines delivered to the collector", ("stream",))
+SHIP_ATTEMPTS = metrics.REGISTRY.counter("ecowipe_log_ship_batches_total", "Batch delivery attempts by result", ("result",))
+TAIL_PAUSED = metrics.REGISTRY.gauge("ecowipe_log_ship_backpressure", "1 while tailing is paused because the spool is full")
+
+def _log(level: int, function_name: str, message: str, exc_info: bool = False) -> None:
+    shipper_logger.log(level, message, exc_info=exc_info,
+                       extra={"custom_module": "log_shipper", "custom_funcName": function_name})
+
+class PermanentShipError(Exception):
+    """The collector refused a batch; retrying it would fail again."""
+
+class RetryableShipError(Exception):
+    """Delivery failed for a reason that may clear (network, overload)."""
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def _first_line_id(path: str) -> Optional[str]:
+    """Identity of a plain or archived segment: hash of its first complete line."""
+    try:
+        with SegmentReader(path) as reader:
+            for _, line in reader.iter_lines():
+                return hashlib.sha256(line).hexdigest()[:32] if line.endswith(b"\n") else None
+    except (OSError, ValueError):
+        return None
+    return None
+
+class StreamTail:
+    """
+    Follows one log across rotations. The cursor is (segment id, offset);
+    after a rotation the remainder of the old segment, and any segments
+    rotated since, are read from the archives before continuing with the
+    new live file.
+    """
+    def __init__(self, name: str, path: str, segment: Optional[str] = None, offset: int = 0):
+        self.name = name
+        self.path = path
+        self.segment = segment
+        self.offset = offset
+        # Rotated segments never change, so their ids are computed once
+        self._rotated_ids: Dict[str, Optional[str]] = {}
+
+    @property
+    def cursor(self) -> Dict[str, object]:
+        return {"segment": self.segment, "offset": self.offset}
+
+    def _sources(self) -> List[Tuple[str, str]]:
+        """(path, segment id) of the files still to read, oldest first."""
+        live_id = _first_line_id(self.path)
+        if self.segment is None or self.segment == live_id:
+            return [(self.path, live_id)] if live_id else []
+        rotated = rotated_segments(self.path)
+        for path in rotated:
+            if self._rotated_ids.get(path) is None:
+                self._rotated_ids[path] = _first_line_id(path)
+        ids = [self._rotated_ids[p] for p in rotated]
+        if self.segment in ids:
+            start = ids.index(self.segment)
+            sources = list(zip(rotated[start:], ids[start:]))
+        else:
+            _log(logging.ERROR, "StreamTail", f"{self.name}: segment {self.segment} no longer exists; resuming at the live log")
+            sources = []
+            self.segment, self.offset = None, 0
+        if live_id:
+            sources.append((self.path, live_id))
+        return sources
+
+    def read(self, max_records: int, max_bytes: int) -> Iterator[Tuple[str, int, bytes]]:
+        """
+        Up to the given number of complete lines as (segment id, offset,
+        line). The cursor is only advanced by advance(), once the lines are
+        safely spooled.
+        """
+        produced, size = 0, 0
+        for path, segment_id in self._sources():
+            offset = self.offset if segment_id == self.segment else 0
+            with SegmentReader(path) as reader:
+                for line_offset, line in reader.iter_lines(offset):
+                    if not line.endswith(b"\n"):
+                        return  # Line still being written
+                    yield segment_id, line_offset, line
+                    produced += 1
+                    size += len(line)
+                    if produced >= max_records or size >= max_bytes:
+                        return
+
+    def advance(self, segment_id: str, next_offset: int) -> None:
+        self.segment, self.offset = segment_id, next_offset
+
+class LogSpool:
+    """Directory of compressed batches awaiting delivery, shipped oldest first."""
+    def __init__(self, directory: str, max_bytes: int = LOG_SHIP_SPOOL_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(directory, REJECTED_DIR), exist_ok=True)
+
+    def batches(self) -> List[str]:
+        return sorted(n for n in os.listdir(self.directory) if n.endswith(_SPOOL_SUFFIX))
+
+    def size(self) -> int:
+        total = 0
+        for name in self.batches():
+            try:
+                total += os.path.getsize(os.path.join(self.directory, name))
+            except OSError:
+                pass
+        return total
+
+    @property
+    def full(self) -> bool:
+        return self.size() >= self.max_bytes
+
+    def put(self, batch_id: str, records: List[Dict[str, object]]) -> str:
+        """Durably write a batch (tmp file, fsync, rename) before its cursor moves on."""
+        name = f"{time.time_ns():020d}_{batch_id}{_SPOOL_SUFFIX}"
+        path = os.path.join(self.directory, name)
+        tmp = path + ".tmp"
+        body = "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in records)
+        with open(tmp, "wb") as f:
+            f.write(gzip.compress(body.encode("utf-8"), compresslevel=6))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        return path
+
+    def reject(self, name: str) -> None:
+        os.replace(os.path.join(self.directory, name), os.path.join(self.directory, REJECTED_DIR, name))
+
+    def remove(self, name: str) -> None:
+        os.remove(os.path.join(self.directory, name))
+
+def batch_id_of(spool_name: str) -> str:
+    return spool_name[:-len(_SPOOL_SUFFIX)].split("_", 1)[1]
+
+class HttpTransport:
+    """POSTs the spooled gzip body unchanged (Content-Encoding: gzip) to the collector."""
+    def __init__(self, url: str, station: str, timeout: float = LOG_SHIP_TIMEOUT_S):
+        self.url = url
+        self.station = station
+        self.timeout = timeout
+
+    def send(self, batch_id: str, body: bytes, records: List[Dict[str, object]]) -> None:
+        request = urllib.request.Request(self.url, data=body, method="POST", headers={
+            "Content-Type": "application/x-ndjson",
+            "Content-Encoding": "gzip",
+            "X-EcoWipe-Station": self.station,
+            "X-EcoWipe-Batch": batch_id,
+        })
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except urllib.error.HTTPError as e:
+            if e.code in (408, 429) or e.code >= 500:
+                retry_after = e.headers.get("Retry-After") if e.headers else None
+                raise RetryableShipError(f"collector returned {e.code}",
+                                         float(retry_after) if retry_after and retry_after.isdigit() else None)
+            raise PermanentShipError(f"collector rejected batch {batch_id} with {e.code}")
+        except (urllib.error.URLError, OSError) as e:
+            raise RetryableShipError(f"collector unreachable: {e}")
+
+class SyslogTransport:
+    """
+    RFC 5424 messages over TCP with octet-counting framing (RFC 6587), one
+    message per log line and one connection write per batch. Syslog has no
+    compression or acknowledgement, so batches are only compressed in the
+    spool and a batch counts as delivered once the collector accepted the
+    bytes.
+    """
+    def __init__(self, host: str, port: int, station: str, timeout: float = LOG_SHIP_TIMEOUT_S):
+        self.address = (host, port)
+        self.station = station
+        self.timeout = timeout
+
+    def _message(self, record: Dict[str, object]) -> bytes:
+        line = str(record["line"]).rstrip("\n").encode("utf-8")
+        match = _LINE_PATTERN.match(line)
+        severity = _SYSLOG_SEVERITY.get(match.group(2).decode() if match else "", 5)
+        # When the record was logged, not when it is sent (a spooled backlog can be days old);
+        # continuation lines (tracebacks) carry no time of their own and use the NILVALUE
+        stamp = match.group(1).decode("ascii", "replace") if match else "-"
+        header = f"<{_SYSLOG_FACILITY_AUDIT * 8 + severity}>1 {stamp} {self.station} ecowipe - {record['stream']} - ".encode("utf-8")
+        message = header + line
+        return str(len(message)).encode("ascii") + b" " + message
+
+    def send(self, batch_id: str, body: bytes, records: List[Dict[str, object]]) -> None:
+        payload = b"".join(self._message(r) for r in records)
+        try:
+            with socket.create_connection(self.address, timeout=self.timeout) as sock:
+                sock.sendall(payload)
+        except OSError as e:
+            raise RetryableShipError(f"syslog collector unreachable: {e}")
+
+def make_transport(url: str, station: str):
+    parsed = urlparse(url)
+    if parsed.scheme in ("http", "https"):
+        return HttpTransport(url, station)
+    if parsed.scheme in ("syslog", "syslog+tcp"):
+        return SyslogTransport(parsed.hostname or "localhost", parsed.port or 601, station)
+    raise ValueError(f"Unsupported log collector URL: {url}")
+
+class LogShipper:
+    """
+    Tails the configured log streams into the spool (tailer thread) and
+    delivers spooled batches with exponential backoff (sender thread).
+    """
+    def __init__(self, url: str, log_dir: str = LOG_DIR, streams=LOG_SHIP_STREAMS,
+                 spool_dir: str = LOG_SHIP_SPOOL_DIR, station: Optional[str] = LOG_SHIP_STATION_ID,
+                 spool_max_bytes: int = LOG_SHIP_SPOOL_MAX_BYTES):
+        self.station = station or socket.gethostname()
+        self.transport = make_transport(url, self.station)
+        self.spool = LogSpool(spool_dir, spool_max_bytes)
+        self._cursor_path = os.path.join(spool_dir, CURSOR_FILE)
+        cursors = self._load_cursors()
+        self.tails = [
+            StreamTail(name, os.path.join(log_dir, f"{name}.log"), **cursors.get(name, {}))
+            for name in streams if name != shipper_logger.name
+        ]
+        self._stop = threading.Event()
+        self._spooled = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._paused = False
+        self._failing = False
+
+    def _load_cursors(self) -> Dict[str, Dict[str, object]]:
+        try:
+            with open(self._cursor_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            _log(logging.ERROR, "_load_cursors", f"Unreadable shipping cursors, restarting from the live logs: {e}")
+            return {}
+
+    def _save_cursors(self) -> None:
+        tmp = self._cursor_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({t.name: t.cursor for t in self.tails}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._cursor_path)
+
+    def start(self) -> "LogShipper":
+        for target, name in ((self._tail_loop, "log-ship-tail"), (self._send_loop, "log-ship-send")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        _log(logging.INFO, "start", f"Shipping {', '.join(t.name for t in self.tails)} logs as station {self.station}")
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop both threads; undelivered batches stay spooled for the next start."""
+        self._stop.set()
+        self._spooled.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    # --- Tailing ---
+
+    def spool_once(self) -> int:
+        """Move newly written lines of every stream into the spool. Returns the number of batches written."""
+        written = 0
+        for tail in self.tails:
+            while not self._stop.is_set():
+                if self.spool.full:
+                    self._set_paused(True)
+                    return written
+                self._set_paused(False)
+                records, last = [], None
+                for segment_id, offset, line in tail.read(LOG_SHIP_BATCH_RECORDS, LOG_SHIP_BATCH_BYTES):
+                    records.append({"station": self.station, "stream": tail.name, "segment": segment_id,
+                                    "offset": offset, "line": line.decode("utf-8", errors="replace")})
+                    last = (segment_id, offset + len(line))
+                if not records:
+                    break
+                first = records[0]
+                self.spool.put(f"{tail.name}-{first['segment'][:16]}-{first['offset']}", records)
+                tail.advance(*last)
+                self._save_cursors()
+                written += 1
+                if len(records) < LOG_SHIP_BATCH_RECORDS:
+                    break  # Caught up with this stream
+        if written:
+            self._spooled.set()
+        return written
+
+    def _set_paused(self, paused: bool) -> None:
+        if paused != self._paused:
+            self._paused = paused
+            TAIL_PAUSED.set(1 if paused else 0)
+            if paused:
+                _log(logging.ERROR, "spool_once", "Log spool is full; tailing paused until the collector catches up")
+            else:
+                _log(logging.INFO, "spool_once", "Log spool has room again; tailing resumed")
+
+    def _tail_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.spool_once()
+            except Exception as e:
+                _log(logging.ERROR, "_tail_loop", f"Log tailing failed: {e}", exc_info=True)
+            self._stop.wait(LOG_SHIP_INTERVAL_S)
+
+    # --- Delivery ---
+
+    def send_once(self) -> bool:
+        """
+        Deliver the oldest spooled batch. Returns True if a batch was
+        delivered or rejected, False if the spool is empty; retryable
+        failures raise RetryableShipError.
+        """
+        names = self.spool.batches()
+        SPOOL_BYTES.set(self.spool.size())
+        if not names:
+            return False
+        name = names[0]
+        with open(os.path.join(self.spool.directory, name), "rb") as f:
+            body = f.read()
+        records = [json.loads(line) for line in gzip.decompress(body).splitlines() if line]
+        try:
+            self.transport.send(batch_id_of(name), body, records)
+        except PermanentShipError as e:
+            SHIP_ATTEMPTS.labels("rejected").inc()
+            _log(logging.ERROR, "send_once", f"{e}; batch kept in {REJECTED_DIR}/ for review")
+            self.spool.reject(name)
+            return True
+        except RetryableShipError:
+            SHIP_ATTEMPTS.labels("retry").inc()
+            raise
+        SHIP_ATTEMPTS.labels("delivered").inc()
+        if records:
+            SHIPPED_RECORDS.labels(records[0]["stream"]).inc(len(records))
+        self.spool.remove(name)
+        return True
+
+    def _send_loop(self) -> None:
+        delay = LOG_SHIP_BACKOFF_INITIAL_S
+        while not self._stop.is_set():
+            try:
+                if not self.send_once():
+                    self._spooled.wait(LOG_SHIP_INTERVAL_S)
+                    self._spooled.clear()
+                    continue
+                if self._failing:
+                    self._failing = False
+                    _log(logging.INFO, "_send_loop", "Log collector reachable again; delivering spooled batches")
+                delay = LOG_SHIP_BACKOFF_INITIAL_S
+            except RetryableShipError as e:
+                if not self._failing:
+                    self._failing = True
+                    _log(logging.ERROR, "_send_loop", f"Log delivery failing, retrying with backoff: {e}")
+                # Full jitter keeps a fleet of stations from retrying in lockstep
+                wait = e.retry_after if e.retry_after is not None else random.uniform(0, delay)
+                delay = min(delay * 2, LOG_SHIP_BACKOFF_MAX_S)
+                self._stop.wait(wait)
+            except Exception as e:
+                _log(logging.ERROR, "_send_loop", f"Log delivery error: {e}", exc_info=True)
+                self._stop.wait(LOG_SHIP_BACKOFF_MAX_S)
+
+def start_log_shipper(url: Optional[str] = LOG_SHIP_URL) -> Optional[LogShipper]:
+    """Start shipping if a collector is configured (LOG_SHIP_URL); returns None otherwise or on bad configuration."""
+    if not url:
+        return None
+    try:
+        return LogShipper(url).start()
+    except (OSError, ValueError) as e:
+        _log(logging.ERROR, "start_log_shipper", f"Log shipping not started: {e}")
+        return None
@@ -2,16 +2,28 @@
 Enterprise Data Sanitization Platform
 Forensic Logging Engine
 """
+import atexit
+import json
 import logging
+import multiprocessing
 import os
-from logging.handlers import TimedRotatingFileHandler
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, TimedRotatingFileHandler
 from datetime import datetime, timezone
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
-import sys
-# Ensure utils can be imported
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.constants import LOG_DIR, LOG_FORMAT, DATE_FORMAT
+from core.log_archive import archive_name, compress_leftovers, compressing_rotator
+from core.audit_log import (
+    AuditContextFilter, AuditIndex, acquire_writer_lock, audit_segments, build_audit_entry, last_chain_state,
+    process_audit_paths, set_aside_torn_tail,
+)
+from utils.constants import (
+    LOG_DIR, LOG_FORMAT, DATE_FORMAT, LOG_QUEUE_MAX, LOG_FLUSH_BATCH,
+    LOG_FLUSH_INTERVAL_S, LOG_FULL_QUEUE_WAIT_S, LOG_LOSSLESS_LOGGERS, AUDIT_LOG_FILE, AUDIT_INDEX_FILE,
+    LOG_BACKUP_DAYS,
+)
 
 class UTCFormatter(logging.Formatter):
     """Custom formatter to enforce strict ISO-8601 UTC timestamps."""
@@ -21,9 +33,349 @@ class UTCFormatter(logging.Formatter):
             return dt.strftime(datefmt)
         return dt.isoformat()
 
+class ContextDefaultsFilter(logging.Filter):
+    """
+    Fill the custom_module/custom_funcName fields used by LOG_FORMAT for records
+    logged without `extra`, which would otherwise fail to format.
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "custom_module"):
+            record.custom_module = record.module
+        if not hasattr(record, "custom_funcName"):
+            record.custom_funcName = record.funcName
+        return True
+
+class BufferedTimedRotatingFileHandler(TimedRotatingFileHandler):
+    """
+    Rotating file handler whose writes stay in the stream buffer until the log
+    writer thread flushes a whole batch (the stock handler flushes every record).
+    Rotated segments are compressed into block-framed gzip (see core/log_archive.py).
+    """
+    def __init__(self, filename: str, **kwargs):
+        super().__init__(filename, when="midnight", interval=1, backupCount=LOG_BACKUP_DAYS, encoding="utf-8", **kwargs)
+        self.namer = archive_name
+        self.rotator = compressing_rotator
+
+    def flush(self) -> None:
+        pass  # Deferred to flush_buffer()
+
+    def flush_buffer(self) -> None:
+        super().flush()
+
+class AuditLogHandler(BufferedTimedRotatingFileHandler):
+    """
+    Writes every record as a hash-chained JSON line (see core/audit_log.py)
+    and indexes its correlation IDs by byte offset. Only the process holding
+    the writer lock appends, so the chain never forks. A process that finds
+    the lock taken (a second instance on the station) writes a chain of its
+    own next to it (audit-p<pid>.jsonl) instead of losing its records.
+    """
+    def __init__(self, filename: str, index_path: str):
+        # Problems found while opening the chain, reported once the security logger exists
+        self.startup_events: List[str] = []
+        lock_file = acquire_writer_lock(filename)
+        if lock_file is None:
+            shared = os.path.basename(filename)
+            filename, index_path = process_audit_paths(filename, index_path, os.getpid())
+            lock_file = acquire_writer_lock(filename)
+            self.startup_events.append(
+                f"Audit log {shared} is locked by another process; this process writes its audit chain to "
+                f"{os.path.basename(filename)}" if lock_file else
+                f"Audit log {shared} and {os.path.basename(filename)} are both locked; audit records are not written"
+            )
+        super().__init__(filename, delay=True)
+        self._owner_pid = os.getpid()
+        self._lock_file = lock_file
+        if self._lock_file:
+            torn = set_aside_torn_tail(filename)
+            if torn:
+                self.startup_events.append(torn)
+        self.index = AuditIndex(index_path) if self._lock_file else None
+        self._seq, self._prev = last_chain_state(filename) if self._lock_file else (0, "")
+        self._offset = 0
+
+    @property
+    def active(self) -> bool:
+        return self._lock_file is not None and self._owner_pid == os.getpid()
+
+    def _open(self):
+        # No newline translation, so tracked offsets match the bytes on disk
+        stream = open(self.baseFilename, self.mode, encoding=self.encoding, errors=self.errors, newline="")
+        self._offset = os.path.getsize(self.baseFilename)
+        return stream
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if not self.active:
+            return
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            entry = build_audit_entry(record, self._seq + 1, self._prev)
+            line = json.dumps(entry, separators=(",", ":"), ensure_ascii=False) + "\n"
+            offset = self._offset
+            self.stream.write(line)
+            self._offset += len(line.encode("utf-8"))
+            self._seq, self._prev = entry["seq"], entry["hash"]
+            self.index.add(entry, os.path.basename(self.baseFilename), offset)
+        except Exception:
+            self.handleError(record)
+
+    def flush_buffer(self) -> None:
+        super().flush_buffer()
+        if self.active:
+            # Only after the file flush: the index never points past the data on disk
+            self.index.commit()
+
+    def rotate(self, source: str, dest: str) -> None:
+        super().flush_buffer()
+        super().rotate(source, dest)
+        self.index.rename_segment(os.path.basename(source), os.path.basename(dest))
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        self.index.prune(audit_segments(self.baseFilename))
+
+    def close(self) -> None:
+        super().close()
+        if self.active:
+            self.index.close()
+            self._lock_file.close()
+            self._lock_file = None
+
+class AsyncLogPipeline:
+    """
+    Moves file I/O off the logging threads (wipe QThread, scanner, certificate
+    workers). Callers only format the record and put it on a bounded queue; a
+    single writer thread writes it to the target file handler and flushes in
+    batches.
+
+    Full-queue policy: audit stream records and records of the forensic
+    loggers (LOG_LOSSLESS_LOGGERS: wipe state transitions, certificates,
+    security events) are never dropped; their caller blocks until there is
+    room. Other DEBUG/INFO records are dropped immediately so a burst of
+    diagnostics never stalls the caller; WARNING and above wait up to
+    LOG_FULL_QUEUE_WAIT_S for room and are only dropped after that. Drops are
+    counted per log file and reported in that file once the queue drains.
+
+    Flush policy: written records are flushed when LOG_FLUSH_BATCH of them are
+    pending, after LOG_FLUSH_INTERVAL_S, and immediately after any ERROR or
+    CRITICAL record. A CRITICAL record additionally blocks its caller until it
+    is on disk, and fatal paths call flush_logs() before terminating so nothing
+    queued before them is lost. The pipeline drains and closes at exit.
+    """
+    _FLUSH = object()  # Queue marker carrying a threading.Event
+    _STOP = object()
+
+    def __init__(self, maxsize: int = LOG_QUEUE_MAX):
+        self._maxsize = maxsize
+        self._handlers: list = []
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        # Also called in forked children, which inherit the queue but not the writer thread
+        self._pid = os.getpid()
+        self._queue: "queue.Queue" = queue.Queue(self._maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self._dropped: Dict[str, int] = {}         # Not yet reported in the log files
+        self._dropped_total: Dict[str, int] = {}
+        self._dropped_lock = threading.Lock()
+        self._stopped = False
+
+    def register(self, handler: BufferedTimedRotatingFileHandler) -> None:
+        self._handlers.append(handler)
+
+    @property
+    def handlers(self) -> list:
+        return list(self._handlers)
+
+    def _ensure_started(self) -> None:
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._reset()
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                    self._thread.start()
+
+    def enqueue(self, target: logging.Handler, record: logging.LogRecord) -> None:
+        self._ensure_started()
+        if self._stopped:
+            # Late records (e.g. from other atexit hooks) are written synchronously
+            target.handle(record)
+            target.flush_buffer()
+            return
+        try:
+            self._queue.put_nowait((target, record))
+        except queue.Full:
+            if isinstance(target, AuditLogHandler) or record.name in LOG_LOSSLESS_LOGGERS:
+                self._put_lossless(target, record)
+                return
+            try:
+                if record.levelno < logging.WARNING:
+                    raise queue.Full
+                self._queue.put((target, record), timeout=LOG_FULL_QUEUE_WAIT_S)
+            except queue.Full:
+                with self._dropped_lock:
+                    for counts in (self._dropped, self._dropped_total):
+                        counts[target.baseFilename] = counts.get(target.baseFilename, 0) + 1
+                return
+        if record.levelno >= logging.CRITICAL:
+            self.flush()
+
+    def _put_lossless(self, target: logging.Handler, record: logging.LogRecord) -> None:
+        """Wait for room as long as the writer is alive; otherwise write the record here."""
+        while True:
+            writer = self._thread
+            if writer is threading.current_thread() or writer is None or not writer.is_alive():
+                # Waiting on the writer from the writer itself (or a dead one) would never end
+                target.handle(record)
+                target.flush_buffer()
+                return
+            try:
+                self._queue.put((target, record), timeout=LOG_FULL_QUEUE_WAIT_S)
+                break
+            except queue.Full:
+                continue
+        if record.levelno >= logging.CRITICAL:
+            self.flush()
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Block until every record queued so far is written and flushed. Returns False on timeout."""
+        self._ensure_started()
+        if self._stopped:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put((self._FLUSH, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def dropped(self) -> Dict[str, int]:
+        """Records dropped so far because the queue was full, by log file."""
+        with self._dropped_lock:
+            return dict(self._dropped_total)
+
+    def flush_buffers(self) -> None:
+        """Flush already written records from the file buffers, without waiting for the queue."""
+        for handler in self._handlers:
+            handler.flush_buffer()
+
+    def shutdown(self) -> None:
+        """Drain the queue, flush and close every log file."""
+        if self._thread is not None and self._pid == os.getpid() and not self._stopped:
+            self._queue.put((self._STOP, None))
+            self._thread.join(timeout=10)
+        self._stopped = True
+        self.flush_buffers()
+
+    def _run(self) -> None:
+        dirty: set = set()
+        pending = 0
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                target, item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                target = item = None
+
+            if target is self._STOP:
+                self._report_drops(dirty)
+                self._flush_dirty(dirty)
+                return
+            if target is self._FLUSH:
+                self._flush_dirty(dirty)
+                item.set()
+                pending, deadline = 0, None
+                continue
+            if target is not None:
+                try:
+                    target.handle(item)
+                except Exception:
+                    target.handleError(item)
+                dirty.add(target)
+                pending += 1
+                if deadline is None:
+                    deadline = time.monotonic() + LOG_FLUSH_INTERVAL_S
+                if item.levelno < logging.ERROR and pending < LOG_FLUSH_BATCH and time.monotonic() < deadline:
+                    continue
+
+            self._report_drops(dirty)
+            self._flush_dirty(dirty)
+            pending, deadline = 0, None
+
+    def _report_drops(self, dirty: set) -> None:
+        with self._dropped_lock:
+            dropped, self._dropped = self._dropped, {}
+        for handler in self._handlers:
+            count = dropped.get(handler.baseFilename)
+            if count:
+                record = logging.LogRecord("logging_engine", logging.WARNING, __file__, 0,
+                                           f"{count} log record(s) dropped: log queue full", None, None)
+                record.custom_module, record.custom_funcName = "logging_engine", "AsyncLogPipeline"
+                handler.handle(record)
+                dirty.add(handler)
+
+    @staticmethod
+    def _flush_dirty(dirty: set) -> None:
+        for handler in dirty:
+            handler.flush_buffer()
+        dirty.clear()
+
+class AsyncQueueHandler(QueueHandler):
+    """Attached to each logger; hands prepared records to the pipeline for its file handlers."""
+    def __init__(self, pipeline: AsyncLogPipeline, *targets: BufferedTimedRotatingFileHandler):
+        super().__init__(None)
+        self.pipeline = pipeline
+        self.targets = targets
+        # Correlation IDs live in the caller's context, so they are read here
+        self.addFilter(AuditContextFilter())
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Resolve everything that depends on the caller's state before the record
+        changes threads: the message arguments and the traceback, which is
+        rendered to text so frames are not kept alive in the queue. Cheaper
+        than the stock prepare(), which formats and copies every record.
+        """
+        ContextDefaultsFilter().filter(record)
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = self.targets[0].formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        for target in self.targets:
+            self.pipeline.enqueue(target, record)
+
+_pipeline = AsyncLogPipeline()
+atexit.register(_pipeline.shutdown)
+_audit_handler: Optional[AuditLogHandler] = None
+if hasattr(os, "register_at_fork"):
+    # Children would otherwise inherit, and later write again, unflushed parent buffers
+    os.register_at_fork(before=_pipeline.flush_buffers)
+
+def _get_audit_handler() -> Optional[AuditLogHandler]:
+    """The shared audit stream; worker processes leave it to the main process."""
+    global _audit_handler
+    if _audit_handler is None and multiprocessing.parent_process() is None:
+        _audit_handler = AuditLogHandler(os.path.join(LOG_DIR, AUDIT_LOG_FILE), os.path.join(LOG_DIR, AUDIT_INDEX_FILE))
+        _audit_handler.setFormatter(UTCFormatter(LOG_FORMAT, DATE_FORMAT))
+        _pipeline.register(_audit_handler)
+    return _audit_handler
+
 def _setup_logger(name: str, log_file: str, level: int = logging.INFO) -> logging.Logger:
     """
-    Configure a rotating, append-only logger.
+    Configure a rotating, append-only logger fed through the asynchronous pipeline.
     
     Args:
         name: The internal name of the logger.
@@ -45,18 +397,18 @@ def _setup_logger(name: str, log_file: str, level: int = logging.INFO) -> loggin
 
     file_path = os.path.join(LOG_DIR, log_file)
     
-    # Daily rotation, keep 365 days of logs for audit purposes
-    handler = TimedRotatingFileHandler(
-        file_path, 
-        when="midnight", 
-        interval=1, 
-        backupCount=365, 
-        encoding="utf-8"
-    )
+    # Daily rotation, keep LOG_BACKUP_DAYS (365) days of logs for audit purposes
+    handler = BufferedTimedRotatingFileHandler(file_path)
     
     formatter = UTCFormatter(LOG_FORMAT, DATE_FORMAT)
     handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    handler.addFilter(ContextDefaultsFilter())
+    _pipeline.register(handler)
+    targets = [handler]
+    audit_handler = _get_audit_handler()
+    if audit_handler is not None:
+        targets.append(audit_handler)
+    logger.addHandler(AsyncQueueHandler(_pipeline, *targets))
     
     # Do not propagate to root logger to avoid console prints
     logger.propagate = False
@@ -69,6 +421,17 @@ wipe_logger = _setup_logger("wipe", "wipe.log")
 certificate_logger = _setup_logger("certificate", "certificate.log")
 security_logger = _setup_logger("security", "security.log")
 error_logger = _setup_logger("error", "error.log", level=logging.ERROR)
+# The log shipper's own status; kept out of the logs it tails so it never ships (or loops on) itself
+shipper_logger = _setup_logger("shipper", "shipper.log")
+
+def _compress_leftover_segments() -> None:
+    for handler in _pipeline.handlers:
+        compress_leftovers(handler.baseFilename)
+
+if multiprocessing.parent_process() is None:
+    # Segments rotated by older releases (or interrupted mid-compression) are
+    # compressed in the background; the wipe path never waits for it
+    threading.Thread(target=_compress_leftover_segments, name="log-archiver", daemon=True).start()
 
 def log_security_event(module_name: str, function_name: str, message: str) -> None:
     """Log a security-critical event."""
@@ -78,3 +441,18 @@ def log_security_event(module_name: str, function_name: str, message: str) -> No
 def log_error_event(module_name: str, function_name: str, message: str, exc_info: bool = False) -> None:
     """Log an error event."""
     error_logger.error(message, exc_info=exc_info, extra={"custom_module": module_name, "custom_funcName": function_name})
+
+if _audit_handler is not None:
+    for _message in _audit_handler.startup_events:
+        log_security_event("logging_engine", "AuditLogHandler", _message)
+
+def flush_logs(timeout: Optional[float] = 5.0) -> bool:
+    """
+    Wait until every record logged so far is on disk. Call before terminating
+    on a fatal error; returns False if the writer did not catch up in time.
+    """
+    return _pipeline.flush(timeout)
+
+def dropped_log_records() -> Dict[str, int]:
+    """Records dropped since startup because the log queue was full, by log file."""
+    return _pipeline.dropped()
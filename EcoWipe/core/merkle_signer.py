@@ -0,0 +1,155 @@
+"""
+Enterprise Data Sanitization Platform
+Batched Merkle Signing
+"""
+import hashlib
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Tuple
+
+from core.exception_types import SecurityViolationError
+from core.logging_engine import security_logger, log_error_event
+from utils.constants import MERKLE_BATCH_MAX_SIZE, MERKLE_BATCH_MAX_LATENCY_MS
+
+# Domain separation between leaves and interior nodes prevents a node hash
+# from being presented as a leaf (second-preimage attack on the tree).
+_LEAF_PREFIX = b"\x00"
+_NODE_PREFIX = b"\x01"
+
+def merkle_leaf(payload_hash: str) -> bytes:
+    """Leaf hash for a certificate's hex payload hash."""
+    return hashlib.sha256(_LEAF_PREFIX + bytes.fromhex(payload_hash)).digest()
+
+def _merkle_parent(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(_NODE_PREFIX + left + right).digest()
+
+def build_merkle_tree(payload_hashes: List[str]) -> Tuple[bytes, List[List[List[str]]]]:
+    """
+    Build a Merkle tree over payload hashes.
+    An odd node at the end of a level is promoted unchanged (never duplicated).
+
+    Returns:
+        (root, paths) where paths[i] is the inclusion proof of leaf i as a list
+        of [side, sibling_hex] steps; side "L"/"R" is the sibling's position.
+    """
+    if not payload_hashes:
+        raise ValueError("Cannot build a Merkle tree without leaves.")
+
+    level = [merkle_leaf(h) for h in payload_hashes]
+    # positions[i] = index of leaf i's ancestor in the current level
+    positions = list(range(len(level)))
+    paths: List[List[List[str]]] = [[] for _ in level]
+
+    while len(level) > 1:
+        for leaf, pos in enumerate(positions):
+            sibling = pos ^ 1
+            if sibling < len(level):
+                side = "L" if sibling < pos else "R"
+                paths[leaf].append([side, level[sibling].hex()])
+        next_level = [
+            _merkle_parent(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+            for i in range(0, len(level), 2)
+        ]
+        positions = [pos // 2 for pos in positions]
+        level = next_level
+
+    return level[0], paths
+
+def merkle_root_from_proof(payload_hash: str, path: List[List[str]]) -> str:
+    """Fold an inclusion proof and return the hex root it commits to."""
+    node = merkle_leaf(payload_hash)
+    for side, sibling_hex in path:
+        sibling = bytes.fromhex(sibling_hex)
+        if side == "L":
+            node = _merkle_parent(sibling, node)
+        elif side == "R":
+            node = _merkle_parent(node, sibling)
+        else:
+            raise ValueError(f"Invalid Merkle proof step side: {side!r}")
+    return node.hex()
+
+class MerkleBatchSigner:
+    """
+    Accumulates certificate payload hashes for up to `max_latency_s` (or until
+    `max_batch_size` are queued), signs the Merkle root once, and hands every
+    caller its inclusion proof. Under concurrent load one signature covers a
+    whole batch instead of one signature per certificate.
+
+    The signature covers the root's hex string, exactly as single-certificate
+    mode signs the payload hash's hex string.
+    """
+    def __init__(self, security_engine, max_batch_size: int = MERKLE_BATCH_MAX_SIZE,
+                 max_latency_s: float = MERKLE_BATCH_MAX_LATENCY_MS / 1000):
+        self.security_engine = security_engine
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_latency_s = max_latency_s
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[str, Future]] = []
+        self._oldest = 0.0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="merkle-batch-signer", daemon=True)
+        self._thread.start()
+
+    def submit(self, payload_hash: str) -> Future:
+        """Queue a payload hash; the future resolves to (root_signature_b64, merkle_proof)."""
+        bytes.fromhex(payload_hash)  # Reject malformed hashes before they can poison a batch
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise SecurityViolationError("Batch signer is closed.")
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append((payload_hash, future))
+            self._cond.notify()
+        return future
+
+    def sign(self, payload_hash: str) -> Tuple[str, Dict[str, Any]]:
+        """Blocking form of submit()."""
+        return self.submit(payload_hash).result()
+
+    def close(self) -> None:
+        """Sign whatever is pending and stop the signing thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._pending:
+                        waited = time.monotonic() - self._oldest
+                        if self._closed or len(self._pending) >= self.max_batch_size or waited >= self.max_latency_s:
+                            break
+                        self._cond.wait(self.max_latency_s - waited)
+                    elif self._closed:
+                        return
+                    else:
+                        self._cond.wait()
+                batch = self._pending[:self.max_batch_size]
+                del self._pending[:self.max_batch_size]
+                if self._pending:
+                    self._oldest = time.monotonic()
+            self._sign_batch(batch)
+
+    def _sign_batch(self, batch: List[Tuple[str, Future]]) -> None:
+        try:
+            root, paths = build_merkle_tree([h for h, _ in batch])
+            root_hex = root.hex()
+            signature = self.security_engine.sign_data(root_hex.encode('utf-8'))
+        except Exception as e:
+            log_error_event("merkle_signer", "_sign_batch", f"Batch signing of {len(batch)} certificate(s) failed: {e}", exc_info=True)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        security_logger.info(f"Signed Merkle root {root_hex} covering {len(batch)} certificate(s).")
+        for index, (_, future) in enumerate(batch):
+            future.set_result((signature, {
+                "root": root_hex,
+                "leaf_index": index,
+                "leaf_count": len(batch),
+                "path": paths[index],
+            }))
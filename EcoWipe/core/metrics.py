@@ -0,0 +1,275 @@
+"""
+Enterprise Data Sanitization Platform
+Station Metrics
+"""
+import json
+import math
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core.logging_engine import security_logger, log_error_event
+from utils.constants import METRICS_HTTP_HOST, METRICS_HTTP_PORT
+
+# Updates are a lock plus an addition, cheap enough for the per-block wipe
+# loop. Hot paths should resolve labels once (child = METRIC.labels(...))
+# and keep the child, instead of looking it up on every update.
+
+class _Child:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+class _HistogramChild:
+    __slots__ = ("_lock", "_bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._lock = threading.Lock()
+        self._bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        slot = bisect_left(self._bounds, value)
+        with self._lock:
+            self.counts[slot] += 1
+            self.sum += value
+            self.count += 1
+
+    def cumulative(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        running = 0
+        for i, c in enumerate(counts):
+            running += c
+            counts[i] = running
+        return counts, total, count
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def _new_child(self):
+        return _Child()
+
+    def labels(self, *values: Any, **kwargs: Any):
+        """The child for one label combination (created on first use)."""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(v) for v in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def children(self) -> List[Tuple[Dict[str, str], Any]]:
+        with self._lock:
+            items = list(self._children.items())
+        return [(dict(zip(self.labelnames, key)), child) for key, child in sorted(items)]
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default.dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default.set(value)
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed upper bounds."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = ()):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = ()) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def metrics(self) -> List[_Metric]:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current values of every metric as plain data (JSON-serializable)."""
+        result = {}
+        for metric in self.metrics():
+            samples = []
+            for labels, child in metric.children():
+                if isinstance(metric, Histogram):
+                    counts, total, count = child.cumulative()
+                    bounds = [_format_value(b) for b in metric.buckets] + ["+Inf"]
+                    samples.append({"labels": labels, "count": count, "sum": total, "buckets": dict(zip(bounds, counts))})
+                else:
+                    samples.append({"labels": labels, "value": child.value})
+            result[metric.name] = {"type": metric.kind, "help": metric.documentation, "samples": samples}
+        return result
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self.metrics():
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for labels, child in metric.children():
+                if isinstance(metric, Histogram):
+                    counts, total, count = child.cumulative()
+                    for bound, cumulative in zip(list(metric.buckets) + [math.inf], counts):
+                        le = "+Inf" if bound == math.inf else _format_value(bound)
+                        lines.append(f"{metric.name}_bucket{_format_labels(labels, le=le)} {cumulative}")
+                    lines.append(f"{metric.name}_sum{_format_labels(labels)} {_format_value(total)}")
+                    lines.append(f"{metric.name}_count{_format_labels(labels)} {count}")
+                else:
+                    lines.append(f"{metric.name}{_format_labels(labels)} {_format_value(child.value)}")
+        return "\n".join(lines) + "\n"
+
+def _format_value(value: float) -> str:
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels: Dict[str, str], **extra: str) -> str:
+    items = {**labels, **extra}
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in items.items()) + "}"
+
+# --- Station metrics ---
+
+REGISTRY = MetricsRegistry()
+
+_THROUGHPUT_BUCKETS_MBPS = (1, 5, 10, 20, 40, 60, 80, 100, 150, 200, 300, 500, 1000, 2000)
+_LATENCY_BUCKETS_S = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+BYTES_WIPED = REGISTRY.counter("ecowipe_bytes_wiped_total", "Bytes overwritten, all passes", ("strategy",))
+BYTES_HASHED = REGISTRY.counter("ecowipe_bytes_hashed_total", "Bytes read for pre/post-wipe hashes", ("phase",))
+WIPE_TRANSITIONS = REGISTRY.counter("ecowipe_wipe_state_transitions_total", "Wipe state machine transitions by target state", ("state", "strategy"))
+WIPES = REGISTRY.counter("ecowipe_wipes_total", "Finished wipe jobs by outcome", ("outcome", "strategy"))
+WIPES_ACTIVE = REGISTRY.gauge("ecowipe_wipes_active", "Wipe jobs currently running")
+DEVICE_THROUGHPUT = REGISTRY.histogram("ecowipe_device_throughput_mb_per_second", "Per-block transfer rate by device and phase",
+                                       ("device", "phase"), _THROUGHPUT_BUCKETS_MBPS)
+ENUMERATION_SECONDS = REGISTRY.histogram("ecowipe_device_enumeration_seconds", "Duration of one device enumeration", (), _LATENCY_BUCKETS_S)
+ENUMERATION_ERRORS = REGISTRY.counter("ecowipe_device_enumeration_errors_total", "Failed device enumerations")
+DEVICES_DETECTED = REGISTRY.gauge("ecowipe_devices_detected", "Wipeable devices found by the last enumeration")
+CERTIFICATE_SIGN_SECONDS = REGISTRY.histogram("ecowipe_certificate_sign_seconds", "Certificate signing latency (including batch wait)",
+                                              ("algorithm",), _LATENCY_BUCKETS_S)
+CERTIFICATE_SECONDS = REGISTRY.histogram("ecowipe_certificate_generation_seconds", "End-to-end certificate generation time", (), _LATENCY_BUCKETS_S)
+FORENSIC_IMAGE_BYTES = REGISTRY.counter("ecowipe_forensic_image_bytes_total", "Device bytes captured into forensic images by storage kind",
+                                        ("kind",))
+CERTIFICATES = REGISTRY.counter("ecowipe_certificates_total", "Certificate generation attempts by result", ("result",))
+
+def snapshot() -> Dict[str, Any]:
+    """Snapshot of the station metrics."""
+    return REGISTRY.snapshot()
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = REGISTRY
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            body = self.registry.render_prometheus().encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif path == "/metrics.json":
+            body = json.dumps(self.registry.snapshot()).encode("utf-8")
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes are not worth a log line each
+
+def start_metrics_server(port: Optional[int] = METRICS_HTTP_PORT, host: str = METRICS_HTTP_HOST,
+                         registry: MetricsRegistry = REGISTRY) -> Optional[ThreadingHTTPServer]:
+    """
+    Serve /metrics (Prometheus text) and /metrics.json (snapshot) on a
+    background thread. Binds to localhost by default; returns None if
+    disabled (port None) or the port is unavailable.
+    """
+    if port is None:
+        return None
+    handler = type("MetricsRequestHandler", (_MetricsRequestHandler,), {"registry": registry})
+    try:
+        server = ThreadingHTTPServer((host, port), handler)
+    except OSError as e:
+        log_error_event("metrics", "start_metrics_server", f"Metrics endpoint unavailable on {host}:{port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    security_logger.info(f"Metrics endpoint listening on http://{host}:{server.server_address[1]}/metrics")
+    return server
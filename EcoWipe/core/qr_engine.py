@@ -6,29 +6,56 @@ import qrcode
 import cv2
 import numpy as np
 from typing import Optional
-import os
+import threading
 
-import sys
-# Ensure core and utils can be imported
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.exception_types import CertificateError
 from core.logging_engine import certificate_logger, log_error_event
-from utils.constants import QR_BOX_SIZE, QR_BORDER
+from utils.constants import QR_BOX_SIZE, QR_BORDER, QR_VERIFY_BOX_SIZE, QR_VERIFY_MODE
+
+# cv2 QR detectors are not thread-safe, so each thread (and therefore each
+# batch worker process) keeps and reuses its own detector instances.
+_detector_cache = threading.local()
+
+def _get_detectors():
+    """
+    The classic detector, plus the ArUco-based detector where OpenCV provides
+    it (4.8+). The classic decoder misses many high-version codes that the
+    ArUco one reads, so it serves as a fallback.
+    """
+    detectors = getattr(_detector_cache, "detectors", None)
+    if detectors is None:
+        detectors = [cv2.QRCodeDetector()]
+        if hasattr(cv2, "QRCodeDetectorAruco"):
+            detectors.append(cv2.QRCodeDetectorAruco())
+        _detector_cache.detectors = detectors
+    return detectors
 
 class QREngine:
     """
     Generates high-reliability QR codes with strict parameters.
     Includes auto-decode verification to guarantee readability.
+    The rendered image is verified in memory; the PNG is only written once it passes.
     """
     
     @staticmethod
-    def generate_and_verify(data: str, output_path: str) -> str:
+    def render(modules: np.ndarray, box_size: int = QR_BOX_SIZE, border: int = QR_BORDER) -> np.ndarray:
+        """Render a boolean module matrix as a black-on-white grayscale image."""
+        padded = np.pad(modules, border, constant_values=False)
+        image = np.where(padded, 0, 255).astype(np.uint8)
+        return np.repeat(np.repeat(image, box_size, axis=0), box_size, axis=1)
+
+    @staticmethod
+    def generate_and_verify(data: str, output_path: str, verify_mode: str = QR_VERIFY_MODE) -> str:
         """
-        Generate a QR code and immediately verify it can be decoded.
+        Generate a QR code and immediately verify it before saving.
         
         Args:
             data: The string data to encode.
             output_path: The file path to save the image.
+            verify_mode: "decode" runs full OpenCV detection and decoding on the
+                rendered image; "structural" samples the rendered image back
+                into a module grid and compares it with the encoder's matrix
+                (much faster, but trusts the encoder rather than a decoder).
             
         Returns:
             The path to the saved QR code.
@@ -38,6 +65,8 @@ class QREngine:
         """
         if not data:
             raise CertificateError("Cannot generate QR code with empty data.")
+        if verify_mode not in ("decode", "structural"):
+            raise CertificateError(f"Unknown QR verification mode: {verify_mode}")
             
         try:
             # 1. Generate QR Code with strict parameters
@@ -49,16 +78,23 @@ class QREngine:
             )
             qr.add_data(data.encode('utf-8'))
             qr.make(fit=True)
+            modules = np.array(qr.modules, dtype=bool)
+            image = QREngine.render(modules)
             
-            img = qr.make_image(fill_color="black", back_color="white")
-            img.save(output_path)
-            
-            # 2. Auto-decode verification using OpenCV
-            if not QREngine._verify_qr(output_path, data):
-                # If verification fails, delete the bad file and raise
-                if os.path.exists(output_path):
-                    os.remove(output_path)
+            # 2. Verify the rendered image in memory (the PNG is a lossless copy of it)
+            if verify_mode == "structural":
+                verified = QREngine._verify_structure(image, qr.modules)
+            else:
+                # Area-downscaling by the integer box ratio keeps modules exact and makes decoding much cheaper
+                scale = QR_VERIFY_BOX_SIZE / QR_BOX_SIZE
+                decoded = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else image
+                verified = QREngine._verify_qr(decoded, data)
+            if not verified:
                 raise CertificateError("QR Code generated but failed auto-decode verification.")
+            
+            # 3. Only a verified code reaches the disk
+            if not cv2.imwrite(output_path, image):
+                raise CertificateError(f"Could not write QR image to {output_path}.")
                 
             certificate_logger.info(f"QR code generated and verified successfully: {output_path}")
             return output_path
@@ -68,21 +104,27 @@ class QREngine:
             raise CertificateError(f"Failed to generate QR code: {e}")
 
     @staticmethod
-    def _verify_qr(image_path: str, expected_data: str) -> bool:
+    def decode_image(image: np.ndarray) -> str:
+        """
+        Decode the QR code in an image with this thread's detectors.
+        
+        Returns:
+            The decoded text, or "" if no QR code could be decoded.
+        """
+        for detector in _get_detectors():
+            data, bbox, _ = detector.detectAndDecode(image)
+            if bbox is not None and data:
+                return data
+        return ""
+
+    @staticmethod
+    def _verify_qr(image: np.ndarray, expected_data: str) -> bool:
         """
-        Attempt to decode the saved QR code image to verify readability.
+        Attempt to decode an in-memory QR code image to verify readability.
         """
         try:
-            # Read image using OpenCV
-            img = cv2.imread(image_path)
-            if img is None:
-                return False
-                
-            # Initialize OpenCV QR Code detector
-            detector = cv2.QRCodeDetector()
-            data, bbox, _ = detector.detectAndDecode(img)
-            
-            if bbox is not None and data == expected_data:
+            data = QREngine.decode_image(image)
+            if data == expected_data:
                 return True
                 
             certificate_logger.warning(f"QR verification mismatch. Expected: {expected_data[:20]}..., Got: {data[:20]}...")
@@ -91,3 +133,25 @@ class QREngine:
         except Exception as e:
             log_error_event("qr_engine", "_verify_qr", f"QR verification error: {e}")
             return False
+
+    @staticmethod
+    def _verify_structure(image: np.ndarray, encoded) -> bool:
+        """
+        Sample the centre pixel of every module of the rendered image, quiet
+        zone included, and compare the recovered grid with the encoder's
+        module matrix (True = dark) surrounded by a light border.
+        """
+        size = len(encoded)
+        grid = size + 2 * QR_BORDER
+        if image.shape != (grid * QR_BOX_SIZE, grid * QR_BOX_SIZE):
+            certificate_logger.warning(f"QR structural verification: image is {image.shape}, expected a {grid}-module grid.")
+            return False
+        centre = QR_BOX_SIZE // 2
+        sampled = image[centre::QR_BOX_SIZE, centre::QR_BOX_SIZE] < 128
+        expected = np.zeros((grid, grid), dtype=bool)
+        expected[QR_BORDER:QR_BORDER + size, QR_BORDER:QR_BORDER + size] = [[bool(m) for m in row] for row in encoded]
+        mismatches = int(np.count_nonzero(sampled != expected))
+        if mismatches:
+            certificate_logger.warning(f"QR structural verification: {mismatches} module(s) differ from the encoded matrix.")
+            return False
+        return True
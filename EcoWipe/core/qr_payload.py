@@ -0,0 +1,258 @@
+"""
+Enterprise Data Sanitization Platform
+Compact Certificate QR Payload
+"""
+import base64
+import binascii
+import json
+import struct
+import zlib
+from typing import Any, Dict, Tuple
+
+from core.exception_types import CertificateError
+
+# Format (version 1):
+#   "EW1:" + base45( flags byte + body )
+#   body  = CBOR record of the full signed certificate, zlib-compressed when flags & 1
+# Base45 only uses QR alphanumeric characters, so the whole string is encoded
+# in alphanumeric mode (5.5 bits per character) instead of byte mode.
+QR_PAYLOAD_PREFIX = "EW1:"
+
+_FLAG_ZLIB = 0x01
+
+# Certificate keys are sent as small integers. The table is append-only:
+# reordering or removing entries breaks decoding of printed certificates.
+# Keys not listed here are sent as text.
+_KEY_TABLE = (
+    "schema_version", "certificate_id", "timestamp_utc", "app_version", "signature_algorithm",
+    "operator", "device", "id", "model", "serial_number", "size_bytes", "wipe_details",
+    "method", "passes", "nist_standard", "pre_hash_sha256", "post_hash_sha256",
+    "start_time_unix", "end_time_unix", "status", "payload_hash", "signature", "rsa_signature",
+    "merkle_proof", "root", "leaf_index", "leaf_count", "path", "verified_capacity_bytes",
+    "forensic_image", "manifest_sha256", "segments", "stored_bytes",
+)
+_KEY_IDS = {key: index for index, key in enumerate(_KEY_TABLE)}
+
+# RFC 8949 "expected conversion" tags: the byte string stands for its
+# base64 (22) or lowercase hex (23) text form, so hashes and signatures travel
+# as raw bytes and come back as the exact original strings.
+_TAG_BASE64 = 22
+_TAG_BASE16 = 23
+# Short strings stay text: conversion would save little and hurt readability
+_MIN_CONVERTED_LENGTH = 16
+# Certificates nest a few levels deep; anything deeper is malformed input
+_MAX_CBOR_DEPTH = 16
+
+_BASE45_ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:"
+_BASE45_VALUES = {c: i for i, c in enumerate(_BASE45_ALPHABET)}
+
+# --- Base45 (RFC 9285) ---
+
+def base45_encode(data: bytes) -> str:
+    out = []
+    for i in range(0, len(data) - 1, 2):
+        n = data[i] * 256 + data[i + 1]
+        n, c = divmod(n, 45)
+        e, d = divmod(n, 45)
+        out.append(_BASE45_ALPHABET[c] + _BASE45_ALPHABET[d] + _BASE45_ALPHABET[e])
+    if len(data) % 2:
+        d, c = divmod(data[-1], 45)
+        out.append(_BASE45_ALPHABET[c] + _BASE45_ALPHABET[d])
+    return "".join(out)
+
+def base45_decode(text: str) -> bytes:
+    try:
+        values = [_BASE45_VALUES[c] for c in text]
+    except KeyError as e:
+        raise ValueError(f"Invalid base45 character {e}")
+    if len(values) % 3 == 1:
+        raise ValueError("Invalid base45 length")
+    out = bytearray()
+    for i in range(0, len(values), 3):
+        group = values[i:i + 3]
+        if len(group) == 3:
+            n = group[0] + group[1] * 45 + group[2] * 2025
+            if n > 0xFFFF:
+                raise ValueError("Invalid base45 group")
+            out += n.to_bytes(2, "big")
+        else:
+            n = group[0] + group[1] * 45
+            if n > 0xFF:
+                raise ValueError("Invalid base45 group")
+            out.append(n)
+    return bytes(out)
+
+# --- Minimal CBOR (RFC 8949) for JSON-compatible values ---
+
+def _cbor_head(major: int, value: int) -> bytes:
+    if value < 24:
+        return bytes([major << 5 | value])
+    for info, fmt in ((24, ">B"), (25, ">H"), (26, ">I"), (27, ">Q")):
+        if value < 1 << (8 * struct.calcsize(fmt)):
+            return bytes([major << 5 | info]) + struct.pack(fmt, value)
+    raise ValueError(f"Integer too large for the QR payload: {value}")
+
+def _binary_form(text: str) -> Tuple[int, bytes]:
+    """(tag, bytes) if the string is lossless hex or base64, else (0, b"")."""
+    if len(text) >= _MIN_CONVERTED_LENGTH:
+        try:
+            raw = bytes.fromhex(text)
+            if raw.hex() == text:
+                return _TAG_BASE16, raw
+        except ValueError:
+            pass
+        try:
+            raw = base64.b64decode(text, validate=True)
+            if base64.b64encode(raw).decode('ascii') == text:
+                return _TAG_BASE64, raw
+        except (binascii.Error, ValueError):
+            pass
+    return 0, b""
+
+def _cbor_encode(value: Any, out: bytearray) -> None:
+    if value is False:
+        out.append(0xF4)
+    elif value is True:
+        out.append(0xF5)
+    elif value is None:
+        out.append(0xF6)
+    elif isinstance(value, int):
+        out += _cbor_head(0, value) if value >= 0 else _cbor_head(1, -1 - value)
+    elif isinstance(value, float):
+        out.append(0xFB)
+        out += struct.pack(">d", value)
+    elif isinstance(value, str):
+        tag, raw = _binary_form(value)
+        if tag:
+            out += _cbor_head(6, tag) + _cbor_head(2, len(raw)) + raw
+        else:
+            encoded = value.encode('utf-8')
+            out += _cbor_head(3, len(encoded)) + encoded
+    elif isinstance(value, (list, tuple)):
+        out += _cbor_head(4, len(value))
+        for item in value:
+            _cbor_encode(item, out)
+    elif isinstance(value, dict):
+        out += _cbor_head(5, len(value))
+        for key, item in value.items():
+            if not isinstance(key, str):
+                raise ValueError(f"Certificate keys must be strings, got {key!r}")
+            key_id = _KEY_IDS.get(key)
+            if key_id is not None:
+                out += _cbor_head(0, key_id)
+            else:
+                _cbor_encode_text(key, out)
+            _cbor_encode(item, out)
+    else:
+        raise ValueError(f"Unsupported value in certificate: {type(value).__name__}")
+
+def _cbor_encode_text(text: str, out: bytearray) -> None:
+    encoded = text.encode('utf-8')
+    out += _cbor_head(3, len(encoded)) + encoded
+
+class _CborReader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def _take(self, n: int) -> bytes:
+        if self.pos + n > len(self.data):
+            raise ValueError("Truncated CBOR data")
+        chunk = self.data[self.pos:self.pos + n]
+        self.pos += n
+        return chunk
+
+    def _head(self) -> Tuple[int, int]:
+        initial = self._take(1)[0]
+        major, info = initial >> 5, initial & 0x1F
+        if info < 24:
+            return major, info
+        if info == 27 and major == 7:
+            return major, info  # Float64 payload is read by the caller
+        sizes = {24: 1, 25: 2, 26: 4, 27: 8}
+        if info not in sizes:
+            raise ValueError(f"Unsupported CBOR encoding (major {major}, info {info})")
+        return major, int.from_bytes(self._take(sizes[info]), "big")
+
+    def read(self, key: bool = False, depth: int = 0) -> Any:
+        if depth > _MAX_CBOR_DEPTH:
+            raise ValueError(f"CBOR nesting deeper than {_MAX_CBOR_DEPTH} levels")
+        major, arg = self._head()
+        if major == 0:
+            if key:
+                if arg >= len(_KEY_TABLE):
+                    raise ValueError(f"Unknown certificate key id {arg}")
+                return _KEY_TABLE[arg]
+            return arg
+        if major == 1:
+            return -1 - arg
+        if major == 2:
+            return self._take(arg)
+        if major == 3:
+            return self._take(arg).decode('utf-8')
+        if major == 4:
+            return [self.read(depth=depth + 1) for _ in range(arg)]
+        if major == 5:
+            result = {}
+            for _ in range(arg):
+                k = self.read(key=True, depth=depth + 1)
+                result[k] = self.read(depth=depth + 1)
+            return result
+        if major == 6:
+            raw = self.read(depth=depth + 1)
+            if not isinstance(raw, bytes) or arg not in (_TAG_BASE16, _TAG_BASE64):
+                raise ValueError(f"Unsupported CBOR tag {arg}")
+            return raw.hex() if arg == _TAG_BASE16 else base64.b64encode(raw).decode('ascii')
+        if major == 7:
+            if arg == 20:
+                return False
+            if arg == 21:
+                return True
+            if arg == 22:
+                return None
+            if arg == 27:
+                return struct.unpack(">d", self._take(8))[0]
+        raise ValueError(f"Unsupported CBOR item (major {major})")
+
+# --- Public API ---
+
+def encode_qr_payload(certificate: Dict[str, Any]) -> str:
+    """Encode a signed certificate into the compact QR text format."""
+    body = bytearray()
+    _cbor_encode(certificate, body)
+    compressed = zlib.compress(bytes(body), 9)
+    if len(compressed) < len(body):
+        record = bytes([_FLAG_ZLIB]) + compressed
+    else:
+        record = bytes([0]) + bytes(body)
+    return QR_PAYLOAD_PREFIX + base45_encode(record)
+
+def decode_qr_payload(text: str) -> Dict[str, Any]:
+    """
+    Decode a scanned certificate QR payload back into the signed certificate.
+    Accepts both the compact format and the legacy base64(JSON) payload.
+
+    Raises:
+        CertificateError: If the payload is malformed.
+    """
+    try:
+        if text.startswith(QR_PAYLOAD_PREFIX):
+            record = base45_decode(text[len(QR_PAYLOAD_PREFIX):])
+            if not record:
+                raise ValueError("Empty payload")
+            flags, body = record[0], record[1:]
+            if flags & ~_FLAG_ZLIB:
+                raise ValueError(f"Unsupported payload flags {flags:#x}")
+            if flags & _FLAG_ZLIB:
+                body = zlib.decompress(body)
+            reader = _CborReader(body)
+            certificate = reader.read()
+            if reader.pos != len(body):
+                raise ValueError("Trailing data after certificate record")
+        else:
+            certificate = json.loads(base64.b64decode(text, validate=True))
+    except (ValueError, zlib.error, UnicodeDecodeError, binascii.Error, RecursionError) as e:
+        raise CertificateError(f"Malformed certificate QR payload: {e}")
+    if not isinstance(certificate, dict):
+        raise CertificateError("Malformed certificate QR payload: not a certificate record")
+    return certificate
@@ -0,0 +1,165 @@
+"""
+Enterprise Data Sanitization Platform
+Bulk QR Certificate Scanning
+"""
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import cv2
+
+from core.certificate_verifier import VerificationFailure, verify_certificate
+from core.exception_types import CertificateError
+from core.qr_engine import QREngine
+from core.qr_payload import decode_qr_payload
+from core.security_engine import load_public_keys
+from utils.parallel import bounded_as_completed, chunked
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+
+# Stages at which a scanned image can fail, in pipeline order
+STAGE_UNREADABLE = "unreadable_image"
+STAGE_NO_QR = "no_qr_code"
+STAGE_MALFORMED = "malformed_payload"
+STAGE_INVALID = "invalid_certificate"
+# Unexpected error in the scanner itself, not attributable to the image
+STAGE_SCAN_ERROR = "scan_error"
+
+@dataclass
+class ScanFailure(VerificationFailure):
+    """One image that did not yield an authentic certificate, and the stage it failed at."""
+    stage: str = STAGE_INVALID
+
+@dataclass
+class ScanReport:
+    """Aggregate result of a bulk QR scan."""
+    total: int = 0
+    valid: int = 0
+    elapsed_seconds: float = 0.0
+    failures_by_stage: Dict[str, int] = field(default_factory=dict)
+    failures: List[ScanFailure] = field(default_factory=list)
+
+    @property
+    def invalid(self) -> int:
+        return self.total - self.valid
+
+    @property
+    def throughput(self) -> float:
+        return self.total / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+# Per-process keyring, loaded once by the pool initializer
+_worker_public_keys: Dict[str, Any] = {}
+
+def _init_scan_worker(public_key_paths: Sequence[str]) -> None:
+    global _worker_public_keys
+    # Parallelism comes from the worker processes; keep OpenCV single-threaded in each
+    cv2.setNumThreads(1)
+    _worker_public_keys = load_public_keys(public_key_paths)
+
+def scan_image(path: str, public_keys) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Read one QR image, decode its certificate and verify it.
+
+    Returns:
+        (certificate_id, failure stage, failure reason); stage and reason are
+        None when the certificate is authentic.
+    """
+    try:
+        image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    except (cv2.error, OSError) as e:
+        return None, STAGE_UNREADABLE, f"image could not be read ({e})"
+    if image is None:
+        return None, STAGE_UNREADABLE, "image could not be read"
+
+    text = QREngine.decode_image(image)
+    if not text:
+        return None, STAGE_NO_QR, "no decodable QR code found"
+
+    try:
+        certificate = decode_qr_payload(text)
+    except CertificateError as e:
+        return None, STAGE_MALFORMED, str(e)
+
+    cert_id = certificate.get("certificate_id")
+    reason = verify_certificate(certificate, public_keys)
+    if reason is not None:
+        return cert_id, STAGE_INVALID, reason
+    return cert_id, None, None
+
+def _scan_chunk(paths: List[str]) -> Tuple[int, List[ScanFailure]]:
+    """Scan a chunk of images inside a worker process."""
+    valid = 0
+    failures = []
+    for path in paths:
+        try:
+            cert_id, stage, reason = scan_image(path, _worker_public_keys)
+        except Exception as e:
+            # Image load failures are reported by scan_image; anything else is a scanner fault
+            cert_id, stage, reason = None, STAGE_SCAN_ERROR, f"{type(e).__name__}: {e}"
+        if stage is None:
+            valid += 1
+        else:
+            failures.append(ScanFailure(path, cert_id, reason, stage))
+    return valid, failures
+
+def iter_image_files(root: str) -> Iterator[str]:
+    """Lazily walk a directory tree for QR images."""
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield entry.path
+
+def scan_images(
+    paths: Iterable[str],
+    public_key_paths: Union[str, Sequence[str]],
+    max_workers: Optional[int] = None,
+    chunk_size: int = 32,
+    on_failure=None,
+) -> ScanReport:
+    """
+    Decode and verify a stream of QR certificate images in parallel worker processes.
+
+    Paths are consumed lazily and sent in chunks with a bounded number in
+    flight, so memory stays flat for archives of any size; each worker holds
+    only the image it is decoding.
+
+    Args:
+        paths: Image file paths, e.g. from iter_image_files().
+        public_key_paths: PEM public key(s) of the signing station.
+        max_workers: Worker process count (defaults to the CPU count).
+        chunk_size: Images per task.
+        on_failure: Optional callback invoked with each ScanFailure as it is
+            found; when given, failures are not accumulated in the report.
+    """
+    if isinstance(public_key_paths, str):
+        public_key_paths = [public_key_paths]
+    public_key_paths = list(public_key_paths)
+    # Fail fast in the parent if a key is unusable
+    load_public_keys(public_key_paths)
+
+    workers = max_workers or os.cpu_count() or 1
+    report = ScanReport()
+    stages: Counter = Counter()
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_scan_worker, initargs=(public_key_paths,)) as executor:
+        for _, chunk, future in bounded_as_completed(executor, _scan_chunk, chunked(paths, chunk_size), workers * 2):
+            valid, failures = future.result()
+            report.total += len(chunk)
+            report.valid += valid
+            for failure in failures:
+                stages[failure.stage] += 1
+                # Streamed failures are not also kept in memory
+                if on_failure is not None:
+                    on_failure(failure)
+                else:
+                    report.failures.append(failure)
+    report.failures_by_stage = dict(stages)
+    report.elapsed_seconds = time.perf_counter() - started
+    return report
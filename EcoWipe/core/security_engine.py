@@ -4,34 +4,92 @@ Cryptographic Security Engine
 """
 import os
 import base64
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
+from typing import Dict, Iterable, Optional, Tuple
 from cryptography.hazmat.primitives import serialization
 from cryptography.exceptions import InvalidSignature
 
-import sys
-# Ensure core and utils can be imported
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.exception_types import SecurityViolationError
 from core.logging_engine import security_logger, log_error_event
-from utils.constants import RSA_KEY_SIZE
+from core.certificate_schema import LEGACY_SIGNATURE_ALGORITHM
+from core.signature_suites import get_suite, suite_for_public_key
+from utils.constants import SIGNATURE_ALGORITHM
+
+def key_paths_for(key_dir: str, algorithm: str) -> Tuple[str, str]:
+    """
+    (private, public) PEM paths of a station key. RSA keeps the original
+    file names so existing stations and auditors are unaffected.
+    """
+    if algorithm == LEGACY_SIGNATURE_ALGORITHM:
+        prefix = "ecowipe"
+    else:
+        prefix = f"ecowipe_{algorithm}"
+    return os.path.join(key_dir, f"{prefix}_private.pem"), os.path.join(key_dir, f"{prefix}_public.pem")
+
+def load_public_key(public_key_path: str):
+    """
+    Load a PEM public key for verification-only use (auditors do not hold the private key).
+    
+    Raises:
+        SecurityViolationError: If the key cannot be read or parsed.
+    """
+    try:
+        with open(public_key_path, "rb") as f:
+            return serialization.load_pem_public_key(f.read())
+    except Exception as e:
+        log_error_event("security_engine", "load_public_key", f"Failed to load public key {public_key_path}: {e}")
+        raise SecurityViolationError(f"Public key {public_key_path} is corrupted or inaccessible.")
+
+def load_public_keys(public_key_paths: Iterable[str]) -> Dict[str, object]:
+    """
+    Load several station public keys into a keyring keyed by signature algorithm.
+    
+    Raises:
+        SecurityViolationError: If a key cannot be loaded or two keys share an algorithm.
+    """
+    keyring: Dict[str, object] = {}
+    for path in public_key_paths:
+        public_key = load_public_key(path)
+        algorithm = suite_for_public_key(public_key).name
+        if algorithm in keyring:
+            raise SecurityViolationError(f"More than one {algorithm} public key given ({path}).")
+        keyring[algorithm] = public_key
+    return keyring
+
+def verify_with_public_key(public_key, data: bytes, signature_b64: str, algorithm: Optional[str] = None) -> bool:
+    """
+    Verify a signature with an already loaded public key.
+    
+    Args:
+        algorithm: Signature algorithm identifier; inferred from the key type if omitted.
+    
+    Raises:
+        InvalidSignature: If the signature does not match (including a key of the wrong type).
+        ValueError: If the signature is not valid Base64.
+        SecurityViolationError: If the algorithm is unknown.
+    """
+    suite = get_suite(algorithm) if algorithm else suite_for_public_key(public_key)
+    signature = base64.b64decode(signature_b64, validate=True)
+    suite.verify(public_key, signature, data)
+    return True
 
 class SecurityEngine:
     """
-    Handles RSA-4096 key generation, signing, and verification.
+    Handles station key generation, signing, and verification for one
+    signature suite (RSA-4096 PSS, Ed25519 or ECDSA P-256).
     Ensures forensic integrity of generated certificates.
     """
-    def __init__(self, key_dir: str = "keys"):
+    def __init__(self, key_dir: str = "keys", algorithm: str = SIGNATURE_ALGORITHM):
         self.key_dir = key_dir
-        self.private_key_path = os.path.join(key_dir, "ecowipe_private.pem")
-        self.public_key_path = os.path.join(key_dir, "ecowipe_public.pem")
+        self.suite = get_suite(algorithm)
+        self.algorithm = self.suite.name
+        self.private_key_path, self.public_key_path = key_paths_for(key_dir, self.algorithm)
         self._private_key = None
         self._public_key = None
         
         self._initialize_keys()
 
     def _initialize_keys(self) -> None:
-        """Load existing keys or generate new RSA-4096 keys if they don't exist."""
+        """Load existing keys or generate a new key pair if they don't exist."""
         os.makedirs(self.key_dir, exist_ok=True)
         
         if os.path.exists(self.private_key_path) and os.path.exists(self.public_key_path):
@@ -40,13 +98,10 @@ class SecurityEngine:
             self._generate_keys()
 
     def _generate_keys(self) -> None:
-        """Generate a new RSA-4096 key pair."""
-        security_logger.info(f"Generating new RSA-{RSA_KEY_SIZE} key pair...")
+        """Generate a new key pair for the configured suite."""
+        security_logger.info(f"Generating new {self.algorithm} key pair...")
         
-        self._private_key = rsa.generate_private_key(
-            public_exponent=65537,
-            key_size=RSA_KEY_SIZE,
-        )
+        self._private_key = self.suite.generate_private_key()
         self._public_key = self._private_key.public_key()
         
         # Save Private Key
@@ -64,10 +119,10 @@ class SecurityEngine:
                 format=serialization.PublicFormat.SubjectPublicKeyInfo
             ))
             
-        security_logger.info("RSA key pair generated and saved successfully.")
+        security_logger.info(f"{self.algorithm} key pair generated and saved successfully.")
 
     def _load_keys(self) -> None:
-        """Load existing RSA keys from disk."""
+        """Load existing keys from disk."""
         try:
             with open(self.private_key_path, "rb") as f:
                 self._private_key = serialization.load_pem_private_key(
@@ -79,12 +134,15 @@ class SecurityEngine:
                     f.read()
                 )
         except Exception as e:
-            log_error_event("security_engine", "_load_keys", f"Failed to load RSA keys: {e}")
+            log_error_event("security_engine", "_load_keys", f"Failed to load {self.algorithm} keys: {e}")
             raise SecurityViolationError("Cryptographic keys are corrupted or inaccessible.")
+        if not self.suite.owns_key(self._public_key):
+            log_error_event("security_engine", "_load_keys", f"{self.public_key_path} is not a {self.algorithm} key.")
+            raise SecurityViolationError(f"Key files do not match the {self.algorithm} algorithm.")
 
     def sign_data(self, data: bytes) -> str:
         """
-        Sign data using the RSA-4096 private key.
+        Sign data with the station private key.
         
         Args:
             data: The raw bytes to sign.
@@ -95,14 +153,7 @@ class SecurityEngine:
         if not self._private_key:
             raise SecurityViolationError("Private key not loaded.")
             
-        signature = self._private_key.sign(
-            data,
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.MAX_LENGTH
-            ),
-            hashes.SHA256()
-        )
+        signature = self.suite.sign(self._private_key, data)
         return base64.b64encode(signature).decode('utf-8')
 
     def verify_signature(self, data: bytes, signature_b64: str) -> bool:
@@ -120,17 +171,7 @@ class SecurityEngine:
             raise SecurityViolationError("Public key not loaded.")
             
         try:
-            signature = base64.b64decode(signature_b64)
-            self._public_key.verify(
-                signature,
-                data,
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                hashes.SHA256()
-            )
-            return True
+            return verify_with_public_key(self._public_key, data, signature_b64, self.algorithm)
         except InvalidSignature:
             security_logger.warning("Signature verification failed: Invalid signature.")
             return False
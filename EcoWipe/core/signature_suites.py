@@ -0,0 +1,104 @@
+"""
+Enterprise Data Sanitization Platform
+Signature Algorithm Suites
+"""
+from typing import Dict
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, padding, rsa
+
+from core.exception_types import SecurityViolationError
+from utils.constants import RSA_KEY_SIZE
+
+class SignatureSuite:
+    """
+    One signature algorithm: key generation, signing and verification.
+    `name` is the identifier recorded in certificates (signature_algorithm).
+    """
+    name = ""
+    public_key_type: tuple = ()
+
+    def generate_private_key(self):
+        raise NotImplementedError
+
+    def sign(self, private_key, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def verify(self, public_key, signature: bytes, data: bytes) -> None:
+        """Raises InvalidSignature if the signature (or key type) does not match."""
+        raise NotImplementedError
+
+    def owns_key(self, public_key) -> bool:
+        return isinstance(public_key, self.public_key_type)
+
+class RsaPssSuite(SignatureSuite):
+    """RSA-4096 with PSS padding over SHA-256 (the original EcoWipe algorithm)."""
+    name = "rsa-pss-sha256"
+    public_key_type = (rsa.RSAPublicKey,)
+
+    _padding = padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH)
+
+    def generate_private_key(self):
+        return rsa.generate_private_key(public_exponent=65537, key_size=RSA_KEY_SIZE)
+
+    def sign(self, private_key, data: bytes) -> bytes:
+        return private_key.sign(data, self._padding, hashes.SHA256())
+
+    def verify(self, public_key, signature: bytes, data: bytes) -> None:
+        if not self.owns_key(public_key):
+            raise InvalidSignature()
+        public_key.verify(signature, data, self._padding, hashes.SHA256())
+
+class Ed25519Suite(SignatureSuite):
+    """Ed25519: fast deterministic signatures, 64-byte signatures."""
+    name = "ed25519"
+    public_key_type = (ed25519.Ed25519PublicKey,)
+
+    def generate_private_key(self):
+        return ed25519.Ed25519PrivateKey.generate()
+
+    def sign(self, private_key, data: bytes) -> bytes:
+        return private_key.sign(data)
+
+    def verify(self, public_key, signature: bytes, data: bytes) -> None:
+        if not self.owns_key(public_key):
+            raise InvalidSignature()
+        public_key.verify(signature, data)
+
+class EcdsaP256Suite(SignatureSuite):
+    """ECDSA on NIST P-256 over SHA-256 (DER signatures, ~72 bytes), for FIPS-only deployments."""
+    name = "ecdsa-p256-sha256"
+    public_key_type = (ec.EllipticCurvePublicKey,)
+
+    def generate_private_key(self):
+        return ec.generate_private_key(ec.SECP256R1())
+
+    def sign(self, private_key, data: bytes) -> bytes:
+        return private_key.sign(data, ec.ECDSA(hashes.SHA256()))
+
+    def verify(self, public_key, signature: bytes, data: bytes) -> None:
+        if not self.owns_key(public_key) or not isinstance(public_key.curve, ec.SECP256R1):
+            raise InvalidSignature()
+        public_key.verify(signature, data, ec.ECDSA(hashes.SHA256()))
+
+SIGNATURE_SUITES: Dict[str, SignatureSuite] = {
+    suite.name: suite for suite in (RsaPssSuite(), Ed25519Suite(), EcdsaP256Suite())
+}
+
+def get_suite(name: str) -> SignatureSuite:
+    """
+    Raises:
+        SecurityViolationError: If the algorithm is unknown.
+    """
+    try:
+        return SIGNATURE_SUITES[name]
+    except KeyError:
+        raise SecurityViolationError(f"Unsupported signature algorithm: {name}")
+
+def suite_for_public_key(public_key) -> SignatureSuite:
+    """Identify the suite a loaded public key belongs to."""
+    for suite in SIGNATURE_SUITES.values():
+        if suite.owns_key(public_key):
+            return suite
+    raise SecurityViolationError(f"Unsupported public key type: {type(public_key).__name__}")
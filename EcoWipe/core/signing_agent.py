@@ -0,0 +1,396 @@
+"""
+Enterprise Data Sanitization Platform
+Local Signing Agent
+"""
+import itertools
+import json
+import os
+import queue
+import secrets
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Dict, List, Optional
+
+from core.exception_types import SecurityViolationError
+from core.logging_engine import security_logger, log_error_event
+from core.security_engine import SecurityEngine
+from utils.constants import (
+    SIGNATURE_ALGORITHM, SIGNING_AGENT_AUTHKEY_FILE, SIGNING_AGENT_PIPE_NAME,
+    SIGNING_AGENT_QUEUE_MAX, SIGNING_AGENT_SOCKET_FILE, SIGNING_AGENT_WORKERS,
+)
+
+# Protocol: JSON messages over an authenticated multiprocessing connection
+# (HMAC challenge with a shared authkey; no pickle crosses the boundary).
+#   -> {"id": n, "op": "sign", "data": [utf-8 text, ...]}
+#   <- {"id": n, "signatures": [base64, ...], "queue_ms": q, "sign_ms": s}
+#   -> {"id": n, "op": "info"}     <- {"id": n, "algorithm": ..., "public_key_pem": ...}
+#   -> {"id": n, "op": "metrics"}  <- {"id": n, "metrics": {...}}
+# Errors come back as {"id": n, "error": message}. Clients may pipeline any
+# number of requests; responses can arrive out of order and are matched by id.
+
+def default_agent_address(key_dir: str = "keys") -> str:
+    """Named pipe on Windows, Unix socket next to the station key elsewhere."""
+    if sys.platform == "win32":
+        return SIGNING_AGENT_PIPE_NAME
+    return os.path.join(key_dir, SIGNING_AGENT_SOCKET_FILE)
+
+def load_or_create_authkey(key_dir: str = "keys", create: bool = False) -> bytes:
+    """
+    Shared secret clients must prove knowledge of. It is only readable by the
+    account that owns the key directory, like the private key itself.
+
+    Raises:
+        SecurityViolationError: If the authkey is missing (and not created) or unreadable.
+    """
+    path = os.path.join(key_dir, SIGNING_AGENT_AUTHKEY_FILE)
+    if create and not os.path.exists(path):
+        os.makedirs(key_dir, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(secrets.token_bytes(32))
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError as e:
+        raise SecurityViolationError(f"Signing agent authkey {path} is inaccessible: {e}")
+
+def _shutdown_connection(conn: Connection) -> None:
+    """
+    Wake a thread blocked reading `conn`; that thread then closes it. Closing
+    the descriptor from another thread does not interrupt a pending read on a
+    Unix socket, so the peer would never see EOF.
+    """
+    if sys.platform == "win32":
+        conn.close()
+        return
+    try:
+        with socket.socket(fileno=os.dup(conn.fileno())) as sock:
+            sock.shutdown(socket.SHUT_RDWR)
+    except (OSError, ValueError):
+        pass  # Already closed
+
+class LatencyStats:
+    """Running latency statistics with percentiles over a recent window."""
+    def __init__(self, window: int = 4096):
+        self._lock = threading.Lock()
+        self._recent: deque = deque(maxlen=window)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms: float) -> None:
+        with self._lock:
+            self._recent.append(ms)
+            self.count += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            recent = sorted(self._recent)
+            count, total, peak = self.count, self.total_ms, self.max_ms
+        def pct(p: float) -> float:
+            return recent[min(len(recent) - 1, int(len(recent) * p))] if recent else 0.0
+        return {
+            "count": count,
+            "mean_ms": round(total / count, 3) if count else 0.0,
+            "p50_ms": round(pct(0.50), 3),
+            "p95_ms": round(pct(0.95), 3),
+            "p99_ms": round(pct(0.99), 3),
+            "max_ms": round(peak, 3),
+        }
+
+class SigningAgent:
+    """
+    Long-lived process-local service that holds the station key in memory and
+    signs on behalf of any number of local clients (wipe stations, batch
+    tools). Each connection has a reader thread that enqueues requests as they
+    arrive; a small pool of signer threads drains the shared queue, so one
+    client's pipelined requests and other clients' requests interleave.
+    """
+    def __init__(self, key_dir: str = "keys", algorithm: str = SIGNATURE_ALGORITHM,
+                 address: Optional[str] = None, workers: int = SIGNING_AGENT_WORKERS,
+                 queue_max: int = SIGNING_AGENT_QUEUE_MAX):
+        self.security_engine = SecurityEngine(key_dir, algorithm)
+        self.address = address or default_agent_address(key_dir)
+        self._authkey = load_or_create_authkey(key_dir, create=True)
+        with open(self.security_engine.public_key_path, "r", encoding="utf-8") as f:
+            self._public_key_pem = f.read()
+
+        # A full queue blocks connection readers, which pushes back on clients
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_max)
+        self._workers = max(1, workers)
+        self._threads: List[threading.Thread] = []
+        self._connections: Dict[int, Connection] = {}
+        self._send_locks: Dict[int, threading.Lock] = {}
+        self._conn_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._listener: Optional[Listener] = None
+
+        self.queue_latency = LatencyStats()
+        self.sign_latency = LatencyStats()
+        self._counter_lock = threading.Lock()
+        self._counters = {"requests": 0, "items": 0, "errors": 0, "connections_total": 0}
+        self._started = time.time()
+
+    # --- Lifecycle ---
+
+    def start(self) -> None:
+        """Listen on the agent address and start the signer threads."""
+        if not self.address.startswith("\\\\") and os.path.exists(self.address):
+            os.remove(self.address)  # Stale socket from a previous run
+        self._listener = Listener(self.address, authkey=self._authkey)
+        if not self.address.startswith("\\\\"):
+            os.chmod(self.address, 0o600)
+        for i in range(self._workers):
+            self._spawn(self._sign_loop, f"signing-agent-signer-{i}")
+        self._spawn(self._accept_loop, "signing-agent-accept")
+        security_logger.info(f"Signing agent listening on {self.address} ({self.security_engine.algorithm}, {self._workers} signer thread(s)).")
+
+    def serve_forever(self) -> None:
+        self.start()
+        try:
+            while not self._closed.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        # Wake the blocking accept() with a throwaway connection
+        try:
+            Client(self.address, authkey=self._authkey).close()
+        except Exception:
+            pass
+        if self._listener is not None:
+            self._listener.close()
+        with self._conn_lock:
+            connections = list(self._connections.values())
+        for conn in connections:
+            _shutdown_connection(conn)
+        for _ in range(self._workers):
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=5)
+        security_logger.info("Signing agent stopped.")
+
+    def _spawn(self, target, name: str, *args) -> None:
+        thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    # --- Connections ---
+
+    def _accept_loop(self) -> None:
+        while not self._closed.is_set():
+            try:
+                conn = self._listener.accept()
+            except Exception as e:
+                if self._closed.is_set():
+                    return
+                # Failed authentication or a broken handshake; keep serving others
+                security_logger.warning(f"Signing agent rejected a connection: {e}")
+                continue
+            if self._closed.is_set():
+                conn.close()
+                return
+            with self._conn_lock:
+                self._connections[id(conn)] = conn
+                self._send_locks[id(conn)] = threading.Lock()
+            self._count("connections_total")
+            threading.Thread(target=self._read_loop, args=(conn,), name="signing-agent-reader", daemon=True).start()
+
+    def _read_loop(self, conn: Connection) -> None:
+        try:
+            while not self._closed.is_set():
+                try:
+                    request = json.loads(conn.recv_bytes())
+                except (EOFError, OSError):
+                    return
+                except ValueError:
+                    request = None
+                if not isinstance(request, dict):
+                    self._count("errors")
+                    self._reply(conn, {"id": None, "error": "malformed request"})
+                    continue
+                self._queue.put((conn, request, time.perf_counter()))
+        finally:
+            with self._conn_lock:
+                self._connections.pop(id(conn), None)
+                self._send_locks.pop(id(conn), None)
+            conn.close()
+
+    def _reply(self, conn: Connection, response: Dict[str, Any]) -> None:
+        with self._conn_lock:
+            lock = self._send_locks.get(id(conn))
+        if lock is None:
+            return
+        try:
+            with lock:
+                conn.send_bytes(json.dumps(response, separators=(",", ":")).encode("utf-8"))
+        except (OSError, EOFError, ValueError):
+            pass  # Client went away; its reader thread cleans up
+
+    # --- Signing ---
+
+    def _sign_loop(self) -> None:
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                return
+            conn, request, enqueued = entry
+            # The signer threads serve every client: no request may end one
+            try:
+                self._serve(conn, request, enqueued)
+            except Exception as e:
+                self._count("errors")
+                log_error_event("signing_agent", "_sign_loop", f"Signing request could not be served: {e}", exc_info=True)
+                self._reply(conn, {"id": request.get("id") if isinstance(request, dict) else None, "error": str(e)})
+
+    def _serve(self, conn: Connection, request: Dict[str, Any], enqueued: float) -> None:
+        started = time.perf_counter()
+        queue_ms = (started - enqueued) * 1000
+        self.queue_latency.record(queue_ms)
+        try:
+            response = self._handle(request)
+        except Exception as e:
+            self._count("errors")
+            log_error_event("signing_agent", "_sign_loop", f"Signing request failed: {e}")
+            response = {"error": str(e)}
+        sign_ms = (time.perf_counter() - started) * 1000
+        if request.get("op") == "sign":
+            self.sign_latency.record(sign_ms)
+        response.update({"id": request.get("id"), "queue_ms": round(queue_ms, 3), "sign_ms": round(sign_ms, 3)})
+        self._reply(conn, response)
+
+    def _handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request.get("op")
+        if op == "sign":
+            data = request.get("data")
+            if not isinstance(data, list) or not all(isinstance(d, str) for d in data):
+                raise ValueError("sign requires a list of strings")
+            signatures = [self.security_engine.sign_data(d.encode("utf-8")) for d in data]
+            self._count("requests")
+            self._count("items", len(data))
+            return {"signatures": signatures}
+        if op == "info":
+            return {"algorithm": self.security_engine.algorithm, "public_key_pem": self._public_key_pem}
+        if op == "metrics":
+            return {"metrics": self.metrics()}
+        raise ValueError(f"unknown operation {op!r}")
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._counter_lock:
+            self._counters[name] += amount
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._counter_lock:
+            counters = dict(self._counters)
+        with self._conn_lock:
+            counters["connections_open"] = len(self._connections)
+        counters.update({
+            "algorithm": self.security_engine.algorithm,
+            "uptime_s": round(time.time() - self._started, 1),
+            "queue_depth": self._queue.qsize(),
+            "queue_latency": self.queue_latency.snapshot(),
+            "sign_latency": self.sign_latency.snapshot(),
+        })
+        return counters
+
+class SigningAgentClient:
+    """
+    Pipelining client: any number of requests may be outstanding; a reader
+    thread resolves each request's future when its response arrives.
+    Safe to share between threads.
+    """
+    def __init__(self, address: Optional[str] = None, key_dir: str = "keys", authkey: Optional[bytes] = None):
+        self.address = address or default_agent_address(key_dir)
+        try:
+            self._conn = Client(self.address, authkey=authkey if authkey is not None else load_or_create_authkey(key_dir))
+        except (OSError, EOFError, AuthenticationError) as e:
+            raise SecurityViolationError(f"Cannot reach signing agent at {self.address}: {e}")
+        self._send_lock = threading.Lock()
+        self._pending: Dict[int, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._reader = threading.Thread(target=self._read_loop, name="signing-agent-client", daemon=True)
+        self._reader.start()
+
+    def _request(self, message: Dict[str, Any]) -> Future:
+        future: Future = Future()
+        request_id = next(self._ids)
+        message["id"] = request_id
+        with self._pending_lock:
+            self._pending[request_id] = future
+        try:
+            with self._send_lock:
+                self._conn.send_bytes(json.dumps(message, separators=(",", ":")).encode("utf-8"))
+        except (OSError, EOFError, ValueError) as e:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+            raise SecurityViolationError(f"Signing agent connection lost: {e}")
+        return future
+
+    def _read_loop(self) -> None:
+        error: Exception = SecurityViolationError("Signing agent connection closed.")
+        try:
+            while True:
+                response = json.loads(self._conn.recv_bytes())
+                with self._pending_lock:
+                    future = self._pending.pop(response.get("id"), None)
+                if future is None:
+                    continue
+                if "error" in response:
+                    future.set_exception(SecurityViolationError(f"Signing agent error: {response['error']}"))
+                else:
+                    future.set_result(response)
+        except (EOFError, OSError, ValueError) as e:
+            error = SecurityViolationError(f"Signing agent connection lost: {e}")
+        finally:
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+            for future in pending.values():
+                future.set_exception(error)
+            self._conn.close()
+
+    def submit(self, data: List[bytes]) -> Future:
+        """Queue a batch sign request; the future resolves to the full response (signatures, queue_ms, sign_ms)."""
+        return self._request({"op": "sign", "data": [d.decode("utf-8") for d in data]})
+
+    def sign_many(self, data: List[bytes]) -> List[str]:
+        return self.submit(data).result()["signatures"]
+
+    def info(self) -> Dict[str, Any]:
+        return self._request({"op": "info"}).result()
+
+    def metrics(self) -> Dict[str, Any]:
+        return self._request({"op": "metrics"}).result()["metrics"]
+
+    def close(self) -> None:
+        _shutdown_connection(self._conn)
+        self._reader.join(timeout=5)
+
+class RemoteSigner(SigningAgentClient):
+    """
+    Drop-in replacement for SecurityEngine's signing side (algorithm,
+    sign_data), so CertificateEngine and MerkleBatchSigner can sign through
+    the agent instead of loading the private key themselves.
+    """
+    def __init__(self, address: Optional[str] = None, key_dir: str = "keys", authkey: Optional[bytes] = None):
+        super().__init__(address, key_dir, authkey)
+        info = self.info()
+        self.algorithm = info["algorithm"]
+        self.public_key_pem = info["public_key_pem"]
+
+    def sign_data(self, data: bytes) -> str:
+        return self.sign_many([data])[0]
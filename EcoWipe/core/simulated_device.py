@@ -0,0 +1,340 @@
+"""
+Enterprise Data Sanitization Platform
+Simulated Block Devices
+"""
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from core.block_device import BlockDevice
+from core.device_validator import ValidatedDevice
+from core.exception_types import DeviceIOError, DeviceRemovedError, DeviceValidationError, WipeEngineError
+from utils.constants import WIPE_BLOCK_SIZE_BYTES
+
+# Fault-injecting stand-ins for physical drives, so the engine's wipe and
+# verification paths can be driven through field failures (slow zones,
+# intermittent errors, short transfers, surprise removal, fake capacity) and
+# soak-tested with many devices at once. Devices are described by a
+# DeviceProfile, which round-trips through plain dicts (JSON scenario files).
+
+SIMULATED_PREFIX = "sim://"
+
+ERROR_CRC = 23                      # Data error (cyclic redundancy check)
+ERROR_DEVICE_NOT_CONNECTED = 1167
+
+@dataclass
+class SlowZone:
+    """Byte range with extra per-operation latency and/or its own throughput cap."""
+    start: int
+    end: int
+    latency_s: float = 0.0
+    mbps: Optional[float] = None
+
+@dataclass
+class Fault:
+    """
+    Failure triggered by an operation touching [offset, offset + length):
+      error  - the operation fails with error_code
+      short  - the transfer comes back partial: it stops just before offset,
+               or transfers half the request if it starts inside the range
+      remove - the device disappears
+    times is how often it fires (None: every time, i.e. a permanent fault).
+    """
+    offset: int
+    kind: str = "error"
+    op: str = "write"               # "read", "write" or "any"
+    length: int = 1
+    times: Optional[int] = 1
+    error_code: int = ERROR_CRC
+
+@dataclass
+class DeviceProfile:
+    """Scriptable behaviour of one simulated device."""
+    size_bytes: int
+    latency_s: float = 0.0                      # Added to every operation
+    read_mbps: Optional[float] = None           # Throughput caps (None: unlimited)
+    write_mbps: Optional[float] = None
+    max_transfer_bytes: Optional[int] = None    # Every larger transfer comes back short
+    slow_zones: List[SlowZone] = field(default_factory=list)
+    faults: List[Fault] = field(default_factory=list)
+    remove_after_bytes: Optional[int] = None    # Surprise removal after this much I/O
+    real_capacity_bytes: Optional[int] = None   # Fake-capacity drive: storage ends here
+    overflow: str = "wrap"                      # Past the real capacity: "wrap" (alias) or "error" (I/O error)
+    seed: int = 0                               # Initial content of never-written regions
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any]) -> "DeviceProfile":
+        spec = dict(spec)
+        spec["slow_zones"] = [SlowZone(**z) for z in spec.get("slow_zones", [])]
+        spec["faults"] = [Fault(**f) for f in spec.get("faults", [])]
+        return cls(**spec)
+
+def seeded_fill(seed: int, index: int, chunk_size: int) -> bytes:
+    """Deterministic stand-in for old data in chunk `index` (never all zeros)."""
+    unit = index.to_bytes(8, "little") + (hashlib.sha256(f"ecowipe-sim-{seed}".encode()).digest() * 128)[8:]   # 4 KiB
+    return (unit * (chunk_size // len(unit) + 1))[:chunk_size]
+
+class _SparseMemory:
+    """
+    In-memory chunk map. Never-written chunks read as a seeded fill pattern
+    (not zeros, so a zero pass still changes the device hash). Whole-chunk
+    writes store the caller's bytes interned by content, so wiping a device
+    with a repeated block costs one block of memory, not the device size.
+    """
+    def __init__(self, chunk_size: int, seed: int):
+        self.chunk_size = chunk_size
+        self._chunks: Dict[int, bytes] = {}
+        self._interned: Dict[bytes, bytes] = {}
+        self.seed = seed
+
+    def _chunk(self, index: int) -> bytes:
+        chunk = self._chunks.get(index)
+        return chunk if chunk is not None else seeded_fill(self.seed, index, self.chunk_size)
+
+    def read_at(self, offset: int, size: int) -> bytes:
+        parts = []
+        while size > 0:
+            index, start = divmod(offset, self.chunk_size)
+            take = min(size, self.chunk_size - start)
+            parts.append(self._chunk(index)[start:start + take])
+            offset += take
+            size -= take
+        return b"".join(parts)
+
+    def write_at(self, offset: int, data: memoryview) -> None:
+        pos = 0
+        while pos < len(data):
+            index, start = divmod(offset + pos, self.chunk_size)
+            take = min(len(data) - pos, self.chunk_size - start)
+            piece = data[pos:pos + take]
+            if take == self.chunk_size:
+                whole = isinstance(piece.obj, bytes) and len(piece.obj) == take
+                content = piece.obj if whole else bytes(piece)
+                self._chunks[index] = self._interned.setdefault(content, content)
+            else:
+                chunk = bytearray(self._chunk(index))
+                chunk[start:start + take] = piece
+                self._chunks[index] = bytes(chunk)
+            pos += take
+
+class _SparseFile:
+    """File-backed storage (a sparse file where supported); holes read as zeros."""
+    def __init__(self, path: str, size: int):
+        mode = "r+b" if os.path.exists(path) else "w+b"
+        self._file = open(path, mode)
+        if os.path.getsize(path) < size:
+            self._file.truncate(size)
+
+    def read_at(self, offset: int, size: int) -> bytes:
+        self._file.seek(offset)
+        return self._file.read(size)
+
+    def write_at(self, offset: int, data: memoryview) -> None:
+        self._file.seek(offset)
+        self._file.write(data)
+
+    def flush(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+class SimulatedBlockDevice(BlockDevice):
+    """
+    BlockDevice over in-memory sparse storage or a backing file, applying the
+    profile's timing and faults to every operation. remove() may be called
+    from any thread to simulate unplugging the device.
+    """
+    def __init__(self, name: str, profile: DeviceProfile, backing_path: Optional[str] = None):
+        self.name = name
+        self.profile = profile
+        self.position = 0
+        self.removed = False
+        self.locked = False
+        self.closed = False
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.faults_fired: List[str] = []
+        self._fault_budget = [f.times for f in profile.faults]
+        self._lock = threading.Lock()
+        capacity = profile.real_capacity_bytes or profile.size_bytes
+        if backing_path:
+            self._storage = _SparseFile(backing_path, capacity)
+        else:
+            self._storage = _SparseMemory(WIPE_BLOCK_SIZE_BYTES, profile.seed)
+
+    @property
+    def device(self) -> ValidatedDevice:
+        """The record a discovery scan would report for this device."""
+        return ValidatedDevice(
+            device_id=SIMULATED_PREFIX + self.name, model="EcoWipe Simulated Disk", serial_number=f"SIM-{self.name}",
+            size_bytes=self.profile.size_bytes, interface_type="USB", is_system_drive=False, is_boot_drive=False,
+            disk_index=-1,
+        )
+
+    def remove(self) -> None:
+        self.removed = True
+
+    # --- Fault and timing model ---
+
+    def _check_present(self) -> None:
+        if self.removed:
+            raise DeviceRemovedError(f"{SIMULATED_PREFIX}{self.name} was removed. Error: {ERROR_DEVICE_NOT_CONNECTED}",
+                                     ERROR_DEVICE_NOT_CONNECTED)
+
+    def _apply_faults(self, op: str, offset: int, size: int) -> int:
+        """Fire faults in [offset, offset + size); returns how many bytes may be transferred."""
+        allowed = size
+        if self.profile.max_transfer_bytes:
+            allowed = min(allowed, self.profile.max_transfer_bytes)
+        for i, fault in enumerate(self.profile.faults):
+            if fault.op not in (op, "any") or self._fault_budget[i] == 0:
+                continue
+            if not (fault.offset < offset + allowed and offset < fault.offset + fault.length):
+                continue
+            if self._fault_budget[i] is not None:
+                self._fault_budget[i] -= 1
+            self.faults_fired.append(f"{fault.kind}:{op}@{fault.offset}")
+            if fault.kind == "remove":
+                self.removed = True
+                self._check_present()
+            elif fault.kind == "short":
+                allowed = fault.offset - offset if fault.offset > offset else max(1, allowed // 2)
+            else:
+                raise DeviceIOError(f"{op.capitalize()} failed on {SIMULATED_PREFIX}{self.name} at offset {offset}. "
+                                    f"Error: {fault.error_code}", fault.error_code)
+        return allowed
+
+    def _pace(self, op: str, offset: int, size: int, started: float) -> None:
+        delay = self.profile.latency_s
+        cap = self.profile.read_mbps if op == "read" else self.profile.write_mbps
+        for zone in self.profile.slow_zones:
+            if zone.start < offset + size and offset < zone.end:
+                delay += zone.latency_s
+                if zone.mbps is not None:
+                    cap = zone.mbps if cap is None else min(cap, zone.mbps)
+        if cap:
+            delay += size / (cap * 1e6)
+        remaining = delay - (time.perf_counter() - started)
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def _physical(self, offset: int) -> int:
+        real = self.profile.real_capacity_bytes
+        return offset % real if real else offset
+
+    def _transfer(self, op: str, size: int, data: Optional[memoryview] = None):
+        started = time.perf_counter()
+        with self._lock:
+            self._check_present()
+            offset = self.position
+            size = max(0, min(size, self.profile.size_bytes - offset))
+            real = self.profile.real_capacity_bytes
+            if size and real and self.profile.overflow == "error" and offset + size > real:
+                self.faults_fired.append(f"overflow:{op}@{offset}")
+                raise DeviceIOError(f"{op.capitalize()} failed on {SIMULATED_PREFIX}{self.name} at offset "
+                                    f"{max(offset, real)}. Error: {ERROR_CRC}", ERROR_CRC)
+            if size:
+                size = self._apply_faults(op, offset, size)
+            removal = self.profile.remove_after_bytes
+            if removal is not None and self.bytes_read + self.bytes_written + size > removal:
+                self.removed = True
+                self.faults_fired.append(f"remove:{op}@{offset}")
+                self._check_present()
+            result = b""
+            pos = 0
+            while pos < size:
+                physical = self._physical(offset + pos)
+                take = size - pos
+                if self.profile.real_capacity_bytes:
+                    take = min(take, self.profile.real_capacity_bytes - physical)
+                if op == "read":
+                    result += self._storage.read_at(physical, take)
+                else:
+                    self._storage.write_at(physical, data[pos:pos + take])
+                pos += take
+            self.position = offset + size
+            if op == "read":
+                self.bytes_read += size
+            else:
+                self.bytes_written += size
+        self._pace(op, offset, size, started)
+        return result if op == "read" else size
+
+    # --- BlockDevice ---
+
+    def lock(self) -> None:
+        if self.removed:
+            raise WipeEngineError("Failed to lock volume for exclusive access.")
+        self.locked = True
+
+    def seek(self, offset: int) -> None:
+        self._check_present()
+        self.position = offset
+
+    def read(self, size: int) -> bytes:
+        return self._transfer("read", size)
+
+    def write(self, data: bytes, size: int) -> int:
+        return self._transfer("write", size, memoryview(data)[:size])
+
+    def flush(self) -> None:
+        self._check_present()
+        if isinstance(self._storage, _SparseFile):
+            self._storage.flush()
+
+    def close(self) -> None:
+        self.locked = False
+        self.closed = True
+
+    def dispose(self) -> None:
+        """Release the backing file (the device cannot be reopened afterwards)."""
+        self.close()
+        if isinstance(self._storage, _SparseFile):
+            self._storage.close()
+
+    def prefill(self) -> None:
+        """Give a file-backed device the seeded old content a fresh memory device reads as."""
+        if isinstance(self._storage, _SparseFile):
+            capacity = self.profile.real_capacity_bytes or self.profile.size_bytes
+            for index in range((capacity + WIPE_BLOCK_SIZE_BYTES - 1) // WIPE_BLOCK_SIZE_BYTES):
+                chunk = seeded_fill(self.profile.seed, index, WIPE_BLOCK_SIZE_BYTES)
+                offset = index * WIPE_BLOCK_SIZE_BYTES
+                self._storage.write_at(offset, memoryview(chunk)[:capacity - offset])
+
+    def read_back(self, size: Optional[int] = None) -> bytes:
+        """Raw content as currently stored (no faults or pacing), for independent verification."""
+        size = self.profile.size_bytes if size is None else size
+        parts = []
+        offset = 0
+        while offset < size:
+            take = min(WIPE_BLOCK_SIZE_BYTES, size - offset)
+            physical = self._physical(offset)
+            if self.profile.real_capacity_bytes:
+                take = min(take, self.profile.real_capacity_bytes - physical)
+            parts.append(self._storage.read_at(physical, take))
+            offset += take
+        return b"".join(parts)
+
+class SimulatedDeviceValidator:
+    """Stands in for DeviceValidator when wiping simulated devices."""
+    def __init__(self, devices: Dict[str, SimulatedBlockDevice]):
+        self.devices = devices
+
+    def validate_device_for_wipe(self, expected: ValidatedDevice) -> ValidatedDevice:
+        device = self.devices.get(expected.device_id)
+        if device is None or device.removed:
+            raise DeviceValidationError(f"Device {expected.device_id} is no longer connected.")
+        if device.device.fingerprint != expected.fingerprint:
+            raise DeviceValidationError(f"Device {expected.device_id} changed since it was selected.")
+        return device.device
+
+    def open_device(self, device: ValidatedDevice) -> SimulatedBlockDevice:
+        """WipeEngine open_device hook; the simulated device object is reused (like re-opening a drive)."""
+        simulated = self.devices[device.device_id]
+        simulated.closed = False
+        return simulated
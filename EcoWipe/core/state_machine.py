@@ -5,10 +5,6 @@ Deterministic State Machine
 from enum import Enum, auto
 from typing import Callable, Dict, List, Optional
 
-import sys
-import os
-# Ensure core can be imported
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.exception_types import StateMachineError
 from core.logging_engine import wipe_logger
 
@@ -31,6 +27,8 @@ class WipeStateMachine:
     """
     def __init__(self):
         self._current_state = WipeState.IDLE
+        # Observers called as listener(old_state, new_state) after each transition
+        self._listeners: List[Callable[[WipeState, WipeState], None]] = []
         
         # Define valid transitions
         self._transitions: Dict[WipeState, List[WipeState]] = {
@@ -49,6 +47,17 @@ class WipeStateMachine:
     def current_state(self) -> WipeState:
         return self._current_state
 
+    def add_listener(self, listener: Callable[[WipeState, WipeState], None]) -> None:
+        """Observe transitions (metrics, tracing). Listener errors never block a transition."""
+        self._listeners.append(listener)
+
+    def _notify(self, old_state: WipeState, new_state: WipeState) -> None:
+        for listener in self._listeners:
+            try:
+                listener(old_state, new_state)
+            except Exception as e:
+                wipe_logger.error(f"State listener failed on {old_state.name} -> {new_state.name}: {e}")
+
     def transition_to(self, new_state: WipeState) -> None:
         """
         Attempt to transition to a new state.
@@ -69,13 +78,15 @@ class WipeStateMachine:
             # to prevent getting stuck in a dangerous state, but still log the violation.
             if new_state in (WipeState.ERROR, WipeState.SAFE_RELEASE):
                 wipe_logger.warning(f"Forcing emergency transition to {new_state.name}")
-                self._current_state = new_state
+                old_state, self._current_state = self._current_state, new_state
+                self._notify(old_state, new_state)
                 return
                 
             raise StateMachineError(error_msg)
             
         wipe_logger.info(f"State transition: {self._current_state.name} -> {new_state.name}")
-        self._current_state = new_state
+        old_state, self._current_state = self._current_state, new_state
+        self._notify(old_state, new_state)
 
     def assert_state(self, expected_state: WipeState) -> None:
         """
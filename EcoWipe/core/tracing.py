@@ -0,0 +1,275 @@
+"""
+Enterprise Data Sanitization Platform
+Wipe Phase Tracing
+"""
+import json
+import os
+import sys
+import threading
+import time
+import zlib
+from collections import Counter as StackCounter, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from core.logging_engine import wipe_logger, log_error_event
+from utils.constants import TRACE_DIR, TRACE_PROFILE_INTERVAL_S, TRACE_PROFILE_MAX_DEPTH, TRACE_PROFILE_MAX_SAMPLES
+
+# Chrome trace-event timestamps are microseconds. Every tracer uses the same
+# clock (wall time at import, advanced by perf_counter), so traces of
+# concurrent jobs, even from separate files, line up on one timeline while
+# durations stay immune to wall clock adjustments.
+_ORIGIN_WALL = time.time()
+_ORIGIN_PERF = time.perf_counter()
+
+def trace_clock_us() -> float:
+    return (_ORIGIN_WALL + (time.perf_counter() - _ORIGIN_PERF)) * 1e6
+
+def job_lane(job_id: str) -> int:
+    """Stable trace thread id for a job, so merged traces keep one lane per job."""
+    return zlib.crc32(job_id.encode("utf-8")) & 0x7FFFFFFF
+
+# Tracers of running jobs, for toggling profiling on one of them
+_active: Dict[str, "JobTracer"] = {}
+_active_lock = threading.Lock()
+
+class SamplingProfiler:
+    """
+    Samples one thread's Python stack at a fixed interval from a daemon
+    thread (sys._current_frames), so it can be attached to and detached from
+    a running job. Every sample is counted per distinct stack (outermost
+    frame first), so the folded profile covers the whole session in memory
+    bounded by the number of distinct stacks; only the newest max_samples
+    are also kept as (timestamp_us, stack) for the trace timeline.
+    """
+    def __init__(self, thread_ident: int, interval: float = TRACE_PROFILE_INTERVAL_S,
+                 max_depth: int = TRACE_PROFILE_MAX_DEPTH, max_samples: int = TRACE_PROFILE_MAX_SAMPLES):
+        self.thread_ident = thread_ident
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples: Deque[Tuple[float, Tuple[str, ...]]] = deque(maxlen=max_samples)
+        self.sample_count = 0
+        self._counts: StackCounter = StackCounter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{self.thread_ident}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_ident)
+            if frame is None:
+                return  # Target thread finished
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.reverse()
+            stack = tuple(stack)
+            self._counts[stack] += 1
+            self.samples.append((trace_clock_us(), stack))
+            self.sample_count += 1
+
+    def folded(self) -> Dict[str, int]:
+        """Collapsed stacks ("outer;inner" -> sample count), the flame graph input format."""
+        return {";".join(stack): count for stack, count in self._counts.most_common()}
+
+class JobTracer:
+    """
+    Timeline of one wipe job. Used as a WipeStateMachine listener it records
+    a span per state; span() adds nested sub-phases (passes, hashes). The
+    result is exported as Chrome trace-event JSON (chrome://tracing,
+    Perfetto, speedscope).
+    """
+    def __init__(self, job_id: str, label: str = "", record_subphases: bool = True):
+        self.job_id = job_id
+        self.label = label or job_id
+        self.record_subphases = record_subphases
+        self.pid = os.getpid()
+        self.tid = job_lane(job_id)
+        self._events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._state: Optional[Tuple[str, float]] = None
+        self._profiler: Optional[SamplingProfiler] = None
+        self._profiles: List[SamplingProfiler] = []
+        self._job_thread: Optional[int] = None
+        self._profile_on_begin = False
+        self._profile_lock = threading.Lock()   # UI thread toggles while the job thread may end
+
+    # --- Lifecycle ---
+
+    def begin(self) -> None:
+        """Mark the calling thread as the job's thread and make the tracer reachable by job id."""
+        self._job_thread = threading.get_ident()
+        with _active_lock:
+            _active[self.job_id] = self
+        if self._profile_on_begin:
+            self.set_profiling(True)
+
+    def end(self) -> None:
+        """Close the open state span and stop profiling."""
+        self.set_profiling(False)
+        self._close_state(trace_clock_us())
+        with _active_lock:
+            _active.pop(self.job_id, None)
+
+    # --- Recording ---
+
+    def _complete(self, name: str, category: str, start_us: float, end_us: float, args: Optional[Dict[str, Any]] = None) -> None:
+        event = {"name": name, "cat": category, "ph": "X", "ts": start_us, "dur": max(end_us - start_us, 0.0),
+                 "pid": self.pid, "tid": self.tid}
+        if args:
+            event["args"] = args
+        with self._lock:
+            self._events.append(event)
+
+    def _close_state(self, now_us: float) -> None:
+        if self._state is not None:
+            name, started = self._state
+            self._state = None
+            self._complete(name, "state", started, now_us)
+
+    def on_transition(self, old_state, new_state) -> None:
+        """WipeStateMachine listener: ends the span of the old state and starts one for the new."""
+        now = trace_clock_us()
+        self._close_state(now)
+        self._state = (new_state.name, now)
+
+    @contextmanager
+    def span(self, name: str, **args: Any):
+        """Sub-phase span nested inside the current state (no-op when sub-phases are off)."""
+        if not self.record_subphases:
+            yield
+            return
+        started = trace_clock_us()
+        try:
+            yield
+        finally:
+            self._complete(name, "phase", started, trace_clock_us(), args)
+
+    def instant(self, name: str, **args: Any) -> None:
+        event = {"name": name, "cat": "event", "ph": "i", "s": "t", "ts": trace_clock_us(), "pid": self.pid, "tid": self.tid}
+        if args:
+            event["args"] = args
+        with self._lock:
+            self._events.append(event)
+
+    # --- Profiling ---
+
+    @property
+    def profiling(self) -> bool:
+        return self._profiler is not None
+
+    def set_profiling(self, enabled: bool) -> None:
+        """
+        Attach or detach the sampling profiler; may be called from any thread
+        while the job runs. Before begin(), the choice applies when it starts.
+        """
+        with self._profile_lock:
+            if self._job_thread is None:
+                self._profile_on_begin = enabled
+            elif enabled and self._profiler is None:
+                self._profiler = SamplingProfiler(self._job_thread)
+                self._profiler.start()
+                self.instant("profiling_started")
+                wipe_logger.info(f"Sampling profiler enabled for job {self.job_id}")
+            elif not enabled and self._profiler is not None:
+                profiler, self._profiler = self._profiler, None
+                profiler.stop()
+                self._profiles.append(profiler)
+                self.instant("profiling_stopped", samples=profiler.sample_count, timeline_samples=len(profiler.samples))
+
+    def folded_stacks(self) -> Dict[str, int]:
+        counts: StackCounter = StackCounter()
+        for profiler in self._profiles:
+            counts.update(profiler.folded())
+        return dict(counts.most_common())
+
+    # --- Export ---
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Trace-event JSON object; stack samples, if any, use the stackFrames/samples format."""
+        with self._lock:
+            events = list(self._events)
+        events.insert(0, {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": self.tid, "args": {"name": self.label}})
+        events.insert(0, {"name": "process_name", "ph": "M", "pid": self.pid, "tid": self.tid, "args": {"name": "EcoWipe"}})
+        trace = {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"job_id": self.job_id}}
+
+        frames: Dict[str, Dict[str, Any]] = {}
+        frame_ids: Dict[Tuple[str, ...], str] = {}
+        samples = []
+        for profiler in self._profiles:
+            for ts, stack in profiler.samples:
+                parent = None
+                for depth in range(1, len(stack) + 1):
+                    key = stack[:depth]
+                    frame_id = frame_ids.get(key)
+                    if frame_id is None:
+                        # Ids are prefixed by the lane so merged traces never collide
+                        frame_id = frame_ids[key] = f"{self.tid}.{len(frame_ids)}"
+                        frames[frame_id] = {"name": key[-1], "category": "python"}
+                        if parent is not None:
+                            frames[frame_id]["parent"] = parent
+                    parent = frame_id
+                if parent is not None:
+                    samples.append({"ts": ts, "pid": self.pid, "tid": self.tid, "sf": parent, "weight": 1})
+        if samples:
+            trace["stackFrames"] = frames
+            trace["samples"] = samples
+        return trace
+
+    def export(self, trace_dir: str = TRACE_DIR) -> Optional[str]:
+        """Write trace_<job_id>.json (and .folded if profiled). Returns the trace path, or None on failure."""
+        try:
+            os.makedirs(trace_dir, exist_ok=True)
+            path = os.path.join(trace_dir, f"trace_{self.job_id}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.chrome_trace(), f)
+            folded = self.folded_stacks()
+            if folded:
+                with open(os.path.join(trace_dir, f"trace_{self.job_id}.folded"), "w", encoding="utf-8") as f:
+                    for stack, count in folded.items():
+                        f.write(f"{stack} {count}\n")
+            return path
+        except OSError as e:
+            log_error_event("tracing", "export", f"Could not write trace for job {self.job_id}: {e}")
+            return None
+
+def active_jobs() -> List[str]:
+    with _active_lock:
+        return list(_active)
+
+def set_job_profiling(job_id: str, enabled: bool) -> bool:
+    """Toggle the sampling profiler of a running job. Returns False if the job is not running."""
+    with _active_lock:
+        tracer = _active.get(job_id)
+    if tracer is None:
+        return False
+    tracer.set_profiling(enabled)
+    return True
+
+def merge_traces(traces: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine per-job traces into one timeline (lanes and frame ids are already unique per job)."""
+    merged: Dict[str, Any] = {"traceEvents": [], "displayTimeUnit": "ms", "otherData": {"job_ids": []}}
+    seen_metadata = set()
+    for trace in traces:
+        for event in trace.get("traceEvents", []):
+            if event.get("ph") == "M":
+                key = (event["name"], event.get("pid"), event.get("tid"))
+                if key in seen_metadata:
+                    continue
+                seen_metadata.add(key)
+            merged["traceEvents"].append(event)
+        merged["otherData"]["job_ids"].append(trace.get("otherData", {}).get("job_id"))
+        if trace.get("samples"):
+            merged.setdefault("stackFrames", {}).update(trace["stackFrames"])
+            merged.setdefault("samples", []).extend(trace["samples"])
+    return merged
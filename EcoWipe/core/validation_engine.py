@@ -3,19 +3,18 @@ Enterprise Data Sanitization Platform
 Centralized Validation Engine
 """
 import re
-import os
 from pathlib import Path
 from typing import Any
 
-import sys
-# Ensure core can be imported
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.exception_types import InvalidInputError, SecurityViolationError
 from core.logging_engine import log_security_event
 
 # Strict regex for operator names: 1-100 chars, alphanumeric, space, hyphen, underscore
 OPERATOR_REGEX = re.compile(r"^[a-zA-Z0-9 \-_]{1,100}$")
 
+# Linux whole-disk block devices (partitions are never valid wipe targets)
+LINUX_DISK_REGEX = re.compile(r"^/dev/(sd[a-z]+|nvme\d+n\d+|mmcblk\d+|vd[a-z]+)$")
+
 # Reserved Windows device names that should never be used as file paths
 RESERVED_NAMES = {
     "CON", "PRN", "AUX", "NUL",
@@ -92,10 +91,11 @@ def validate_safe_path(file_path: str, must_exist: bool = False) -> Path:
 
 def validate_device_path(device_path: str) -> str:
     """
-    Validate that a device path matches the expected Windows physical drive format.
+    Validate that a device path matches the expected physical drive format
+    (Windows physical drive or Linux whole-disk block device).
     
     Args:
-        device_path: The device path (e.g., '\\\\.\\PhysicalDrive1').
+        device_path: The device path (e.g., '\\\\.\\PhysicalDrive1' or '/dev/sdb').
         
     Returns:
         The validated device path.
@@ -106,8 +106,9 @@ def validate_device_path(device_path: str) -> str:
     if not device_path:
         raise InvalidInputError("Device path cannot be empty.")
         
-    # Strict check for Windows physical drive format
-    if not re.match(r"^\\\\\\.\\PhysicalDrive\d+$", device_path, re.IGNORECASE):
+    # Strict check for Windows physical drive or Linux whole-disk format
+    if not (re.match(r"^\\\\\.\\PhysicalDrive\d+$", device_path, re.IGNORECASE)
+            or LINUX_DISK_REGEX.match(device_path)):
         log_security_event("validation_engine", "validate_device_path", f"Invalid device path format: {device_path}")
         raise InvalidInputError(f"Invalid device path format: {device_path}")
         
@@ -2,22 +2,26 @@
 Enterprise Data Sanitization Platform
 Secure Wipe Engine
 """
+import dataclasses
 import hashlib
 import time
+import uuid
+from contextlib import nullcontext
 from typing import Optional, Callable, Dict, Any
 from PyQt6.QtCore import QThread, pyqtSignal
 
-import sys
-import os
-# Ensure core and utils can be imported
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.state_machine import WipeStateMachine, WipeState
 from core.device_validator import DeviceValidator, ValidatedDevice
 from core.wipe_strategies import get_strategy, WipeStrategy
 from core.exception_types import WipeEngineError, DeviceValidationError
 from core.logging_engine import wipe_logger, log_error_event, log_security_event
-from utils.win_api import get_device_handle, close_handle, lock_volume, dismount_volume, unlock_volume
-from utils.constants import WIPE_BLOCK_SIZE_BYTES, INVALID_HANDLE_VALUE
+from core.audit_log import audit_context
+from core import metrics
+from core.tracing import JobTracer
+from core.block_device import BlockDevice, Win32BlockDevice
+from core.capacity_probe import probe_capacity
+from core.forensic_image import ForensicImageWriter
+from utils.constants import WIPE_BLOCK_SIZE_BYTES, TRACE_ENABLED, TRACE_SUBPHASES, CAPACITY_PROBE_ENABLED
 
 class WipeEngine(QThread):
     """
@@ -29,18 +33,44 @@ class WipeEngine(QThread):
     wipe_completed = pyqtSignal(dict)        # result_data
     wipe_failed = pyqtSignal(str)            # error_message
 
-    def __init__(self, device_id: str, method_name: str, operator_name: str):
+    def __init__(self, selected_device: ValidatedDevice, method_name: str, operator_name: str,
+                 validator: Optional[DeviceValidator] = None,
+                 open_device: Callable[[ValidatedDevice], BlockDevice] = Win32BlockDevice.open,
+                 forensic_image_dir: Optional[str] = None):
+        """
+        validator and open_device are injection points for targets other than
+        physical drives (see core/simulated_device.py); by default the device
+        is re-validated through WMI and opened as a Win32 handle.
+        With forensic_image_dir set, the pre-wipe hash read also captures an
+        image of the device there (see core/forensic_image.py).
+        """
         super().__init__()
-        self.device_id = device_id
+        self.selected_device = selected_device
+        self.device_id = selected_device.device_id
         self.method_name = method_name
         self.operator_name = operator_name
+        # Correlates every audit record of this wipe (and its certificate)
+        self.job_id = str(uuid.uuid4())
         
         self.state_machine = WipeStateMachine()
-        self.validator = DeviceValidator()
+        self.state_machine.add_listener(self._record_transition)
+        self.tracer: Optional[JobTracer] = None
+        if TRACE_ENABLED:
+            self.tracer = JobTracer(self.job_id, f"{selected_device.model} ({selected_device.serial_number})", TRACE_SUBPHASES)
+            self.state_machine.add_listener(self.tracer.on_transition)
+        # Created on the wipe thread unless injected (WMI connections are per-thread);
+        # a validator created there is also closed there
+        self.validator = validator
+        self._owns_validator = validator is None
+        self.open_device = open_device
         self.strategy = get_strategy(method_name)
         
         self.device: Optional[ValidatedDevice] = None
-        self.handle: int = INVALID_HANDLE_VALUE
+        self.block_device: Optional[BlockDevice] = None
+        
+        self.forensic_image_dir = forensic_image_dir
+        # Certificate entry of the captured image (manifest hash, segments)
+        self.forensic_image: Optional[Dict[str, Any]] = None
         
         self.pre_hash: str = ""
         self.post_hash: str = ""
@@ -48,36 +78,72 @@ class WipeEngine(QThread):
         self.end_time: float = 0.0
         
         self._is_cancelled = False
+        # Outcome for callers without an event loop (soak tests); the UI uses the signals
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
 
     def cancel(self):
         """Request cancellation of the wipe process."""
         self._is_cancelled = True
         wipe_logger.warning(f"Wipe cancellation requested for {self.device_id}")
 
+    def set_profiling(self, enabled: bool):
+        """Switch the sampling profiler for this job on or off (also while it runs)."""
+        if self.tracer is not None:
+            self.tracer.set_profiling(enabled)
+
+    def _trace_span(self, name: str, **args):
+        return self.tracer.span(name, **args) if self.tracer is not None else nullcontext()
+
+    def _record_transition(self, old_state: WipeState, new_state: WipeState):
+        metrics.WIPE_TRANSITIONS.labels(new_state.name, self.strategy.name).inc()
+
     def run(self):
         """Main execution loop for the QThread."""
-        try:
-            self.start_time = time.time()
-            wipe_logger.info(f"Starting wipe operation on {self.device_id} by {self.operator_name}")
-            
-            self._validate_device()
-            self._lock_and_dismount()
-            self._compute_pre_hash()
-            self._perform_wipe()
-            self._compute_post_hash()
-            self._finalize()
-            
-        except Exception as e:
-            log_error_event("wipe_engine", "run", f"Wipe failed: {e}", exc_info=True)
-            self.state_machine.transition_to(WipeState.ERROR)
-            self.wipe_failed.emit(str(e))
-        finally:
-            self._safe_release()
+        outcome = "failed"
+        metrics.WIPES_ACTIVE.inc()
+        if self.tracer is not None:
+            self.tracer.begin()
+        with audit_context(job_id=self.job_id, device_serial=self.selected_device.serial_number):
+            try:
+                self.start_time = time.time()
+                wipe_logger.info(f"Starting wipe operation on {self.device_id} by {self.operator_name}")
+                
+                self._validate_device()
+                self._lock_and_dismount()
+                self._probe_capacity()
+                self._compute_pre_hash()
+                self._perform_wipe()
+                self._compute_post_hash()
+                self._finalize()
+                outcome = "completed"
+                
+            except Exception as e:
+                if self._is_cancelled:
+                    outcome = "cancelled"
+                log_error_event("wipe_engine", "run", f"Wipe failed: {e}", exc_info=True)
+                self.state_machine.transition_to(WipeState.ERROR)
+                self.error = str(e)
+                self.wipe_failed.emit(str(e))
+            finally:
+                self._safe_release()
+                if self._owns_validator and self.validator is not None:
+                    self.validator.close()
+                    self.validator = None
+                metrics.WIPES_ACTIVE.dec()
+                metrics.WIPES.labels(outcome, self.strategy.name).inc()
+                if self.tracer is not None:
+                    self.tracer.end()
+                    trace_path = self.tracer.export()
+                    if trace_path:
+                        wipe_logger.info(f"Wipe timeline written to {trace_path}")
 
     def _validate_device(self):
         """State: IDLE -> DEVICE_VALIDATED"""
         self.progress_updated.emit(0, "Validating device...")
-        self.device = self.validator.validate_device_for_wipe(self.device_id)
+        if self.validator is None:
+            self.validator = DeviceValidator()
+        self.device = self.validator.validate_device_for_wipe(self.selected_device)
         self.state_machine.transition_to(WipeState.DEVICE_VALIDATED)
 
     def _lock_and_dismount(self):
@@ -85,14 +151,9 @@ class WipeEngine(QThread):
         self.progress_updated.emit(5, "Locking and dismounting volume...")
         
         try:
-            # Acquire handle with write access
-            self.handle = get_device_handle(self.device_id, write_access=True)
-            
-            # Lock and dismount
-            if not lock_volume(self.handle):
-                raise WipeEngineError("Failed to lock volume for exclusive access.")
-            if not dismount_volume(self.handle):
-                raise WipeEngineError("Failed to dismount volume.")
+            # Acquire handle with write access, then lock and dismount
+            self.block_device = self.open_device(self.device)
+            self.block_device.lock()
                 
             self.state_machine.transition_to(WipeState.LOCKED)
             wipe_logger.info(f"Successfully locked and dismounted {self.device_id}")
@@ -100,22 +161,44 @@ class WipeEngine(QThread):
         except Exception as e:
             raise WipeEngineError(f"Lock/Dismount failed: {e}")
 
-    def _compute_hash(self, phase: str) -> str:
-        """Helper to compute SHA-256 of the drive."""
-        if self.handle == INVALID_HANDLE_VALUE:
+    def _probe_capacity(self):
+        """
+        State: LOCKED. Verify the device really stores what it reports before
+        anything is hashed or wiped; a counterfeit is wiped (and hashed) over
+        its real capacity only, since the rest of the address space wraps onto
+        it or fails, and its result carries the COUNTERFEIT_PARTIAL status.
+        """
+        self.state_machine.assert_state(WipeState.LOCKED)
+        if not CAPACITY_PROBE_ENABLED:
+            return
+        self.progress_updated.emit(5, "Verifying real capacity...")
+        with self._trace_span("capacity_probe"):
+            probe = probe_capacity(self.block_device, self.device.size_bytes, cancelled=lambda: self._is_cancelled)
+        self.device = dataclasses.replace(self.device, verified_capacity_bytes=probe.verified_bytes)
+        wipe_logger.info(f"Capacity probe of {self.device_id}: {probe.verified_bytes} of {probe.reported_bytes} bytes "
+                         f"verified ({probe.probes} probes, {probe.io_errors} I/O errors, {probe.seconds:.2f}s)")
+        if probe.counterfeit:
+            log_security_event("wipe_engine", "_probe_capacity",
+                               f"Counterfeit capacity on {self.device_id} (S/N {self.device.serial_number}): reports "
+                               f"{probe.reported_bytes} bytes, stores {probe.verified_bytes}; aliases {probe.aliases[:4]}")
+        if probe.verified_bytes == 0:
+            raise WipeEngineError("Capacity probe found no usable storage on the device.")
+
+    def _compute_hash(self, phase: str, sink: Optional[Callable[[int, bytes], None]] = None) -> str:
+        """Helper to compute SHA-256 of the drive; sink(offset, data) also receives every block read."""
+        if self.block_device is None:
             raise WipeEngineError("Invalid handle during hash computation.")
             
         hasher = hashlib.sha256()
         bytes_read = 0
-        total_bytes = self.device.size_bytes
+        total_bytes = self.device.usable_bytes
         
         # Seek to beginning
-        import ctypes
-        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
-        kernel32.SetFilePointer(self.handle, 0, None, 0) # FILE_BEGIN
+        self.block_device.seek(0)
         
-        buffer = ctypes.create_string_buffer(WIPE_BLOCK_SIZE_BYTES)
-        bytes_read_out = ctypes.wintypes.DWORD(0)
+        # Metric children resolved once, outside the per-block loop
+        hashed_counter = metrics.BYTES_HASHED.labels(phase)
+        throughput = metrics.DEVICE_THROUGHPUT.labels(self.device_id, f"{phase}_hash")
         
         while bytes_read < total_bytes:
             if self._is_cancelled:
@@ -123,16 +206,23 @@ class WipeEngine(QThread):
                 
             read_size = min(WIPE_BLOCK_SIZE_BYTES, total_bytes - bytes_read)
             
-            success = kernel32.ReadFile(
-                self.handle, buffer, read_size, ctypes.byref(bytes_read_out), None
-            )
+            block_start = time.perf_counter()
+            try:
+                data = self.block_device.read(read_size)
+            except WipeEngineError as e:
+                raise WipeEngineError(f"Failed to read drive for hashing at offset {bytes_read}: {e}") from e
+            block_seconds = time.perf_counter() - block_start
             
-            if not success or bytes_read_out.value == 0:
-                error_code = ctypes.get_last_error()
-                raise WipeEngineError(f"Failed to read drive for hashing. Error: {error_code}")
+            if not data:
+                raise WipeEngineError(f"Failed to read drive for hashing. Unexpected end of device at offset {bytes_read}")
                 
-            hasher.update(buffer.raw[:bytes_read_out.value])
-            bytes_read += bytes_read_out.value
+            hasher.update(data)
+            if sink is not None:
+                sink(bytes_read, data)
+            bytes_read += len(data)
+            hashed_counter.inc(len(data))
+            if block_seconds > 0:
+                throughput.observe(len(data) / block_seconds / 1e6)
             
             # Update progress (0-10% for pre, 90-100% for post)
             if phase == "pre":
@@ -147,7 +237,21 @@ class WipeEngine(QThread):
     def _compute_pre_hash(self):
         """State: LOCKED -> PRE_HASHED"""
         self.state_machine.assert_state(WipeState.LOCKED)
-        self.pre_hash = self._compute_hash("pre")
+        if self.forensic_image_dir is None:
+            with self._trace_span("pre_hash", bytes=self.device.usable_bytes):
+                self.pre_hash = self._compute_hash("pre")
+        else:
+            # One read feeds both the hash and the image; the image is complete
+            # and on disk before anything is overwritten
+            image = ForensicImageWriter(self.forensic_image_dir, self.job_id, self.device, self.device.usable_bytes)
+            try:
+                with self._trace_span("pre_hash", bytes=self.device.usable_bytes, forensic_image=True):
+                    self.pre_hash = self._compute_hash("pre", sink=image.submit)
+                with self._trace_span("forensic_image_finalize"):
+                    self.forensic_image = image.finish(self.pre_hash)
+            except Exception:
+                image.abort()
+                raise
         wipe_logger.info(f"Pre-wipe hash: {self.pre_hash}")
         self.state_machine.transition_to(WipeState.PRE_HASHED)
 
@@ -156,58 +260,64 @@ class WipeEngine(QThread):
         self.state_machine.assert_state(WipeState.PRE_HASHED)
         self.state_machine.transition_to(WipeState.OVERWRITING)
         
-        import ctypes
-        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
-        
-        total_bytes = self.device.size_bytes
+        total_bytes = self.device.usable_bytes
         passes = self.strategy.passes
+        wiped_counter = metrics.BYTES_WIPED.labels(self.strategy.name)
+        throughput = metrics.DEVICE_THROUGHPUT.labels(self.device_id, "overwrite")
         
         for pass_idx in range(passes):
-            # Seek to beginning for each pass
-            kernel32.SetFilePointer(self.handle, 0, None, 0)
-            
-            bytes_written = 0
-            block_data = self.strategy.get_block(pass_idx)
-            
-            while bytes_written < total_bytes:
-                if self._is_cancelled:
-                    raise WipeEngineError("Operation cancelled by user.")
-                    
-                write_size = min(WIPE_BLOCK_SIZE_BYTES, total_bytes - bytes_written)
-                bytes_written_out = ctypes.wintypes.DWORD(0)
+            with self._trace_span(f"pass {pass_idx+1}/{passes}", pattern_pass=pass_idx, bytes=total_bytes):
+                # Seek to beginning for each pass
+                self.block_device.seek(0)
                 
-                success = kernel32.WriteFile(
-                    self.handle, block_data, write_size, ctypes.byref(bytes_written_out), None
-                )
+                bytes_written = 0
+                block_data = self.strategy.get_block(pass_idx)
                 
-                if not success or bytes_written_out.value == 0:
-                    error_code = ctypes.get_last_error()
-                    raise WipeEngineError(f"Write failed at offset {bytes_written}. Error: {error_code}")
+                while bytes_written < total_bytes:
+                    if self._is_cancelled:
+                        raise WipeEngineError("Operation cancelled by user.")
+                        
+                    write_size = min(WIPE_BLOCK_SIZE_BYTES, total_bytes - bytes_written)
                     
-                bytes_written += bytes_written_out.value
-                
-                # Calculate overall progress (10% to 90%)
-                pass_progress = bytes_written / total_bytes
-                overall_progress = 10 + int(((pass_idx + pass_progress) / passes) * 80)
-                
-                self.progress_updated.emit(
-                    overall_progress, 
-                    f"Wiping (Pass {pass_idx+1}/{passes})... {int(pass_progress*100)}%"
-                )
-                
-            # Flush buffers after each pass
-            kernel32.FlushFileBuffers(self.handle)
-            wipe_logger.info(f"Completed pass {pass_idx+1}/{passes}")
+                    block_start = time.perf_counter()
+                    try:
+                        written = self.block_device.write(block_data, write_size)
+                    except WipeEngineError as e:
+                        raise WipeEngineError(f"Write failed at offset {bytes_written}: {e}") from e
+                    block_seconds = time.perf_counter() - block_start
+                    
+                    if written == 0:
+                        raise WipeEngineError(f"Write failed at offset {bytes_written}. No bytes written")
+                        
+                    bytes_written += written
+                    wiped_counter.inc(written)
+                    if block_seconds > 0:
+                        throughput.observe(written / block_seconds / 1e6)
+                    
+                    # Calculate overall progress (10% to 90%)
+                    pass_progress = bytes_written / total_bytes
+                    overall_progress = 10 + int(((pass_idx + pass_progress) / passes) * 80)
+                    
+                    self.progress_updated.emit(
+                        overall_progress, 
+                        f"Wiping (Pass {pass_idx+1}/{passes})... {int(pass_progress*100)}%"
+                    )
+                    
+                # Flush buffers after each pass
+                with self._trace_span("flush"):
+                    self.block_device.flush()
+                    wipe_logger.info(f"Completed pass {pass_idx+1}/{passes}")
 
     def _compute_post_hash(self):
         """State: OVERWRITING -> VERIFYING"""
         self.state_machine.assert_state(WipeState.OVERWRITING)
         self.state_machine.transition_to(WipeState.VERIFYING)
         
-        self.post_hash = self._compute_hash("post")
+        with self._trace_span("post_hash", bytes=self.device.usable_bytes):
+            self.post_hash = self._compute_hash("post")
         wipe_logger.info(f"Post-wipe hash: {self.post_hash}")
         
-        if self.pre_hash == self.post_hash and self.device.size_bytes > 0:
+        if self.pre_hash == self.post_hash and self.device.usable_bytes > 0:
             # If hashes match, the data didn't change (wipe failed silently)
             raise WipeEngineError("Pre and Post hashes match. Wipe operation failed to modify data.")
 
@@ -217,32 +327,42 @@ class WipeEngine(QThread):
         self.end_time = time.time()
         self.state_machine.transition_to(WipeState.COMPLETED)
         
+        # Only a wipe that overwrote the full reported size is a SUCCESS; a
+        # counterfeit's certificate states that its real storage alone was wiped
+        status = "COUNTERFEIT_PARTIAL" if self.device.usable_bytes < self.device.size_bytes else "SUCCESS"
         result = {
+            "job_id": self.job_id,
             "device_id": self.device.device_id,
             "model": self.device.model,
             "serial": self.device.serial_number,
             "size_bytes": self.device.size_bytes,
+            "verified_capacity_bytes": self.device.verified_capacity_bytes,
             "method": self.strategy.name,
             "passes": self.strategy.passes,
             "nist_standard": self.strategy.nist_standard,
             "operator": self.operator_name,
             "pre_hash": self.pre_hash,
             "post_hash": self.post_hash,
+            "forensic_image": self.forensic_image,
             "start_time": self.start_time,
             "end_time": self.end_time,
-            "status": "SUCCESS"
+            "status": status
         }
         
-        wipe_logger.info(f"Wipe completed successfully for {self.device_id}")
+        if status == "SUCCESS":
+            wipe_logger.info(f"Wipe completed successfully for {self.device_id}")
+        else:
+            wipe_logger.warning(f"Wipe of {self.device_id} completed over its {self.device.usable_bytes} real bytes only "
+                                f"(reports {self.device.size_bytes}): {status}")
+        self.result = result
         self.wipe_completed.emit(result)
 
     def _safe_release(self):
         """Ensure resources are released regardless of success or failure."""
         try:
-            if self.handle != INVALID_HANDLE_VALUE:
-                unlock_volume(self.handle)
-                close_handle(self.handle)
-                self.handle = INVALID_HANDLE_VALUE
+            if self.block_device is not None:
+                self.block_device.close()
+                self.block_device = None
                 wipe_logger.info(f"Released handle for {self.device_id}")
         except Exception as e:
             log_error_event("wipe_engine", "_safe_release", f"Error releasing handle: {e}")
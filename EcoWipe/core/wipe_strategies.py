@@ -5,9 +5,6 @@ Wipe Strategies and Data Generation
 import os
 from typing import Iterator, Tuple
 
-import sys
-# Ensure utils can be imported
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.constants import WIPE_BLOCK_SIZE_BYTES
 
 class WipeStrategy:
@@ -15,6 +12,8 @@ class WipeStrategy:
     name: str = "Unknown"
     passes: int = 0
     nist_standard: str = "Unknown"
+    # Passes writing fresh random data; every other pass writes a fixed, reproducible pattern
+    random_passes: Tuple[int, ...] = ()
 
     def get_block(self, pass_index: int, block_size: int = WIPE_BLOCK_SIZE_BYTES) -> bytes:
         """Generate a block of data for the given pass."""
@@ -34,6 +33,7 @@ class RandomPassStrategy(WipeStrategy):
     name = "1-Pass Random"
     passes = 1
     nist_standard = "Clear"
+    random_passes = (0,)
 
     def get_block(self, pass_index: int, block_size: int = WIPE_BLOCK_SIZE_BYTES) -> bytes:
         return os.urandom(block_size)
@@ -43,6 +43,7 @@ class DoD522022MStrategy(WipeStrategy):
     name = "DoD 5220.22-M (3-Pass)"
     passes = 3
     nist_standard = "DoD 5220.22-M"
+    random_passes = (2,)
 
     def get_block(self, pass_index: int, block_size: int = WIPE_BLOCK_SIZE_BYTES) -> bytes:
         if pass_index == 0:
@@ -6,12 +6,23 @@ import sys
 import ctypes
 from PyQt6.QtWidgets import QApplication, QMessageBox
 
-# Ensure the current directory is in the path
+# Ensure the current directory is in the path (entry points set up the import
+# path once; library modules never modify it)
 import os
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from ui.main_window import MainWindow
-from core.logging_engine import log_security_event
+from core.logging_engine import log_security_event, error_logger
+
+def log_unhandled_exception(exc_type, exc_value, exc_tb) -> None:
+    """
+    PyQt aborts the process on an exception escaping a slot, skipping atexit;
+    a CRITICAL record blocks until the log pipeline has written everything
+    queued before it, so the cause of the crash reaches disk.
+    """
+    error_logger.critical("Unhandled exception", exc_info=(exc_type, exc_value, exc_tb),
+                          extra={"custom_module": "main", "custom_funcName": "excepthook"})
+    sys.__excepthook__(exc_type, exc_value, exc_tb)
 
 def is_admin() -> bool:
     """Check if the application is running with Administrator privileges."""
@@ -21,6 +32,7 @@ def is_admin() -> bool:
         return False
 
 def main():
+    sys.excepthook = log_unhandled_exception
     app = QApplication(sys.argv)
     
     # Enforce Administrator Privileges
@@ -0,0 +1,16 @@
+"""
+Enterprise Data Sanitization Platform
+Test Configuration
+
+Run from the EcoWipe directory:
+    python -m pytest -q tests
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The logging engine opens logs/ (and the audit chain) in the working directory
+# when first imported; keep the test run's logs out of the source tree
+os.chdir(tempfile.mkdtemp(prefix="ecowipe-tests-"))
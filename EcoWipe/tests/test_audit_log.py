@@ -0,0 +1,119 @@
+"""
+Enterprise Data Sanitization Platform
+Audit Chain Tests
+"""
+import json
+import logging
+import os
+
+from core.audit_log import (
+    GENESIS_HASH, build_audit_entry, last_chain_state, process_audit_paths, process_audit_pids,
+    set_aside_torn_tail, verify_chain,
+)
+
+def _record(message: str) -> logging.LogRecord:
+    record = logging.LogRecord("wipe", logging.INFO, __file__, 0, message, None, None)
+    record.custom_module, record.custom_funcName = "tests", "audit"
+    return record
+
+def _write_chain(path: str, count: int) -> list:
+    entries = []
+    seq, prev = last_chain_state(path)
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        for i in range(count):
+            entry = build_audit_entry(_record(f"event {seq + i + 1}"), seq + i + 1, prev)
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            prev = entry["hash"]
+            entries.append(entry)
+    return entries
+
+def test_chain_verifies_from_genesis(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    _write_chain(path, 5)
+    result = verify_chain(path)
+    assert result.valid and result.anchored
+    assert (result.entries, result.first_seq, result.last_seq) == (5, 1, 5)
+
+def test_empty_log_starts_at_genesis(tmp_path):
+    assert last_chain_state(str(tmp_path / "audit.jsonl")) == (0, GENESIS_HASH)
+
+def test_modified_entry_breaks_chain(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    _write_chain(path, 4)
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    entry = json.loads(lines[1])
+    entry["message"] = "rewritten"
+    lines[1] = json.dumps(entry, separators=(",", ":")) + "\n"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.writelines(lines)
+    result = verify_chain(path)
+    assert not result.valid
+    assert "entry 2 was modified" in result.error
+
+def test_removed_entry_breaks_chain(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    _write_chain(path, 4)
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.writelines(lines[:2] + lines[3:])
+    result = verify_chain(path)
+    assert not result.valid
+    assert "sequence jumps from 2 to 4" in result.error
+
+def test_intact_file_is_left_alone(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    _write_chain(path, 3)
+    size = os.path.getsize(path)
+    assert set_aside_torn_tail(path) is None
+    assert os.path.getsize(path) == size
+
+def test_torn_last_line_is_set_aside_and_chain_resumes(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    entries = _write_chain(path, 3)
+    intact = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(b'{"seq": 4, "ts')
+    assert last_chain_state(path) == (3, entries[-1]["hash"])
+
+    message = set_aside_torn_tail(path)
+    assert "after entry 3" in message
+    assert os.path.getsize(path) == intact
+    side_files = [name for name in os.listdir(tmp_path) if ".torn-" in name]
+    assert len(side_files) == 1
+    with open(tmp_path / side_files[0], "rb") as f:
+        assert f.read() == b'{"seq": 4, "ts'
+
+    _write_chain(path, 2)
+    result = verify_chain(path)
+    assert result.valid and result.last_seq == 5
+
+def test_unreadable_complete_lines_are_set_aside(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    entries = _write_chain(path, 2)
+    with open(path, "ab") as f:
+        f.write(b"\x00\x00garbage\n{\"seq\":\n")
+    assert set_aside_torn_tail(path) is not None
+    assert last_chain_state(path) == (2, entries[-1]["hash"])
+    assert verify_chain(path).valid
+
+def test_side_file_is_not_a_rotated_segment(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    _write_chain(path, 2)
+    with open(path, "ab") as f:
+        f.write(b"{")
+    set_aside_torn_tail(path)
+    assert verify_chain(path).segments == 1
+
+def test_process_chains_are_found(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    index = str(tmp_path / "audit_index.db")
+    log_path, index_path = process_audit_paths(path, index, 4242)
+    assert os.path.basename(log_path) == "audit-p4242.jsonl"
+    assert os.path.basename(index_path) == "audit_index-p4242.db"
+    _write_chain(path, 1)
+    _write_chain(log_path, 2)
+    assert process_audit_pids(path) == [4242]
+    assert verify_chain(log_path).entries == 2
+    assert verify_chain(path).entries == 1
@@ -0,0 +1,112 @@
+"""
+Enterprise Data Sanitization Platform
+Capacity Probe Tests
+"""
+import pytest
+
+from core.capacity_probe import probe_capacity, probe_offsets
+from core.exception_types import DeviceIOError, DeviceRemovedError, WipeEngineError
+from core.simulated_device import DeviceProfile, Fault, SimulatedBlockDevice
+from utils.constants import CAPACITY_PROBE_SECTOR_BYTES
+
+SIZE = 8 * 1024**2
+SECTOR = CAPACITY_PROBE_SECTOR_BYTES
+
+def _device(**profile) -> SimulatedBlockDevice:
+    return SimulatedBlockDevice("probe", DeviceProfile(size_bytes=SIZE, **profile))
+
+def test_offsets_are_sector_aligned_and_include_every_power_of_two():
+    offsets = probe_offsets(SIZE)
+    assert offsets == sorted(set(offsets))
+    assert offsets[0] == 0 and offsets[-1] == SIZE - SECTOR
+    assert all(offset % SECTOR == 0 for offset in offsets)
+    power = SECTOR
+    while power < SIZE:
+        assert power in offsets
+        power *= 2
+
+def test_genuine_device_is_verified_in_full_and_restored():
+    device = _device()
+    original = device.read_back()
+    result = probe_capacity(device, SIZE)
+    assert result.verified_bytes == SIZE and not result.counterfeit
+    assert result.aliases == [] and result.io_errors == 0
+    assert device.read_back() == original
+
+@pytest.mark.parametrize("real", [SIZE // 2, SIZE // 8, 64 * 1024])
+def test_wrapping_counterfeit_is_found_at_its_real_capacity(real):
+    device = _device(real_capacity_bytes=real)
+    original = device.read_back()
+    result = probe_capacity(device, SIZE)
+    assert result.verified_bytes == real and result.counterfeit
+    assert result.aliases
+    assert device.read_back() == original
+
+@pytest.mark.parametrize("real", [SIZE // 4, 3 * 1024**2 + 5 * SECTOR])
+def test_counterfeit_failing_past_its_storage_is_found_at_its_real_capacity(real):
+    device = _device(real_capacity_bytes=real, overflow="error")
+    original = device.read_back(real)
+    result = probe_capacity(device, SIZE)
+    assert result.verified_bytes == real
+    assert result.io_errors > 0
+    assert device.read_back(real) == original
+
+@pytest.mark.parametrize("op", ["read", "write"])
+def test_transient_error_at_a_probe_offset_is_retried(op):
+    device = _device(faults=[Fault(1024**2, kind="error", op=op, length=SECTOR, times=1)])
+    original = device.read_back()
+    result = probe_capacity(device, SIZE)
+    assert result.verified_bytes == SIZE and not result.counterfeit
+    assert result.io_errors == 1
+    assert device.read_back() == original
+
+@pytest.mark.parametrize("bad", [1024**2, SIZE - SECTOR])
+def test_persistent_read_error_on_a_genuine_device_fails_the_probe(bad):
+    device = _device(faults=[Fault(bad, kind="error", op="read", length=SECTOR, times=None)])
+    original = device.read_back()
+    with pytest.raises(WipeEngineError, match=f"persistently fails I/O at offset {bad}"):
+        probe_capacity(device, SIZE)
+    assert device.read_back() == original
+
+def test_persistent_error_inside_the_search_range_fails_the_probe():
+    # A wrapping fake, plus one bad sector between its real capacity and the next probe offset
+    real = SIZE // 2
+    bad = real - 3 * SECTOR
+    device = _device(real_capacity_bytes=real, faults=[Fault(bad, kind="error", op="read", length=SECTOR, times=None)])
+    assert bad not in probe_offsets(SIZE)
+    with pytest.raises(WipeEngineError, match=f"offset {bad}"):
+        probe_capacity(device, SIZE)
+
+def test_removal_is_reported_not_masked_by_the_failed_restore():
+    device = _device(remove_after_bytes=64 * SECTOR)
+    with pytest.raises(DeviceRemovedError):
+        probe_capacity(device, SIZE)
+
+class _FailingRestore(SimulatedBlockDevice):
+    """Accepts probe tags everywhere, but fails to write anything else back at one offset."""
+    def __init__(self, bad: int):
+        super().__init__("restore", DeviceProfile(size_bytes=SIZE))
+        self.bad = bad
+
+    def write(self, data: bytes, size: int) -> int:
+        if self.position == self.bad and not bytes(data[:8]) == b"EWPROBE1":
+            raise DeviceIOError("Write failed. Error: 23", 23)
+        return super().write(data, size)
+
+def test_sector_that_cannot_be_restored_fails_the_probe():
+    with pytest.raises(WipeEngineError, match="could not restore 1 sector"):
+        probe_capacity(_FailingRestore(1024**2), SIZE)
+
+def test_cancellation_stops_the_probe_and_restores():
+    device = _device()
+    original = device.read_back()
+    calls = []
+
+    def cancelled() -> bool:
+        # Checked once per read: stop while reading the tags back, after all were written
+        calls.append(None)
+        return len(calls) > len(probe_offsets(SIZE)) + 10
+
+    with pytest.raises(WipeEngineError, match="cancelled"):
+        probe_capacity(device, SIZE, cancelled=cancelled)
+    assert device.read_back() == original
@@ -0,0 +1,109 @@
+"""
+Enterprise Data Sanitization Platform
+Certificate Store Tests
+"""
+import csv
+import io
+import json
+import types
+
+import pytest
+
+from core.certificate_store import CSV_COLUMNS, CertificateStore
+from core.exception_types import CertificateError
+
+def _certificate(number: int, serial: str = "SN1", operator: str = "alice") -> dict:
+    return {
+        "certificate_id": f"cert-{number:04d}",
+        "timestamp_utc": f"2026-10-{1 + number // 100:02d}T10:{number // 60 % 60:02d}:{number % 60:02d}+00:00",
+        "operator": operator,
+        "device": {"serial_number": serial, "model": "SanDisk Ultra"},
+        "wipe_details": {"method": "Zero Fill", "status": "SUCCESS"},
+        "payload_hash": f"{number:064x}",
+    }
+
+@pytest.fixture
+def store(tmp_path):
+    with CertificateStore(str(tmp_path / "certificates.db")) as store:
+        yield store
+
+def test_get_returns_the_stored_document(store):
+    certificate = _certificate(1)
+    store.add(certificate, "/certs/cert-0001.json")
+    assert store.get("cert-0001") == certificate
+    assert store.get("missing") is None
+
+def test_find_filters_by_serial_operator_and_time(store):
+    for number in range(6):
+        store.add(_certificate(number, serial=f"SN{number % 2}", operator="alice" if number < 3 else "bob"))
+    assert [c["certificate_id"] for c in store.find(serial="SN0")] == ["cert-0000", "cert-0002", "cert-0004"]
+    assert [c["certificate_id"] for c in store.find(serial="SN1", operator="bob")] == ["cert-0003", "cert-0005"]
+    since, until = _certificate(2)["timestamp_utc"], _certificate(4)["timestamp_utc"]
+    assert [c["certificate_id"] for c in store.find(since=since, until=until)] == ["cert-0002", "cert-0003"]
+    assert len(list(store.find(limit=4))) == 4
+
+def test_duplicate_in_a_batch_does_not_discard_the_other_pending_certificates(tmp_path):
+    path = str(tmp_path / "certificates.db")
+    with CertificateStore(path, batch_size=10) as store:
+        store.add(_certificate(1))
+        store.add(_certificate(2))
+        with pytest.raises(CertificateError, match="cert-0001"):
+            store.add(_certificate(1))
+        store.add(_certificate(3))
+    with CertificateStore(path, read_only=True) as reader:
+        assert [c["certificate_id"] for c in reader.find()] == ["cert-0001", "cert-0002", "cert-0003"]
+
+def test_pending_batch_is_invisible_until_flushed(tmp_path):
+    with CertificateStore(str(tmp_path / "certificates.db"), batch_size=10) as store:
+        store.add(_certificate(1))
+        # Exports read through their own connection, so they only see committed certificates
+        assert list(store.find()) == []
+        store.flush()
+        assert len(list(store.find())) == 1
+
+def test_read_only_store_rejects_writes(tmp_path):
+    path = str(tmp_path / "certificates.db")
+    CertificateStore(path).close()
+    with CertificateStore(path, read_only=True) as reader:
+        with pytest.raises(CertificateError, match="read-only"):
+            reader.add(_certificate(1))
+
+def test_read_only_store_must_exist(tmp_path):
+    with pytest.raises(CertificateError):
+        CertificateStore(str(tmp_path / "missing.db"), read_only=True)
+
+def test_exports_stream_every_matching_row(store):
+    for number in range(1234):
+        store.add(_certificate(number, serial="SN0" if number % 3 else "SN1"))
+    matches = store.find(serial="SN1")
+    assert isinstance(matches, types.GeneratorType)
+
+    out = io.StringIO()
+    assert store.export_jsonl(out, serial="SN1") == 412
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 412
+    assert json.loads(lines[0]) == _certificate(0, serial="SN1")
+    assert [json.loads(line) for line in lines] == list(matches)
+
+    out = io.StringIO()
+    assert store.export_csv(out, limit=3) == 3
+    rows = list(csv.reader(io.StringIO(out.getvalue())))
+    assert tuple(rows[0]) == CSV_COLUMNS
+    assert [row[0] for row in rows[1:]] == ["cert-0000", "cert-0001", "cert-0002"]
+
+def test_export_json_files(store, tmp_path):
+    store.add(_certificate(7))
+    assert store.export_json_files(str(tmp_path / "out")) == 1
+    with open(tmp_path / "out" / "cert_cert-0007.json", "r", encoding="utf-8") as f:
+        assert json.load(f) == _certificate(7)
+
+def test_import_json_directory_skips_known_certificates(store, tmp_path):
+    legacy = tmp_path / "legacy"
+    legacy.mkdir()
+    for number in (1, 2):
+        with open(legacy / f"cert_{number}.json", "w", encoding="utf-8") as f:
+            json.dump(_certificate(number), f)
+    (legacy / "qr_1.png").write_bytes(b"png")
+    assert store.import_json_directory(str(legacy)) == 2
+    assert store.import_json_directory(str(legacy)) == 0
+    assert store.get("cert-0002") == _certificate(2)
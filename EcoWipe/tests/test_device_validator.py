@@ -0,0 +1,94 @@
+"""
+Enterprise Data Sanitization Platform
+System Drive Cache Tests
+"""
+from typing import Dict, List, Optional, Set
+
+import pytest
+
+from core.device_validator import DeviceValidator, SystemDiskFingerprint
+from core.discovery_backends import DiscoveryBackend, DiskInfo
+
+GIB = 1024**3
+
+def _disk(index: int, serial: str, model: str = "Disk", size: int = 64 * GIB, interface: str = "USB") -> DiskInfo:
+    return DiskInfo(index, f"\\\\.\\PhysicalDrive{index}", model, serial, size, interface)
+
+class FakeBackend(DiscoveryBackend):
+    """Disks by index; the system disk is whichever disk has boot_model."""
+    name = "fake"
+
+    def __init__(self, disks: List[DiskInfo], boot_model: str):
+        self.disks: Dict[int, DiskInfo] = {disk.index: disk for disk in disks}
+        self.boot_model = boot_model
+        self.system_queries = 0
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.name}:{id(self)}"
+
+    def is_admin(self) -> bool:
+        return True
+
+    def list_disks(self) -> List[DiskInfo]:
+        return list(self.disks.values())
+
+    def get_disk(self, disk_index: int) -> Optional[DiskInfo]:
+        return self.disks.get(disk_index)
+
+    def query_system_disk_indices(self) -> Set[int]:
+        self.system_queries += 1
+        return {disk.index for disk in self.disks.values() if disk.model == self.boot_model}
+
+@pytest.fixture(autouse=True)
+def _cold_cache():
+    DeviceValidator.invalidate_all_system_drive_caches()
+    yield
+    DeviceValidator.invalidate_all_system_drive_caches()
+
+def test_fingerprint_compares_serial_model_and_size():
+    fp = SystemDiskFingerprint.of(_disk(0, "SYS1", "Boot SSD", 512 * GIB))
+    assert fp.matches(_disk(0, "SYS1", "Boot SSD", 512 * GIB))
+    assert not fp.matches(_disk(0, "SYS1", "Other", 512 * GIB))
+    assert not fp.matches(_disk(0, "SYS1", "Boot SSD", 256 * GIB))
+    assert not fp.matches(_disk(0, "SYS2", "Boot SSD", 512 * GIB))
+    assert not fp.matches(None)
+
+def test_fingerprint_without_serial_never_matches():
+    disk = _disk(0, "", "Boot SSD")
+    assert not SystemDiskFingerprint.of(disk).matches(disk)
+
+def test_cached_indices_are_reused_while_the_disks_match():
+    backend = FakeBackend([_disk(0, "SYS1", "Boot SSD"), _disk(1, "USB1")], "Boot SSD")
+    validator = DeviceValidator(backend)
+    assert validator._verified_system_drive_indices() == {0}
+    assert validator._verified_system_drive_indices() == {0}
+    assert backend.system_queries == 1
+
+def test_swapped_disk_with_same_serial_invalidates_the_cache():
+    backend = FakeBackend([_disk(0, "SYS1", "Boot SSD", 512 * GIB), _disk(1, "USB1")], "Boot SSD")
+    validator = DeviceValidator(backend)
+    assert validator._verified_system_drive_indices() == {0}
+    # Same serial at the cached index, but a different disk; the boot disk moved to index 1
+    backend.disks = {0: _disk(0, "SYS1", "Cheap Stick", 512 * GIB), 1: _disk(1, "SYS1", "Boot SSD", 512 * GIB)}
+    assert validator._verified_system_drive_indices() == {1}
+    assert backend.system_queries == 2
+
+def test_serial_less_system_disk_is_never_served_from_the_cache():
+    backend = FakeBackend([_disk(0, "", "Boot SSD"), _disk(1, "USB1")], "Boot SSD")
+    validator = DeviceValidator(backend)
+    assert validator._verified_system_drive_indices() == {0}
+    # Another serial-less disk takes index 0; the boot disk is now at index 2
+    backend.disks = {0: _disk(0, "", "Card Reader"), 1: _disk(1, "USB1"), 2: _disk(2, "", "Boot SSD")}
+    assert validator._verified_system_drive_indices() == {2}
+    assert validator._get_system_drive_indices(backend.list_disks()) == {2}
+    assert backend.system_queries == 3
+
+def test_changed_population_recomputes():
+    backend = FakeBackend([_disk(0, "SYS1", "Boot SSD"), _disk(1, "USB1")], "Boot SSD")
+    validator = DeviceValidator(backend)
+    assert validator._get_system_drive_indices(backend.list_disks()) == {0}
+    assert validator._get_system_drive_indices(backend.list_disks()) == {0}
+    backend.disks[2] = _disk(2, "USB2")
+    validator._get_system_drive_indices(backend.list_disks())
+    assert backend.system_queries == 2
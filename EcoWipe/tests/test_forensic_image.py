@@ -0,0 +1,131 @@
+"""
+Enterprise Data Sanitization Platform
+Forensic Image Tests
+"""
+import hashlib
+import json
+import os
+import random
+
+import pytest
+
+from core.device_validator import ValidatedDevice
+from core.exception_types import ForensicImageError
+from core.forensic_image import (
+    KIND_RAW, KIND_ZERO, KIND_ZLIB, MANIFEST_NAME, ForensicImageReader, ForensicImageWriter, encode_chunk,
+)
+
+KIB = 1024
+BLOCK = 4 * KIB
+CHUNK = 16 * KIB
+
+def _content() -> bytes:
+    """Incompressible, compressible and zero regions; one zero run spans three read chunks."""
+    rng = random.Random(5)
+    return (
+        rng.randbytes(24 * KIB)
+        + b"EcoWipe " * (5 * KIB)
+        + bytes(40 * KIB)
+        + rng.randbytes(6 * KIB)
+        + b"tail" * 512
+        + bytes(BLOCK + 100)
+    )
+
+def _device(size: int) -> ValidatedDevice:
+    return ValidatedDevice("\\\\.\\PhysicalDrive9", "Evidence Stick", "SN-IMG", size, "USB", False, False, 9)
+
+def _capture(image_dir: str, data: bytes, segment_bytes: int = 16 * KIB) -> str:
+    writer = ForensicImageWriter(image_dir, "job-1", _device(len(data)), len(data), segment_bytes=segment_bytes,
+                                 block_bytes=BLOCK, workers=3, queue_chunks=2)
+    for offset in range(0, len(data), CHUNK):
+        writer.submit(offset, data[offset:offset + CHUNK])
+    return writer.finish(hashlib.sha256(data).hexdigest())["manifest"]
+
+def test_encode_chunk_elides_zeros_and_stores_incompressible_blocks_raw():
+    data = os.urandom(BLOCK) + bytes(2 * BLOCK) + b"a" * BLOCK + bytes(100)
+    records = encode_chunk(1000, data, BLOCK)
+    assert [(offset, length, kind) for offset, length, kind, _ in records] == [
+        (1000, BLOCK, KIND_RAW), (1000 + BLOCK, 2 * BLOCK, KIND_ZERO),
+        (1000 + 3 * BLOCK, BLOCK, KIND_ZLIB), (1000 + 4 * BLOCK, 100, KIND_ZERO),
+    ]
+    assert records[1][3] == b""
+
+def test_image_round_trips_through_verify_and_extract(tmp_path):
+    data = _content()
+    manifest_path = _capture(str(tmp_path / "images"), data)
+    reader = ForensicImageReader(manifest_path)
+    assert reader.verify() == hashlib.sha256(data).hexdigest()
+    out = str(tmp_path / "device.img")
+    assert reader.extract(out) == hashlib.sha256(data).hexdigest()
+    with open(out, "rb") as f:
+        assert f.read() == data
+
+def test_zero_runs_are_merged_across_chunks_and_not_stored(tmp_path):
+    data = _content()
+    reader = ForensicImageReader(_capture(str(tmp_path / "images"), data))
+    zero_runs = [(offset, length) for offset, length, kind, _ in reader.iter_records() if kind == KIND_ZERO]
+    start = 24 * KIB + 40 * KIB
+    assert zero_runs[0] == (start, 40 * KIB)
+    assert zero_runs[-1] == (len(data) - BLOCK - 100, BLOCK + 100)
+    assert reader.manifest["elided_zero_bytes"] == 40 * KIB + BLOCK + 100
+    assert reader.manifest["stored_bytes"] < len(data) - reader.manifest["elided_zero_bytes"]
+
+def test_segments_roll_over_and_cover_the_device_in_order(tmp_path):
+    data = _content()
+    reader = ForensicImageReader(_capture(str(tmp_path / "images"), data, segment_bytes=8 * KIB))
+    segments = reader.manifest["segments"]
+    assert len(segments) > 3
+    assert [s["file"] for s in segments] == [f"image.{i:03d}.ewseg" for i in range(len(segments))]
+    assert segments[0]["first_offset"] == 0 and segments[-1]["end_offset"] == len(data)
+    for previous, segment in zip(segments, segments[1:]):
+        assert segment["first_offset"] == previous["end_offset"]
+        # A segment only exceeds the limit when it holds a single oversized record
+        assert previous["bytes"] <= 8 * KIB or previous["end_offset"] - previous["first_offset"] <= BLOCK
+    assert reader.verify() == hashlib.sha256(data).hexdigest()
+
+def test_tampered_segment_fails_verification(tmp_path):
+    data = _content()
+    manifest_path = _capture(str(tmp_path / "images"), data, segment_bytes=8 * KIB)
+    segment = os.path.join(os.path.dirname(manifest_path), "image.001.ewseg")
+    with open(segment, "r+b") as f:
+        f.seek(-1, os.SEEK_END)
+        last = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes([last[0] ^ 0xFF]))
+    with pytest.raises(ForensicImageError):
+        ForensicImageReader(manifest_path).verify()
+
+def test_missing_segment_fails_verification(tmp_path):
+    manifest_path = _capture(str(tmp_path / "images"), _content(), segment_bytes=8 * KIB)
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    del manifest["segments"][1]
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    with pytest.raises(ForensicImageError, match="not segment 1"):
+        ForensicImageReader(manifest_path).verify()
+
+def test_wrong_raw_hash_is_rejected(tmp_path):
+    data = _content()
+    writer = ForensicImageWriter(str(tmp_path / "images"), "job-1", _device(len(data)), len(data), block_bytes=BLOCK)
+    writer.submit(0, data)
+    manifest_path = writer.finish("00" * 32)["manifest"]
+    with pytest.raises(ForensicImageError, match="pre-wipe hash"):
+        ForensicImageReader(manifest_path).verify()
+
+def test_gaps_and_short_images_are_refused(tmp_path):
+    writer = ForensicImageWriter(str(tmp_path / "images"), "job-1", _device(2 * CHUNK), 2 * CHUNK, block_bytes=BLOCK)
+    writer.submit(0, bytes(CHUNK))
+    with pytest.raises(ForensicImageError, match="expected"):
+        writer.submit(CHUNK + 1, bytes(CHUNK))
+    with pytest.raises(ForensicImageError, match="covers"):
+        writer.finish("00" * 32)
+    writer.abort()
+    assert not os.path.exists(writer.directory)
+
+def test_existing_job_directory_is_never_reused(tmp_path):
+    data = bytes(CHUNK)
+    manifest_path = _capture(str(tmp_path / "images"), data)
+    with pytest.raises(ForensicImageError):
+        ForensicImageWriter(str(tmp_path / "images"), "job-1", _device(len(data)), len(data))
+    assert os.path.basename(manifest_path) == MANIFEST_NAME
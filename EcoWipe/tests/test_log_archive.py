@@ -0,0 +1,128 @@
+"""
+Enterprise Data Sanitization Platform
+Compressed Log Archive Search Tests
+"""
+import gzip
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from core.log_archive import (
+    SearchCriteria, SegmentReader, plan_search, read_blocks, rotated_segments, search_segment, write_archive,
+)
+from utils.constants import DATE_FORMAT
+
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools")
+START = 1_790_000_000       # 2026-09-21T13:33:20Z
+BLOCK = 2048
+
+def _line(stamp: int, level: str, message: str, module: str = "wipe_engine") -> str:
+    text = time.strftime(DATE_FORMAT, time.gmtime(stamp))
+    return f"[{text}] [{level}] [{module}] [run] {message}\n"
+
+def _write_log(path: str, first: int, count: int) -> bytes:
+    """One record a minute; every 50th is an error with a traceback."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for i in range(first, first + count):
+            if i % 50 == 0:
+                f.write(_line(START + 60 * i, "ERROR", f"Wipe failed on disk {i}"))
+                f.write("Traceback (most recent call last):\n  File \"wipe_engine.py\", line 1\nOSError: [Errno 5]\n")
+            else:
+                f.write(_line(START + 60 * i, "INFO", f"Wrote block {i}"))
+    with open(path, "rb") as f:
+        return f.read()
+
+@pytest.fixture
+def logs(tmp_path):
+    """wipe.log with two archived daily segments and a newer one still being compressed."""
+    live = str(tmp_path / "wipe.log")
+    contents = []
+    for suffix, first in ((".2026-09-20", 0), (".2026-09-21", 400), (".2026-09-22", 800)):
+        plain = live + suffix
+        contents.append(_write_log(plain, first, 400))
+        if first < 800:
+            write_archive(plain, plain + ".gz", block_size=BLOCK)
+            os.remove(plain)
+    contents.append(_write_log(live, 1200, 100))
+    return live, contents
+
+def test_archive_is_plain_gzip_of_whole_records(logs):
+    live, contents = logs
+    segment = live + ".2026-09-20.gz"
+    with gzip.open(segment, "rb") as f:
+        assert f.read() == contents[0]
+    blocks = read_blocks(segment)
+    assert len(blocks) > 5
+    assert sum(b.raw_length for b in blocks) == len(contents[0])
+    with SegmentReader(segment) as reader:
+        for block in blocks:
+            first = reader.read_line_at(block.raw_offset)
+            # Blocks start on a record, never inside a traceback
+            assert first.startswith(b"[")
+            assert block.first_ts is not None and block.first_ts <= block.last_ts
+
+def test_reader_offsets_match_the_uncompressed_segment(logs):
+    live, contents = logs
+    with SegmentReader(live + ".2026-09-21.gz") as reader:
+        lines = list(reader.iter_lines())
+        assert b"".join(line for _, line in lines) == contents[1]
+        for offset, line in lines[::37]:
+            assert contents[1][offset:offset + len(line)] == line
+            assert reader.read_line_at(offset) == line
+        assert reader.last_line() == contents[1].rstrip(b"\n").split(b"\n")[-1]
+
+def test_rotated_segments_oldest_first_including_one_still_being_compressed(logs):
+    live, _ = logs
+    names = [os.path.basename(p) for p in rotated_segments(live)]
+    assert names == ["wipe.log.2026-09-20.gz", "wipe.log.2026-09-21.gz", "wipe.log.2026-09-22.gz"]
+    with SegmentReader(live + ".2026-09-22.gz") as reader:
+        assert not reader.compressed
+
+def _search(live: str, criteria: SearchCriteria):
+    segments = rotated_segments(live) + [live]
+    tasks = list(plan_search(segments, criteria, blocks_per_task=3))
+    return tasks, [(os.path.basename(path), record) for path, blocks in tasks
+                   for _, record in search_segment(path, blocks, criteria)]
+
+def test_search_finds_records_across_rotated_blocks(logs):
+    live, _ = logs
+    _, found = _search(live, SearchCriteria(pattern=r"Wipe failed"))
+    assert [record.split("disk ")[1].split("\n")[0] for _, record in found] == [str(i) for i in range(0, 1300, 50)]
+    assert {segment for segment, _ in found} == {"wipe.log.2026-09-20.gz", "wipe.log.2026-09-21.gz",
+                                              "wipe.log.2026-09-22", "wipe.log"}
+    # The whole record, traceback included, is returned
+    assert all(record.endswith("OSError: [Errno 5]\n") for _, record in found)
+
+def test_field_filter(logs):
+    live, _ = logs
+    _, found = _search(live, SearchCriteria(fields={"level": "ERROR", "logger": "wipe"}))
+    assert len(found) == 26
+    _, found = _search(live, SearchCriteria(fields={"module": "certificate_engine"}))
+    assert found == []
+
+def test_time_range_skips_archive_blocks_by_header(logs):
+    live, _ = logs
+    since, until = START + 60 * 500, START + 60 * 520
+    criteria = SearchCriteria(since=since, until=until)
+    tasks, found = _search(live, criteria)
+    assert len(found) == 21
+    assert all(segment == "wipe.log.2026-09-21.gz" for segment, _ in found)
+    archived = [blocks for path, blocks in tasks if path.endswith(".gz")]
+    # The oldest segment is skipped entirely; only the overlapping blocks of the other are inflated
+    assert all(path.endswith(("wipe.log.2026-09-21.gz", "wipe.log.2026-09-22", "wipe.log")) for path, _ in tasks)
+    assert 0 < sum(len(blocks) for blocks in archived) < len(read_blocks(live + ".2026-09-21.gz"))
+
+def test_search_tool_prints_matches_in_segment_order(logs):
+    live, _ = logs
+    result = subprocess.run(
+        [sys.executable, os.path.join(TOOLS_DIR, "search_logs.py"), "--log-dir", os.path.dirname(live),
+         "--log", "wipe", "--field", "level=ERROR", "--workers", "2", "--json"],
+        capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    matches = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [m["record"].split("disk ")[1].split("\n")[0] for m in matches] == [str(i) for i in range(0, 1300, 50)]
@@ -0,0 +1,108 @@
+"""
+Enterprise Data Sanitization Platform
+Merkle Inclusion Proof Tests
+"""
+import copy
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.certificate_schema import compute_payload_hash
+from core.certificate_verifier import verify_certificate
+from core.merkle_signer import MerkleBatchSigner, build_merkle_tree, merkle_root_from_proof
+from core.security_engine import SecurityEngine, load_public_key
+
+def _hashes(count: int) -> list:
+    return [hashlib.sha256(str(i).encode()).hexdigest() for i in range(count)]
+
+@pytest.mark.parametrize("count", [1, 2, 3, 5, 7, 8, 13])
+def test_every_leaf_proves_inclusion(count):
+    hashes = _hashes(count)
+    root, paths = build_merkle_tree(hashes)
+    for payload_hash, path in zip(hashes, paths):
+        assert merkle_root_from_proof(payload_hash, path) == root.hex()
+
+def test_odd_node_is_promoted_not_duplicated():
+    hashes = _hashes(3)
+    root, paths = build_merkle_tree(hashes)
+    # Leaf 2 has no sibling on the first level; duplicating it would add a step
+    assert len(paths[2]) == 1 and len(paths[0]) == 2
+    # A fourth leaf equal to the third must not produce the same root
+    assert build_merkle_tree(hashes + hashes[2:])[0] != root
+
+def test_single_leaf_has_an_empty_path():
+    root, paths = build_merkle_tree(_hashes(1))
+    assert paths == [[]]
+    assert merkle_root_from_proof(_hashes(1)[0], []) == root.hex()
+
+def test_empty_tree_is_rejected():
+    with pytest.raises(ValueError):
+        build_merkle_tree([])
+
+def test_tampered_path_does_not_reach_the_root():
+    hashes = _hashes(5)
+    root, paths = build_merkle_tree(hashes)
+    flipped = copy.deepcopy(paths[1])
+    flipped[0][0] = "L" if flipped[0][0] == "R" else "R"
+    altered = copy.deepcopy(paths[1])
+    altered[1][1] = "00" * 32
+    for path in (flipped, altered, paths[1][:-1], paths[0]):
+        assert merkle_root_from_proof(hashes[1], path) != root.hex()
+    with pytest.raises(ValueError):
+        merkle_root_from_proof(hashes[1], [["X", "00" * 32]])
+
+@pytest.fixture(scope="module")
+def signed(tmp_path_factory):
+    """Three certificates signed in one batch, and the station public key."""
+    key_dir = str(tmp_path_factory.mktemp("keys"))
+    engine = SecurityEngine(key_dir, algorithm="ed25519")
+    signer = MerkleBatchSigner(engine, max_batch_size=3, max_latency_s=5.0)
+    certificates = []
+    for i in range(3):
+        certificate = {"certificate_id": f"cert-{i}", "signature_algorithm": "ed25519", "device": {"serial_number": f"SN{i}"}}
+        certificate["payload_hash"] = compute_payload_hash(certificate)
+        certificates.append(certificate)
+    try:
+        with ThreadPoolExecutor(3) as pool:
+            results = list(pool.map(signer.sign, [c["payload_hash"] for c in certificates]))
+    finally:
+        signer.close()
+    for certificate, (signature, proof) in zip(certificates, results):
+        certificate["signature"], certificate["merkle_proof"] = signature, proof
+    return certificates, load_public_key(engine.public_key_path)
+
+def test_one_signature_covers_the_batch(signed):
+    certificates, public_key = signed
+    assert len({c["signature"] for c in certificates}) == 1
+    assert {c["merkle_proof"]["leaf_count"] for c in certificates} == {3}
+    for certificate in certificates:
+        assert verify_certificate(certificate, public_key) is None
+
+def test_tampered_proof_fails_verification(signed):
+    certificates, public_key = signed
+    certificate = copy.deepcopy(certificates[2])
+    certificate["merkle_proof"]["path"][0][1] = "11" * 32
+    assert verify_certificate(certificate, public_key) == "merkle proof does not lead to the signed root"
+    certificate = copy.deepcopy(certificates[0])
+    certificate["merkle_proof"]["root"] = certificates[0]["payload_hash"]
+    assert verify_certificate(certificate, public_key) == "merkle proof does not lead to the signed root"
+
+def test_proof_of_another_certificate_fails_verification(signed):
+    certificates, public_key = signed
+    certificate = copy.deepcopy(certificates[0])
+    certificate["merkle_proof"] = copy.deepcopy(certificates[1]["merkle_proof"])
+    assert verify_certificate(certificate, public_key) is not None
+
+def test_stripped_proof_fails_verification(signed):
+    certificates, public_key = signed
+    certificate = copy.deepcopy(certificates[1])
+    del certificate["merkle_proof"]
+    # The signature covers the root, not the bare payload hash
+    assert verify_certificate(certificate, public_key).startswith("invalid signature")
+
+def test_malformed_proof_is_reported(signed):
+    certificates, public_key = signed
+    certificate = copy.deepcopy(certificates[0])
+    certificate["merkle_proof"] = {"root": "ab"}
+    assert verify_certificate(certificate, public_key).startswith("malformed merkle proof")
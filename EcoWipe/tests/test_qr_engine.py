@@ -0,0 +1,68 @@
+"""
+Enterprise Data Sanitization Platform
+QR Engine Verification Tests
+"""
+import cv2
+import numpy as np
+import pytest
+
+from core.exception_types import CertificateError
+from core.qr_engine import QREngine
+from utils.constants import QR_BORDER, QR_BOX_SIZE
+
+DATA = "EW1:" + "0123456789ABCDEFGHIJ" * 8
+
+@pytest.mark.parametrize("mode", ["decode", "structural"])
+def test_verified_code_is_written_and_decodes(tmp_path, mode):
+    path = str(tmp_path / "qr.png")
+    assert QREngine.generate_and_verify(DATA, path, mode) == path
+    assert QREngine.decode_image(cv2.imread(path, cv2.IMREAD_GRAYSCALE)) == DATA
+
+def _corrupt_render(monkeypatch, damage):
+    render = QREngine.render
+
+    def corrupted(modules, box_size=QR_BOX_SIZE, border=QR_BORDER):
+        image = render(modules, box_size, border).copy()
+        damage(image, box_size, border)
+        return image
+
+    monkeypatch.setattr(QREngine, "render", staticmethod(corrupted))
+
+def _flip_module(image, box_size, border):
+    # One data module, away from the finder patterns
+    top = (border + 9) * box_size
+    image[top:top + box_size, top:top + box_size] ^= 0xFF
+
+def _smear_quiet_zone(image, box_size, border):
+    image[:box_size, :] = 0
+
+@pytest.mark.parametrize("damage", [_flip_module, _smear_quiet_zone])
+def test_structural_mode_rejects_a_rendering_that_differs_from_the_encoder(tmp_path, monkeypatch, damage):
+    _corrupt_render(monkeypatch, damage)
+    path = tmp_path / "qr.png"
+    with pytest.raises(CertificateError):
+        QREngine.generate_and_verify(DATA, str(path), "structural")
+    assert not path.exists()
+
+def test_decode_mode_rejects_an_unreadable_rendering_before_writing(tmp_path, monkeypatch):
+    def blank(image, box_size, border):
+        image[:] = 255
+
+    _corrupt_render(monkeypatch, blank)
+    path = tmp_path / "qr.png"
+    with pytest.raises(CertificateError):
+        QREngine.generate_and_verify(DATA, str(path), "decode")
+    assert not path.exists()
+
+def test_rejects_empty_data_and_unknown_mode(tmp_path):
+    with pytest.raises(CertificateError):
+        QREngine.generate_and_verify("", str(tmp_path / "qr.png"))
+    with pytest.raises(CertificateError, match="verification mode"):
+        QREngine.generate_and_verify(DATA, str(tmp_path / "qr.png"), "pixels")
+
+def test_render_is_black_on_white_with_a_quiet_zone():
+    modules = np.array([[True, False], [False, True]])
+    image = QREngine.render(modules, box_size=2, border=1)
+    assert image.shape == (8, 8) and image.dtype == np.uint8
+    assert (image[:2, :] == 255).all()
+    assert (image[2:4, 2:4] == 0).all() and (image[2:4, 4:6] == 255).all()
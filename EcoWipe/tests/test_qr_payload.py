@@ -0,0 +1,113 @@
+"""
+Enterprise Data Sanitization Platform
+Certificate QR Payload Tests
+"""
+import base64
+import hashlib
+import json
+import os
+
+import pytest
+
+from core.exception_types import CertificateError
+from core.qr_payload import QR_PAYLOAD_PREFIX, base45_decode, base45_encode, decode_qr_payload, encode_qr_payload
+
+def _certificate() -> dict:
+    digest = hashlib.sha256(b"device").hexdigest()
+    return {
+        "schema_version": 2,
+        "certificate_id": "0b6f3c1e-4d3a-4f7e-9b1c-2a5d6e7f8091",
+        "timestamp_utc": "2026-10-19T10:00:00+00:00",
+        "app_version": "1.0.0",
+        "signature_algorithm": "ecdsa-p256-sha256",
+        "operator": "Jöhn Dœ",
+        "device": {
+            "id": "\\\\.\\PHYSICALDRIVE2", "model": "SanDisk Ultra", "serial_number": "4C530001230405",
+            "size_bytes": 64 * 1024**3, "verified_capacity_bytes": None,
+        },
+        "wipe_details": {
+            "method": "DoD 5220.22-M (3-Pass)", "passes": 3, "nist_standard": "DoD 5220.22-M",
+            "pre_hash_sha256": digest, "post_hash_sha256": digest.upper(),
+            "start_time_unix": 1792404000.25, "end_time_unix": 1792407600.5, "status": "COMPLETED",
+            "forensic_image": None,
+        },
+        "payload_hash": digest,
+        "signature": base64.b64encode(os.urandom(72)).decode("ascii"),
+        "merkle_proof": {"root": digest, "leaf_index": 0, "leaf_count": 1, "path": []},
+        "extension": {"flag": True, "other": False, "negative": -17, "big": 2**40},
+    }
+
+@pytest.mark.parametrize("data", [b"", b"A", b"AB", b"ietf!", bytes(range(256))])
+def test_base45_round_trip(data):
+    assert base45_decode(base45_encode(data)) == data
+
+def test_base45_rfc_vectors():
+    assert base45_encode(b"AB") == "BB8"
+    assert base45_encode(b"Hello!!") == "%69 VD92EX0"
+    assert base45_decode("QED8WEX0") == b"ietf!"
+
+@pytest.mark.parametrize("text", ["GGW", "A", "a12"])
+def test_base45_rejects_invalid_text(text):
+    with pytest.raises(ValueError):
+        base45_decode(text)
+
+def test_certificate_round_trips_exactly():
+    certificate = _certificate()
+    text = encode_qr_payload(certificate)
+    assert text.startswith(QR_PAYLOAD_PREFIX)
+    decoded = decode_qr_payload(text)
+    assert decoded == certificate
+    # Key order and value types survive, so the signed canonical JSON is unchanged
+    assert json.dumps(decoded, sort_keys=True) == json.dumps(certificate, sort_keys=True)
+    assert list(decoded) == list(certificate)
+
+def test_payload_is_smaller_than_legacy_base64_json():
+    certificate = _certificate()
+    legacy = base64.b64encode(json.dumps(certificate).encode("utf-8")).decode("ascii")
+    assert len(encode_qr_payload(certificate)) < len(legacy)
+
+def test_legacy_base64_json_payload_still_decodes():
+    certificate = _certificate()
+    legacy = base64.b64encode(json.dumps(certificate).encode("utf-8")).decode("ascii")
+    assert decode_qr_payload(legacy) == certificate
+
+def test_payload_is_qr_alphanumeric():
+    alphabet = set("0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:")
+    assert set(encode_qr_payload(_certificate())) <= alphabet
+
+@pytest.mark.parametrize("text", [
+    QR_PAYLOAD_PREFIX,
+    QR_PAYLOAD_PREFIX + "GGW",
+    QR_PAYLOAD_PREFIX + base45_encode(b"\x02abc"),
+    QR_PAYLOAD_PREFIX + base45_encode(b"\x01not zlib"),
+    "not a payload!",
+    base64.b64encode(b"[1, 2]").decode("ascii"),
+])
+def test_malformed_payloads_raise_certificate_error(text):
+    with pytest.raises(CertificateError):
+        decode_qr_payload(text)
+
+def test_truncated_payload_raises_certificate_error():
+    text = encode_qr_payload(_certificate())
+    with pytest.raises(CertificateError):
+        decode_qr_payload(text[:len(text) // 2 // 3 * 3])
+
+@pytest.mark.parametrize("depth", [17, 100_000])
+def test_deeply_nested_payload_raises_certificate_error(depth):
+    # CBOR: a map with one key holding `depth` nested single-element arrays
+    body = b"\xa1\x00" + b"\x81" * depth + b"\x00"
+    with pytest.raises(CertificateError, match="nesting"):
+        decode_qr_payload(QR_PAYLOAD_PREFIX + base45_encode(b"\x00" + body))
+
+def test_deeply_nested_legacy_payload_raises_certificate_error():
+    legacy = base64.b64encode(b"[" * 100_000 + b"]" * 100_000).decode("ascii")
+    with pytest.raises(CertificateError):
+        decode_qr_payload(legacy)
+
+def test_nesting_within_the_limit_decodes():
+    body = b"\xa1\x00" + b"\x81" * 15 + b"\x00"
+    value = decode_qr_payload(QR_PAYLOAD_PREFIX + base45_encode(b"\x00" + body))["schema_version"]
+    for _ in range(15):
+        assert isinstance(value, list) and len(value) == 1
+        value = value[0]
+    assert value == 0
@@ -0,0 +1,73 @@
+"""
+Enterprise Data Sanitization Platform
+Signing Agent Robustness Tests
+"""
+import json
+import time
+from multiprocessing.connection import Client
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+
+from core.security_engine import verify_with_public_key
+from core.signing_agent import SigningAgent, SigningAgentClient, load_or_create_authkey
+
+@pytest.fixture
+def agent(tmp_path):
+    key_dir = str(tmp_path / "keys")
+    agent = SigningAgent(key_dir, "ed25519", workers=1)
+    agent.start()
+    yield agent
+    agent.close()
+
+def _raw(agent: SigningAgent):
+    return Client(agent.address, authkey=load_or_create_authkey(agent.security_engine.key_dir))
+
+def _exchange(conn, body: bytes) -> dict:
+    conn.send_bytes(body)
+    return json.loads(conn.recv_bytes())
+
+@pytest.mark.parametrize("body", [b"[1]", b'"sign"', b"null", b"42", b"{not json", b"\xff\xfe"])
+def test_non_object_requests_get_an_error_reply(agent, body):
+    with _raw(agent) as conn:
+        assert _exchange(conn, body) == {"id": None, "error": "malformed request"}
+        # The connection and the signer thread keep serving
+        reply = _exchange(conn, b'{"id": 7, "op": "info"}')
+        assert reply["id"] == 7 and reply["algorithm"] == "ed25519"
+
+def test_failure_outside_the_handler_does_not_kill_the_signer(agent, monkeypatch):
+    def broken(ms):
+        raise RuntimeError("stats unavailable")
+
+    monkeypatch.setattr(agent.sign_latency, "record", broken)
+    with _raw(agent) as conn:
+        assert _exchange(conn, b'{"id": 1, "op": "sign", "data": ["x"]}') == {"id": 1, "error": "stats unavailable"}
+        monkeypatch.undo()
+        reply = _exchange(conn, b'{"id": 2, "op": "sign", "data": ["x"]}')
+        assert reply["id"] == 2 and len(reply["signatures"]) == 1
+
+def test_invalid_operation_reports_the_request_id(agent):
+    with _raw(agent) as conn:
+        reply = _exchange(conn, b'{"id": 3, "op": "sign", "data": "x"}')
+        assert reply["id"] == 3 and "list of strings" in reply["error"]
+        reply = _exchange(conn, b'{"id": 4, "op": "format"}')
+        assert reply["id"] == 4 and "unknown operation" in reply["error"]
+
+def test_client_signatures_verify(agent):
+    client = SigningAgentClient(agent.address, agent.security_engine.key_dir)
+    try:
+        signatures = client.sign_many([b"alpha", b"beta"])
+    finally:
+        client.close()
+    public_key = serialization.load_pem_public_key(agent._public_key_pem.encode("utf-8"))
+    assert verify_with_public_key(public_key, b"alpha", signatures[0], "ed25519")
+    assert verify_with_public_key(public_key, b"beta", signatures[1], "ed25519")
+
+def test_closed_connections_release_their_state(agent):
+    for _ in range(3):
+        with _raw(agent) as conn:
+            _exchange(conn, b'{"id": 1, "op": "info"}')
+    deadline = time.monotonic() + 5
+    while (agent._connections or agent._send_locks) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert agent._connections == {} and agent._send_locks == {}
@@ -0,0 +1,168 @@
+"""
+Enterprise Data Sanitization Platform
+Simulated Device Fault Injection Tests
+"""
+import dataclasses
+import time
+
+import pytest
+
+from core.exception_types import DeviceIOError, DeviceRemovedError, DeviceValidationError, WipeEngineError
+from core.simulated_device import (
+    ERROR_CRC, ERROR_DEVICE_NOT_CONNECTED, DeviceProfile, Fault, SimulatedBlockDevice, SimulatedDeviceValidator,
+    SlowZone, seeded_fill,
+)
+from utils.constants import WIPE_BLOCK_SIZE_BYTES
+
+SIZE = 4 * WIPE_BLOCK_SIZE_BYTES
+KIB = 1024
+
+def _device(**profile) -> SimulatedBlockDevice:
+    return SimulatedBlockDevice("dev", DeviceProfile(size_bytes=SIZE, **profile))
+
+def _write(device: SimulatedBlockDevice, offset: int, data: bytes) -> int:
+    device.seek(offset)
+    return device.write(data, len(data))
+
+def _read(device: SimulatedBlockDevice, offset: int, size: int) -> bytes:
+    device.seek(offset)
+    return device.read(size)
+
+def test_never_written_content_is_seeded_and_deterministic():
+    device = _device(seed=7)
+    data = _read(device, 0, 64 * KIB)
+    assert data == seeded_fill(7, 0, WIPE_BLOCK_SIZE_BYTES)[:64 * KIB]
+    assert data.count(0) < len(data)
+    assert _device(seed=8).read_back(64 * KIB) != data
+
+def test_writes_read_back_across_chunk_boundaries():
+    device = _device()
+    data = bytes(range(256)) * 64
+    offset = WIPE_BLOCK_SIZE_BYTES - 1000
+    assert _write(device, offset, data) == len(data)
+    assert _read(device, offset, len(data)) == data
+    assert device.read_back()[offset:offset + len(data)] == data
+    assert (device.bytes_written, device.bytes_read) == (len(data), len(data))
+
+def test_transfers_stop_at_the_end_of_the_device():
+    device = _device()
+    assert _write(device, SIZE - 10, b"x" * 100) == 10
+    assert _read(device, SIZE, 100) == b""
+
+def test_error_fault_fires_its_budget_then_clears():
+    device = _device(faults=[Fault(8 * KIB, op="read", times=2, error_code=ERROR_CRC)])
+    for _ in range(2):
+        with pytest.raises(DeviceIOError) as excinfo:
+            _read(device, 0, 16 * KIB)
+        assert excinfo.value.error_code == ERROR_CRC
+    assert len(_read(device, 0, 16 * KIB)) == 16 * KIB
+    assert device.faults_fired == [f"error:read@{8 * KIB}"] * 2
+
+def test_fault_only_fires_for_its_operation_and_range():
+    device = _device(faults=[Fault(8 * KIB, op="write", length=4 * KIB, times=None)])
+    _read(device, 0, 16 * KIB)
+    _write(device, 0, b"\0" * (8 * KIB))
+    _write(device, 12 * KIB, b"\0" * KIB)
+    for _ in range(3):
+        with pytest.raises(DeviceIOError):
+            _write(device, 11 * KIB, b"\0" * KIB)
+    assert len(device.faults_fired) == 3
+
+def test_any_op_fault_hits_reads_and_writes():
+    device = _device(faults=[Fault(0, op="any", times=2)])
+    with pytest.raises(DeviceIOError):
+        _read(device, 0, KIB)
+    with pytest.raises(DeviceIOError):
+        _write(device, 0, b"\0" * KIB)
+
+def test_short_fault_truncates_before_the_offset_or_halves_the_transfer():
+    device = _device(faults=[Fault(10 * KIB, kind="short", times=2)])
+    assert _write(device, 0, b"a" * (16 * KIB)) == 10 * KIB
+    assert device.position == 10 * KIB
+    assert device.write(b"b" * (16 * KIB), 16 * KIB) == 8 * KIB
+    assert _write(device, 0, b"c" * (16 * KIB)) == 16 * KIB
+
+def test_max_transfer_bytes_caps_every_transfer():
+    device = _device(max_transfer_bytes=4 * KIB)
+    assert _write(device, 0, b"a" * (16 * KIB)) == 4 * KIB
+    assert len(_read(device, 0, 16 * KIB)) == 4 * KIB
+
+def test_remove_fault_unplugs_the_device():
+    device = _device(faults=[Fault(32 * KIB, kind="remove")])
+    _write(device, 0, b"\0" * (32 * KIB))
+    with pytest.raises(DeviceRemovedError) as excinfo:
+        _write(device, 32 * KIB, b"\0" * KIB)
+    assert excinfo.value.error_code == ERROR_DEVICE_NOT_CONNECTED
+    with pytest.raises(DeviceRemovedError):
+        device.seek(0)
+    with pytest.raises(WipeEngineError):
+        device.lock()
+
+def test_removal_after_a_byte_budget():
+    device = _device(remove_after_bytes=20 * KIB)
+    _write(device, 0, b"\0" * (16 * KIB))
+    with pytest.raises(DeviceRemovedError):
+        _read(device, 0, 8 * KIB)
+    assert device.bytes_written + device.bytes_read == 16 * KIB
+
+def test_remove_from_another_thread():
+    device = _device()
+    device.remove()
+    with pytest.raises(DeviceRemovedError):
+        _read(device, 0, KIB)
+
+def test_wrapping_fake_capacity_aliases_high_offsets():
+    real = WIPE_BLOCK_SIZE_BYTES
+    device = _device(real_capacity_bytes=real)
+    _write(device, real + 5, b"alias")
+    assert _read(device, 5, 5) == b"alias"
+    assert device.read_back(real + 10)[real + 5:] == b"alias"
+
+def test_erroring_fake_capacity_fails_past_its_storage():
+    real = WIPE_BLOCK_SIZE_BYTES + 4 * KIB
+    device = _device(real_capacity_bytes=real, overflow="error")
+    assert _write(device, real - KIB, b"\1" * KIB) == KIB
+    with pytest.raises(DeviceIOError, match=f"offset {real}"):
+        _write(device, real - KIB, b"\1" * (2 * KIB))
+    with pytest.raises(DeviceIOError):
+        _read(device, real + 4 * KIB, KIB)
+    assert device.faults_fired == [f"overflow:write@{real - KIB}", f"overflow:read@{real + 4 * KIB}"]
+
+def test_slow_zone_paces_only_its_range():
+    device = _device(slow_zones=[SlowZone(0, 4 * KIB, latency_s=0.05)])
+    started = time.perf_counter()
+    _read(device, 8 * KIB, KIB)
+    fast = time.perf_counter() - started
+    started = time.perf_counter()
+    _read(device, 0, KIB)
+    assert time.perf_counter() - started >= 0.05 > fast
+
+def test_profile_round_trips_through_a_dict():
+    profile = DeviceProfile(size_bytes=SIZE, slow_zones=[SlowZone(0, 10, 0.1)], faults=[Fault(5, kind="short", op="any")],
+                            real_capacity_bytes=SIZE // 2, overflow="error")
+    assert DeviceProfile.from_dict(dataclasses.asdict(profile)) == profile
+
+def test_file_backed_device_matches_memory_device(tmp_path):
+    profile = DeviceProfile(size_bytes=SIZE, seed=3)
+    memory = SimulatedBlockDevice("mem", profile)
+    backed = SimulatedBlockDevice("file", profile, backing_path=str(tmp_path / "disk.img"))
+    backed.prefill()
+    assert backed.read_back() == memory.read_back()
+    _write(backed, 100, b"data")
+    backed.flush()
+    backed.dispose()
+    reopened = SimulatedBlockDevice("file", profile, backing_path=str(tmp_path / "disk.img"))
+    assert _read(reopened, 100, 4) == b"data"
+    reopened.dispose()
+
+def test_validator_rejects_removed_or_changed_devices():
+    device = _device()
+    validator = SimulatedDeviceValidator({device.device.device_id: device})
+    expected = device.device
+    assert validator.validate_device_for_wipe(expected) == expected
+    assert validator.open_device(expected) is device
+    with pytest.raises(DeviceValidationError, match="changed"):
+        validator.validate_device_for_wipe(dataclasses.replace(expected, serial_number="OTHER"))
+    device.remove()
+    with pytest.raises(DeviceValidationError, match="no longer connected"):
+        validator.validate_device_for_wipe(expected)
@@ -0,0 +1,115 @@
+"""
+Enterprise Data Sanitization Platform
+Sysfs Discovery Backend Tests
+"""
+import os
+
+import pytest
+
+from core.discovery_backends import SysfsDiscoveryBackend
+from core.exception_types import DeviceValidationError
+
+def _write(path: str, text: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+
+class FakeSysfs:
+    """A minimal /sys tree: block, class/block and dev/block links into devices/."""
+    def __init__(self, root: str):
+        self.sysfs = os.path.join(root, "sys")
+        self.mounts = os.path.join(root, "mounts")
+        for sub in ("block", "class/block", "dev/block"):
+            os.makedirs(os.path.join(self.sysfs, sub), exist_ok=True)
+
+    def _link(self, target: str, *where: str) -> None:
+        os.symlink(target, os.path.join(self.sysfs, *where))
+
+    def disk(self, name: str, major: int, minor: int, parent: str, sectors: int = 2048,
+             vendor: str = "ACME", model: str = "Disk", serial: str = "") -> str:
+        path = os.path.join(self.sysfs, "devices", parent, "block", name)
+        _write(os.path.join(path, "dev"), f"{major}:{minor}")
+        _write(os.path.join(path, "size"), str(sectors))
+        _write(os.path.join(path, "device", "vendor"), vendor)
+        _write(os.path.join(path, "device", "model"), model)
+        if serial:
+            _write(os.path.join(path, "device", "serial"), serial)
+        self._link(path, "block", name)
+        self._link(path, "class", "block", name)
+        self._link(path, "dev", "block", f"{major}:{minor}")
+        return path
+
+    def partition(self, disk_path: str, name: str, major: int, minor: int) -> None:
+        path = os.path.join(disk_path, name)
+        _write(os.path.join(path, "dev"), f"{major}:{minor}")
+        _write(os.path.join(path, "partition"), name[-1])
+        self._link(path, "class", "block", name)
+        self._link(path, "dev", "block", f"{major}:{minor}")
+
+    def mapper(self, name: str, major: int, minor: int, *slaves: str) -> None:
+        path = os.path.join(self.sysfs, "devices", "virtual", "block", name)
+        _write(os.path.join(path, "dev"), f"{major}:{minor}")
+        os.makedirs(os.path.join(path, "slaves"))
+        for slave in slaves:
+            os.symlink(os.path.join(self.sysfs, "class", "block", slave), os.path.join(path, "slaves", slave))
+        self._link(path, "block", name)
+        self._link(path, "class", "block", name)
+
+    def mount(self, *lines: str) -> None:
+        with open(self.mounts, "w", encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in lines))
+
+    def backend(self) -> SysfsDiscoveryBackend:
+        return SysfsDiscoveryBackend(self.sysfs, self.mounts, require_root=False)
+
+@pytest.fixture
+def station(tmp_path) -> FakeSysfs:
+    fake = FakeSysfs(str(tmp_path))
+    sda = fake.disk("sda", 8, 0, "pci0000:00/ata1/host0/target0:0:0/0:0:0:0", sectors=1 << 30, model="Boot SSD",
+                    serial="SATA123")
+    fake.partition(sda, "sda1", 8, 1)
+    fake.partition(sda, "sda2", 8, 2)
+    usb = "pci0000:00/0000:00:14.0/usb1/1-2"
+    _write(os.path.join(fake.sysfs, "devices", usb, "serial"), "USB4C53")
+    sdb = fake.disk("sdb", 8, 16, usb + "/1-2:1.0/host1/target1:0:0/1:0:0:0", sectors=2 << 20, vendor="SanDisk",
+                    model="Ultra")
+    fake.partition(sdb, "sdb1", 8, 17)
+    fake.disk("nvme0n1", 259, 0, "pci0000:00/0000:00:1d.0/nvme/nvme0", model="NVMe Data", serial="NV1")
+    fake.disk("loop0", 7, 0, "virtual")
+    fake.mapper("dm-0", 253, 0, "sda2")
+    fake.mount("/dev/dm-0 / ext4 rw 0 0", "/dev/sda1 /boot/efi vfat rw 0 0", "/dev/sdb1 /media/usb vfat rw 0 0",
+               "tmpfs /tmp tmpfs rw 0 0")
+    return fake
+
+def test_lists_physical_disks_with_interface_serial_and_size(station):
+    disks = {disk.device_id: disk for disk in station.backend().list_disks()}
+    assert set(disks) == {"/dev/sda", "/dev/sdb", "/dev/nvme0n1"}
+    usb = disks["/dev/sdb"]
+    assert (usb.interface_type, usb.serial_number, usb.model) == ("USB", "USB4C53", "SanDisk Ultra")
+    assert usb.size_bytes == (2 << 20) * 512
+    assert usb.index == (8 << 20) | 16
+    assert disks["/dev/sda"].interface_type == "SCSI"
+    assert disks["/dev/nvme0n1"].interface_type == "NVME"
+
+def test_get_disk_by_index(station):
+    backend = station.backend()
+    assert backend.get_disk((8 << 20) | 16).device_id == "/dev/sdb"
+    assert backend.get_disk((8 << 20) | 17) is None     # A partition
+    assert backend.get_disk((8 << 20) | 99) is None     # Not present
+
+def test_system_disk_is_traced_through_device_mapper_and_partitions(station):
+    assert station.backend().query_system_disk_indices() == {(8 << 20) | 0}
+
+def test_unresolvable_root_fails_safe(station):
+    station.mount("/dev/sdb1 /media/usb vfat rw 0 0")
+    with pytest.raises(DeviceValidationError):
+        station.backend().query_system_disk_indices()
+
+def test_unknown_root_device_fails_safe(station):
+    station.mount("/dev/mystery / ext4 rw 0 0")
+    with pytest.raises(DeviceValidationError):
+        station.backend().query_system_disk_indices()
+
+def test_cache_key_is_per_tree(station, tmp_path):
+    other = FakeSysfs(str(tmp_path / "other"))
+    assert station.backend().cache_key != other.backend().cache_key
@@ -0,0 +1,45 @@
+"""
+Enterprise Data Sanitization Platform
+Wipe Engine Capacity Outcome Tests
+"""
+import hashlib
+
+import pytest
+
+from core.simulated_device import DeviceProfile, Fault, SimulatedBlockDevice, SimulatedDeviceValidator
+from core.state_machine import WipeState
+from core.wipe_engine import WipeEngine
+
+SIZE = 16 * 1024**2
+METHOD = "1-Pass Zero (NIST 800-88 Clear)"
+
+def _wipe(**profile):
+    device = SimulatedBlockDevice("engine", DeviceProfile(size_bytes=SIZE, **profile))
+    validator = SimulatedDeviceValidator({device.device.device_id: device})
+    engine = WipeEngine(device.device, METHOD, "tests", validator=validator, open_device=validator.open_device)
+    engine.run()
+    assert engine.state_machine.current_state == WipeState.SAFE_RELEASE
+    return engine, device
+
+def test_genuine_device_with_a_transient_read_error_is_wiped_in_full():
+    engine, device = _wipe(faults=[Fault(1024**2, op="read", times=1)])
+    assert engine.error is None
+    assert engine.result["status"] == "SUCCESS"
+    assert engine.result["verified_capacity_bytes"] == SIZE
+    assert device.read_back() == bytes(SIZE)
+    assert engine.post_hash == hashlib.sha256(bytes(SIZE)).hexdigest()
+
+def test_genuine_device_with_a_bad_sector_is_not_certified():
+    engine, device = _wipe(faults=[Fault(1024**2, op="read", times=None)])
+    assert engine.result is None
+    assert "persistently fails I/O" in engine.error
+    assert device.bytes_written < SIZE
+
+@pytest.mark.parametrize("overflow", ["wrap", "error"])
+def test_counterfeit_is_never_certified_as_success(overflow):
+    real = SIZE // 4
+    engine, device = _wipe(real_capacity_bytes=real, overflow=overflow)
+    assert engine.error is None
+    assert engine.result["status"] == "COUNTERFEIT_PARTIAL"
+    assert (engine.result["size_bytes"], engine.result["verified_capacity_bytes"]) == (SIZE, real)
+    assert device.read_back(real) == bytes(real)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+EcoWipe Audit Log Query
+Looks up every audit record for a device serial, certificate or wipe job via
+the offset index (no scanning of rotated logs), and verifies the audit hash
+chain.
+
+Usage:
+    python tools/audit_query.py serial WD-WCC4N1234567
+    python tools/audit_query.py certificate 0b6f3c1e-... --json
+    python tools/audit_query.py job 5e1d... --log-dir logs
+    python tools/audit_query.py verify
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.audit_log import find_entries, process_audit_paths, process_audit_pids, verify_chain
+from utils.constants import AUDIT_INDEX_FILE, AUDIT_LOG_FILE, LOG_DIR
+
+LOOKUP_FIELDS = {"serial": "device_serial", "certificate": "certificate_id", "job": "job_id"}
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Query and verify the structured audit log.")
+    parser.add_argument("--log-dir", default=LOG_DIR, help="Directory holding the audit log and its index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, field in LOOKUP_FIELDS.items():
+        p = sub.add_parser(name, help=f"Records with this {field}")
+        p.add_argument("value")
+        p.add_argument("--json", action="store_true", help="Print raw JSON lines")
+    sub.add_parser("verify", help="Check the hash chain across all audit segments")
+    args = parser.parse_args()
+
+    log_path = os.path.join(args.log_dir, AUDIT_LOG_FILE)
+    index_path = os.path.join(args.log_dir, AUDIT_INDEX_FILE)
+    # The shared chain, then those written by processes that could not take its lock
+    chains = [(log_path, index_path)] + [
+        process_audit_paths(log_path, index_path, pid) for pid in process_audit_pids(log_path)
+    ]
+    if args.command == "verify":
+        failed = False
+        for path, _ in chains:
+            name = os.path.basename(path)
+            result = verify_chain(path)
+            if not result.valid:
+                print(f"FAIL: audit chain {name} broken at {result.error}")
+                failed = True
+                continue
+            anchor = "genesis" if result.anchored else f"entry {result.first_seq} (older segments expired)"
+            print(f"Audit chain {name} intact: {result.entries} entries in {result.segments} segment(s), anchored at {anchor}.")
+        return 1 if failed else 0
+
+    count = 0
+    for path, index in chains:
+        for entry in find_entries(path, index, LOOKUP_FIELDS[args.command], args.value):
+            count += 1
+            if args.json:
+                print(json.dumps(entry, ensure_ascii=False))
+            else:
+                print(f"{entry['ts']} [{entry['level']}] [{entry['logger']}] [{entry['module']}.{entry['function']}] {entry['message']}")
+    if not args.json:
+        print(f"{count} record(s).", file=sys.stderr)
+    return 0 if count else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
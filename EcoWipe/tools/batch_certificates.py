@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+EcoWipe Batch Certificate Generator
+Re-issues or backfills certificates from a JSON-lines file of wipe results
+(one WipeEngine result dictionary per line), using a process pool.
+
+Usage:
+    python tools/batch_certificates.py wipe_results.jsonl --output certificates --workers 8
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.certificate_engine import CertificateEngine
+from core.certificate_store import CertificateStore
+from core.signing_agent import default_agent_address
+from utils.constants import CERT_DB_PATH
+
+def read_wipe_results(path: str, line_numbers: List[int], skipped: List[int]) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield wipe results so arbitrarily large backfills stay in bounded memory.
+    The file line of every yielded result is appended to line_numbers; lines
+    that are not a JSON object are reported, recorded in skipped and left out.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                result = json.loads(line)
+            except ValueError as e:
+                print(f"SKIPPED line {number}: not valid JSON ({e})", file=sys.stderr)
+                skipped.append(number)
+                continue
+            if not isinstance(result, dict):
+                print(f"SKIPPED line {number}: not a wipe result object", file=sys.stderr)
+                skipped.append(number)
+                continue
+            line_numbers.append(number)
+            yield result
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate certificates for many wipe results in parallel.")
+    parser.add_argument("input", help="JSON-lines file of wipe results")
+    parser.add_argument("--output", default="certificates", help="Certificate output directory")
+    parser.add_argument("--keys", default="keys", help="Signing key directory")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--db", default=CERT_DB_PATH, help="Certificate store database")
+    parser.add_argument("--agent", nargs="?", const="", default=None,
+                        help="Sign through the local signing agent (optionally at this address) instead of loading the key")
+    parser.add_argument("--no-json", action="store_true", help="Only index certificates in the store, skip cert_*.json files")
+    args = parser.parse_args()
+
+    store = CertificateStore(args.db, batch_size=500)
+    # Worker processes sign; the parent engine only loads keys and writes the store
+    agent_address = None if args.agent is None else (args.agent or default_agent_address(args.keys))
+    engine = CertificateEngine(key_dir=args.keys, store=store, write_json=not args.no_json, batch_sign=False,
+                               agent_address=agent_address)
+    started = time.perf_counter()
+    succeeded = failed = 0
+    line_numbers: List[int] = []
+    skipped: List[int] = []
+    results = read_wipe_results(args.input, line_numbers, skipped)
+    for result in engine.generate_certificates(results, args.output, args.workers):
+        if "error" in result:
+            failed += 1
+            print(f"FAILED line {line_numbers[result['index']]}: {result['error']}", file=sys.stderr)
+        else:
+            succeeded += 1
+            print(f"{result['certificate_id']}\t{result['json_path'] or '-'}\t{result['qr_path']}")
+
+    engine.close()
+    store.close()
+    elapsed = time.perf_counter() - started
+    rate = (succeeded + failed) / elapsed if elapsed > 0 else 0.0
+    print(f"Generated {succeeded} certificate(s), {failed} failure(s), {len(skipped)} unreadable line(s) "
+          f"in {elapsed:.1f}s ({rate:.1f}/s).", file=sys.stderr)
+    return 1 if failed or skipped else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+EcoWipe Device Enumeration Benchmark
+Measures DeviceValidator.get_valid_usb_drives latency and allocations against
+a simulated provider or a synthetic sysfs tree with many disks.
+
+Usage:
+    python tools/bench_enumeration.py --disks 30 100 1000
+    python tools/bench_enumeration.py --backend sysfs --disks 300
+    python tools/bench_enumeration.py --disks 1000 --budget-ms 50
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import List, Optional, Set
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.device_validator import DeviceValidator, scan_interval_for
+from core.discovery_backends import DiscoveryBackend, DiskInfo, SysfsDiscoveryBackend
+
+# Mount points that make a simulated disk a system disk (as the sysfs backend treats them)
+SYSTEM_MOUNT_POINTS = ("/", "/boot", "/boot/efi", "/usr")
+
+@dataclass(frozen=True)
+class SimulatedPartition:
+    """A partition on a simulated disk. Boot/root partitions make the disk a system disk."""
+    number: int
+    size_bytes: int
+    mount_point: str = ""
+    is_boot: bool = False
+
+class SimulatedDiscoveryBackend(DiscoveryBackend):
+    """
+    In-memory stand-in for WMI or sysfs for the benchmark.
+    Optional per-query latencies model the cost of the real platform calls.
+    """
+    name = "simulated"
+
+    def __init__(self, disks: List[DiskInfo], partitions: Optional[dict] = None,
+                 enumeration_latency_s: float = 0.0, system_query_latency_s: float = 0.0):
+        self._disks = {disk.index: disk for disk in disks}
+        self.partitions = partitions or {}
+        self.enumeration_latency_s = enumeration_latency_s
+        self.system_query_latency_s = system_query_latency_s
+        self.system_queries = 0
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.name}:{id(self)}"
+
+    def is_admin(self) -> bool:
+        return True
+
+    def list_disks(self) -> List[DiskInfo]:
+        if self.enumeration_latency_s:
+            time.sleep(self.enumeration_latency_s)
+        return list(self._disks.values())
+
+    def get_disk(self, disk_index: int) -> Optional[DiskInfo]:
+        return self._disks.get(disk_index)
+
+    def query_system_disk_indices(self) -> Set[int]:
+        self.system_queries += 1
+        if self.system_query_latency_s:
+            time.sleep(self.system_query_latency_s)
+        return {
+            index for index, parts in self.partitions.items()
+            if any(p.is_boot or p.mount_point in SYSTEM_MOUNT_POINTS for p in parts)
+        }
+
+    def attach(self, disk: DiskInfo, partitions: Optional[List[SimulatedPartition]] = None) -> None:
+        """Simulate a hotplug arrival."""
+        self._disks[disk.index] = disk
+        if partitions:
+            self.partitions[disk.index] = partitions
+
+    def detach(self, disk_index: int) -> None:
+        """Simulate a surprise removal."""
+        self._disks.pop(disk_index, None)
+        self.partitions.pop(disk_index, None)
+
+def generate_simulated_backend(disk_count: int, usb_ratio: float = 0.6, seed: int = 0,
+                               **backend_kwargs) -> SimulatedDiscoveryBackend:
+    """
+    Build a simulated station with a mix of SATA/NVMe/USB/SD disks, multi-partition
+    layouts, serial-less card readers and one system disk at index 0.
+    """
+    rng = random.Random(seed)
+    disks = []
+    partitions = {}
+    for index in range(disk_count):
+        if index == 0:
+            interface = "SCSI"
+        elif rng.random() < usb_ratio:
+            interface = "USB"
+        else:
+            interface = rng.choice(("SCSI", "IDE", "NVME", "SD"))
+        size = rng.choice((0, 8, 16, 32, 64, 128, 256, 512, 1024)) * 1024**3 if interface == "USB" else rng.choice((256, 512, 1024, 2048)) * 1024**3
+        # Card readers and cheap enclosures frequently report no serial number
+        serial = "" if rng.random() < 0.05 else f"SIM{seed:04d}{index:06d}"
+        disks.append(DiskInfo(
+            index=index,
+            device_id=f"\\\\.\\PhysicalDrive{index}",
+            model=f"Simulated {interface} Disk {index}",
+            serial_number=serial,
+            size_bytes=size,
+            interface_type=interface,
+        ))
+        part_count = rng.randint(0, 4)
+        partitions[index] = [
+            SimulatedPartition(number=n, size_bytes=size // max(part_count, 1))
+            for n in range(1, part_count + 1)
+        ]
+    partitions[0] = [
+        SimulatedPartition(number=1, size_bytes=512 * 1024**2, mount_point="/boot/efi", is_boot=True),
+        SimulatedPartition(number=2, size_bytes=disks[0].size_bytes, mount_point="/"),
+    ] if disks else []
+    return SimulatedDiscoveryBackend(disks, partitions, **backend_kwargs)
+
+def build_synthetic_sysfs(root: str, disk_count: int, usb_ratio: float = 0.6, seed: int = 0) -> str:
+    """
+    Create a minimal sysfs + mount table layout with `disk_count` disks.
+    Disk 0 (sda) is a SATA system disk; the rest are a mix of USB and SATA,
+    each with a few partitions. Returns the mounts file path.
+    """
+    rng = random.Random(seed)
+    sysfs = os.path.join(root, "sys")
+    for sub in ("block", "class/block", "dev/block"):
+        os.makedirs(os.path.join(sysfs, sub), exist_ok=True)
+
+    def disk_name(i: int) -> str:
+        letters = ""
+        i += 1
+        while i:
+            i, rem = divmod(i - 1, 26)
+            letters = chr(ord("a") + rem) + letters
+        return "sd" + letters
+
+    for i in range(disk_count):
+        name = disk_name(i)
+        major, minor = 8 + (i // 16) * 57, (i % 16) * 16
+        usb = i > 0 and rng.random() < usb_ratio
+        if usb:
+            usb_dev = os.path.join(sysfs, "devices", "pci0000:00", "0000:00:14.0", f"usb{1 + i // 127}", f"1-{i}")
+            host = os.path.join(usb_dev, f"1-{i}:1.0", f"host{i}", f"target{i}:0:0", f"{i}:0:0:0")
+        else:
+            usb_dev = None
+            host = os.path.join(sysfs, "devices", "pci0000:00", f"ata{i}", f"host{i}", f"target{i}:0:0", f"{i}:0:0:0")
+        block = os.path.join(host, "block", name)
+        os.makedirs(block)
+        if usb_dev and rng.random() > 0.05:
+            with open(os.path.join(usb_dev, "serial"), "w") as f:
+                f.write(f"SYN{i:06d}")
+        with open(os.path.join(host, "vendor"), "w") as f:
+            f.write("Synth")
+        with open(os.path.join(host, "model"), "w") as f:
+            f.write(f"Disk {i}")
+        os.symlink(host, os.path.join(block, "device"))
+        with open(os.path.join(block, "size"), "w") as f:
+            f.write(str(rng.choice((16, 32, 64, 256)) * 1024**3 // 512))
+        with open(os.path.join(block, "dev"), "w") as f:
+            f.write(f"{major}:{minor}")
+        os.symlink(block, os.path.join(sysfs, "block", name))
+        os.symlink(block, os.path.join(sysfs, "class", "block", name))
+        os.symlink(block, os.path.join(sysfs, "dev", "block", f"{major}:{minor}"))
+        for part in range(1, rng.randint(1, 4) + 1):
+            part_dir = os.path.join(block, f"{name}{part}")
+            os.makedirs(part_dir)
+            with open(os.path.join(part_dir, "partition"), "w") as f:
+                f.write(str(part))
+            with open(os.path.join(part_dir, "dev"), "w") as f:
+                f.write(f"{major}:{minor + part}")
+            os.symlink(part_dir, os.path.join(sysfs, "class", "block", f"{name}{part}"))
+            os.symlink(part_dir, os.path.join(sysfs, "dev", "block", f"{major}:{minor + part}"))
+
+    mounts = os.path.join(root, "mounts")
+    with open(mounts, "w") as f:
+        f.write("/dev/sda2 / ext4 rw 0 0\n/dev/sda1 /boot/efi vfat rw 0 0\nproc /proc proc rw 0 0\n")
+    return mounts
+
+def measure(validator: DeviceValidator, iterations: int, cold: bool) -> dict:
+    """Time repeated enumerations and trace allocations of one representative run."""
+    timings = []
+    valid = 0
+    for _ in range(iterations):
+        if cold:
+            validator.invalidate_system_drive_cache()
+        started = time.perf_counter()
+        valid = len(validator.get_valid_usb_drives())
+        timings.append(time.perf_counter() - started)
+
+    if cold:
+        validator.invalidate_system_drive_cache()
+    tracemalloc.start()
+    validator.get_valid_usb_drives()
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+
+    timings.sort()
+    return {
+        "valid": valid,
+        "median_ms": statistics.median(timings) * 1000,
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000,
+        "max_ms": timings[-1] * 1000,
+        "peak_kib": peak / 1024,
+        "live_blocks": blocks,
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark device enumeration scalability.")
+    parser.add_argument("--backend", choices=("simulated", "sysfs"), default="simulated")
+    parser.add_argument("--disks", type=int, nargs="+", default=[30, 100, 1000])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--usb-ratio", type=float, default=0.6)
+    parser.add_argument("--system-query-ms", type=float, default=0.0,
+                        help="Simulated cost of the system disk query (simulated backend only).")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Fail (exit 1) if the warm median exceeds this budget.")
+    args = parser.parse_args()
+
+    print(f"{'disks':>6} {'mode':>5} {'valid':>6} {'median ms':>10} {'p95 ms':>8} {'max ms':>8} {'peak KiB':>9} {'blocks':>7} {'poll s':>7}")
+    over_budget = False
+    for count in args.disks:
+        workdir = None
+        if args.backend == "sysfs":
+            workdir = tempfile.mkdtemp(prefix="ecowipe_sysfs_")
+            mounts = build_synthetic_sysfs(workdir, count, args.usb_ratio)
+            backend = SysfsDiscoveryBackend(os.path.join(workdir, "sys"), mounts, require_root=False)
+        else:
+            backend = generate_simulated_backend(count, args.usb_ratio, system_query_latency_s=args.system_query_ms / 1000)
+        try:
+            validator = DeviceValidator(backend)
+            for mode, cold in (("cold", True), ("warm", False)):
+                r = measure(validator, args.iterations, cold)
+                print(f"{count:>6} {mode:>5} {r['valid']:>6} {r['median_ms']:>10.2f} {r['p95_ms']:>8.2f} "
+                      f"{r['max_ms']:>8.2f} {r['peak_kib']:>9.1f} {r['live_blocks']:>7} "
+                      f"{scan_interval_for(r['median_ms'] / 1000):>7.1f}")
+                if not cold and args.budget_ms is not None and r["median_ms"] > args.budget_ms:
+                    over_budget = True
+        finally:
+            if workdir:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    if over_budget:
+        print(f"FAIL: warm enumeration exceeded the {args.budget_ms} ms budget.")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
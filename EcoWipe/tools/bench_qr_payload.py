@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+EcoWipe QR Payload Benchmark
+Compares the legacy base64(JSON) certificate QR payload with the compact
+CBOR + zlib + base45 format: payload length, QR version and the time to
+generate and auto-verify the QR code with QREngine.
+
+Usage:
+    python tools/bench_qr_payload.py
+    python tools/bench_qr_payload.py --suites ed25519 --repeat 10
+    python tools/bench_qr_payload.py --verify-mode structural
+"""
+import argparse
+import base64
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.certificate_schema import compute_payload_hash
+from core.exception_types import CertificateError
+from core.qr_engine import QREngine
+from core.qr_payload import decode_qr_payload, encode_qr_payload
+from core.signature_suites import SIGNATURE_SUITES
+from tools.bench_signatures import qr_version, sample_certificate
+
+def legacy_payload(certificate: dict) -> str:
+    return base64.b64encode(json.dumps(certificate, separators=(',', ':')).encode('utf-8')).decode('utf-8')
+
+def time_generation(payload: str, workdir: str, repeat: int, verify_mode: str):
+    """Median generate_and_verify time in ms, or None if the QR cannot be generated and verified."""
+    timings = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        try:
+            QREngine.generate_and_verify(payload, os.path.join(workdir, f"qr_{i}.png"), verify_mode)
+        except CertificateError:
+            return None
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark legacy vs compact certificate QR payloads.")
+    parser.add_argument("--suites", nargs="+", choices=sorted(SIGNATURE_SUITES), default=list(SIGNATURE_SUITES))
+    parser.add_argument("--repeat", type=int, default=5, help="QR generations per measurement")
+    parser.add_argument("--verify-mode", choices=("decode", "structural"), default="decode", help="QREngine verification mode")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    workdir = tempfile.mkdtemp(prefix="ecowipe_qr_")
+    try:
+        for name in args.suites:
+            suite = SIGNATURE_SUITES[name]
+            certificate = sample_certificate(name)
+            certificate["payload_hash"] = compute_payload_hash(certificate)
+            signature = suite.sign(suite.generate_private_key(), certificate["payload_hash"].encode('utf-8'))
+            certificate["signature"] = base64.b64encode(signature).decode('utf-8')
+
+            compact = encode_qr_payload(certificate)
+            if decode_qr_payload(compact) != certificate:
+                print(f"FAIL: compact payload for {name} does not round-trip.", file=sys.stderr)
+                return 1
+            for fmt, payload in (("legacy", legacy_payload(certificate)), ("compact", compact)):
+                ms = time_generation(payload, workdir, args.repeat, args.verify_mode)
+                results.append({
+                    "suite": name,
+                    "format": fmt,
+                    "payload_chars": len(payload),
+                    "qr_version": qr_version(payload),
+                    "generate_verify_ms": round(ms, 1) if ms is not None else None,
+                })
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"{'suite':<20} {'format':<8} {'chars':>6} {'QR ver':>7} {'gen+verify ms':>14}")
+    for r in results:
+        ms = f"{r['generate_verify_ms']:.1f}" if r["generate_verify_ms"] is not None else "failed"
+        print(f"{r['suite']:<20} {r['format']:<8} {r['payload_chars']:>6} {r['qr_version']:>7} {ms:>14}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+EcoWipe Signature Suite Benchmark
+Measures key generation time, sign and verify rates, signature size and the
+resulting certificate QR payload size / QR version for each signature suite.
+
+Usage:
+    python tools/bench_signatures.py
+    python tools/bench_signatures.py --suites ed25519 ecdsa-p256-sha256 --seconds 2
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import sys
+import time
+
+import qrcode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.certificate_schema import SCHEMA_VERSION, compute_payload_hash
+from core.signature_suites import SIGNATURE_SUITES
+
+def sample_certificate(algorithm: str) -> dict:
+    """A representative certificate body (as CertificateEngine builds it, unsigned)."""
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "certificate_id": "6f1c3a52-8d0e-4f7b-9a51-0c2d7e4b9f13",
+        "timestamp_utc": "2026-01-01T12:00:00.000000+00:00",
+        "app_version": "2.0.0-Enterprise",
+        "signature_algorithm": algorithm,
+        "operator": "Bench Operator",
+        "device": {
+            "id": "\\\\.\\PhysicalDrive3",
+            "model": "SanDisk Ultra USB 3.0",
+            "serial_number": "4C530001230917114582",
+            "size_bytes": 61530439680,
+        },
+        "wipe_details": {
+            "method": "NIST 800-88 Clear",
+            "passes": 1,
+            "nist_standard": "NIST SP 800-88 Rev. 1",
+            "pre_hash_sha256": hashlib.sha256(b"pre").hexdigest(),
+            "post_hash_sha256": hashlib.sha256(b"post").hexdigest(),
+            "start_time_unix": 1767268800.0,
+            "end_time_unix": 1767272400.0,
+            "status": "SUCCESS",
+        },
+    }
+
+def rate(fn, seconds: float) -> float:
+    """Calls per second of fn over roughly `seconds` of wall time."""
+    calls = 0
+    started = time.perf_counter()
+    deadline = started + seconds
+    while True:
+        fn()
+        calls += 1
+        now = time.perf_counter()
+        if now >= deadline:
+            return calls / (now - started)
+
+def qr_version(payload: str) -> str:
+    """QR version the certificate payload needs at the engine's error correction level."""
+    qr = qrcode.QRCode(version=None, error_correction=qrcode.constants.ERROR_CORRECT_H)
+    qr.add_data(payload.encode('utf-8'))
+    try:
+        qr.make(fit=True)
+    except (ValueError, qrcode.exceptions.DataOverflowError):
+        return ">40"
+    return str(qr.version) if qr.version <= 40 else ">40"
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark certificate signature suites.")
+    parser.add_argument("--suites", nargs="+", choices=sorted(SIGNATURE_SUITES), default=list(SIGNATURE_SUITES))
+    parser.add_argument("--seconds", type=float, default=1.0, help="Measurement time per operation")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    for name in args.suites:
+        suite = SIGNATURE_SUITES[name]
+        started = time.perf_counter()
+        private_key = suite.generate_private_key()
+        keygen_ms = (time.perf_counter() - started) * 1000
+        public_key = private_key.public_key()
+
+        certificate = sample_certificate(name)
+        payload_hash = compute_payload_hash(certificate)
+        data = payload_hash.encode('utf-8')
+        signature = suite.sign(private_key, data)
+        certificate["payload_hash"] = payload_hash
+        certificate["signature"] = base64.b64encode(signature).decode('utf-8')
+        # Same QR payload encoding as CertificateEngine
+        qr_payload = base64.b64encode(json.dumps(certificate, separators=(',', ':')).encode('utf-8')).decode('utf-8')
+
+        results.append({
+            "suite": name,
+            "keygen_ms": round(keygen_ms, 2),
+            "sign_per_s": round(rate(lambda: suite.sign(private_key, data), args.seconds), 1),
+            "verify_per_s": round(rate(lambda: suite.verify(public_key, signature, data), args.seconds), 1),
+            "signature_bytes": len(signature),
+            "qr_payload_chars": len(qr_payload),
+            "qr_version": qr_version(qr_payload),
+        })
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"{'suite':<20} {'keygen ms':>10} {'sign/s':>10} {'verify/s':>10} {'sig B':>6} {'QR chars':>9} {'QR ver':>7}")
+    for r in results:
+        print(f"{r['suite']:<20} {r['keygen_ms']:>10.1f} {r['sign_per_s']:>10.0f} {r['verify_per_s']:>10.0f} "
+              f"{r['signature_bytes']:>6} {r['qr_payload_chars']:>9} {r['qr_version']:>7}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
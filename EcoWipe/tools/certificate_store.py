@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+EcoWipe Certificate Store Tool
+Imports loose certificate files into the indexed store, looks certificates
+up, and streams exports.
+
+Usage:
+    python tools/certificate_store.py import certificates/
+    python tools/certificate_store.py get <certificate_id>
+    python tools/certificate_store.py find --serial ABC123
+    python tools/certificate_store.py export --format csv --operator John-Doe > audit.csv
+    python tools/certificate_store.py export --format json-files --output export/
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.certificate_store import CertificateStore
+from utils.constants import CERT_DB_PATH
+
+def _add_filters(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--serial", help="Device serial number")
+    parser.add_argument("--operator", help="Operator name")
+    parser.add_argument("--since", help="ISO-8601 UTC start (inclusive)")
+    parser.add_argument("--until", help="ISO-8601 UTC end (exclusive)")
+    parser.add_argument("--limit", type=int, help="Maximum number of certificates")
+
+def _filters(args: argparse.Namespace) -> dict:
+    return {"serial": args.serial, "operator": args.operator, "since": args.since, "until": args.until, "limit": args.limit}
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Query and export the certificate store.")
+    parser.add_argument("--db", default=CERT_DB_PATH, help="Certificate store database")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_import = sub.add_parser("import", help="Import cert_*.json files from a directory")
+    p_import.add_argument("directory")
+
+    p_get = sub.add_parser("get", help="Print one certificate")
+    p_get.add_argument("certificate_id")
+
+    p_find = sub.add_parser("find", help="List matching certificates")
+    _add_filters(p_find)
+
+    p_export = sub.add_parser("export", help="Stream matching certificates")
+    p_export.add_argument("--format", choices=("jsonl", "csv", "json-files"), default="jsonl")
+    p_export.add_argument("--output", help="Output file (jsonl/csv, default stdout) or directory (json-files)")
+    _add_filters(p_export)
+
+    args = parser.parse_args()
+
+    with CertificateStore(args.db, batch_size=500, read_only=args.command != "import") as store:
+        if args.command == "import":
+            print(f"Imported {store.import_json_directory(args.directory)} certificate(s).", file=sys.stderr)
+        elif args.command == "get":
+            certificate = store.get(args.certificate_id)
+            if certificate is None:
+                print(f"Certificate {args.certificate_id} not found.", file=sys.stderr)
+                return 1
+            print(json.dumps(certificate, indent=4))
+        elif args.command == "find":
+            for cert in store.find(**_filters(args)):
+                device = cert["device"]
+                print(f"{cert['timestamp_utc']}\t{cert['certificate_id']}\t{cert['operator']}\t{device['serial_number']}\t{device['model']}")
+        elif args.command == "export":
+            if args.format == "json-files":
+                count = store.export_json_files(args.output or "export", **_filters(args))
+            else:
+                out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+                try:
+                    export = store.export_csv if args.format == "csv" else store.export_jsonl
+                    count = export(out, **_filters(args))
+                finally:
+                    if args.output:
+                        out.close()
+            print(f"Exported {count} certificate(s).", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
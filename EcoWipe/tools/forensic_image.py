@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+EcoWipe Forensic Image Tool
+Verifies a forensic image captured before a wipe (every segment hash, and
+the decoded content against the recorded pre-wipe hash), optionally against
+the wipe's certificate, and restores the raw device image from it.
+
+Usage:
+    python tools/forensic_image.py verify images/<job_id>/manifest.json
+    python tools/forensic_image.py verify images/<job_id>/manifest.json --certificate certificates/cert_<...>.json
+    python tools/forensic_image.py extract images/<job_id>/manifest.json -o device.img
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.exception_types import ForensicImageError
+from core.forensic_image import ForensicImageReader
+
+def check_certificate(reader: ForensicImageReader, certificate_path: str) -> None:
+    """The certificate must pin this manifest, and certify the hash the image content matches."""
+    with open(certificate_path, "r", encoding="utf-8") as f:
+        details = json.load(f).get("wipe_details", {})
+    image = details.get("forensic_image") or {}
+    if image.get("manifest_sha256") != reader.manifest_sha256:
+        raise ForensicImageError("Certificate does not reference this image manifest")
+    if details.get("pre_hash_sha256") != reader.manifest["raw_sha256"]:
+        raise ForensicImageError("Certificate pre-wipe hash differs from the image's raw hash")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Verify or extract a pre-wipe forensic image.")
+    parser.add_argument("action", choices=["verify", "extract"])
+    parser.add_argument("manifest", help="manifest.json of the image")
+    parser.add_argument("--certificate", default=None, help="Certificate JSON the image must belong to")
+    parser.add_argument("-o", "--output", default=None, help="Raw image file to write (extract)")
+    args = parser.parse_args()
+
+    if args.action == "extract" and not args.output:
+        parser.error("extract needs --output")
+    try:
+        reader = ForensicImageReader(args.manifest)
+        if args.certificate:
+            check_certificate(reader, args.certificate)
+        if args.action == "verify":
+            digest = reader.verify()
+        else:
+            digest = reader.extract(args.output)
+    except (OSError, ValueError, ForensicImageError) as e:
+        print(f"FAILED: {e}", file=sys.stderr)
+        return 1
+
+    manifest = reader.manifest
+    device = manifest["device"]
+    print(f"{device['model']} (S/N {device['serial_number']}), job {manifest['job_id']}")
+    print(f"{manifest['image_bytes']} bytes in {len(manifest['segments'])} segment(s): "
+          f"{manifest['stored_bytes']} stored, {manifest['elided_zero_bytes']} zero bytes elided")
+    print(f"Raw SHA-256 {digest} matches the pre-wipe hash"
+          + (" and the certificate" if args.certificate else ""))
+    if args.action == "extract":
+        print(f"Image written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
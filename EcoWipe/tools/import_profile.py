@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+EcoWipe Startup Import Profile
+Runs `python -X importtime` on the GUI startup module and reports the
+slowest imports, the total import time, and any heavy subsystem (OpenCV,
+numpy, qrcode, cryptography, WMI) that leaked back onto the startup path.
+
+Usage:
+    python tools/import_profile.py
+    python tools/import_profile.py --budget-ms 400 --runs 5
+    python tools/import_profile.py --module core.certificate_engine --forbid
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded in the background (SubsystemInitThread / scanner thread), never by the window itself
+DEFAULT_FORBIDDEN = ("cv2", "numpy", "qrcode", "PIL", "cryptography", "wmi", "pythoncom")
+
+def profile_imports(module: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Import `module` in a fresh interpreter.
+
+    Returns:
+        (name, depth, self_us, cumulative_us) for every import, in load order.
+    """
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        # Still report what was loaded (e.g. Windows-only modules fail on other platforms)
+        reason = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit code {proc.returncode}"
+        print(f"WARNING: importing {module} failed ({reason}); the profile is partial.", file=sys.stderr)
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return entries
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Profile the import cost of the startup path.")
+    parser.add_argument("--module", default="ui.main_window", help="Module imported at startup")
+    parser.add_argument("--runs", type=int, default=3, help="Profile runs; the fastest total is reported")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--forbid", nargs="*", default=list(DEFAULT_FORBIDDEN),
+                        help="Top-level packages that must not be imported (pass no values to disable)")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail (exit 1) if the total exceeds this budget")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    best = None
+    for _ in range(max(1, args.runs)):
+        entries = profile_imports(args.module)
+        total_us = sum(cumulative for _, depth, _, cumulative in entries if depth == 0)
+        if best is None or total_us < best[0]:
+            best = (total_us, entries)
+    total_us, entries = best
+
+    cumulative_by_name: Dict[str, int] = {name: cumulative for name, _, _, cumulative in entries}
+    slowest = sorted(entries, key=lambda e: e[2], reverse=True)[:args.top]
+    forbidden = set(args.forbid)
+    leaked = sorted({name for name, _, _, _ in entries if name.split(".")[0] in forbidden})
+    over_budget = args.budget_ms is not None and total_us / 1000 > args.budget_ms
+
+    if args.json:
+        print(json.dumps({
+            "module": args.module,
+            "total_ms": round(total_us / 1000, 1),
+            "module_count": len(entries),
+            "slowest_self_ms": {name: round(self_us / 1000, 2) for name, _, self_us, _ in slowest},
+            "leaked_heavy_imports": leaked,
+            "over_budget": over_budget,
+        }, indent=2))
+    else:
+        print(f"{'self ms':>8} {'cumul ms':>9}  module")
+        for name, _, self_us, _ in slowest:
+            print(f"{self_us / 1000:>8.1f} {cumulative_by_name[name] / 1000:>9.1f}  {name}")
+        print(f"Importing {args.module}: {total_us / 1000:.1f} ms across {len(entries)} module(s).")
+        if leaked:
+            print(f"FAIL: heavy subsystems imported at startup: {', '.join(leaked)}")
+        if over_budget:
+            print(f"FAIL: startup imports exceeded the {args.budget_ms} ms budget.")
+    return 1 if leaked or over_budget else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+EcoWipe Log Collector (local stand-in)
+Receives batches from station log shippers over HTTP (gzip JSON lines) and/or
+syslog over TCP (octet-counted RFC 5424), and appends them per station and
+stream. Resent HTTP batches are recognized by their batch id and acknowledged
+without being stored twice. Failure injection exercises the shippers' retry
+and backpressure paths.
+
+Usage:
+    python tools/log_collector.py --out collected
+    python tools/log_collector.py --port 8514 --syslog-port 6601 --fail-rate 0.3
+    python tools/log_collector.py --down-for 60    # refuse everything for a minute
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import re
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9._-]")
+
+class CollectorStore:
+    """Append-only files <out>/<station>/<stream>.log plus a per-station list of seen batch ids."""
+    def __init__(self, out_dir: str):
+        self.out_dir = out_dir
+        self._lock = threading.Lock()
+        self._seen = {}
+        self.records = 0
+        self.batches = 0
+        self.duplicates = 0
+
+    def _station_dir(self, station: str) -> str:
+        path = os.path.join(self.out_dir, _SAFE_NAME.sub("_", station) or "unknown")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _seen_ids(self, station: str) -> set:
+        if station not in self._seen:
+            seen_path = os.path.join(self._station_dir(station), "batches.seen")
+            try:
+                with open(seen_path, "r", encoding="utf-8") as f:
+                    self._seen[station] = set(f.read().split())
+            except FileNotFoundError:
+                self._seen[station] = set()
+        return self._seen[station]
+
+    def add_batch(self, station: str, batch_id: str, records) -> bool:
+        """Store a batch; returns False if it was already received."""
+        with self._lock:
+            seen = self._seen_ids(station)
+            if batch_id and batch_id in seen:
+                self.duplicates += 1
+                return False
+            directory = self._station_dir(station)
+            by_stream = {}
+            for record in records:
+                by_stream.setdefault(_SAFE_NAME.sub("_", str(record.get("stream", "unknown"))), []).append(record["line"])
+            for stream, lines in by_stream.items():
+                with open(os.path.join(directory, f"{stream}.log"), "a", encoding="utf-8", newline="") as f:
+                    f.writelines(lines)
+            if batch_id:
+                seen.add(batch_id)
+                with open(os.path.join(directory, "batches.seen"), "a", encoding="utf-8") as f:
+                    f.write(batch_id + "\n")
+            self.records += len(records)
+            self.batches += 1
+            return True
+
+    def add_syslog(self, peer: str, message: bytes) -> None:
+        with self._lock:
+            with open(os.path.join(self._station_dir(f"syslog-{peer}"), "syslog.log"), "ab") as f:
+                f.write(message.rstrip(b"\n") + b"\n")
+            self.records += 1
+
+class FailureInjector:
+    def __init__(self, fail_rate: float, down_for: float, delay: float):
+        self.fail_rate = fail_rate
+        self.down_until = time.monotonic() + down_for
+        self.delay = delay
+
+    def should_fail(self) -> bool:
+        if self.delay:
+            time.sleep(self.delay)
+        return time.monotonic() < self.down_until or random.random() < self.fail_rate
+
+def make_http_handler(store: CollectorStore, failures: FailureInjector):
+    class IngestHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path.split("?", 1)[0] != "/ingest":
+                self.send_error(404)
+                return
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if failures.should_fail():
+                self.send_response(503)
+                self.send_header("Retry-After", "2")
+                self.end_headers()
+                return
+            try:
+                if self.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                records = [json.loads(line) for line in body.splitlines() if line.strip()]
+            except (OSError, ValueError) as e:
+                self.send_error(400, f"Malformed batch: {e}")
+                return
+            stored = store.add_batch(self.headers.get("X-EcoWipe-Station", "unknown"),
+                                     self.headers.get("X-EcoWipe-Batch", ""), records)
+            reply = json.dumps({"accepted": len(records) if stored else 0, "duplicate": not stored}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(reply)))
+            self.end_headers()
+            self.wfile.write(reply)
+
+        def log_message(self, format, *args):
+            pass
+    return IngestHandler
+
+def make_syslog_handler(store: CollectorStore):
+    class SyslogHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            peer = self.client_address[0]
+            while True:
+                length = b""
+                while not length.endswith(b" "):
+                    char = self.rfile.read(1)
+                    if not char:
+                        return
+                    length += char
+                message = self.rfile.read(int(length))
+                if not message:
+                    return
+                store.add_syslog(peer, message)
+    return SyslogHandler
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Local stand-in for the central log collector.")
+    parser.add_argument("--out", default="collected_logs", help="Directory receiving the shipped logs")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8514, help="HTTP port (POST /ingest)")
+    parser.add_argument("--syslog-port", type=int, default=None, help="Also accept syslog over TCP on this port")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of HTTP batches answered with 503")
+    parser.add_argument("--down-for", type=float, default=0.0, help="Answer every HTTP batch with 503 for this many seconds")
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before answering each HTTP batch")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    store = CollectorStore(args.out)
+    failures = FailureInjector(args.fail_rate, args.down_for, args.delay)
+
+    http_server = ThreadingHTTPServer((args.host, args.port), make_http_handler(store, failures))
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+    print(f"HTTP collector on http://{args.host}:{http_server.server_address[1]}/ingest -> {args.out}")
+    syslog_server = None
+    if args.syslog_port is not None:
+        syslog_server = socketserver.ThreadingTCPServer((args.host, args.syslog_port), make_syslog_handler(store))
+        syslog_server.daemon_threads = True
+        threading.Thread(target=syslog_server.serve_forever, daemon=True).start()
+        print(f"Syslog collector on tcp://{args.host}:{syslog_server.server_address[1]}")
+
+    try:
+        while True:
+            time.sleep(10)
+            print(f"{store.batches} batch(es), {store.records} record(s), {store.duplicates} duplicate batch(es)")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        http_server.shutdown()
+        if syslog_server is not None:
+            syslog_server.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+EcoWipe Trace Merge
+Combines per-job wipe traces into one Chrome trace-event file, so concurrent
+wipes (each on its own lane) can be compared on a single timeline in
+chrome://tracing or Perfetto.
+
+Usage:
+    python tools/merge_traces.py -o station.json
+    python tools/merge_traces.py traces/trace_5e1d....json traces/trace_9a0c....json -o pair.json
+    python tools/merge_traces.py --since 2026-10-01T08:00 -o morning.json
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.tracing import merge_traces
+from utils.constants import TRACE_DIR
+
+def parse_time_us(text: str) -> float:
+    stamp = datetime.fromisoformat(text)
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=timezone.utc)
+    return stamp.timestamp() * 1e6
+
+def first_timestamp(trace) -> float:
+    return min((e["ts"] for e in trace.get("traceEvents", []) if "ts" in e), default=0.0)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Merge per-job wipe traces into one timeline.")
+    parser.add_argument("traces", nargs="*", help="Trace files (default: every trace in --trace-dir)")
+    parser.add_argument("--trace-dir", default=TRACE_DIR, help="Directory of per-job traces")
+    parser.add_argument("--since", type=parse_time_us, default=None, help="Skip jobs that started earlier (ISO-8601, UTC if no offset)")
+    parser.add_argument("-o", "--output", required=True, help="Merged trace file to write")
+    args = parser.parse_args()
+
+    paths = args.traces or sorted(glob.glob(os.path.join(args.trace_dir, "trace_*.json")))
+    traces = []
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                trace = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Skipping {path}: {e}", file=sys.stderr)
+            continue
+        if args.since is None or first_timestamp(trace) >= args.since:
+            traces.append(trace)
+    if not traces:
+        print("No traces to merge.", file=sys.stderr)
+        return 1
+
+    traces.sort(key=first_timestamp)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(merge_traces(traces), f)
+    print(f"Merged {len(traces)} job trace(s) into {args.output}.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+EcoWipe Bulk QR Certificate Scanner
+Reads archived QR images (PNG exports or scanned paper), decodes the embedded
+certificate and checks its payload hash and signature, in parallel.
+
+Usage:
+    python tools/scan_qr_certificates.py certificates/
+    python tools/scan_qr_certificates.py scans/ --public-key keys/ecowipe_ed25519_public.pem --failures failures.jsonl
+    find /archive -name '*.png' | python tools/scan_qr_certificates.py - --json
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+from dataclasses import asdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.qr_scanner import iter_image_files, scan_images
+
+def read_path_stream(stream):
+    """Lazily yield image paths, one per line."""
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield line
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Decode and verify a large archive of certificate QR images.")
+    parser.add_argument("source", help="Directory of QR images (searched recursively), or - to read image paths from stdin")
+    parser.add_argument("--public-key", action="append", default=None,
+                        help="Signing station public key (PEM); repeat for several algorithms "
+                             "(default: every keys/ecowipe*_public.pem)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=32, help="Images per worker task")
+    parser.add_argument("--failures", help="Write failures as JSON lines to this file")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    paths = read_path_stream(sys.stdin) if args.source == "-" else iter_image_files(args.source)
+    public_keys = args.public_key or sorted(glob.glob(os.path.join("keys", "ecowipe*_public.pem")))
+    if not public_keys:
+        parser.error("No public keys found; pass --public-key.")
+
+    failures_out = open(args.failures, "w", encoding="utf-8") if args.failures else None
+    try:
+        on_failure = (lambda f: failures_out.write(json.dumps(asdict(f)) + "\n")) if failures_out else None
+        report = scan_images(paths, public_keys, args.workers, args.chunk_size, on_failure)
+    finally:
+        if failures_out:
+            failures_out.close()
+
+    summary = {
+        "total": report.total,
+        "valid": report.valid,
+        "invalid": report.invalid,
+        "failures_by_stage": report.failures_by_stage,
+        "elapsed_seconds": round(report.elapsed_seconds, 3),
+        "images_per_second": round(report.throughput, 1),
+        "failures": [asdict(f) for f in report.failures],
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        for failure in report.failures:
+            print(f"FAIL [{failure.stage}] {failure.source} ({failure.certificate_id}): {failure.reason}")
+        breakdown = ", ".join(f"{stage}: {count}" for stage, count in sorted(report.failures_by_stage.items()))
+        print(f"Scanned {report.total} image(s): {report.valid} valid, {report.invalid} invalid"
+              f"{f' ({breakdown})' if breakdown else ''} in {report.elapsed_seconds:.1f}s ({report.throughput:.1f}/s).")
+    return 1 if report.invalid else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
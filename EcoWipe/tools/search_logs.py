@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+EcoWipe Log Search
+Searches live and rotated (block-compressed) logs in parallel, filtering by
+time range, regular expression and record fields. Archive blocks outside the
+time range are skipped from their headers; matching blocks are inflated in
+memory only, never to disk.
+
+Usage:
+    python tools/search_logs.py --since 2026-10-01 --until 2026-10-02 "Wipe failed"
+    python tools/search_logs.py --log wipe --field level=ERROR
+    python tools/search_logs.py --log audit --field device_serial=WD-WCC4N1234567 --json
+"""
+import argparse
+import heapq
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.log_archive import SearchCriteria, plan_search, rotated_segments, search_segment
+from utils.constants import LOG_DIR
+from utils.parallel import bounded_as_completed
+
+def parse_time(text: str) -> float:
+    """ISO-8601 date or date-time; naive values are taken as UTC, like the logs."""
+    stamp = datetime.fromisoformat(text)
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=timezone.utc)
+    return stamp.timestamp()
+
+def log_files(log_dir: str, names):
+    """Live log files, optionally restricted to the given logger names (wipe, audit, ...)."""
+    for entry in sorted(os.listdir(log_dir)):
+        stem, _, ext = entry.partition(".")
+        if ext in ("log", "jsonl") and (not names or stem in names):
+            yield os.path.join(log_dir, entry)
+
+def _run_task(task, criteria):
+    path, blocks = task
+    return search_segment(path, blocks, criteria)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Search live and compressed EcoWipe logs.")
+    parser.add_argument("pattern", nargs="?", default=None, help="Regular expression matched against each record")
+    parser.add_argument("--log-dir", default=LOG_DIR, help="Log directory")
+    parser.add_argument("--log", action="append", default=None, help="Logger to search (device, wipe, certificate, security, error, shipper, audit); repeatable")
+    parser.add_argument("--since", type=parse_time, default=None, help="Earliest record time (ISO-8601, UTC if no offset)")
+    parser.add_argument("--until", type=parse_time, default=None, help="Latest record time")
+    parser.add_argument("--field", action="append", default=[], metavar="KEY=VALUE",
+                        help="Record field filter: level/module/function for text logs, any key for audit records")
+    parser.add_argument("-i", "--ignore-case", action="store_true", help="Case-insensitive pattern")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--json", action="store_true", help="Print matches as JSON lines with their segment and offset")
+    args = parser.parse_args()
+
+    fields = {}
+    for item in args.field:
+        key, sep, value = item.partition("=")
+        if not sep:
+            parser.error(f"--field expects KEY=VALUE, got {item!r}")
+        fields[key] = value
+    criteria = SearchCriteria(args.pattern, args.since, args.until, fields, args.ignore_case)
+
+    segments = []
+    for live in log_files(args.log_dir, args.log):
+        segments.extend(rotated_segments(live))
+        segments.append(live)
+    tasks = list(plan_search(segments, criteria))
+
+    workers = args.workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    matches = 0
+    # Results are printed in segment order as soon as every earlier task is done
+    ready = []
+    next_index = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for index, task, future in bounded_as_completed(executor, _run_task, tasks, workers * 2, criteria):
+            heapq.heappush(ready, (index, task, future.result()))
+            while ready and ready[0][0] == next_index:
+                _, (path, _), results = heapq.heappop(ready)
+                next_index += 1
+                for offset, text in results:
+                    matches += 1
+                    if args.json:
+                        print(json.dumps({"segment": os.path.basename(path), "offset": offset, "record": text}, ensure_ascii=False))
+                    else:
+                        sys.stdout.write(text if text.endswith("\n") else text + "\n")
+    elapsed = time.perf_counter() - started
+    print(f"{matches} record(s) in {len(segments)} segment(s), {len(tasks)} task(s), {elapsed:.2f}s.", file=sys.stderr)
+    return 0 if matches else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+EcoWipe Signing Agent
+Runs the local signing agent that holds the station key in memory for every
+wipe station and tool on this machine, shows its metrics, or load-tests it
+with several client processes pipelining batched sign requests.
+
+Usage:
+    python tools/signing_agent.py serve --algorithm ed25519
+    python tools/signing_agent.py metrics
+    python tools/signing_agent.py loadtest --clients 4 --requests 500 --batch 8 --depth 16
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import serialization
+
+from core.security_engine import verify_with_public_key
+from core.signing_agent import LatencyStats, SigningAgent, SigningAgentClient
+from utils.constants import SIGNATURE_ALGORITHM, SIGNING_AGENT_QUEUE_MAX, SIGNING_AGENT_WORKERS
+
+def run_client(address: str, key_dir: str, client_index: int, requests: int, batch: int, depth: int, results) -> None:
+    """One load-test client process: keeps `depth` batched requests in flight."""
+    client = SigningAgentClient(address, key_dir)
+    info = client.info()
+    public_key = serialization.load_pem_public_key(info["public_key_pem"].encode("utf-8"))
+    latency = LatencyStats()
+    in_flight: deque = deque()
+    bad = 0
+    started = time.perf_counter()
+    for n in range(requests):
+        data = [hashlib.sha256(f"{client_index}:{n}:{i}".encode()).hexdigest().encode() for i in range(batch)]
+        in_flight.append((data, time.perf_counter(), client.submit(data)))
+        if len(in_flight) >= depth:
+            bad += _settle(in_flight.popleft(), public_key, info["algorithm"], latency)
+    while in_flight:
+        bad += _settle(in_flight.popleft(), public_key, info["algorithm"], latency)
+    elapsed = time.perf_counter() - started
+    client.close()
+    results.put({"client": client_index, "items": requests * batch, "bad_signatures": bad,
+                 "elapsed_s": elapsed, "latency": latency.snapshot()})
+
+def _settle(entry, public_key, algorithm: str, latency: LatencyStats) -> int:
+    data, sent, future = entry
+    signatures = future.result()["signatures"]
+    latency.record((time.perf_counter() - sent) * 1000)
+    bad = 0
+    for item, signature in zip(data, signatures):
+        try:
+            verify_with_public_key(public_key, item, signature, algorithm)
+        except (InvalidSignature, ValueError):
+            bad += 1
+    return bad
+
+def serve(args) -> int:
+    agent = SigningAgent(args.keys, args.algorithm, args.address, args.workers, args.queue_max)
+    print(f"Signing agent ({agent.security_engine.algorithm}) listening on {agent.address}; Ctrl+C to stop.")
+    agent.serve_forever()
+    return 0
+
+def metrics(args) -> int:
+    client = SigningAgentClient(args.address, args.keys)
+    print(json.dumps(client.metrics(), indent=2))
+    client.close()
+    return 0
+
+def loadtest(args) -> int:
+    agent = None
+    address = args.address
+    if not args.external:
+        # Self-contained run: host the agent in this process, clients in others
+        agent = SigningAgent(args.keys, args.algorithm, address, args.workers, args.queue_max)
+        agent.start()
+        address = agent.address
+    results = multiprocessing.Queue()
+    clients = [multiprocessing.Process(target=run_client, args=(address, args.keys, i, args.requests, args.batch, args.depth, results))
+               for i in range(args.clients)]
+    started = time.perf_counter()
+    for process in clients:
+        process.start()
+    reports = [results.get() for _ in clients]
+    for process in clients:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    probe = SigningAgentClient(address, args.keys)
+    agent_metrics = probe.metrics()
+    probe.close()
+    if agent is not None:
+        agent.close()
+
+    items = sum(r["items"] for r in reports)
+    bad = sum(r["bad_signatures"] for r in reports)
+    for r in sorted(reports, key=lambda r: r["client"]):
+        lat = r["latency"]
+        print(f"client {r['client']}: {r['items']} signatures in {r['elapsed_s']:.2f}s, "
+              f"request latency p50 {lat['p50_ms']} ms / p99 {lat['p99_ms']} ms")
+    q = agent_metrics["queue_latency"]
+    print(f"agent queue latency: mean {q['mean_ms']} ms, p50 {q['p50_ms']} ms, p95 {q['p95_ms']} ms, "
+          f"p99 {q['p99_ms']} ms, max {q['max_ms']} ms")
+    print(f"{items} signature(s) from {args.clients} client(s) in {elapsed:.2f}s ({items / elapsed:.0f}/s), "
+          f"{bad} failed verification.")
+    return 1 if bad else 0
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Local signing agent shared by wipe stations.")
+    parser.add_argument("--keys", default="keys", help="Signing key directory")
+    parser.add_argument("--address", default=None, help="Agent address (default: named pipe on Windows, <keys>/signing-agent.sock elsewhere)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("serve", "loadtest"):
+        p = sub.add_parser(name)
+        p.add_argument("--algorithm", default=SIGNATURE_ALGORITHM, help="Signature suite of the held key")
+        p.add_argument("--workers", type=int, default=SIGNING_AGENT_WORKERS, help="Signer threads")
+        p.add_argument("--queue-max", type=int, default=SIGNING_AGENT_QUEUE_MAX, help="Queued requests before clients are throttled")
+    sub.add_parser("metrics", help="Print a running agent's metrics as JSON")
+    p = sub.choices["loadtest"]
+    p.add_argument("--external", action="store_true", help="Load-test an already running agent instead of starting one")
+    p.add_argument("--clients", type=int, default=4, help="Client processes")
+    p.add_argument("--requests", type=int, default=200, help="Sign requests per client")
+    p.add_argument("--batch", type=int, default=8, help="Items per sign request")
+    p.add_argument("--depth", type=int, default=16, help="Requests each client keeps in flight")
+    args = parser.parse_args()
+
+    return {"serve": serve, "metrics": metrics, "loadtest": loadtest}[args.command](args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+EcoWipe Soak Test
+Runs the real WipeEngine (validation, pre-hash, passes, post-hash
+verification, release, capacity probe) against many simulated block devices concurrently,
+with randomly drawn or scripted faults, and checks every outcome: wipes that
+should succeed must leave the expected content and a matching post-wipe hash,
+wipes hit by a fatal fault must fail cleanly, counterfeit devices must be
+found at their real capacity and never reported as a full SUCCESS, and every
+device must end up released.
+
+Usage:
+    python tools/soak_test.py --devices 32 --size 64MiB --concurrency 8
+    python tools/soak_test.py --devices 200 --size 16MiB --fault-rate 0.5 --rounds 3 --seed 7
+    python tools/soak_test.py --scenario scenarios.json --method "DoD 5220.22-M (3-Pass)"
+    python tools/soak_test.py --backing-dir /tmp/simdisks --devices 4 --size 256MiB
+    python tools/soak_test.py --image-dir /tmp/images --devices 8    # also capture and verify forensic images
+
+A scenario file is a JSON list of DeviceProfile dicts (see
+core/simulated_device.py), assigned to the devices in turn, e.g.
+    [{"size_bytes": 67108864, "write_mbps": 40,
+      "faults": [{"offset": 33554432, "kind": "error", "op": "write", "times": 1}]}]
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.forensic_image import ForensicImageReader
+from core.simulated_device import DeviceProfile, Fault, SimulatedBlockDevice, SimulatedDeviceValidator, SlowZone
+from core.state_machine import WipeState
+from core.wipe_engine import WipeEngine
+from core.wipe_strategies import get_strategy
+from core.logging_engine import flush_logs
+from utils.constants import CAPACITY_PROBE_SECTOR_BYTES, WIPE_BLOCK_SIZE_BYTES
+
+METHODS = ["1-Pass Zero (NIST 800-88 Clear)", "1-Pass Random (NIST 800-88 Clear)", "DoD 5220.22-M (3-Pass)"]
+SCENARIOS = ["clean", "slow_zone", "short_transfers", "transient_write_error", "bad_read_sector", "surprise_removal",
+             "counterfeit", "counterfeit_error"]
+
+def parse_size(text: str) -> int:
+    units = {"KIB": 1024, "MIB": 1024**2, "GIB": 1024**3, "K": 1024, "M": 1024**2, "G": 1024**3}
+    upper = text.strip().upper()
+    for suffix, factor in units.items():
+        if upper.endswith(suffix):
+            return int(float(upper[:-len(suffix)]) * factor)
+    return int(upper)
+
+def random_profile(rng: random.Random, size: int, passes: int, scenario: str) -> DeviceProfile:
+    """A device with a plausible baseline speed plus the faults of one scenario."""
+    profile = DeviceProfile(size_bytes=size, latency_s=rng.uniform(0, 0.0005),
+                            read_mbps=rng.choice([None, 400, 800]), write_mbps=rng.choice([None, 200, 400]),
+                            seed=rng.randrange(1 << 30))
+    at = rng.randrange(size)
+    if scenario == "slow_zone":
+        length = max(size // 8, WIPE_BLOCK_SIZE_BYTES)
+        profile.slow_zones.append(SlowZone(at, at + length, latency_s=0.002, mbps=50))
+    elif scenario == "short_transfers":
+        profile.max_transfer_bytes = rng.choice([4096, 65536, 300 * 1024])
+        profile.faults.append(Fault(at, kind="short", op="any", length=4096, times=None))
+    elif scenario == "transient_write_error":
+        profile.faults.append(Fault(at, kind="error", op="write", times=1))
+    elif scenario == "bad_read_sector":
+        profile.faults.append(Fault(at, kind="error", op="read", length=512, times=None))
+    elif scenario == "surprise_removal":
+        # Anywhere in the job's I/O: pre-hash, any pass, or post-hash
+        profile.remove_after_bytes = rng.randrange(size * (passes + 2))
+    elif scenario == "counterfeit":
+        # Fake controllers wrap the address space at a power-of-two module size
+        profile.real_capacity_bytes = max(size // rng.choice([2, 4, 8]), WIPE_BLOCK_SIZE_BYTES)
+    elif scenario == "counterfeit_error":
+        # Others fail every transfer past their real storage instead
+        profile.real_capacity_bytes = max(size // rng.choice([2, 3, 4, 8]), WIPE_BLOCK_SIZE_BYTES)
+        profile.real_capacity_bytes -= profile.real_capacity_bytes % CAPACITY_PROBE_SECTOR_BYTES
+        profile.overflow = "error"
+    return profile
+
+def expected_to_succeed(profile: DeviceProfile, passes: int) -> bool:
+    total_io = (profile.real_capacity_bytes or profile.size_bytes) * (passes + 2)
+    if profile.remove_after_bytes is not None and profile.remove_after_bytes < total_io:
+        return False
+    return not any(f.kind in ("error", "remove") and f.offset < profile.size_bytes for f in profile.faults)
+
+def run_one(name: str, label: str, profile: DeviceProfile, method: str, backing_dir: str, image_dir: str) -> Dict:
+    backing = os.path.join(backing_dir, f"{name}.img") if backing_dir else None
+    device = SimulatedBlockDevice(name, profile, backing)
+    device.prefill()
+    validator = SimulatedDeviceValidator({device.device.device_id: device})
+    engine = WipeEngine(device.device, method, "soak-test", validator=validator, open_device=validator.open_device,
+                         forensic_image_dir=image_dir)
+    strategy = get_strategy(method)
+    expect_ok = expected_to_succeed(profile, strategy.passes)
+    expected_capacity = min(profile.real_capacity_bytes or profile.size_bytes, profile.size_bytes)
+    original_hash = hashlib.sha256(device.read_back(expected_capacity)).hexdigest()
+    started = time.perf_counter()
+    engine.run()
+    elapsed = time.perf_counter() - started
+
+    problems: List[str] = []
+    succeeded = engine.result is not None
+    if succeeded != expect_ok:
+        problems.append(f"expected {'success' if expect_ok else 'failure'}, got "
+                        f"{'success' if succeeded else 'failure: ' + str(engine.error)}")
+    if engine.state_machine.current_state != WipeState.SAFE_RELEASE:
+        problems.append(f"ended in {engine.state_machine.current_state.name}")
+    if device.locked or not device.closed:
+        problems.append("device left open or locked")
+    if succeeded:
+        if engine.pre_hash != original_hash:
+            problems.append("pre-wipe hash does not match the original content (probe sectors not restored)")
+        if image_dir:
+            try:
+                if ForensicImageReader(engine.forensic_image["manifest"]).verify() != original_hash:
+                    problems.append("forensic image does not hold the original content")
+            except Exception as e:
+                problems.append(f"forensic image does not verify: {e}")
+        if engine.device.usable_bytes != expected_capacity:
+            problems.append(f"capacity probe found {engine.device.usable_bytes} usable bytes, expected {expected_capacity}")
+        expected_status = "COUNTERFEIT_PARTIAL" if expected_capacity < profile.size_bytes else "SUCCESS"
+        if engine.result["status"] != expected_status:
+            problems.append(f"status {engine.result['status']}, expected {expected_status}")
+        content = device.read_back(engine.device.usable_bytes)
+        if hashlib.sha256(content).hexdigest() != engine.post_hash:
+            problems.append("post-wipe hash does not match the device content")
+        final_pass = strategy.passes - 1
+        if final_pass not in strategy.random_passes:
+            last_block = strategy.get_block(final_pass)
+            expected = (last_block * (len(content) // len(last_block) + 1))[:len(content)]
+            if content != expected:
+                problems.append("device content is not the final pass pattern")
+    device.dispose()
+    return {"name": name, "scenario": label, "ok": not problems, "succeeded": succeeded, "problems": problems,
+            "seconds": elapsed, "bytes": device.bytes_read + device.bytes_written, "faults": device.faults_fired}
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Soak-test the wipe engine against simulated devices.")
+    parser.add_argument("--devices", type=int, default=16, help="Simulated devices per round")
+    parser.add_argument("--size", type=parse_size, default=parse_size("32MiB"), help="Device size (e.g. 64MiB)")
+    parser.add_argument("--method", default=None, choices=METHODS, help="Wipe method (default: random per device)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Wipes running at once")
+    parser.add_argument("--rounds", type=int, default=1, help="Repetitions with fresh devices")
+    parser.add_argument("--fault-rate", type=float, default=0.3, help="Fraction of devices given a fault scenario")
+    parser.add_argument("--scenario", default=None, help="JSON list of DeviceProfile dicts instead of random devices")
+    parser.add_argument("--backing-dir", default=None, help="Back devices with sparse files here (default: memory)")
+    parser.add_argument("--image-dir", default=None, help="Capture a forensic image of every device here")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible runs")
+    parser.add_argument("--json", action="store_true", help="Print one JSON result per device")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    scripted = None
+    if args.scenario:
+        with open(args.scenario, "r", encoding="utf-8") as f:
+            scripted = [DeviceProfile.from_dict(spec) for spec in json.load(f)]
+    if args.backing_dir:
+        os.makedirs(args.backing_dir, exist_ok=True)
+
+    results = []
+    started = time.perf_counter()
+    for round_index in range(args.rounds):
+        jobs: List[Tuple[str, str, DeviceProfile, str]] = []
+        for i in range(args.devices):
+            method = args.method or rng.choice(METHODS)
+            if scripted:
+                label, profile = f"scripted[{i % len(scripted)}]", scripted[i % len(scripted)]
+            else:
+                label = rng.choice(SCENARIOS[1:]) if rng.random() < args.fault_rate else "clean"
+                profile = random_profile(rng, args.size, get_strategy(method).passes, label)
+            jobs.append((f"r{round_index}d{i}", label, profile, method))
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            futures = [executor.submit(run_one, name, label, profile, method, args.backing_dir, args.image_dir)
+                       for name, label, profile, method in jobs]
+            for future in futures:
+                result = future.result()
+                results.append(result)
+                if args.json:
+                    print(json.dumps(result))
+    elapsed = time.perf_counter() - started
+    flush_logs()
+
+    by_scenario = defaultdict(lambda: [0, 0, 0])
+    for result in results:
+        counts = by_scenario[result["scenario"]]
+        counts[0] += 1
+        counts[1] += result["succeeded"]
+        counts[2] += not result["ok"]
+    if not args.json:
+        print(f"{'scenario':<24}{'devices':>9}{'wiped':>8}{'unexpected':>12}")
+        for scenario, (total, wiped, unexpected) in sorted(by_scenario.items()):
+            print(f"{scenario:<24}{total:>9}{wiped:>8}{unexpected:>12}")
+        for result in results:
+            for problem in result["problems"]:
+                print(f"UNEXPECTED {result['name']} ({result['scenario']}): {problem}")
+    moved = sum(r["bytes"] for r in results)
+    print(f"{len(results)} wipe(s), {moved / 1e6:.0f} MB of device I/O in {elapsed:.1f}s "
+          f"({moved / 1e6 / elapsed:.0f} MB/s aggregate).", file=sys.stderr)
+    return 1 if any(not r["ok"] for r in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
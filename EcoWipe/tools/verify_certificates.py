@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+EcoWipe Bulk Certificate Verifier
+Recomputes each certificate's canonical payload hash and checks its
+signature, in parallel, over a certificate directory or the certificate store.
+
+Usage:
+    python tools/verify_certificates.py certificates/ --public-key keys/ecowipe_public.pem
+    python tools/verify_certificates.py --db certificates/certificates.db --failures failures.jsonl --json
+    python tools/verify_certificates.py certificates/ --public-key keys/ecowipe_public.pem --public-key keys/ecowipe_ed25519_public.pem
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+from dataclasses import asdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.certificate_store import CertificateStore
+from core.certificate_verifier import iter_certificate_files, iter_store_certificates, verify_archive
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Verify the signatures of a certificate archive.")
+    parser.add_argument("archive", nargs="?", help="Directory of cert_*.json files (searched recursively)")
+    parser.add_argument("--db", help="Verify certificates from a certificate store instead of files")
+    parser.add_argument("--public-key", action="append", default=None,
+                        help="Signing station public key (PEM); repeat for stations using several algorithms "
+                             "(default: every keys/ecowipe*_public.pem)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Certificates per worker task")
+    parser.add_argument("--failures", help="Write failures as JSON lines to this file")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    if bool(args.archive) == bool(args.db):
+        parser.error("Give either an archive directory or --db.")
+
+    failures_out = open(args.failures, "w", encoding="utf-8") if args.failures else None
+    store = CertificateStore(args.db, read_only=True) if args.db else None
+    try:
+        items = iter_store_certificates(store) if store else iter_certificate_files(args.archive)
+        on_failure = (lambda f: failures_out.write(json.dumps(asdict(f)) + "\n")) if failures_out else None
+        public_keys = args.public_key or sorted(glob.glob(os.path.join("keys", "ecowipe*_public.pem")))
+        report = verify_archive(items, public_keys, args.workers, args.chunk_size, on_failure)
+    finally:
+        if failures_out:
+            failures_out.close()
+        if store:
+            store.close()
+
+    summary = {
+        "total": report.total,
+        "valid": report.valid,
+        "invalid": report.invalid,
+        "elapsed_seconds": round(report.elapsed_seconds, 3),
+        "certificates_per_second": round(report.throughput, 1),
+        "failures": [asdict(f) for f in report.failures],
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        for failure in report.failures:
+            print(f"FAIL {failure.source} ({failure.certificate_id}): {failure.reason}")
+        print(f"Verified {report.total} certificate(s): {report.valid} valid, {report.invalid} invalid "
+              f"in {report.elapsed_seconds:.1f}s ({report.throughput:.0f}/s).")
+    return 1 if report.invalid else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Enterprise Data Sanitization Platform
+Incremental Device List Model
+"""
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+from typing import Any, Dict, List, Optional
+
+from core.device_validator import ValidatedDevice
+
+class DeviceListModel(QAbstractListModel):
+    """
+    List model keyed by device_id.
+    Scanner snapshots are applied as keyed diffs (remove / update / insert) so
+    views keep their selection and only changed rows are repainted. A row
+    whose device fingerprint changed is replaced, which drops its selection.
+    """
+    DeviceRole = Qt.ItemDataRole.UserRole
+    DeviceIdRole = Qt.ItemDataRole.UserRole + 1
+    StatusRole = Qt.ItemDataRole.UserRole + 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._devices: List[ValidatedDevice] = []
+        self._rows: Dict[str, int] = {}
+        self._status: Dict[str, str] = {}
+
+    # --- QAbstractListModel interface ---
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._devices)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or not 0 <= index.row() < len(self._devices):
+            return None
+        device = self._devices[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.describe(device, self._status.get(device.device_id, ""))
+        if role == self.DeviceRole:
+            return device
+        if role == self.DeviceIdRole:
+            return device.device_id
+        if role == self.StatusRole:
+            return self._status.get(device.device_id, "")
+        return None
+
+    # --- Public API ---
+
+    @staticmethod
+    def describe(device: ValidatedDevice, status: str = "") -> str:
+        text = f"{device.device_id} | {device.model} | {device.size_gb} GB | S/N: {device.serial_number}"
+        return f"{text} | {status}" if status else text
+
+    def device_at(self, row: int) -> Optional[ValidatedDevice]:
+        return self._devices[row] if 0 <= row < len(self._devices) else None
+
+    def row_of(self, device_id: str) -> int:
+        return self._rows.get(device_id, -1)
+
+    def apply_snapshot(self, drives: List[ValidatedDevice]) -> None:
+        """
+        Bring the model in line with a full scanner snapshot using the minimal
+        set of row removals, in-place updates, replacements and appends.
+        """
+        incoming = {d.device_id: d for d in drives}
+
+        # 1. Removals, walking backwards so earlier row numbers stay valid
+        row = len(self._devices) - 1
+        while row >= 0:
+            if self._devices[row].device_id in incoming:
+                row -= 1
+                continue
+            end = row
+            while row - 1 >= 0 and self._devices[row - 1].device_id not in incoming:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row, end)
+            for removed in self._devices[row:end + 1]:
+                self._status.pop(removed.device_id, None)
+            del self._devices[row:end + 1]
+            self.endRemoveRows()
+            row -= 1
+        self._reindex()
+
+        # 2. In-place updates for devices whose record changed
+        for row, device in enumerate(self._devices):
+            fresh = incoming[device.device_id]
+            if fresh == device:
+                continue
+            if fresh.fingerprint != device.fingerprint:
+                # A different physical device now sits at this id: replace the row
+                # (remove + insert) so no selection or status carries over to it
+                self.beginRemoveRows(QModelIndex(), row, row)
+                self._status.pop(device.device_id, None)
+                del self._devices[row]
+                self.endRemoveRows()
+                self.beginInsertRows(QModelIndex(), row, row)
+                self._devices.insert(row, fresh)
+                self.endInsertRows()
+                continue
+            self._devices[row] = fresh
+            idx = self.index(row)
+            self.dataChanged.emit(idx, idx)
+
+        # 3. Append new devices in snapshot order
+        new_devices = [d for d in drives if d.device_id not in self._rows]
+        if new_devices:
+            first = len(self._devices)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_devices) - 1)
+            self._devices.extend(new_devices)
+            self._reindex()
+            self.endInsertRows()
+
+    def set_status(self, device_id: str, status: str) -> None:
+        """Attach a live status (e.g. wipe progress) to a device row."""
+        if self._status.get(device_id, "") == status:
+            return
+        if status:
+            self._status[device_id] = status
+        else:
+            self._status.pop(device_id, None)
+        row = self._rows.get(device_id, -1)
+        if row >= 0:
+            idx = self.index(row)
+            self.dataChanged.emit(idx, idx, [Qt.ItemDataRole.DisplayRole, self.StatusRole])
+
+    def _reindex(self) -> None:
+        self._rows = {d.device_id: row for row, d in enumerate(self._devices)}
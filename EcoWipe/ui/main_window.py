@@ -4,24 +4,23 @@ Main UI Window
 """
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QPushButton, QListWidget, QComboBox, QLineEdit, QProgressBar,
-    QMessageBox, QFrame, QListWidgetItem
+    QPushButton, QListView, QComboBox, QLineEdit, QProgressBar,
+    QMessageBox, QFrame, QDialog, QAbstractItemView, QCheckBox
 )
 from PyQt6.QtCore import Qt, pyqtSlot
 from PyQt6.QtGui import QFont
 from typing import List, Optional
 
-import sys
-import os
-# Ensure core and ui can be imported
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.device_validator import ValidatedDevice
 from core.wipe_engine import WipeEngine
-from core.certificate_engine import CertificateEngine
 from core.validation_engine import validate_operator_name
 from core.exception_types import InvalidInputError
-from ui.worker_threads import DeviceScannerThread
+from core.metrics import start_metrics_server
+from core.log_shipper import start_log_shipper
+from ui.worker_threads import DeviceScannerThread, CertificateWorkerPool, SubsystemInitThread
+from ui.device_list_model import DeviceListModel
 from ui.safe_dialogs import StrictConfirmationDialog, show_error_dialog, show_info_dialog
+from utils.constants import FORENSIC_IMAGE_DIR
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -31,11 +30,28 @@ class MainWindow(QMainWindow):
         
         self.current_drives: List[ValidatedDevice] = []
         self.wipe_thread: Optional[WipeEngine] = None
-        self.cert_engine = CertificateEngine()
+        self.wiping_device_id: Optional[str] = None
+        # The certificate engine (crypto/QR stack and signing key) loads in the
+        # background; certificates requested before it is ready are held.
+        self.cert_engine = None
+        self.cert_workers = CertificateWorkerPool(parent=self)
+        self.cert_workers.certificate_ready.connect(self._handle_certificate_ready)
+        self.cert_workers.certificate_failed.connect(self._handle_certificate_failed)
         
         self._setup_ui()
+        self._start_subsystems()
         self._start_scanner()
 
+    def _start_subsystems(self):
+        # Local scrape endpoint; binding a socket is cheap, so it starts right away
+        self.metrics_server = start_metrics_server()
+        # Tails the logs on its own threads; None unless a collector is configured
+        self.log_shipper = start_log_shipper()
+        self.subsystems = SubsystemInitThread(self)
+        self.subsystems.certificate_engine_ready.connect(self._handle_certificate_engine_ready)
+        self.subsystems.initialization_failed.connect(self._handle_subsystem_failed)
+        self.subsystems.start()
+
     def _setup_ui(self):
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -60,8 +76,12 @@ class MainWindow(QMainWindow):
 
         # Device List
         main_layout.addWidget(QLabel("Available USB Devices (System Drives Hidden):"))
-        self.device_list = QListWidget()
-        self.device_list.setSelectionMode(QListWidget.SelectionMode.SingleSelection)
+        self.device_model = DeviceListModel(self)
+        self.device_list = QListView()
+        self.device_list.setModel(self.device_model)
+        self.device_list.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        # Uniform rows let the view lay out only the visible items
+        self.device_list.setUniformItemSizes(True)
         main_layout.addWidget(self.device_list)
 
         # Wipe Method Selection
@@ -82,7 +102,7 @@ class MainWindow(QMainWindow):
         self.progress_bar.setTextVisible(True)
         main_layout.addWidget(self.progress_bar)
         
-        self.status_label = QLabel("Ready")
+        self.status_label = QLabel("Initializing device discovery...")
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         main_layout.addWidget(self.status_label)
 
@@ -96,12 +116,23 @@ class MainWindow(QMainWindow):
         self.wipe_btn.setStyleSheet("background-color: #DC2626; color: white; font-weight: bold; padding: 10px;")
         self.wipe_btn.clicked.connect(self._initiate_wipe)
         
+        # Stays enabled during a wipe: toggles the sampling profiler of the running job
+        self.profile_check = QCheckBox("Profile wipe")
+        self.profile_check.setToolTip("Sample the wipe thread's stack into the job's trace (traces/)")
+        self.profile_check.toggled.connect(self._toggle_profiling)
+        
+        self.image_check = QCheckBox("Capture forensic image")
+        self.image_check.setToolTip(f"Keep a compressed image of the device ({FORENSIC_IMAGE_DIR}/) before it is wiped")
+        
         btn_layout.addWidget(self.refresh_btn)
+        btn_layout.addWidget(self.image_check)
+        btn_layout.addWidget(self.profile_check)
         btn_layout.addWidget(self.wipe_btn)
         main_layout.addLayout(btn_layout)
 
     def _start_scanner(self):
         self.scanner = DeviceScannerThread()
+        self.scanner.scanner_ready.connect(self._handle_scanner_ready)
         self.scanner.drives_updated.connect(self._update_device_list)
         self.scanner.error_occurred.connect(self._handle_scanner_error)
         self.scanner.start()
@@ -113,21 +144,39 @@ class MainWindow(QMainWindow):
     @pyqtSlot(list)
     def _update_device_list(self, drives: List[ValidatedDevice]):
         self.current_drives = drives
-        self.device_list.clear()
+        self.device_model.apply_snapshot(drives)
         
         if not drives:
-            self.device_list.addItem("No valid USB devices found.")
-            self.device_list.item(0).setFlags(Qt.ItemFlag.NoItemFlags) # Make unselectable
+            self.status_label.setText("No valid USB devices found.")
             return
             
-        for drive in drives:
-            item_text = f"{drive.device_id} | {drive.model} | {drive.size_gb} GB | S/N: {drive.serial_number}"
-            item = QListWidgetItem(item_text)
-            item.setData(Qt.ItemDataRole.UserRole, drive.device_id)
-            self.device_list.addItem(item)
-            
         self.status_label.setText(f"Found {len(drives)} valid device(s).")
 
+    def _selected_device(self) -> Optional[ValidatedDevice]:
+        indexes = self.device_list.selectionModel().selectedIndexes()
+        if not indexes:
+            return None
+        return self.device_model.device_at(indexes[0].row())
+
+    @pyqtSlot()
+    def _handle_scanner_ready(self):
+        self.status_label.setText("Scanning for devices...")
+
+    @pyqtSlot(object)
+    def _handle_certificate_engine_ready(self, cert_engine):
+        if self.cert_engine is cert_engine:
+            return
+        self.cert_engine = cert_engine
+        self.cert_workers.set_engine(cert_engine)
+
+    @pyqtSlot(str, str)
+    def _handle_subsystem_failed(self, subsystem: str, error_msg: str):
+        self.cert_workers.fail_held(error_msg)
+        show_error_dialog(
+            self, "Initialization Error",
+            f"The {subsystem} subsystem could not be initialized; certificates cannot be generated:\n{error_msg}"
+        )
+
     @pyqtSlot(str)
     def _handle_scanner_error(self, error_msg: str):
         self.status_label.setText(f"Scanner Error: {error_msg}")
@@ -141,13 +190,12 @@ class MainWindow(QMainWindow):
             return
 
         # 2. Validate Selection
-        selected_items = self.device_list.selectedItems()
-        if not selected_items or selected_items[0].flags() == Qt.ItemFlag.NoItemFlags:
+        selected_device = self._selected_device()
+        if selected_device is None:
             show_error_dialog(self, "Selection Error", "Please select a valid device to wipe.")
             return
             
-        device_id = selected_items[0].data(Qt.ItemDataRole.UserRole)
-        device_info = selected_items[0].text()
+        device_info = DeviceListModel.describe(selected_device)
         method_name = self.method_combo.currentText()
 
         # 3. Strict Confirmation
@@ -163,16 +211,26 @@ class MainWindow(QMainWindow):
         # Stop scanner during wipe to prevent WMI conflicts
         self.scanner.stop()
         
-        self.wipe_thread = WipeEngine(device_id, method_name, operator_name)
+        self.wiping_device_id = selected_device.device_id
+        self.device_model.set_status(self.wiping_device_id, "Queued")
+        image_dir = FORENSIC_IMAGE_DIR if self.image_check.isChecked() else None
+        self.wipe_thread = WipeEngine(selected_device, method_name, operator_name, forensic_image_dir=image_dir)
         self.wipe_thread.progress_updated.connect(self._update_progress)
         self.wipe_thread.wipe_completed.connect(self._handle_wipe_success)
         self.wipe_thread.wipe_failed.connect(self._handle_wipe_failure)
+        self.wipe_thread.set_profiling(self.profile_check.isChecked())
         self.wipe_thread.start()
 
+    @pyqtSlot(bool)
+    def _toggle_profiling(self, enabled: bool):
+        if self.wipe_thread is not None:
+            self.wipe_thread.set_profiling(enabled)
+
     def _set_ui_locked(self, locked: bool):
         self.operator_input.setEnabled(not locked)
         self.device_list.setEnabled(not locked)
         self.method_combo.setEnabled(not locked)
+        self.image_check.setEnabled(not locked)
         self.refresh_btn.setEnabled(not locked)
         self.wipe_btn.setEnabled(not locked)
 
@@ -180,37 +238,86 @@ class MainWindow(QMainWindow):
     def _update_progress(self, value: int, message: str):
         self.progress_bar.setValue(value)
         self.status_label.setText(message)
+        if self.wiping_device_id:
+            self.device_model.set_status(self.wiping_device_id, f"{value}%")
 
     @pyqtSlot(dict)
     def _handle_wipe_success(self, result: dict):
         self.progress_bar.setValue(100)
-        self.status_label.setText("Wipe completed successfully. Generating certificate...")
+        counterfeit = result["status"] == "COUNTERFEIT_PARTIAL"
+        self.device_model.set_status(result["device_id"], "Wiped (counterfeit)" if counterfeit else "Wiped")
         
-        try:
-            cert_info = self.cert_engine.generate_certificate(result)
-            msg = (
-                f"Wipe completed successfully!\n\n"
-                f"Certificate ID: {cert_info['certificate_id']}\n"
-                f"Saved to: {cert_info['json_path']}\n"
-                f"QR Code: {cert_info['qr_path']}"
-            )
-            show_info_dialog(self, "Success", msg)
-        except Exception as e:
-            show_error_dialog(self, "Certificate Error", f"Wipe succeeded, but certificate generation failed:\n{e}")
-            
-        self._cleanup_after_wipe()
+        # Signing and QR rendering run on the certificate pool; the station is
+        # released for the next wipe immediately.
+        self.cert_workers.submit(result)
+        if self.subsystems.error is not None:
+            self.cert_workers.fail_held(self.subsystems.error)
+        outcome = "Counterfeit device: real storage wiped" if counterfeit else "Wipe completed successfully"
+        self._cleanup_after_wipe(
+            f"{outcome}. Generating certificate ({self.cert_workers.pending_count} pending)..."
+        )
+
+    @pyqtSlot(dict, dict)
+    def _handle_certificate_ready(self, result: dict, cert_info: dict):
+        if result["status"] == "COUNTERFEIT_PARTIAL":
+            headline = (f"Counterfeit device: it reports {result['size_bytes']} bytes but stores only "
+                        f"{result['verified_capacity_bytes']}. Its real storage was wiped; the certificate "
+                        f"records status {result['status']}.")
+        else:
+            headline = "Wipe completed successfully!"
+        msg = (
+            f"{headline}\n\n"
+            f"Device: {result['device_id']} (S/N: {result['serial']})\n"
+            f"Certificate ID: {cert_info['certificate_id']}\n"
+            f"Saved to: {cert_info['json_path']}\n"
+            f"QR Code: {cert_info['qr_path']}"
+        )
+        if result.get("forensic_image"):
+            msg += f"\nForensic image: {result['forensic_image']['manifest']}"
+        show_info_dialog(self, "Success", msg)
+
+    @pyqtSlot(dict, str)
+    def _handle_certificate_failed(self, result: dict, error_msg: str):
+        show_error_dialog(
+            self, "Certificate Error",
+            f"Wipe of {result['device_id']} (S/N: {result['serial']}) succeeded, but certificate generation failed:\n{error_msg}"
+        )
 
     @pyqtSlot(str)
     def _handle_wipe_failure(self, error_msg: str):
         self.progress_bar.setValue(0)
         self.status_label.setText("Wipe failed.")
+        if self.wiping_device_id:
+            self.device_model.set_status(self.wiping_device_id, "Failed")
         show_error_dialog(self, "Wipe Failed", f"A critical error occurred during the wipe process:\n\n{error_msg}")
         self._cleanup_after_wipe()
 
-    def _cleanup_after_wipe(self):
-        self.wipe_thread = None
+    def _cleanup_after_wipe(self, status: str = "Ready"):
+        self.status_label.setText(status)
+        if self.wipe_thread is None:
+            self._release_station()
+            return
+        # The engine emits its result before releasing the device handle; keep
+        # the station locked until the thread finishes instead of blocking the
+        # GUI thread on it.
+        self.wipe_thread.finished.connect(self._release_station)
+        if self.wipe_thread.isFinished():
+            self._release_station()
+
+    @pyqtSlot()
+    def _release_station(self):
+        if self.wipe_thread is not None:
+            if not self.wipe_thread.isFinished():
+                return
+            # finished has been emitted, so this returns at once; the QThread
+            # must not be destroyed while it is still unwinding.
+            self.wipe_thread.wait()
+            self.wipe_thread.finished.disconnect(self._release_station)
+            self.wipe_thread = None
+        elif self.wiping_device_id is None and self.wipe_btn.isEnabled():
+            return
+        self.wiping_device_id = None
         self._set_ui_locked(False)
-        self.status_label.setText("Ready")
         # Restart scanner
         self._start_scanner()
 
@@ -225,10 +332,28 @@ class MainWindow(QMainWindow):
             if reply == QMessageBox.StandardButton.Yes:
                 self.wipe_thread.cancel()
                 self.wipe_thread.wait()
-                self.scanner.stop()
+                self._shutdown_background_work()
                 event.accept()
             else:
                 event.ignore()
         else:
-            self.scanner.stop()
+            self._shutdown_background_work()
             event.accept()
+
+    def _shutdown_background_work(self):
+        self.scanner.stop()
+        if self.metrics_server is not None:
+            self.metrics_server.shutdown()
+        if self.log_shipper is not None:
+            self.log_shipper.stop()
+        # Never drop a certificate for a wipe that already happened: let the
+        # engine finish loading (its ready signal may not have been delivered yet)
+        self.subsystems.wait()
+        if self.subsystems.cert_engine is not None:
+            self._handle_certificate_engine_ready(self.subsystems.cert_engine)
+        elif self.subsystems.error is not None:
+            # The failure signal may not have been delivered either; release held results now
+            self.cert_workers.fail_held(self.subsystems.error)
+        self.cert_workers.wait_for_done()
+        if self.cert_engine is not None:
+            self.cert_engine.close()
@@ -2,22 +2,23 @@
 Enterprise Data Sanitization Platform
 UI Worker Threads
 """
-from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtCore import QObject, QRunnable, QThread, QThreadPool, pyqtSignal
+import threading
 import time
-from typing import List, Any
+from typing import List, Any, Dict, Optional
 
-import sys
-import os
-# Ensure core can be imported
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from core.device_validator import DeviceValidator, ValidatedDevice
-from core.logging_engine import log_error_event
+from core.device_validator import DeviceValidator, ValidatedDevice, scan_interval_for
+from core.logging_engine import log_error_event, device_logger, certificate_logger
+from core.audit_log import audit_context
+from core import metrics
+from utils.constants import DEVICE_SCAN_INTERVAL_S, CERT_WORKER_THREADS
 
 class DeviceScannerThread(QThread):
     """
     Background thread for continuously scanning for valid USB devices.
     Ensures the UI thread is never blocked by WMI queries.
     """
+    scanner_ready = pyqtSignal()       # Device discovery (WMI) initialized
     drives_updated = pyqtSignal(list)  # Emits List[ValidatedDevice]
     error_occurred = pyqtSignal(str)
 
@@ -25,39 +26,176 @@ class DeviceScannerThread(QThread):
         super().__init__(parent)
         self._is_running = True
         self._force_refresh = False
-        self.validator = DeviceValidator()
+        # Created on the scanner thread: WMI setup is slow and its connection is per-thread
+        self.validator: Optional[DeviceValidator] = None
         self._last_drives: List[ValidatedDevice] = []
+        self.last_enumeration_seconds = 0.0
 
     def run(self):
         """Main loop for the scanner thread."""
+        try:
+            self.validator = DeviceValidator()
+        except Exception as e:
+            log_error_event("worker_threads", "DeviceScannerThread.run", f"Device discovery initialization failed: {e}")
+            self.error_occurred.emit(str(e))
+            return
+        self.scanner_ready.emit()
+        try:
+            self._scan_loop()
+        finally:
+            self.validator.close()
+
+    def _scan_loop(self):
         while self._is_running:
+            interval = DEVICE_SCAN_INTERVAL_S
             try:
+                started = time.perf_counter()
                 current_drives = self.validator.get_valid_usb_drives()
+                self.last_enumeration_seconds = time.perf_counter() - started
+                metrics.ENUMERATION_SECONDS.observe(self.last_enumeration_seconds)
+                metrics.DEVICES_DETECTED.set(len(current_drives))
+                interval = scan_interval_for(self.last_enumeration_seconds)
+                if interval > DEVICE_SCAN_INTERVAL_S:
+                    device_logger.debug(f"Enumeration took {self.last_enumeration_seconds:.2f}s; polling every {interval:.1f}s.")
                 
-                # Check if the list of drives has changed (by comparing device IDs)
-                current_ids = {d.device_id for d in current_drives}
-                last_ids = {d.device_id for d in self._last_drives}
-                
-                if current_ids != last_ids or self._force_refresh:
+                # Check if the list of drives has changed. Full record comparison so a
+                # device swapped on the same port is reported as an update.
+                if set(current_drives) != set(self._last_drives) or self._force_refresh:
                     self.drives_updated.emit(current_drives)
                     self._last_drives = current_drives
                     self._force_refresh = False
                     
             except Exception as e:
+                metrics.ENUMERATION_ERRORS.inc()
                 log_error_event("worker_threads", "DeviceScannerThread.run", f"Scanner error: {e}")
                 self.error_occurred.emit(str(e))
                 
             # Sleep in small increments to allow quick cancellation
-            for _ in range(20): # 2 seconds total
+            for _ in range(int(interval * 10)):
                 if not self._is_running or self._force_refresh:
                     break
                 time.sleep(0.1)
 
     def trigger_refresh(self):
         """Force an immediate refresh of the device list."""
+        # A manual refresh is usually requested after plugging devices in, so
+        # also re-derive the system drive fingerprints from scratch.
+        DeviceValidator.invalidate_all_system_drive_caches()
         self._force_refresh = True
 
     def stop(self):
         """Safely stop the thread."""
         self._is_running = False
         self.wait()
+
+class SubsystemInitThread(QThread):
+    """
+    Loads the certificate subsystem off the GUI thread so the window shows
+    immediately: imports the crypto/QR stack (cryptography, OpenCV, numpy,
+    qrcode) and loads, or on first run generates, the station signing key.
+    """
+    certificate_engine_ready = pyqtSignal(object)   # CertificateEngine
+    initialization_failed = pyqtSignal(str, str)    # subsystem, error_message
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cert_engine = None
+        self.error: Optional[str] = None
+
+    def run(self):
+        try:
+            started = time.perf_counter()
+            # Deferred imports: these pull in the heavy native libraries
+            from core.certificate_engine import CertificateEngine
+            from core.certificate_store import CertificateStore
+            self.cert_engine = CertificateEngine(store=CertificateStore())
+            certificate_logger.info(f"Certificate subsystem ready in {time.perf_counter() - started:.2f}s.")
+            self.certificate_engine_ready.emit(self.cert_engine)
+        except Exception as e:
+            self.error = str(e)
+            log_error_event("worker_threads", "SubsystemInitThread.run", f"Certificate subsystem failed to initialize: {e}", exc_info=True)
+            self.initialization_failed.emit("certificates", str(e))
+
+class _CertificateJob(QRunnable):
+    """Generates one certificate on a pool thread and reports back through the pool's signals."""
+
+    def __init__(self, pool: "CertificateWorkerPool", wipe_result: Dict[str, Any]):
+        super().__init__()
+        self._pool = pool
+        self._wipe_result = wipe_result
+
+    def run(self):
+        with audit_context(job_id=self._wipe_result.get("job_id"), device_serial=self._wipe_result.get("serial")):
+            try:
+                cert_info = self._pool.cert_engine.generate_certificate(self._wipe_result)
+                self._pool.certificate_ready.emit(self._wipe_result, cert_info)
+            except Exception as e:
+                log_error_event("worker_threads", "_CertificateJob.run", f"Certificate generation failed: {e}")
+                self._pool.certificate_failed.emit(self._wipe_result, str(e))
+            finally:
+                self._pool._job_done()
+
+class CertificateWorkerPool(QObject):
+    """
+    Background queue for certificate generation (signing, QR render and
+    verification), so the GUI thread never blocks after a wipe and several
+    certificates can be built while the next wipe is already running.
+    Signals are emitted from pool threads and delivered queued to the GUI thread.
+
+    The pool can be created before the certificate engine exists; results
+    submitted meanwhile are held until set_engine() (or fail_held()).
+    """
+    certificate_ready = pyqtSignal(dict, dict)   # wipe_result, cert_info
+    certificate_failed = pyqtSignal(dict, str)   # wipe_result, error_message
+
+    def __init__(self, cert_engine=None, max_workers: int = CERT_WORKER_THREADS, parent=None):
+        super().__init__(parent)
+        self.cert_engine = cert_engine
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_workers)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._held: List[Dict[str, Any]] = []
+
+    @property
+    def is_ready(self) -> bool:
+        with self._lock:
+            return self.cert_engine is not None
+
+    def set_engine(self, cert_engine) -> None:
+        """Attach the certificate engine and start any held jobs."""
+        with self._lock:
+            self.cert_engine = cert_engine
+            held, self._held = self._held, []
+        for wipe_result in held:
+            self._pool.start(_CertificateJob(self, wipe_result))
+
+    def fail_held(self, error_message: str) -> None:
+        """Report every held job as failed (the engine could not be initialized)."""
+        with self._lock:
+            held, self._held = self._held, []
+            self._pending -= len(held)
+        for wipe_result in held:
+            self.certificate_failed.emit(wipe_result, error_message)
+
+    def submit(self, wipe_result: Dict[str, Any]) -> None:
+        """Queue certificate generation for a completed wipe."""
+        with self._lock:
+            self._pending += 1
+            if self.cert_engine is None:
+                self._held.append(wipe_result)
+                return
+        self._pool.start(_CertificateJob(self, wipe_result))
+
+    def _job_done(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    @property
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._pending
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        """Block until every started certificate has been generated (held jobs are not started)."""
+        return self._pool.waitForDone(msecs)
@@ -2,23 +2,96 @@
 Enterprise Data Sanitization Platform
 Constants and Magic Numbers
 """
-from typing import Final
+from typing import Final, Optional, Tuple
 
 # Wipe Configuration
 WIPE_BLOCK_SIZE_BYTES: Final[int] = 4 * 1024 * 1024  # 4MB constant block size
 MAX_DRIVE_SIZE_BYTES: Final[int] = 100 * 1024**4     # 100 TB max supported
 
+# Capacity Probe
+CAPACITY_PROBE_ENABLED: Final[bool] = True          # Verify the real capacity before every wipe
+CAPACITY_PROBE_SECTOR_BYTES: Final[int] = 4096      # Probe unit (aligned for 512e and 4Kn drives)
+CAPACITY_PROBE_POINTS_PER_OCTAVE: Final[int] = 4    # Probe offsets between consecutive powers of two
+CAPACITY_PROBE_IO_ATTEMPTS: Final[int] = 3          # Tries per probe transfer before an I/O error is persistent
+
+# Forensic Imaging
+FORENSIC_IMAGE_DIR: Final[str] = "images"           # One directory of segments + manifest per job
+FORENSIC_IMAGE_BLOCK_BYTES: Final[int] = 64 * 1024  # Zero-elision and compression unit
+FORENSIC_IMAGE_SEGMENT_BYTES: Final[int] = 2 * 1024**3  # Max segment file size (fits FAT32 evidence media)
+FORENSIC_IMAGE_COMPRESSION_LEVEL: Final[int] = 1    # zlib level; keeps pace with USB reads
+FORENSIC_IMAGE_WORKERS: Final[int] = 4              # Compression threads
+FORENSIC_IMAGE_QUEUE_CHUNKS: Final[int] = 8         # Read chunks in flight before the pre-hash read waits
+
+# Device Scanning
+DEVICE_SCAN_INTERVAL_S: Final[float] = 2.0          # Base polling interval
+DEVICE_SCAN_MAX_DUTY_CYCLE: Final[float] = 0.10     # Max fraction of time spent enumerating
+DEVICE_SECURITY_REPEAT_LOG_S: Final[float] = 300.0  # Re-log a persisting security verdict with its repeat count
+
+# Metrics
+METRICS_HTTP_HOST: Final[str] = "127.0.0.1"         # Metrics endpoint is local-only by default
+METRICS_HTTP_PORT: Final[Optional[int]] = 9464      # /metrics and /metrics.json (None disables the endpoint)
+
+# Tracing
+TRACE_DIR: Final[str] = "traces"                    # Chrome trace-event JSON per wipe job
+TRACE_ENABLED: Final[bool] = True                   # Record a span per wipe state
+TRACE_SUBPHASES: Final[bool] = True                 # Also record each pass and hash as a nested span
+TRACE_PROFILE_INTERVAL_S: Final[float] = 0.005      # Sampling profiler interval
+TRACE_PROFILE_MAX_DEPTH: Final[int] = 64            # Frames kept per stack sample
+TRACE_PROFILE_MAX_SAMPLES: Final[int] = 60000       # Timestamped samples kept per profiling session (newest; ~5 min)
+
 # Logging Configuration
 LOG_DIR: Final[str] = "logs"
 LOG_FORMAT: Final[str] = "[%(asctime)s] [%(levelname)s] [%(custom_module)s] [%(custom_funcName)s] %(message)s"
 DATE_FORMAT: Final[str] = "%Y-%m-%dT%H:%M:%SZ"
+AUDIT_LOG_FILE: Final[str] = "audit.jsonl"          # Hash-chained structured audit stream (all loggers)
+AUDIT_INDEX_FILE: Final[str] = "audit_index.db"     # Offset index of the audit stream by correlation ID
+LOG_BACKUP_DAYS: Final[int] = 365                   # Daily segments kept per log (audit retention)
+LOG_ARCHIVE_BLOCK_BYTES: Final[int] = 1024 * 1024   # Uncompressed size of one independently readable gzip block
+LOG_ARCHIVE_LEVEL: Final[int] = 6                   # zlib level for rotated segments
+LOG_QUEUE_MAX: Final[int] = 10000                   # Records buffered for the log writer thread
+LOG_FLUSH_BATCH: Final[int] = 256                   # Records written between forced flushes
+LOG_FLUSH_INTERVAL_S: Final[float] = 0.5            # Longest a written record stays in the file buffer
+LOG_FULL_QUEUE_WAIT_S: Final[float] = 1.0           # How long WARNING+ records wait for room before being dropped
+LOG_LOSSLESS_LOGGERS: Final[Tuple[str, ...]] = ("wipe", "certificate", "security")   # Forensic logs never dropped on a full queue
+
+# Log Shipping
+LOG_SHIP_URL: Final[Optional[str]] = None           # "http://collector:8514/ingest" or "syslog://collector:601" (None: no shipping)
+LOG_SHIP_STATION_ID: Final[Optional[str]] = None    # Station name sent with every record (None: host name)
+LOG_SHIP_STREAMS: Final[Tuple[str, ...]] = ("security", "wipe", "certificate")   # Logs tailed to the collector
+LOG_SHIP_SPOOL_DIR: Final[str] = "logs/spool"       # Compressed batches awaiting delivery, plus tail cursors
+LOG_SHIP_SPOOL_MAX_BYTES: Final[int] = 256 * 1024**2   # Spool size at which tailing pauses (backpressure)
+LOG_SHIP_BATCH_RECORDS: Final[int] = 1000           # Log lines per batch
+LOG_SHIP_BATCH_BYTES: Final[int] = 1024 * 1024      # Uncompressed bytes per batch
+LOG_SHIP_INTERVAL_S: Final[float] = 2.0             # Tail polling interval
+LOG_SHIP_TIMEOUT_S: Final[float] = 10.0             # Per-request network timeout
+LOG_SHIP_BACKOFF_INITIAL_S: Final[float] = 1.0      # First retry delay ceiling (full jitter, doubled per failure)
+LOG_SHIP_BACKOFF_MAX_S: Final[float] = 300.0        # Retry delay cap
 
 # Cryptography
 RSA_KEY_SIZE: Final[int] = 4096
+SIGNATURE_ALGORITHM: Final[str] = "rsa-pss-sha256"    # Or "ed25519" / "ecdsa-p256-sha256" (see core/signature_suites.py)
+
+# Certificates
+CERT_DIR: Final[str] = "certificates"
+CERT_DB_PATH: Final[str] = "certificates/certificates.db"
+CERT_WORKER_THREADS: Final[int] = 2                 # Concurrent background certificate jobs
+MERKLE_BATCH_SIGNING: Final[bool] = False          # Sign a Merkle root per batch instead of every certificate
+MERKLE_BATCH_MAX_SIZE: Final[int] = 64              # Certificates covered by one root signature
+MERKLE_BATCH_MAX_LATENCY_MS: Final[int] = 250       # Longest a certificate waits for its batch to fill
+
+# Signing Agent
+SIGNING_AGENT_ADDRESS: Final[Optional[str]] = None  # Sign through a running signing agent at this address (None: sign locally)
+SIGNING_AGENT_PIPE_NAME: Final[str] = r"\\.\pipe\ecowipe-signing-agent"   # Default agent address on Windows
+SIGNING_AGENT_SOCKET_FILE: Final[str] = "signing-agent.sock"   # Default Unix socket, inside the key directory
+SIGNING_AGENT_AUTHKEY_FILE: Final[str] = "signing_agent.authkey"  # Shared client secret, inside the key directory
+SIGNING_AGENT_WORKERS: Final[int] = 2               # Signer threads draining the request queue
+SIGNING_AGENT_QUEUE_MAX: Final[int] = 1024          # Queued requests before client reads are throttled
 
 # QR Code
 QR_BOX_SIZE: Final[int] = 12
 QR_BORDER: Final[int] = 4
+QR_VERIFY_BOX_SIZE: Final[int] = 4                  # Module size of the in-memory image decoded for verification
+QR_VERIFY_MODE: Final[str] = "decode"               # "decode" (OpenCV) or "structural" (module matrix comparison)
 
 # Win32 API Constants
 GENERIC_READ: Final[int] = 0x80000000
@@ -0,0 +1,50 @@
+"""
+Enterprise Data Sanitization Platform
+Bounded Parallel Execution Helpers
+"""
+from concurrent.futures import Executor, Future, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+def bounded_as_completed(
+    executor: Executor,
+    fn: Callable[..., Any],
+    items: Iterable[Any],
+    max_in_flight: int,
+    *extra_args: Any,
+) -> Iterator[Tuple[int, Any, Future]]:
+    """
+    Submit fn(item, *extra_args) for every item while keeping at most
+    max_in_flight tasks outstanding, yielding (index, item, future) as tasks
+    complete. Memory stays bounded for arbitrarily long (lazy) iterables.
+    """
+    pending: Dict[Future, Tuple[int, Any]] = {}
+    iterator = iter(enumerate(items))
+    exhausted = False
+
+    while True:
+        while not exhausted and len(pending) < max_in_flight:
+            try:
+                index, item = next(iterator)
+            except StopIteration:
+                exhausted = True
+                break
+            pending[executor.submit(fn, item, *extra_args)] = (index, item)
+
+        if not pending:
+            return
+
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            index, item = pending.pop(future)
+            yield index, item, future
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Lazily group an iterable into lists of at most `size` items."""
+    chunk: List[Any] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -5,11 +5,7 @@ Safe Windows API Wrappers
 import ctypes
 from ctypes import wintypes
 from typing import Optional, Tuple
-import os
 
-import sys
-# Ensure utils can be imported
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.constants import (
     GENERIC_READ, GENERIC_WRITE, FILE_SHARE_READ, FILE_SHARE_WRITE,
     OPEN_EXISTING, INVALID_HANDLE_VALUE, FSCTL_LOCK_VOLUME,